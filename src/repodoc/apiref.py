@@ -0,0 +1,349 @@
+"""Static extraction of a project's public Python API.
+
+Signatures, parameters and docstrings are read from the syntax tree, so API
+reference tables are exact and the model is only asked for what the code
+cannot say: short descriptions of undocumented symbols.
+"""
+
+from __future__ import annotations
+
+import ast
+import copy
+import textwrap
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from repodoc.graph import EXCLUDED_PACKAGES
+from repodoc.imports import module_names
+
+# Lines of source shown to the model per undocumented symbol
+SNIPPET_LINES = 12
+
+# Default values rendered longer than this are shown as ``...``
+MAX_DEFAULT_CHARS = 40
+
+
+@dataclass
+class ApiSymbol:
+    """A public class, function or method.
+
+    Attributes:
+        qualname: Name qualified with the enclosing class, if any.
+        kind: ``"class"``, ``"function"`` or ``"method"``.
+        signature: Definition without body, e.g. ``f(x: int) -> str``.
+        description: First docstring paragraph, or a generated description.
+        snippet: Leading source lines, used to describe undocumented symbols.
+    """
+
+    qualname: str
+    kind: str
+    signature: str
+    description: str = ""
+    snippet: str = ""
+
+
+@dataclass
+class ApiModule:
+    """Public API of one module.
+
+    Attributes:
+        name: Dotted module name.
+        path: File path inside the repository.
+        description: First paragraph of the module docstring.
+        symbols: Public symbols in source order; methods follow their class.
+    """
+
+    name: str
+    path: str
+    description: str = ""
+    symbols: List[ApiSymbol] = field(default_factory=list)
+
+
+def _summary(node: ast.AST) -> str:
+    """Return the first paragraph of a node's docstring on one line.
+
+    Args:
+        node: Module, class or function node.
+
+    Returns:
+        Docstring summary, or an empty string.
+    """
+    docstring = ast.get_docstring(node)
+    if not docstring:
+        return ""
+    return " ".join(docstring.strip().split("\n\n")[0].split())
+
+
+def _short(value: Optional[ast.expr]) -> Optional[ast.expr]:
+    """Replace a long default value with an ellipsis.
+
+    Args:
+        value: Default value expression.
+
+    Returns:
+        The value, or ``...`` when its source is too long.
+    """
+    if value is not None and len(ast.unparse(value)) > MAX_DEFAULT_CHARS:
+        return ast.Constant(value=...)
+    return value
+
+
+def _arguments(args: ast.arguments, *, bound: bool) -> str:
+    """Render an argument list, optionally without ``self``/``cls``.
+
+    Args:
+        args: Arguments of a function definition.
+        bound: Drop the first positional argument.
+
+    Returns:
+        Argument list without parentheses.
+    """
+    args = copy.copy(args)
+    if bound:
+        if args.posonlyargs:
+            args.posonlyargs = args.posonlyargs[1:]
+        else:
+            args.args = args.args[1:]
+    args.defaults = [_short(value) for value in args.defaults]
+    args.kw_defaults = [_short(value) for value in args.kw_defaults]
+    return ast.unparse(args)
+
+
+def _fields(node: ast.ClassDef) -> str:
+    """Render the constructor parameters of a dataclass.
+
+    Args:
+        node: Class definition decorated with ``dataclass``.
+
+    Returns:
+        Annotated fields with their defaults, without parentheses.
+    """
+    fields = []
+    for child in node.body:
+        if isinstance(child, ast.AnnAssign) and isinstance(child.target, ast.Name):
+            field_ = f"{child.target.id}: {ast.unparse(child.annotation)}"
+            default = _short(child.value)
+            fields.append(f"{field_}={ast.unparse(default)}" if default else field_)
+    return ", ".join(fields)
+
+
+def _is_dataclass(node: ast.ClassDef) -> bool:
+    """Tell whether a class is decorated with ``dataclass``.
+
+    Args:
+        node: Class definition.
+
+    Returns:
+        True for ``@dataclass`` and ``@dataclass(...)``.
+    """
+    for decorator in node.decorator_list:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        name = (
+            target.attr
+            if isinstance(target, ast.Attribute)
+            else getattr(target, "id", "")
+        )
+        if name == "dataclass":
+            return True
+    return False
+
+
+def _signature(node: ast.AST, *, method: bool = False) -> str:
+    """Render a definition without ``def``/``class`` keyword and body.
+
+    Classes are shown with their constructor parameters; methods without
+    ``self`` or ``cls``.
+
+    Args:
+        node: Class or (async) function definition.
+        method: Whether *node* is defined in a class body.
+
+    Returns:
+        Signature string.
+    """
+    if isinstance(node, ast.ClassDef):
+        init = next(
+            (
+                child
+                for child in node.body
+                if isinstance(child, ast.FunctionDef) and child.name == "__init__"
+            ),
+            None,
+        )
+        if init:
+            arguments = _arguments(init.args, bound=True)
+        else:
+            arguments = _fields(node) if _is_dataclass(node) else ""
+        return f"{node.name}({arguments})"
+    static = any(
+        isinstance(d, ast.Name) and d.id == "staticmethod" for d in node.decorator_list
+    )
+    arguments = _arguments(node.args, bound=method and not static)
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    prefix = "async " if isinstance(node, ast.AsyncFunctionDef) else ""
+    return f"{prefix}{node.name}({arguments}){returns}"
+
+
+def _exported(tree: ast.Module) -> Optional[List[str]]:
+    """Return a module's ``__all__`` when it is a literal list or tuple.
+
+    Args:
+        tree: Parsed module.
+
+    Returns:
+        Exported names, or None when ``__all__`` is absent or dynamic.
+    """
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets)
+            and isinstance(node.value, (ast.List, ast.Tuple))
+        ):
+            return [
+                element.value
+                for element in node.value.elts
+                if isinstance(element, ast.Constant) and isinstance(element.value, str)
+            ]
+    return None
+
+
+def is_public_module(path: str) -> bool:
+    """Tell whether a file belongs in the API reference.
+
+    Args:
+        path: File path inside the repository.
+
+    Returns:
+        False for non-Python, private, test, docs and example modules.
+    """
+    names = module_names(path)
+    if not names:
+        return False
+    parts = names[-1].split(".")
+    if parts[0] in EXCLUDED_PACKAGES or parts[-1].startswith("test_"):
+        return False
+    return not any(part.startswith("_") for part in parts)
+
+
+def extract_module(path: str, source: str) -> Optional[ApiModule]:
+    """Extract the public API of a Python module.
+
+    Names listed in ``__all__`` are public when it is defined; otherwise all
+    names without a leading underscore are. Methods of public classes are
+    included unless private; ``__init__`` is folded into the class signature.
+
+    Args:
+        path: File path inside the repository.
+        source: Python source code.
+
+    Returns:
+        The module's API, or None if it does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    lines = source.splitlines()
+    exported = _exported(tree)
+    definitions = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+    def symbol(node: ast.AST, qualname: str, kind: str) -> ApiSymbol:
+        end = min(node.end_lineno, node.lineno - 1 + SNIPPET_LINES)
+        snippet = textwrap.dedent("\n".join(lines[node.lineno - 1 : end]))
+        signature = _signature(node, method=kind == "method")
+        return ApiSymbol(qualname, kind, signature, _summary(node), snippet)
+
+    module = ApiModule(module_names(path)[-1], path, _summary(tree))
+    for node in tree.body:
+        if not isinstance(node, definitions):
+            continue
+        public = (
+            node.name in exported
+            if exported is not None
+            else not node.name.startswith("_")
+        )
+        if not public:
+            continue
+        if not isinstance(node, ast.ClassDef):
+            module.symbols.append(symbol(node, node.name, "function"))
+            continue
+        module.symbols.append(symbol(node, node.name, "class"))
+        for child in node.body:
+            if isinstance(child, definitions[1:]) and not child.name.startswith("_"):
+                module.symbols.append(
+                    symbol(child, f"{node.name}.{child.name}", "method")
+                )
+    return module
+
+
+def extract_api(files: Iterable[Tuple[str, str]]) -> List[ApiModule]:
+    """Extract the public API of every public module of a project.
+
+    Args:
+        files: ``(path, source)`` pairs.
+
+    Returns:
+        Modules with at least one public symbol, sorted by name.
+    """
+    modules = [
+        module
+        for path, source in files
+        if is_public_module(path)
+        for module in [extract_module(path, source)]
+        if module and module.symbols
+    ]
+    return sorted(modules, key=lambda module: module.name)
+
+
+def _cell(text: str) -> str:
+    """Escape text for a markdown table cell.
+
+    Args:
+        text: Cell content.
+
+    Returns:
+        Content with pipes escaped and newlines flattened.
+    """
+    return " ".join(text.split()).replace("|", "\\|")
+
+
+def render_api(modules: Iterable[ApiModule]) -> str:
+    """Render API reference tables in markdown.
+
+    Args:
+        modules: Modules whose symbols carry descriptions.
+
+    Returns:
+        Markdown starting with a level 2 header ``## API``.
+    """
+    sections = ["## API"]
+    for module in modules:
+        sections.append(f"### `{module.name}`")
+        if module.description:
+            sections.append(module.description)
+        functions = [s for s in module.symbols if s.kind == "function"]
+        if functions:
+            rows = ["| Function | Description |", "| --- | --- |"]
+            rows.extend(
+                f"| `{_cell(s.signature)}` | {_cell(s.description)} |"
+                for s in functions
+            )
+            sections.append("\n".join(rows))
+        for cls in (s for s in module.symbols if s.kind == "class"):
+            sections.append(f"#### `class {_cell(cls.signature)}`")
+            if cls.description:
+                sections.append(cls.description)
+            methods = [
+                s
+                for s in module.symbols
+                if s.kind == "method" and s.qualname.startswith(f"{cls.qualname}.")
+            ]
+            if methods:
+                rows = ["| Method | Description |", "| --- | --- |"]
+                rows.extend(
+                    f"| `{_cell(s.signature)}` | {_cell(s.description)} |"
+                    for s in methods
+                )
+                sections.append("\n".join(rows))
+    return "\n\n".join(sections) + "\n"
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import math
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Tuple
 
 
 def iter_chunks(path: Path, *, max_tokens: int = 16_000) -> Iterator[str]:
@@ -44,3 +44,32 @@ def iter_chunks(path: Path, *, max_tokens: int = 16_000) -> Iterator[str]:
 
     if buf:  # trailing remainder
         yield "".join(buf)
+
+
+def iter_line_chunks(
+    text: str, *, max_tokens: int = 512
+) -> Iterator[Tuple[int, int, str]]:
+    """Yield consecutive runs of whole lines within the token limit.
+
+    Uses the same 4 chars ≈ 1 token heuristic as :func:`iter_chunks`. A single
+    line longer than the limit becomes its own chunk.
+
+    Yields:
+        ``(first_line, last_line, text)`` with 1-based inclusive line numbers.
+    """
+    max_chars = max_tokens * 4
+    buf: list[str] = []
+    char_count = 0
+    first = 1
+
+    for number, line in enumerate(text.splitlines(keepends=True), start=1):
+        if buf and char_count + len(line) > max_chars:
+            yield first, number - 1, "".join(buf)
+            buf.clear()
+            char_count = 0
+            first = number
+        buf.append(line)
+        char_count += len(line)
+
+    if buf:
+        yield first, first + len(buf) - 1, "".join(buf)
@@ -2,85 +2,608 @@
 
 import asyncio
 import logging
+import os
+import socket
+import time
 from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 import typer
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.prompt import Confirm
 
-from repodoc.errors import OutputDirectoryError
-from repodoc.generators.base import get_generator
-from repodoc.logging import setup_logging
-from repodoc.ollama import OllamaClient
-from repodoc.parser import run_repomix
-from repodoc.writer import write
+from repodoc.errors import ConfigurationError, OutputDirectoryError, RepoDocError
+from repodoc.generators.base import ContextMode
 
+# Heavy dependencies (rich widgets, httpx via the Ollama client, generator
+# modules) are imported inside the functions using them, so that
+# ``repodoc --help`` and shell completion only pay for typer itself.
+
+# Generators of a run and the descriptions used in progress and log output
+GENERATORS: Dict[str, str] = {
+    "api": "API documentation",
+    "manual": "User manual",
+    "architecture": "Architecture documentation",
+}
 
 app = typer.Typer(
     name="repodoc",
     help="Generate documentation from Git repositories using Ollama.",
+    # Plain click help output; rich formatting alone doubles startup time.
+    rich_markup_mode=None,
 )
 
 
+def _client_settings(config: Any) -> Dict[str, Any]:
+    """Return the client keyword arguments derived from the configuration.
+
+    Args:
+        config: Loaded configuration.
+
+    Returns:
+        Concurrency and chunk sizes for :class:`~repodoc.ollama.OllamaClient`.
+    """
+    performance = config.performance
+    return {
+        "concurrency": performance.concurrency,
+        "default_chunk_tokens": performance.chunk_tokens,
+        "chunk_tokens": {
+            model: profile.chunk_tokens
+            for model, profile in performance.models.items()
+            if profile.chunk_tokens
+        },
+    }
+
+
+def _seed_rates(client: Any, config: Any) -> None:
+    """Start the client's timeouts from the rates measured by ``repodoc tune``.
+
+    Args:
+        client: Ollama client.
+        config: Loaded configuration.
+    """
+    from repodoc.timeouts import ModelRates
+
+    for model, profile in config.performance.models.items():
+        rates = ModelRates()
+        if profile.prompt_rate:
+            rates.prompt_rate = profile.prompt_rate
+        if profile.token_rate:
+            rates.token_rate = profile.token_rate
+        # No samples: the first measurement of this run replaces the benchmark
+        client.rates.seed(model, rates)
+
+
+def _pack(
+    repo_path: Path,
+    output_dir: Path,
+    rev: Optional[str],
+    stream: Optional[Any] = None,
+) -> Awaitable[Path]:
+    """Start packing the working tree with repomix, or a revision with Git.
+
+    Args:
+        repo_path: Path to the Git repository; may be bare with *rev*.
+        output_dir: Output directory, which keeps revision packs.
+        rev: Revision to pack from the object database; None for the
+            working tree.
+        stream: Receives the packed files; None to only write the pack.
+
+    Returns:
+        Awaitable resolving to the path of the XML pack.
+    """
+    from repodoc.gitpack import PACKS_DIR, pack_revision
+    from repodoc.parser import OutputFormat, stream_repomix
+
+    if rev is not None:
+        packs_dir = output_dir / PACKS_DIR
+        return pack_revision(repo_path, rev, packs_dir, stream)
+    return stream_repomix(repo_path, stream, format=OutputFormat.XML, parsable=True)
+
+
+async def _document_shards(
+    client: Any,
+    console: Any,
+    repo_path: Path,
+    shards: List[Tuple[str, Path, Callable[[Optional[Any]], Awaitable[Path]]]],
+    *,
+    seeds: Dict[str, Any],
+    generator_options: Dict[str, Any],
+) -> Set[str]:
+    """Pack trees and write their documents, all trees concurrently.
+
+    Args:
+        client: Ollama client.
+        console: Console of the progress display.
+        repo_path: Path to Git repository to document.
+        shards: ``(name, docs_dir, pack)`` triples: a name labelling
+            progress and log output (empty for a lone tree), the directory
+            to write the documents to, and a function starting to pack the
+            tree given the stream to send packed files to.
+        seeds: Scheduler seeds in addition to the pack.
+        generator_options: Keyword arguments of every generator.
+
+    Returns:
+        Names of the shards with a document that failed and the user chose
+        to continue.
+
+    Raises:
+        typer.Exit: If the user stops after a failed document.
+    """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.prompt import Confirm
+
+    from repodoc.parser import PackStream
+    from repodoc.scheduler import Scheduler
+    from repodoc.writer import write
+
+    logger = logging.getLogger("repodoc")
+    generators = GENERATORS
+    failed: Set[str] = set()
+
+    # Generators and their shared artifacts run as a DAG per shard;
+    # documents are written as soon as each one completes. Packing runs in
+    # the background: nodes needing the pack wait for it, while map-stage
+    # nodes consume packed files from a bounded stream as they arrive.
+    seeds = {
+        "project_file": None,
+        "pack_stream": None,
+        "repo_path": repo_path,
+        **seeds,
+    }
+    streamed = "pack_stream" in Scheduler(client, seeds).plan(generators)
+    results: asyncio.Queue[Optional[Tuple[str, Path, str, Any]]] = asyncio.Queue()
+    packings: Dict[str, asyncio.Future[Path]] = {}
+
+    async def document(
+        name: str, docs_dir: Path, pack: Callable[[Optional[Any]], Awaitable[Path]]
+    ) -> None:
+        stream = PackStream() if streamed else None
+        packing = packings[name] = asyncio.ensure_future(pack(stream))
+        scheduler = Scheduler(
+            client,
+            {**seeds, "project_file": packing, "pack_stream": stream},
+            generator_options=generator_options,
+        )
+        try:
+            async for kind, doc in scheduler.run(generators):
+                await results.put((name, docs_dir, kind, doc))
+        finally:
+            results.put_nowait(None)  # this shard is finished
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        tasks = {
+            (name, kind): progress.add_task(
+                f"Generating {description}{f' of {name}' if name else ''}...",
+                total=None,
+            )
+            for name, _, _ in shards
+            for kind, description in generators.items()
+        }
+        runners = [asyncio.ensure_future(document(*shard)) for shard in shards]
+        try:
+            remaining = len(runners)
+            while remaining:
+                result = await results.get()
+                if result is None:
+                    remaining -= 1
+                    continue
+                name, docs_dir, kind, doc = result
+                description = generators[kind] + (f" of {name}" if name else "")
+                if isinstance(doc, BaseException) and packings[name].done():
+                    # Nothing can be generated without the pack
+                    await packings[name]
+
+                try:
+                    if isinstance(doc, BaseException):
+                        raise doc
+
+                    # Write documentation to file
+                    out_file = write(doc, kind, docs_dir)
+                    logger.info(f"Wrote {description} to {out_file}")
+
+                except Exception as e:
+                    failed.add(name)
+                    logger.error(f"Failed to generate {description}: {e}")
+                    if not Confirm.ask("Continue with remaining documentation?"):
+                        raise typer.Exit(1)
+
+                progress.update(tasks[(name, kind)], completed=True)
+            await asyncio.gather(*runners)
+        finally:
+            for runner in runners:
+                runner.cancel()
+            await asyncio.gather(*runners, return_exceptions=True)
+
+    for name, packing in packings.items():
+        logger.debug(f"Pack{f' of {name}' if name else ''}: {await packing}")
+    return failed
+
+
+async def _document_revision(
+    client: Any,
+    console: Any,
+    repo_path: Path,
+    output_dir: Path,
+    docs_dir: Path,
+    rev: Optional[str],
+    *,
+    seeds: Dict[str, Any],
+    generator_options: Dict[str, Any],
+) -> bool:
+    """Pack one revision and write its documents.
+
+    Args:
+        client: Ollama client.
+        console: Console of the progress display.
+        repo_path: Path to Git repository to document.
+        output_dir: Output directory of the run, which keeps revision packs.
+        docs_dir: Directory to write the documents to.
+        rev: Revision to document; None for the working tree.
+        seeds: Scheduler seeds in addition to the pack.
+        generator_options: Keyword arguments of every generator.
+
+    Returns:
+        Whether a document failed and the user chose to continue.
+
+    Raises:
+        typer.Exit: If the user stops after a failed document.
+    """
+    logger = logging.getLogger("repodoc")
+    if rev is None:
+        logger.info("Running repomix to analyze repository...")
+    else:
+        logger.info(f"Packing revision {rev} from the Git object database...")
+    failed = await _document_shards(
+        client,
+        console,
+        repo_path,
+        [("", docs_dir, lambda stream: _pack(repo_path, output_dir, rev, stream))],
+        seeds=seeds,
+        generator_options=generator_options,
+    )
+    return bool(failed)
+
+
+async def _document_packages(
+    client: Any,
+    console: Any,
+    repo_path: Path,
+    output_dir: Path,
+    rev: Optional[str],
+    *,
+    seeds: Dict[str, Any],
+    generator_options: Dict[str, Any],
+) -> bool:
+    """Document every package of a monorepo concurrently, with an index.
+
+    Packages are read from the Git object database, so only committed
+    files are documented. A package whose files are unchanged since its
+    documents were last written is skipped.
+
+    Args:
+        client: Ollama client.
+        console: Console of the progress display.
+        repo_path: Path to Git repository to document.
+        output_dir: Output directory; each package gets a subdirectory.
+        rev: Revision to document; None for ``HEAD``.
+        seeds: Scheduler seeds in addition to the pack.
+        generator_options: Keyword arguments of every generator.
+
+    Returns:
+        Whether a document failed and the user chose to continue.
+
+    Raises:
+        typer.Exit: If the user stops after a failed document.
+    """
+    from repodoc.gitpack import PACKS_DIR, list_tree, pack_files, resolve_revision
+    from repodoc.monorepo import (
+        MANIFEST_PATH,
+        find_packages,
+        load_manifest,
+        render_index,
+        save_manifest,
+    )
+    from repodoc.writer import KIND_TO_FILENAME, write
+
+    logger = logging.getLogger("repodoc")
+    commit = await resolve_revision(repo_path, rev or "HEAD")
+    packages = find_packages(await list_tree(repo_path, commit))
+    manifest_path = output_dir / MANIFEST_PATH
+    manifest = load_manifest(manifest_path)
+    packs_dir = output_dir / PACKS_DIR
+    if rev is None:
+        logger.info("Documenting the packages of HEAD without uncommitted changes")
+
+    def current(package: Any) -> bool:
+        docs_dir = output_dir / package.slug
+        return manifest.get(package.root) == package.digest and all(
+            (docs_dir / KIND_TO_FILENAME[kind]).exists() for kind in GENERATORS
+        )
+
+    changed = [package for package in packages if not current(package)]
+    logger.info(
+        f"Found {len(packages)} packages; {len(changed)} changed since the last run"
+    )
+    shards = [
+        (
+            package.name,
+            output_dir / package.slug,
+            lambda stream, package=package: pack_files(
+                repo_path,
+                package.entries,
+                packs_dir / f"{package.digest}.xml",
+                stream,
+                label=f"package {package.name}",
+            ),
+        )
+        for package in changed
+    ]
+    failed = await _document_shards(
+        client,
+        console,
+        repo_path,
+        shards,
+        seeds=seeds,
+        generator_options=generator_options,
+    )
+
+    for package in changed:
+        if package.name not in failed:
+            manifest[package.root] = package.digest
+    roots = {package.root for package in packages}
+    save_manifest(
+        manifest_path,
+        {root: digest for root, digest in manifest.items() if root in roots},
+    )
+    index = render_index(repo_path.name, packages, GENERATORS)
+    out_file = write(index, "index", output_dir)
+    logger.info(f"Wrote the package index to {out_file}")
+    return bool(failed)
+
+
+async def _document_within(
+    client: Any,
+    repo_path: Path,
+    output_dir: Path,
+    rev: Optional[str],
+    *,
+    until: float,
+    history: Any,
+    seeds: Dict[str, Any],
+    generator_options: Dict[str, Any],
+) -> bool:
+    """Write the best documents a deadline allows.
+
+    A draft of every document is written first and replaced by versions
+    generated from more context while time remains (see
+    :func:`~repodoc.deadline.refine`).
+
+    Args:
+        client: Ollama client.
+        repo_path: Path to Git repository to document.
+        output_dir: Directory to write the documents to.
+        rev: Revision to document; None for the working tree.
+        until: Deadline as a :func:`time.monotonic` timestamp.
+        history: Throughput measured by earlier runs.
+        seeds: Scheduler seeds in addition to the pack.
+        generator_options: Keyword arguments of every generator.
+
+    Returns:
+        Whether a document has no complete version by the deadline.
+    """
+    from repodoc.deadline import refine
+    from repodoc.writer import write
+
+    logger = logging.getLogger("repodoc")
+    logger.info(f"Packing repository ({until - time.monotonic():.0f}s left)...")
+    project_file = await _pack(repo_path, output_dir, rev)
+
+    def publish(kind: str, doc: str, budget: int) -> None:
+        out_file = write(doc, kind, output_dir)
+        logger.info(
+            f"Wrote {GENERATORS[kind]} from {budget:,} context tokens to {out_file}"
+        )
+
+    published = await refine(
+        client,
+        {
+            "project_file": project_file,
+            "pack_stream": None,
+            "repo_path": repo_path,
+            **seeds,
+        },
+        GENERATORS,
+        until=until,
+        history=history,
+        generator_options=generator_options,
+        publish=publish,
+    )
+    missing = [kind for kind in GENERATORS if kind not in published]
+    for kind in missing:
+        logger.error(f"No complete {GENERATORS[kind]} within the deadline")
+    return bool(missing)
+
+
 async def _generate_docs(
     repo_path: Path,
     output_dir: Path,
     verbose: bool,
+    context: ContextMode = ContextMode.INPUTS,
+    outline: bool = False,
+    resume: bool = False,
+    rev: Optional[str] = None,
+    revs: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    chunk_tokens: Optional[int] = None,
+    repair: bool = True,
+    queue_dir: Optional[Path] = None,
+    packages: bool = False,
+    deadline: Optional[float] = None,
 ) -> None:
     """Generate documentation from Git repositories using Ollama.
 
+    Model output is recorded in a run journal in the output directory while
+    it streams in. The journal is deleted once every document is written;
+    otherwise a later run with *resume* reuses what was generated.
+
+    With *revs*, revisions are documented oldest first into one
+    subdirectory each. They share the journal, so any request whose prompt
+    did not change since the previous revision is answered from it; they
+    also share the embedding index and, in outline mode, reuse outlines
+    while the set of files is unchanged. Only the work affected by each
+    revision's delta reaches the model.
+
     Args:
         repo_path: Path to Git repository to document.
         output_dir: Directory to write documentation to.
         verbose: Whether to enable verbose logging.
+        context: How generators select the project context they send.
+        outline: Whether to outline documents and write sections concurrently.
+        resume: Whether to continue from the journal of an interrupted run.
+        rev: Revision to document instead of the working tree.
+        revs: Revisions to document, ``A..B`` or ``A,B,C`` (see
+            :func:`~repodoc.gitpack.revision_range`).
+        concurrency: Requests in flight, overriding the configuration.
+        chunk_tokens: Map-stage chunk size, overriding the configuration.
+        repair: Whether to validate documents and repair failing sections.
+        queue_dir: Shared queue directory; generation requests become jobs
+            for ``repodoc worker`` processes instead of being sent to Ollama.
+        packages: Whether to document each package root of a monorepo on
+            its own, concurrently, with an index linking them.
+        deadline: Seconds the run may take; documents are drafted first and
+            refined while time remains.
     """
+    from repodoc.config import load as load_config
+    from repodoc.gitpack import PACKS_DIR, list_tree, revision_range, tree_delta
+    from repodoc.history import HISTORY_PATH, ThroughputHistory
+    from repodoc.journal import JOURNAL_PATH, Journal
+    from repodoc.logging import setup_logging
+    from repodoc.ollama import OllamaClient
+    from repodoc.workqueue import QueueClient, open_queue
+
+    started = time.monotonic()
+
     # Set up logging
     console = setup_logging(verbose)
     logger = logging.getLogger("repodoc")
 
     try:
-        # Run repomix to get project content
-        logger.info("Running repomix to analyze repository...")
-        project_file = run_repomix(repo_path)
-        logger.debug(f"Repomix output: {project_file}")
+        config = load_config(
+            {"concurrency": concurrency, "chunk_tokens": chunk_tokens}
+        )
+    except ConfigurationError as e:
+        logger.error(f"Configuration error: {e}")
+        raise typer.Exit(e.exit_code)
 
+    try:
+        journal = Journal(output_dir / JOURNAL_PATH, resume=resume)
+        if queue_dir is not None:
+            work_queue, cache = open_queue(queue_dir)
+    except OutputDirectoryError as e:
+        logger.error(f"Output directory error: {e}")
+        raise typer.Exit(1)
+    failed = False
+
+    try:
         # Initialize Ollama client
         logger.info("Initializing Ollama client...")
-        client = OllamaClient()
+        settings: Dict[str, Any] = {
+            "routes": config.routes,
+            "keep_alive": config.keep_alive,
+            "journal": journal,
+            **_client_settings(config),
+        }
+        if queue_dir is None:
+            client = OllamaClient(config.ollama_url, config.model, **settings)
+        else:
+            logger.info(f"Submitting generation requests to workers of {queue_dir}")
+            client = QueueClient(
+                work_queue, cache, config.ollama_url, config.model, **settings
+            )
+        # Load every routed model while the repository is being packed
+        warm_up = asyncio.create_task(client.warm_up())
         logger.debug("Ollama client initialized")
 
-        # Generate documentation for each type
-        generators = {
-            "api": "API documentation",
-            "manual": "User manual",
-            "architecture": "Architecture documentation",
+        # Start from the throughput measured by earlier runs
+        history_path = output_dir / HISTORY_PATH
+        history = ThroughputHistory.load(history_path)
+        _seed_rates(client, config)
+        history.seed(client.rates)
+
+        seeds: Dict[str, Any] = {}
+        options: Dict[str, Any] = {
+            "context": context,
+            "outline": outline,
+            "repair": repair,
         }
+        # Monorepo packages and deadline runs are documented below instead
+        targets: List[Tuple[Optional[str], Path]] = (
+            [] if packages or deadline is not None else [(rev, output_dir)]
+        )
+        if revs is not None:
+            revisions = await revision_range(repo_path, revs)
+            logger.info(f"Documenting {len(revisions)} revisions: {revs}")
+            targets = [
+                (name, output_dir / name.replace("/", "-")) for name in revisions
+            ]
+            seeds["embeddings_dir"] = output_dir / PACKS_DIR / "embeddings"
+            options["outlines"] = {}
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            for kind, description in generators.items():
-                task = progress.add_task(f"Generating {description}...", total=None)
-                
-                try:
-                    # Get generator and generate documentation
-                    generator = get_generator(kind)()
-                    doc = await generator.generate(project_file.read_text(), client)
-                    
-                    # Write documentation to file
-                    out_file = write(doc, kind, output_dir)
-                    logger.info(f"Wrote {description} to {out_file}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to generate {description}: {e}")
-                    if not Confirm.ask("Continue with remaining documentation?"):
-                        raise typer.Exit(1)
-                
-                progress.update(task, completed=True)
+        if packages:
+            failed |= await _document_packages(
+                client,
+                console,
+                repo_path,
+                output_dir,
+                rev,
+                seeds=seeds,
+                generator_options=options,
+            )
 
+        if deadline is not None:
+            failed |= await _document_within(
+                client,
+                repo_path,
+                output_dir,
+                rev,
+                until=started + deadline,
+                history=history,
+                seeds=seeds,
+                generator_options=options,
+            )
+
+        previous = None
+        for name, docs_dir in targets:
+            if revs is not None:
+                entries = await list_tree(repo_path, name)
+                if previous is not None:
+                    delta = tree_delta(previous, entries)
+                    logger.info(f"Changes in {name}: {delta}")
+                previous = entries
+            failed |= await _document_revision(
+                client,
+                console,
+                repo_path,
+                output_dir,
+                docs_dir,
+                name,
+                seeds=seeds,
+                generator_options=options,
+            )
+
+        await warm_up
+        history.update(client.rates, client.metrics)
+        history.save(history_path)
+        if journal.resumed:
+            logger.info(f"Reused {journal.resumed} responses from the run journal")
+        if not failed:
+            journal.discard()
         logger.info("Documentation generation complete!")
+        for line in client.metrics.summary():
+            logger.info(f"  {line}")
 
     except OutputDirectoryError as e:
         logger.error(f"Output directory error: {e}")
@@ -89,9 +612,203 @@ async def _generate_docs(
         logger.error(f"Unexpected error: {e}")
         raise typer.Exit(1)
     finally:
+        journal.close()
         await client.close()
 
 
+async def _plan_docs(
+    repo_path: Path,
+    output_dir: Path,
+    verbose: bool,
+    context: ContextMode = ContextMode.INPUTS,
+    outline: bool = False,
+    rev: Optional[str] = None,
+) -> None:
+    """Estimate the cost and duration of a run without calling the model.
+
+    The repository is packed and the generators run against a client that
+    records requests instead of sending them. Responses completed in the
+    output directory's journal count as cached, and the throughput measured
+    by earlier runs turns prompt sizes into an ETA.
+
+    Args:
+        repo_path: Path to Git repository to document.
+        output_dir: Directory a run would write documentation to.
+        verbose: Whether to enable verbose logging.
+        context: How generators select the project context they send.
+        outline: Whether documents would be outlined first.
+        rev: Revision to estimate instead of the working tree.
+    """
+    from repodoc.config import load as load_config
+    from repodoc.history import HISTORY_PATH, ThroughputHistory
+    from repodoc.journal import JOURNAL_PATH, read_journal
+    from repodoc.logging import setup_logging
+    from repodoc.plan import PlanningClient, build_plan
+
+    setup_logging(verbose)
+    logger = logging.getLogger("repodoc")
+
+    try:
+        config = load_config()
+    except ConfigurationError as e:
+        logger.error(f"Configuration error: {e}")
+        raise typer.Exit(e.exit_code)
+
+    client = PlanningClient(
+        config.ollama_url,
+        config.model,
+        routes=config.routes,
+        **_client_settings(config),
+    )
+    try:
+        journal = read_journal(output_dir / JOURNAL_PATH)
+        history = ThroughputHistory.load(output_dir / HISTORY_PATH)
+
+        logger.info("Packing repository...")
+        project_file = await _pack(repo_path, output_dir, rev)
+        plan = await build_plan(
+            client,
+            {"project_file": project_file, "repo_path": repo_path},
+            GENERATORS,
+            context=context,
+            outline=outline,
+            cached={key for key, (_, done) in journal.items() if done},
+            history=history,
+        )
+    except RepoDocError as e:
+        logger.error(f"Planning failed: {e}")
+        raise typer.Exit(e.exit_code)
+    finally:
+        await client.close()
+
+    for line in plan.lines():
+        typer.echo(line)
+
+
+async def _tune(verbose: bool, levels: List[int]) -> None:
+    """Benchmark the configured host and save the results to config.toml.
+
+    Args:
+        verbose: Whether to enable verbose logging.
+        levels: Concurrency levels to try.
+    """
+    from repodoc.config import load as load_config
+    from repodoc.config import render_performance, save_performance
+    from repodoc.logging import setup_logging
+    from repodoc.ollama import OllamaClient
+    from repodoc.tune import tune as tune_host
+
+    setup_logging(verbose)
+    logger = logging.getLogger("repodoc")
+
+    try:
+        config = load_config()
+    except ConfigurationError as e:
+        logger.error(f"Configuration error: {e}")
+        raise typer.Exit(e.exit_code)
+
+    models = list(dict.fromkeys([config.model, *config.routes.values()]))
+    client = OllamaClient(
+        config.ollama_url, config.model, keep_alive=config.keep_alive
+    )
+    try:
+        logger.info(f"Benchmarking {config.ollama_url}: {', '.join(models)}")
+        performance = await tune_host(
+            client, models, base=config.performance, levels=levels
+        )
+        save_performance(performance)
+    except RepoDocError as e:
+        logger.error(f"Tuning failed: {e}")
+        raise typer.Exit(e.exit_code)
+    finally:
+        await client.close()
+
+    typer.echo(render_performance(performance), nl=False)
+
+
+async def _work(
+    queue_dir: Path,
+    verbose: bool,
+    concurrency: Optional[int] = None,
+    idle_exit: Optional[float] = None,
+) -> None:
+    """Process jobs of a shared work queue with the configured Ollama host.
+
+    Args:
+        queue_dir: Queue directory shared with ``repodoc generate --queue``.
+        verbose: Whether to enable verbose logging.
+        concurrency: Jobs processed at once, overriding the configuration.
+        idle_exit: Stop after this many seconds without a job; None to run
+            until interrupted.
+    """
+    from repodoc.config import load as load_config
+    from repodoc.logging import setup_logging
+    from repodoc.ollama import OllamaClient
+    from repodoc.workqueue import Worker, open_queue
+
+    setup_logging(verbose)
+    logger = logging.getLogger("repodoc")
+
+    try:
+        config = load_config({"concurrency": concurrency})
+        work_queue, cache = open_queue(queue_dir)
+    except RepoDocError as e:
+        logger.error(f"Worker failed to start: {e}")
+        raise typer.Exit(e.exit_code)
+
+    clients: Dict[str, Any] = {}
+
+    def client_for(model: str) -> Any:
+        if model not in clients:
+            clients[model] = OllamaClient(
+                config.ollama_url,
+                model,
+                keep_alive=config.keep_alive,
+                **_client_settings(config),
+            )
+            _seed_rates(clients[model], config)
+        return clients[model]
+
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    worker = Worker(work_queue, cache, client_for, owner=owner)
+    logger.info(f"Worker {owner} serving {queue_dir} with {config.ollama_url}")
+    try:
+        processed = await worker.run(config.performance.concurrency, idle_exit)
+    except RepoDocError as e:
+        logger.error(f"Worker failed: {e}")
+        raise typer.Exit(e.exit_code)
+    finally:
+        for client in clients.values():
+            await client.close()
+    logger.info(f"Worker {owner} completed {processed} jobs")
+
+
+def _parse_duration(text: str) -> float:
+    """Parse a duration option such as ``300``, ``90s``, ``5m`` or ``1h``.
+
+    Args:
+        text: Option value; plain numbers are seconds.
+
+    Returns:
+        Duration in seconds.
+
+    Raises:
+        typer.BadParameter: If the value is not a positive duration.
+    """
+    units = {"s": 1, "m": 60, "h": 3600}
+    value = text.strip().lower()
+    scale = units.get(value[-1:], 1)
+    if value[-1:] in units:
+        value = value[:-1]
+    try:
+        seconds = float(value) * scale
+    except ValueError:
+        raise typer.BadParameter(f"Invalid duration: {text!r}") from None
+    if seconds <= 0:
+        raise typer.BadParameter(f"Duration must be positive: {text!r}")
+    return seconds
+
+
 @app.command(name="generate")
 def generate(
     repo_path: Path = typer.Argument(
@@ -116,9 +833,223 @@ def generate(
         "-v",
         help="Enable verbose logging.",
     ),
+    context: ContextMode = typer.Option(
+        ContextMode.INPUTS.value,
+        "--context",
+        help=(
+            "Context sent to each generator: its declared inputs, chunks "
+            "retrieved by embedding similarity, files chosen by the "
+            "token-budget planner, or a PageRank-ranked map of definitions."
+        ),
+    ),
+    outline: bool = typer.Option(
+        False,
+        "--outline",
+        help=(
+            "Outline each document first, then generate its sections "
+            "concurrently from only the files they need."
+        ),
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help=(
+            "Continue an interrupted run: reuse the model output recorded in "
+            "the output directory's journal and generate only the rest."
+        ),
+    ),
+    rev: Optional[str] = typer.Option(
+        None,
+        "--rev",
+        help=(
+            "Document this branch, tag or commit, read from the Git object "
+            "database without a checkout; works on bare repositories."
+        ),
+    ),
+    revs: Optional[str] = typer.Option(
+        None,
+        "--revs",
+        help=(
+            "Document several revisions oldest first, one subdirectory each: "
+            "A..B for A, every tag in between and B, or a comma-separated "
+            "list. Work unchanged since the previous revision is reused."
+        ),
+    ),
+    concurrency: Optional[int] = typer.Option(
+        None,
+        "--concurrency",
+        min=1,
+        help="Generation requests in flight; overrides [performance].",
+    ),
+    chunk_tokens: Optional[int] = typer.Option(
+        None,
+        "--chunk-tokens",
+        min=1,
+        help="Prompt tokens per map-stage chunk; overrides [performance].",
+    ),
+    repair: bool = typer.Option(
+        True,
+        "--repair/--no-repair",
+        help=(
+            "Check each document for missing headers, broken code blocks and "
+            "diagrams and truncated text, and rewrite only failing sections."
+        ),
+    ),
+    packages: bool = typer.Option(
+        False,
+        "--packages",
+        help=(
+            "Document each package (a directory with pyproject.toml, "
+            "package.json, go.mod or Cargo.toml) on its own and concurrently, "
+            "plus an index.md linking them; unchanged packages are skipped."
+        ),
+    ),
+    deadline: Optional[str] = typer.Option(
+        None,
+        "--deadline",
+        help=(
+            "Time budget such as 300, 90s, 5m or 1h: write a draft of every "
+            "document from the highest-ranked context first, then refine it "
+            "with more context while time remains."
+        ),
+    ),
+    queue_dir: Optional[Path] = typer.Option(
+        None,
+        "--queue",
+        help=(
+            "Shared queue directory: hand generation requests to "
+            "'repodoc worker' processes instead of calling Ollama directly."
+        ),
+        file_okay=False,
+        dir_okay=True,
+    ),
 ) -> None:
     """Generate documentation from Git repositories using Ollama."""
-    asyncio.run(_generate_docs(repo_path, output_dir, verbose))
+    if rev is not None and revs is not None:
+        raise typer.BadParameter("--rev and --revs cannot be combined")
+    if packages and revs is not None:
+        raise typer.BadParameter("--packages and --revs cannot be combined")
+    if deadline is not None and (revs is not None or packages):
+        raise typer.BadParameter(
+            "--deadline cannot be combined with --revs or --packages"
+        )
+    asyncio.run(
+        _generate_docs(
+            repo_path,
+            output_dir,
+            verbose,
+            context=context,
+            outline=outline,
+            resume=resume,
+            rev=rev,
+            revs=revs,
+            concurrency=concurrency,
+            chunk_tokens=chunk_tokens,
+            repair=repair,
+            queue_dir=queue_dir,
+            packages=packages,
+            deadline=None if deadline is None else _parse_duration(deadline),
+        )
+    )
+
+
+@app.command(name="plan")
+def plan(
+    repo_path: Path = typer.Argument(
+        ...,
+        help="Path to Git repository to document.",
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    ),
+    output_dir: Path = typer.Option(
+        "docs",
+        "--output-dir",
+        "-o",
+        help="Output directory of the run, holding its journal and history.",
+        file_okay=False,
+        dir_okay=True,
+    ),
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Enable verbose logging.",
+    ),
+    context: ContextMode = typer.Option(
+        ContextMode.INPUTS.value,
+        "--context",
+        help="Context mode of the run to estimate, as for generate.",
+    ),
+    outline: bool = typer.Option(
+        False,
+        "--outline",
+        help="Estimate an outlined run; section requests are not counted.",
+    ),
+    rev: Optional[str] = typer.Option(
+        None, "--rev", help="Estimate a run for this revision, as for generate."
+    ),
+) -> None:
+    """Estimate requests, tokens and duration of a run without the model."""
+    asyncio.run(
+        _plan_docs(
+            repo_path, output_dir, verbose, context=context, outline=outline, rev=rev
+        )
+    )
+
+
+@app.command(name="tune")
+def tune(
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Enable verbose logging.",
+    ),
+    max_concurrency: int = typer.Option(
+        8,
+        "--max-concurrency",
+        min=1,
+        help="Highest number of parallel requests to benchmark.",
+    ),
+) -> None:
+    """Benchmark Ollama and store a [performance] profile in config.toml."""
+    levels = [1]
+    while levels[-1] * 2 <= max_concurrency:
+        levels.append(levels[-1] * 2)
+    asyncio.run(_tune(verbose, levels))
+
+
+@app.command(name="worker")
+def worker(
+    queue_dir: Path = typer.Argument(
+        ...,
+        help="Queue directory shared with 'repodoc generate --queue'.",
+        file_okay=False,
+        dir_okay=True,
+    ),
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Enable verbose logging.",
+    ),
+    concurrency: Optional[int] = typer.Option(
+        None,
+        "--concurrency",
+        min=1,
+        help="Jobs processed at once; overrides [performance].",
+    ),
+    idle_exit: Optional[float] = typer.Option(
+        None,
+        "--idle-exit",
+        min=0,
+        help="Exit after this many seconds without a job; runs until stopped if unset.",
+    ),
+) -> None:
+    """Generate queued requests with the configured Ollama host."""
+    asyncio.run(_work(queue_dir, verbose, concurrency=concurrency, idle_exit=idle_exit))
 
 
 if __name__ == "__main__":
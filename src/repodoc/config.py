@@ -1,14 +1,52 @@
 """Configuration management for repodoc."""
 
+import json
 import os
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import tomli
 
 from repodoc.errors import ConfigurationError
 
+# Task types that can be routed to their own model (see repodoc.ollama.Task)
+TASKS = ("summarize", "extract", "synthesize", "repair")
+
+CONFIG_PATH = Path("config.toml")
+
+
+@dataclass
+class ModelProfile:
+    """Measured performance of one model on the configured host.
+
+    Attributes:
+        prompt_rate: Prompt tokens evaluated per second.
+        token_rate: Tokens generated per second.
+        chunk_tokens: Prompt size in tokens for map-stage chunks.
+    """
+
+    prompt_rate: Optional[float] = None
+    token_rate: Optional[float] = None
+    chunk_tokens: Optional[int] = None
+
+
+@dataclass
+class Performance:
+    """Performance settings, written by ``repodoc tune``.
+
+    Attributes:
+        concurrency: Generation requests in flight at once.
+        chunk_tokens: Prompt size in tokens for map-stage chunks of models
+            without their own profile.
+        models: Model -> measured profile.
+    """
+
+    concurrency: int = 4
+    chunk_tokens: int = 16_000
+    models: Dict[str, ModelProfile] = field(default_factory=dict)
+
 
 @dataclass
 class Config:
@@ -16,9 +54,64 @@ class Config:
 
     ollama_url: str = "http://localhost:11434"
     model: str = "codestral"
+    routes: Dict[str, str] = field(default_factory=dict)
+    keep_alive: str = "10m"
+    performance: Performance = field(default_factory=Performance)
 
 
-def load(cli_args: dict[str, Optional[str]] = None) -> Config:
+def _positive_int(value: Any, name: str) -> int:
+    """Validate a positive integer setting.
+
+    Args:
+        value: Value from the config file, environment or CLI.
+        name: Setting name used in the error message.
+
+    Returns:
+        The value as an integer.
+
+    Raises:
+        ConfigurationError: If the value is not a positive integer.
+    """
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = 0
+    if number <= 0 or isinstance(value, (bool, float)):
+        raise ConfigurationError(f"{name} must be a positive integer, got {value!r}")
+    return number
+
+
+def _load_performance(data: Dict[str, Any], performance: Performance) -> None:
+    """Read the ``[performance]`` table of config.toml.
+
+    Args:
+        data: The table.
+        performance: Settings to update.
+
+    Raises:
+        ConfigurationError: If a setting is invalid.
+    """
+    if "concurrency" in data:
+        performance.concurrency = _positive_int(
+            data["concurrency"], "performance.concurrency"
+        )
+    if "chunk_tokens" in data:
+        performance.chunk_tokens = _positive_int(
+            data["chunk_tokens"], "performance.chunk_tokens"
+        )
+    models = data.get("models", {})
+    if not isinstance(models, dict) or not all(
+        isinstance(profile, dict) for profile in models.values()
+    ):
+        raise ConfigurationError("[performance.models] must hold one table per model")
+    for model, profile in models.items():
+        try:
+            performance.models[model] = ModelProfile(**profile)
+        except TypeError as e:
+            raise ConfigurationError(f"Invalid [performance.models] entry: {e}") from e
+
+
+def load(cli_args: Optional[Dict[str, Any]] = None) -> Config:
     """Load configuration with override precedence.
 
     Args:
@@ -34,7 +127,7 @@ def load(cli_args: dict[str, Optional[str]] = None) -> Config:
     config = Config()
 
     # 1. Load from config.toml if present
-    config_path = Path("config.toml")
+    config_path = CONFIG_PATH
     if config_path.exists():
         try:
             with config_path.open("rb") as f:
@@ -44,6 +137,14 @@ def load(cli_args: dict[str, Optional[str]] = None) -> Config:
                         config.ollama_url = data["ollama"]["url"]
                     if "model" in data["ollama"]:
                         config.model = data["ollama"]["model"]
+                    if "keep_alive" in data["ollama"]:
+                        config.keep_alive = str(data["ollama"]["keep_alive"])
+                    routes = data["ollama"].get("routes", {})
+                    if not isinstance(routes, dict):
+                        raise ConfigurationError("[ollama.routes] must be a table")
+                    config.routes.update(routes)
+                if "performance" in data:
+                    _load_performance(data["performance"], config.performance)
         except tomli.TOMLDecodeError as e:
             raise ConfigurationError(f"Invalid config.toml: {e}") from e
 
@@ -52,12 +153,36 @@ def load(cli_args: dict[str, Optional[str]] = None) -> Config:
         config.ollama_url = url
     if model := os.environ.get("REPODOC_MODEL"):
         config.model = model
+    if keep_alive := os.environ.get("REPODOC_KEEP_ALIVE"):
+        config.keep_alive = keep_alive
+    for task in TASKS:
+        if model := os.environ.get(f"REPODOC_MODEL_{task.upper()}"):
+            config.routes[task] = model
+    if concurrency := os.environ.get("REPODOC_CONCURRENCY"):
+        config.performance.concurrency = _positive_int(
+            concurrency, "REPODOC_CONCURRENCY"
+        )
+    if chunk_tokens := os.environ.get("REPODOC_CHUNK_TOKENS"):
+        config.performance.chunk_tokens = _positive_int(
+            chunk_tokens, "REPODOC_CHUNK_TOKENS"
+        )
 
     # 3. Override with CLI arguments
     if url := cli_args.get("ollama_url"):
         config.ollama_url = url
     if model := cli_args.get("model"):
         config.model = model
+    if concurrency := cli_args.get("concurrency"):
+        config.performance.concurrency = _positive_int(concurrency, "--concurrency")
+    if chunk_tokens := cli_args.get("chunk_tokens"):
+        config.performance.chunk_tokens = _positive_int(chunk_tokens, "--chunk-tokens")
+
+    unknown = sorted(set(config.routes) - set(TASKS))
+    if unknown:
+        raise ConfigurationError(
+            f"Unknown task in [ollama.routes]: {', '.join(unknown)}. "
+            f"Expected one of: {', '.join(TASKS)}"
+        )
 
     # Validate URL
     if not config.ollama_url.startswith(("http://", "https://")):
@@ -65,4 +190,72 @@ def load(cli_args: dict[str, Optional[str]] = None) -> Config:
             f"Invalid Ollama URL: {config.ollama_url}. Must start with http:// or https://"
         )
 
-    return config 
\ No newline at end of file
+    return config
+
+
+def _toml_value(value: Any) -> str:
+    """Render a string or number as a TOML value.
+
+    Args:
+        value: Value to render.
+
+    Returns:
+        TOML representation; JSON strings are valid TOML basic strings.
+    """
+    if isinstance(value, float):
+        return repr(round(value, 2))
+    return json.dumps(value)
+
+
+def render_performance(performance: Performance) -> str:
+    """Render performance settings as config.toml tables.
+
+    Args:
+        performance: Settings to render.
+
+    Returns:
+        The ``[performance]`` table followed by one table per model.
+    """
+    lines = [
+        "[performance]",
+        f"concurrency = {performance.concurrency}",
+        f"chunk_tokens = {performance.chunk_tokens}",
+    ]
+    for model, profile in sorted(performance.models.items()):
+        lines += ["", f"[performance.models.{json.dumps(model)}]"]
+        lines += [
+            f"{name} = {_toml_value(value)}"
+            for name, value in vars(profile).items()
+            if value is not None
+        ]
+    return "\n".join(lines) + "\n"
+
+
+# Header of a table inside [performance], e.g. [performance.models."x"]
+_PERFORMANCE_TABLE = re.compile(r"^\s*\[\s*performance\s*[.\]]")
+_TABLE = re.compile(r"^\s*\[")
+
+
+def save_performance(performance: Performance, path: Path = CONFIG_PATH) -> None:
+    """Replace the performance tables of config.toml, keeping everything else.
+
+    Args:
+        performance: Settings to write.
+        path: Config file; created if missing.
+
+    Raises:
+        ConfigurationError: If the file cannot be read or written.
+    """
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+        kept, skipping = [], False
+        for line in lines:
+            if _TABLE.match(line):
+                skipping = bool(_PERFORMANCE_TABLE.match(line))
+            if not skipping:
+                kept.append(line)
+        text = "\n".join(kept).rstrip()
+        text = f"{text}\n\n" if text else ""
+        path.write_text(text + render_performance(performance), encoding="utf-8")
+    except OSError as e:
+        raise ConfigurationError(f"Failed to write {path}: {e}") from e
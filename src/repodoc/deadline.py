@@ -0,0 +1,228 @@
+"""Anytime documentation runs bounded by a deadline.
+
+A deadline run documents the project in rounds of growing context budget.
+The first round sends each generator only its highest-ranked context (the
+files the token-budget planner or the repository map rank first, such as
+entry points and central modules), so a complete draft of every document is
+written early. Later rounds regenerate the documents from larger budgets,
+as far as the throughput measured so far says a round can finish before the
+deadline. Each document is written as soon as a round completes it, and the
+round in flight when the deadline hits is cancelled, so every document on
+disk is the last complete version.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Mapping, Optional
+
+from repodoc.generators.base import ContextMode
+from repodoc.history import ThroughputHistory
+from repodoc.ollama import Task
+from repodoc.scheduler import Scheduler
+
+if TYPE_CHECKING:
+    from repodoc.ollama import OllamaClient
+
+logger = logging.getLogger("repodoc")
+
+#: Context budgets of successive rounds, in tokens.
+BUDGETS = (2_000, 4_000, 8_000, 16_000, 32_000, 64_000)
+
+#: Share of the time left that the draft round is planned to take.
+DRAFT_SHARE = 0.25
+
+#: Context modes that rank the context and cut it at a token budget.
+BUDGETED = (ContextMode.PLANNED, ContextMode.REPO_MAP)
+
+# Called with (generator name, document, context budget) for every document
+Publish = Callable[[str, str, int], None]
+
+
+def _request_seconds(
+    history: ThroughputHistory, model: str, budget: int
+) -> Optional[float]:
+    """Estimate the duration of a synthesis request with a context budget.
+
+    Args:
+        history: Measured throughput.
+        model: Model synthesis requests are routed to.
+        budget: Context tokens of the request.
+
+    Returns:
+        Seconds, or None without measurements of the model.
+    """
+    return history.request_seconds(model, Task.SYNTHESIZE.value, budget)
+
+
+def first_budget(history: ThroughputHistory, model: str, seconds: float) -> int:
+    """Choose the context budget of the draft round.
+
+    Args:
+        history: Throughput measured by earlier runs.
+        model: Model synthesis requests are routed to.
+        seconds: Time left until the deadline.
+
+    Returns:
+        The largest budget whose request is expected to take at most
+        :data:`DRAFT_SHARE` of *seconds*; the smallest budget without
+        measurements.
+    """
+    chosen = BUDGETS[0]
+    for budget in BUDGETS[1:]:
+        estimate = _request_seconds(history, model, budget)
+        if estimate is None or estimate > seconds * DRAFT_SHARE:
+            break
+        chosen = budget
+    return chosen
+
+
+def next_budget(
+    history: ThroughputHistory,
+    model: str,
+    budget: int,
+    elapsed: float,
+    remaining: float,
+    total: Optional[int] = None,
+) -> Optional[int]:
+    """Choose the context budget of the next round.
+
+    The duration of a round is extrapolated from the last one: in proportion
+    to the estimated request durations when the model has measurements,
+    otherwise in proportion to the budget.
+
+    Args:
+        history: Measured throughput.
+        model: Model synthesis requests are routed to.
+        budget: Context budget of the last round.
+        elapsed: Seconds the last round took.
+        remaining: Seconds left until the deadline.
+        total: Tokens of the whole project, if known; no budget beyond the
+            first one holding all of it is chosen.
+
+    Returns:
+        The largest budget expected to finish in time, or None if no
+        larger budget does or the last round already held the project.
+    """
+    if total is not None and budget >= total:
+        return None
+    base = _request_seconds(history, model, budget)
+    chosen = None
+    for candidate in BUDGETS:
+        if candidate <= budget:
+            continue
+        estimate = _request_seconds(history, model, candidate)
+        if base and estimate is not None:
+            predicted = elapsed * estimate / base
+        else:
+            predicted = elapsed * candidate / budget
+        if predicted > remaining:
+            break
+        chosen = candidate
+        if total is not None and candidate >= total:
+            break
+    return chosen
+
+
+async def _round(
+    scheduler: Scheduler,
+    targets: Iterable[str],
+    budget: int,
+    publish: Publish,
+    published: Dict[str, int],
+) -> None:
+    """Generate every document once and publish each as it completes.
+
+    Args:
+        scheduler: Scheduler instantiating generators with *budget*.
+        targets: Generator names.
+        budget: Context budget of the round.
+        publish: Receives each completed document.
+        published: Receives generator name -> *budget* for each document.
+    """
+    runner = scheduler.run(targets)
+    try:
+        async for name, doc in runner:
+            if isinstance(doc, BaseException):
+                logger.warning(f"No {budget:,}-token version of {name}: {doc}")
+                continue
+            publish(name, doc, budget)
+            published[name] = budget
+    finally:
+        await runner.aclose()
+
+
+async def refine(
+    client: OllamaClient,
+    seeds: Mapping[str, Any],
+    generators: Iterable[str],
+    *,
+    until: float,
+    history: ThroughputHistory,
+    generator_options: Mapping[str, Any],
+    publish: Publish,
+) -> Dict[str, int]:
+    """Document a project in rounds of growing context until a deadline.
+
+    Artifacts built by the first round, such as the file index and the
+    repository map, are reused by later rounds.
+
+    Args:
+        client: Ollama client.
+        seeds: Scheduler seeds, including the finished pack.
+        generators: Generator names to produce.
+        until: Deadline as a :func:`time.monotonic` timestamp.
+        history: Throughput measured by earlier runs.
+        generator_options: Keyword arguments of every generator. Context
+            modes without a token budget are replaced by the repository map.
+        publish: Called with each completed document; documents of later
+            rounds replace those of earlier ones.
+
+    Returns:
+        Generator name -> context budget of the last published version;
+        generators without a complete version are missing.
+    """
+    targets = list(generators)
+    options = dict(generator_options)
+    if ContextMode(options.get("context", ContextMode.INPUTS)) not in BUDGETED:
+        logger.info("Deadline runs rank context with the repository map")
+        options["context"] = ContextMode.REPO_MAP
+    model = client.model_for(Task.SYNTHESIZE)
+    seeds = dict(seeds)
+    published: Dict[str, int] = {}
+
+    budget: Optional[int] = first_budget(history, model, until - time.monotonic())
+    while budget is not None:
+        started = time.monotonic()
+        logger.info(
+            f"{'Refining' if published else 'Drafting'} documents from "
+            f"{budget:,} context tokens ({until - started:.0f}s left)"
+        )
+        scheduler = Scheduler(
+            client, seeds, generator_options={**options, "context_tokens": budget}
+        )
+        completed: Dict[str, int] = {}
+        try:
+            await asyncio.wait_for(
+                _round(scheduler, targets, budget, publish, completed),
+                until - started,
+            )
+        except TimeoutError:
+            logger.info(
+                f"Deadline reached with {len(completed)} of {len(targets)} "
+                f"documents at {budget:,} context tokens"
+            )
+            published.update(completed)
+            break
+        published.update(completed)
+        if not completed:
+            break  # larger prompts would fail the same way
+
+        seeds.update(scheduler.artifacts())
+        files = seeds.get("files")
+        total = files.files.total("tokens") if files is not None else None
+        now = time.monotonic()
+        budget = next_budget(history, model, budget, now - started, until - now, total)
+    return published
@@ -0,0 +1,338 @@
+"""Removal of files with no documentation value before prompting.
+
+Files are dropped, in order, when they match ``.repodocignore``, look like
+lock files, vendored, minified, snapshot or generated code, duplicate an
+earlier file exactly (same blob hash) or nearly (MinHash similarity). A
+report records how many files and tokens each rule removed.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from repodoc.index import RepoIndex
+
+IGNORE_FILE = ".repodocignore"
+
+LOCK_FILES = frozenset(
+    {
+        "Cargo.lock",
+        "Gemfile.lock",
+        "Pipfile.lock",
+        "composer.lock",
+        "go.sum",
+        "package-lock.json",
+        "pnpm-lock.yaml",
+        "poetry.lock",
+        "uv.lock",
+        "yarn.lock",
+    }
+)
+
+# Directory names holding third-party or build output
+VENDORED_DIRS = frozenset(
+    {"node_modules", "vendor", "third_party", "dist", "build", "__snapshots__"}
+)
+
+GENERATED_PATTERNS = ("*.min.js", "*.min.css", "*_pb2.py", "*_pb2_grpc.py", "*.snap")
+
+GENERATED_MARKERS = re.compile(
+    r"@generated|DO NOT EDIT|Code generated .* DO NOT EDIT|auto-?generated",
+    re.IGNORECASE,
+)
+
+# Average line length above which a file is considered minified
+MINIFIED_LINE_LENGTH = 300
+
+# Files smaller than this are never deduplicated (e.g. empty ``__init__.py``)
+MIN_DEDUP_TOKENS = 32
+
+# MinHash signature size and LSH banding (bands * rows == bins)
+MINHASH_BINS = 64
+LSH_BANDS = 16
+NEAR_DUPLICATE_SIMILARITY = 0.9
+
+_WORD = re.compile(r"\w+")
+_EMPTY_BIN = 1 << 32
+
+
+@dataclass
+class FilterReport:
+    """Files and tokens removed by each filter rule.
+
+    Attributes:
+        removed: Rule name -> removed file paths.
+        tokens: Rule name -> tokens saved.
+        kept_tokens: Tokens of the files that remain.
+    """
+
+    removed: Dict[str, List[str]] = field(default_factory=dict)
+    tokens: Dict[str, int] = field(default_factory=dict)
+    kept_tokens: int = 0
+
+    def add(self, rule: str, path: str, tokens: int) -> None:
+        """Record a removed file.
+
+        Args:
+            rule: Name of the rule that removed it.
+            path: File path inside the repository.
+            tokens: Token estimate of the file.
+        """
+        self.removed.setdefault(rule, []).append(path)
+        self.tokens[rule] = self.tokens.get(rule, 0) + tokens
+
+    def lines(self) -> List[str]:
+        """Format the report for logging.
+
+        Returns:
+            One line per rule plus a total.
+        """
+        saved = sum(self.tokens.values())
+        lines = [
+            f"{rule}: {len(paths)} files, {self.tokens[rule]:,} tokens"
+            for rule, paths in self.removed.items()
+        ]
+        total = saved + self.kept_tokens
+        share = saved / total if total else 0.0
+        lines.append(f"total: {saved:,} of {total:,} tokens saved ({share:.0%})")
+        return lines
+
+
+def load_ignore(repo_path: Path) -> List[str]:
+    """Read the patterns of a repository's ``.repodocignore``.
+
+    Args:
+        repo_path: Repository root.
+
+    Returns:
+        Glob patterns; empty if the file does not exist.
+    """
+    try:
+        text = (repo_path / IGNORE_FILE).read_text(encoding="utf-8")
+    except OSError:
+        return []
+    return [
+        line.strip()
+        for line in text.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+def is_ignored(path: str, patterns: Sequence[str]) -> bool:
+    """Match a path against gitignore-style patterns.
+
+    Patterns without a slash match any path component; patterns ending in a
+    slash match directories; other patterns match the full path.
+
+    Args:
+        path: File path inside the repository.
+        patterns: Patterns from ``.repodocignore``.
+
+    Returns:
+        True if any pattern matches.
+    """
+    parts = path.split("/")
+    for pattern in patterns:
+        directory = pattern.endswith("/")
+        pattern = pattern.strip("/")
+        if "/" in pattern:
+            if fnmatch(path, pattern) or (directory and path.startswith(pattern + "/")):
+                return True
+            continue
+        candidates = parts[:-1] if directory else parts
+        if any(fnmatch(part, pattern) for part in candidates):
+            return True
+    return False
+
+
+def classify(path: str, head: str, size: int) -> Optional[str]:
+    """Classify lock, vendored, minified and generated files.
+
+    Args:
+        path: File path inside the repository.
+        head: The first kilobyte or so of the file.
+        size: File size in bytes.
+
+    Returns:
+        Rule name, or None for regular source files.
+    """
+    parts = path.split("/")
+    if parts[-1] in LOCK_FILES:
+        return "lockfile"
+    if VENDORED_DIRS.intersection(parts[:-1]):
+        return "vendored"
+    if any(fnmatch(parts[-1], pattern) for pattern in GENERATED_PATTERNS):
+        return "generated"
+    first_lines = "\n".join(head.splitlines()[:5])
+    if GENERATED_MARKERS.search(first_lines):
+        return "generated"
+    lines = head.count("\n") + 1
+    if size > 1024 and len(head) / lines > MINIFIED_LINE_LENGTH:
+        return "minified"
+    return None
+
+
+def minhash(text: str, *, shingle: int = 5) -> Tuple[int, ...]:
+    """Compute a one-permutation MinHash signature of a text.
+
+    Word shingles are hashed once with CRC-32; each hash lands in one of
+    :data:`MINHASH_BINS` bins that keeps its minimum, which costs a single
+    pass over the shingles.
+
+    Args:
+        text: File content.
+        shingle: Number of consecutive words per shingle.
+
+    Returns:
+        Signature with one value per bin (:data:`_EMPTY_BIN` when empty).
+    """
+    words = _WORD.findall(text)
+    signature = [_EMPTY_BIN] * MINHASH_BINS
+    for i in range(max(len(words) - shingle + 1, 1)):
+        value = zlib.crc32(" ".join(words[i : i + shingle]).encode())
+        slot = value % MINHASH_BINS
+        if value < signature[slot]:
+            signature[slot] = value
+    return tuple(signature)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimate the Jaccard similarity of two signatures.
+
+    Args:
+        a: First signature.
+        b: Second signature.
+
+    Returns:
+        Fraction of non-empty bins that agree.
+    """
+    bins = [(x, y) for x, y in zip(a, b) if x != _EMPTY_BIN or y != _EMPTY_BIN]
+    if not bins:
+        return 1.0
+    return sum(x == y for x, y in bins) / len(bins)
+
+
+class FileFilter:
+    """Incremental filter deciding file by file, in pack order.
+
+    Keeps the hashes and MinHash buckets of the files accepted so far, so
+    files can be judged as they arrive from a pack that is still being
+    produced.
+
+    Attributes:
+        report: Files and tokens removed so far.
+    """
+
+    def __init__(self, ignore: Sequence[str] = ()) -> None:
+        """Initialize the filter.
+
+        Args:
+            ignore: Patterns from ``.repodocignore``.
+        """
+        self.ignore = list(ignore)
+        self.report = FilterReport()
+        self._hashes: Dict[str, str] = {}
+        self._buckets: Dict[
+            Tuple[int, Tuple[int, ...]], List[Tuple[str, Tuple[int, ...]]]
+        ] = {}
+
+    def accept(
+        self, path: str, content: str, *, tokens: int, size: int, digest: str
+    ) -> bool:
+        """Judge the next file, recording it in the report when removed.
+
+        Args:
+            path: File path inside the repository.
+            content: File content.
+            tokens: Token estimate of the file.
+            size: File size in bytes.
+            digest: Git blob hash of the file.
+
+        Returns:
+            True if the file should be kept.
+        """
+        rule = self._rule(path, content, tokens=tokens, size=size, digest=digest)
+        if rule:
+            self.report.add(rule, path, tokens)
+            return False
+        self.report.kept_tokens += tokens
+        return True
+
+    def _rule(
+        self, path: str, content: str, *, tokens: int, size: int, digest: str
+    ) -> Optional[str]:
+        """Apply the filter rules to one file, first match wins.
+
+        Args:
+            path: File path inside the repository.
+            content: File content.
+            tokens: Token estimate of the file.
+            size: File size in bytes.
+            digest: Git blob hash of the file.
+
+        Returns:
+            Name of the first rule removing the file, or None to keep it.
+        """
+        if self.ignore and is_ignored(path, self.ignore):
+            return "repodocignore"
+        rule = classify(path, content[:1024], size)
+        if rule:
+            return rule
+        if tokens < MIN_DEDUP_TOKENS:
+            return None
+
+        if digest in self._hashes:
+            return "duplicate"
+        self._hashes[digest] = path
+
+        signature = minhash(content)
+        rows_per_band = MINHASH_BINS // LSH_BANDS
+        bands = [
+            (band, signature[band * rows_per_band : (band + 1) * rows_per_band])
+            for band in range(LSH_BANDS)
+        ]
+        candidates = {other for key in bands for other in self._buckets.get(key, ())}
+        if any(
+            similarity(signature, other) >= NEAR_DUPLICATE_SIMILARITY
+            for _, other in candidates
+        ):
+            return "near-duplicate"
+        for key in bands:
+            self._buckets.setdefault(key, []).append((path, signature))
+        return None
+
+
+def filter_files(
+    files: RepoIndex,
+    contents: Iterable[Tuple[str, str]],
+    *,
+    ignore: Sequence[str] = (),
+) -> Tuple[List[int], FilterReport]:
+    """Decide which files of an index are worth sending to the model.
+
+    Args:
+        files: Columnar index of the pack.
+        contents: ``(path, content)`` pairs in index order.
+        ignore: Patterns from ``.repodocignore``.
+
+    Returns:
+        Rows to keep, in index order, and the report of removed files.
+    """
+    file_filter = FileFilter(ignore)
+    kept = [
+        row
+        for row, (path, content) in enumerate(contents)
+        if file_filter.accept(
+            path,
+            content,
+            tokens=files.tokens[row],
+            size=files.sizes[row],
+            digest=files.blob_hash(row),
+        )
+    ]
+    return kept, file_filter.report
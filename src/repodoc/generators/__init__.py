@@ -1,7 +1,35 @@
-"""Documentation generators package."""
+"""Documentation generators package.
 
-from repodoc.generators.api import ApiGenerator
-from repodoc.generators.manual import ManualGenerator
-from repodoc.generators.architecture import ArchitectureGenerator
+Generator classes are imported on first access so that importing the package
+(or :mod:`repodoc.generators.base`) does not load every generator module.
+"""
 
-__all__ = ["ApiGenerator", "ManualGenerator", "ArchitectureGenerator"] 
\ No newline at end of file
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "ApiGenerator": "repodoc.generators.api",
+    "ManualGenerator": "repodoc.generators.manual",
+    "ArchitectureGenerator": "repodoc.generators.architecture",
+}
+
+__all__ = ["ApiGenerator", "ManualGenerator", "ArchitectureGenerator"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a generator class on first access.
+
+    Args:
+        name: Exported attribute name.
+
+    Returns:
+        The generator class.
+
+    Raises:
+        AttributeError: If the name is not exported by this package.
+    """
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getattr(import_module(module_name), name)
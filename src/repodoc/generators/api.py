@@ -1,7 +1,25 @@
 """API documentation generator."""
 
-from repodoc.generators.base import DocGenerator, register
-from repodoc.ollama import OllamaClient
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from repodoc.apiref import ApiModule, ApiSymbol, extract_api, render_api
+from repodoc.generators.base import DocGenerator, prompt_segments, register
+from repodoc.ollama import OllamaClient, Task
+from repodoc.parser import PackIndex
+
+logger = logging.getLogger("repodoc")
+
+# Undocumented symbols described per request
+BATCH_SIZE = 40
+
+# JSON schema of a description response: symbol id -> description
+DESCRIPTION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "additionalProperties": {"type": "string"},
+}
 
 
 def build_prompt(project: str) -> str:
@@ -27,14 +45,129 @@ Please format the documentation with markdown headers, code blocks, and lists as
 Start with a level 2 header '## API'."""
 
 
+def build_description_prompt(batch: Sequence[Tuple[str, str, ApiSymbol]]) -> str:
+    """Build a prompt asking for short descriptions of several symbols.
+
+    Args:
+        batch: ``(id, module name, symbol)`` triples.
+
+    Returns:
+        Prompt string requesting a JSON object keyed by symbol id.
+    """
+    entries = "\n\n".join(
+        f"[{key}] {module}.{symbol.qualname} ({symbol.kind})\n```python\n{symbol.snippet}\n```"
+        for key, module, symbol in batch
+    )
+    return f"""Describe each of the following Python symbols in one short sentence
+stating what it does, as it would appear in an API reference table.
+
+{entries}
+
+Respond with a JSON object mapping each id in square brackets (without the
+brackets) to its description, for example {{"1": "Parse the configuration file."}}."""
+
+
+async def describe_symbols(
+    modules: List[ApiModule], client: OllamaClient, *, batch_size: int = BATCH_SIZE
+) -> None:
+    """Fill in descriptions of symbols without a docstring.
+
+    Symbols are described in batches, one JSON-constrained request per batch,
+    all in flight at once. A batch whose response cannot be parsed leaves its
+    descriptions empty.
+
+    Args:
+        modules: Extracted API, updated in place.
+        client: Ollama client for text generation.
+        batch_size: Symbols per request.
+    """
+    pending = [
+        (str(i), module.name, symbol)
+        for i, (module, symbol) in enumerate(
+            (module, symbol)
+            for module in modules
+            for symbol in module.symbols
+            if not symbol.description
+        )
+    ]
+    batches = [
+        pending[start : start + batch_size]
+        for start in range(0, len(pending), batch_size)
+    ]
+    responses = await asyncio.gather(
+        *(
+            client.generate(
+                build_description_prompt(batch),
+                format=DESCRIPTION_SCHEMA,
+                task=Task.EXTRACT,
+            )
+            for batch in batches
+        )
+    )
+    for batch, response in zip(batches, responses):
+        try:
+            descriptions = json.loads(response)
+        except json.JSONDecodeError:
+            logger.warning("Ignoring malformed symbol descriptions from the model")
+            continue
+        if not isinstance(descriptions, dict):
+            continue
+        for key, _, symbol in batch:
+            symbol.description = str(descriptions.get(key, "")).strip()
+
+
 @register("api")
 class ApiGenerator(DocGenerator):
     """Generator for API documentation.
 
     This generator creates documentation focused on API endpoints, methods,
-    parameters, and responses.
+    parameters, and responses. Signatures and docstrings of public Python
+    symbols are extracted statically and assembled into reference tables; the
+    model only writes short descriptions of undocumented symbols. Projects
+    without Python symbols fall back to prompting with the project skeleton.
     """
 
+    inputs = ("skeleton", "files")
+    title = "API"
+    query = (
+        "Public classes, functions and methods with their signatures, "
+        "parameters, return types and data structures."
+    )
+    path_weights = (
+        ("*tests/*", 0.2),
+        ("*test_*", 0.2),
+        ("*/__init__.py", 1.5),
+        ("*.py", 1.2),
+        ("*.md", 0.3),
+        ("*.lock", 0.0),
+    )
+
+    def required_inputs(self) -> Tuple[str, ...]:
+        """Return the artifacts this instance needs the scheduler to resolve.
+
+        Returns:
+            The context artifacts plus the file index.
+        """
+        inputs = super().required_inputs()
+        return inputs if "files" in inputs else (*inputs, "files")
+
+    async def run(self, artifacts: Mapping[str, Any], client: OllamaClient) -> str:
+        """Generate API documentation from statically extracted symbols.
+
+        Args:
+            artifacts: Resolved values for every name in :meth:`required_inputs`.
+            client: Ollama client for text generation.
+
+        Returns:
+            Generated API documentation in markdown format.
+        """
+        index: PackIndex = artifacts["files"]
+        modules = await asyncio.to_thread(extract_api, list(index.contents()))
+        if not modules:
+            return await super().run(artifacts, client)
+        await describe_symbols(modules, client)
+        return render_api(modules)
+
     async def generate(self, project: str, client: OllamaClient) -> str:
         """Generate API documentation.
 
@@ -45,5 +178,5 @@ class ApiGenerator(DocGenerator):
         Returns:
             Generated API documentation in markdown format.
         """
-        prompt = build_prompt(project)
-        return await client.generate(prompt) 
\ No newline at end of file
+        prompt = prompt_segments(build_prompt, project)
+        return await client.generate(prompt)
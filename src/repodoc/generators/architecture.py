@@ -1,6 +1,9 @@
 """Architecture documentation generator."""
 
-from repodoc.generators.base import DocGenerator, register
+from typing import Any, Mapping, Tuple
+
+from repodoc.generators.base import ContextMode, DocGenerator, prompt_segments, register
+from repodoc.graph import ImportGraph
 from repodoc.ollama import OllamaClient
 
 
@@ -41,14 +44,127 @@ sequenceDiagram
 Ensure at least one Mermaid diagram is included in the documentation."""
 
 
+def build_narrative_prompt(graph: ImportGraph, excerpts: str = "") -> str:
+    """Build a prompt describing an architecture from its import graph.
+
+    Diagrams are rendered from the graph itself, so the model only writes
+    the prose around them.
+
+    Args:
+        graph: Static import graph of the project.
+        excerpts: Optional module summaries or source excerpts for
+            additional detail.
+
+    Returns:
+        Prompt string asking for architecture prose without diagrams.
+    """
+    excerpt_section = f"\nSupporting context:\n{excerpts}\n" if excerpts else ""
+    return f"""Please write architecture documentation in markdown format for a project
+with the following package dependency graph. Packages are listed from the
+highest layer (entry points) to the lowest (foundations); each package only
+imports packages in lower layers unless listed in a cycle.
+
+Dependency graph:
+{graph.summary()}
+{excerpt_section}
+Focus on:
+- High-level system overview
+- Responsibilities of each layer and package
+- Data flow between components
+- Key architectural decisions and patterns, including any import cycles
+
+Use level 3 headers ('###') for sections. Do not include Mermaid diagrams or a
+top-level header; a dependency diagram is added automatically."""
+
+
+def render_architecture(narrative: str, graph: ImportGraph) -> str:
+    """Combine the model's narrative with the rendered dependency diagram.
+
+    Args:
+        narrative: Architecture prose from the model.
+        graph: Static import graph of the project.
+
+    Returns:
+        Architecture documentation in markdown format.
+    """
+    lines = narrative.strip().splitlines()
+    if lines and lines[0].lstrip().startswith("## "):
+        lines = lines[1:]
+    sections = [
+        "## Architecture",
+        "\n".join(lines).strip(),
+        "### Dependency Graph",
+        "Arrows point from a component to the components it imports; layer 0 "
+        "holds foundations with no internal dependencies.",
+        f"```mermaid\n{graph.mermaid()}\n```",
+    ]
+    cycles = graph.cycles()
+    if cycles:
+        sections.append("### Import Cycles")
+        sections.append("\n".join(f"- {' <-> '.join(cycle)}" for cycle in cycles))
+    return "\n\n".join(section for section in sections if section) + "\n"
+
+
 @register("architecture")
 class ArchitectureGenerator(DocGenerator):
     """Generator for architecture documentation.
 
     This generator creates documentation focused on system architecture,
     component relationships, and includes Mermaid diagrams for visualization.
+    Diagrams are rendered from the static import graph and the model only
+    writes the narrative around a compact graph summary, supported by the
+    shared module summaries, which are produced while the repository is
+    still being packed. Projects without Python imports are documented from
+    the module summaries alone, or from the raw pack when nothing could be
+    summarized.
     """
 
+    inputs = ("module_summaries", "project", "import_graph")
+    title = "Architecture"
+    diagrams = 1
+    query = (
+        "Module and package boundaries, how components interact, data flow "
+        "between modules and key design decisions."
+    )
+    path_weights = (
+        ("*tests/*", 0.2),
+        ("*/__init__.py", 2.0),
+        ("README*", 1.5),
+        ("pyproject.toml", 1.5),
+        ("*.lock", 0.0),
+    )
+
+    def required_inputs(self) -> Tuple[str, ...]:
+        """Return the artifacts this instance needs the scheduler to resolve.
+
+        Returns:
+            The context artifacts plus the import graph.
+        """
+        inputs = super().required_inputs()
+        return inputs if "import_graph" in inputs else (*inputs, "import_graph")
+
+    async def run(self, artifacts: Mapping[str, Any], client: OllamaClient) -> str:
+        """Generate architecture documentation from the import graph.
+
+        The module summaries, or in the other context modes the selected
+        context, are passed along as supporting excerpts.
+
+        Args:
+            artifacts: Resolved values for every name in :meth:`required_inputs`.
+            client: Ollama client for text generation.
+
+        Returns:
+            Generated architecture documentation in markdown format.
+        """
+        graph: ImportGraph = artifacts["import_graph"]
+        if self.context is ContextMode.INPUTS and not artifacts["module_summaries"]:
+            return await self.generate(artifacts["project"], client)
+        if not graph:
+            return await super().run(artifacts, client)
+        excerpts = await self.build_context(artifacts)
+        narrative = await client.generate(build_narrative_prompt(graph, excerpts))
+        return render_architecture(narrative, graph)
+
     async def generate(self, project: str, client: OllamaClient) -> str:
         """Generate architecture documentation.
 
@@ -59,5 +175,5 @@ class ArchitectureGenerator(DocGenerator):
         Returns:
             Generated architecture documentation in markdown format.
         """
-        prompt = build_prompt(project)
+        prompt = prompt_segments(build_prompt, project)
         return await client.generate(prompt) 
\ No newline at end of file
@@ -1,9 +1,58 @@
 """Base interface for documentation generators."""
 
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Type
+from dataclasses import dataclass, field
+from enum import Enum
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping
+from typing import Optional, Tuple, Type
+
+from repodoc.payload import Prompt, Segment
+
+if TYPE_CHECKING:
+    from repodoc.ollama import OllamaClient
+
+#: Entry point group used by third-party packages to contribute generators.
+ENTRY_POINT_GROUP = "repodoc.generators"
+
+logger = logging.getLogger("repodoc")
+
+#: Upper bound on the sections of an outline expanded in parallel.
+MAX_SECTIONS = 8
 
-from repodoc.ollama import OllamaClient
+# JSON schema of an outline response
+OUTLINE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "files": {"type": "array", "items": {"type": "string"}},
+                    "notes": {"type": "string"},
+                },
+                "required": ["title", "files"],
+            },
+        }
+    },
+    "required": ["sections"],
+}
+
+
+class ContextMode(str, Enum):
+    """How a generator selects the project context sent to the model."""
+
+    INPUTS = "inputs"  # the generator's declared inputs
+    RETRIEVAL = "retrieval"  # chunks retrieved by embedding similarity
+    PLANNED = "planned"  # files chosen by the token-budget planner
+    REPO_MAP = "repo-map"  # outline and sources of the most central symbols
 
 
 class DocGenerator(ABC):
@@ -12,8 +61,224 @@ class DocGenerator(ABC):
     This class defines the interface that all concrete documentation generators
     must implement. The strategy pattern allows for different documentation
     generation approaches to be used interchangeably.
+
+    Attributes:
+        inputs: Names of the artifacts this generator consumes. The scheduler
+            resolves them before :meth:`run` is called. ``"project"`` is the
+            packed repository text without filtered files; other names refer
+            to registered artifacts or to the output of other generators.
+        query: Description of the context this generator needs, used to
+            retrieve relevant chunks in retrieval mode.
+        top_k: Number of chunks retrieved for :attr:`query`.
+        path_weights: ``(glob pattern, weight)`` pairs scoring how relevant
+            files are to this generator in planned mode; first match wins.
+        context_tokens: Context budget in tokens for planned mode.
+        title: Title of the generated document, expected as its level 2
+            header and used in outline mode.
+        diagrams: Minimum number of Mermaid diagrams in the document.
+        context: How this instance selects its context (a :class:`ContextMode`).
+        outline: Whether to outline the document first and expand its
+            sections concurrently.
+        outlines: Outlines of earlier revisions, or None outside of
+            multi-revision runs.
+        repair: Whether to validate the document and repair failing
+            sections (see :meth:`review`).
     """
 
+    inputs: Tuple[str, ...] = ("project",)
+    query: str = ""
+    top_k: int = 24
+    path_weights: Tuple[Tuple[str, float], ...] = ()
+    context_tokens: int = 24_000
+    title: str = "Documentation"
+    diagrams: int = 0
+
+    def __init__(
+        self,
+        *,
+        context: ContextMode = ContextMode.INPUTS,
+        outline: bool = False,
+        outlines: Optional[OutlineMemo] = None,
+        repair: bool = False,
+        context_tokens: Optional[int] = None,
+    ) -> None:
+        """Initialize the generator.
+
+        Args:
+            context: How to select the context sent to the model. Retrieval
+                falls back to the declared inputs without a :attr:`query`.
+            outline: Generate an outline first, then all of its sections
+                concurrently (see :meth:`expand`).
+            outlines: Outlines shared across the revisions of a
+                multi-revision run, keyed by document title; see
+                :meth:`expand`.
+            repair: Check the generated document and rewrite only the
+                sections that fail (see :meth:`review`).
+            context_tokens: Context budget overriding the class default of
+                :attr:`context_tokens`.
+        """
+        context = ContextMode(context)
+        if context is ContextMode.RETRIEVAL and not self.query:
+            context = ContextMode.INPUTS
+        self.context = context
+        self.outline = outline
+        self.outlines = outlines
+        self.repair = repair
+        if context_tokens is not None:
+            self.context_tokens = context_tokens
+
+    def required_inputs(self) -> Tuple[str, ...]:
+        """Return the artifacts this instance needs the scheduler to resolve.
+
+        Returns:
+            :attr:`inputs`, or the artifact backing the context mode, plus
+            the file index in outline mode.
+        """
+        if self.context is ContextMode.RETRIEVAL:
+            inputs: Tuple[str, ...] = ("retriever",)
+        elif self.context is ContextMode.PLANNED:
+            inputs = ("planner", "project")
+        elif self.context is ContextMode.REPO_MAP:
+            inputs = ("repo_map", "project")
+        else:
+            inputs = self.inputs
+        if self.outline and "files" not in inputs:
+            inputs = (*inputs, "files")  # per-section context
+        return inputs
+
+    async def build_context(self, artifacts: Mapping[str, Any]) -> str:
+        """Assemble the project context sent to the model.
+
+        This is the first declared input, the retrieved chunks in retrieval
+        mode, the files chosen by the token-budget planner in planned mode,
+        or the ranked repository map in repo-map mode.
+
+        Args:
+            artifacts: Resolved values for every name in :meth:`required_inputs`.
+
+        Returns:
+            Project context.
+        """
+        if self.context is ContextMode.RETRIEVAL:
+            retriever = artifacts["retriever"]
+            return await retriever.context(self.query, top_k=self.top_k)
+        if self.context is ContextMode.PLANNED:
+            planner = artifacts["planner"]
+            selections = planner.plan(self.path_weights, self.context_tokens)
+            if selections:
+                return render_files(planner.render(selections))
+            return artifacts["project"]  # nothing indexed, e.g. a non-XML pack
+        if self.context is ContextMode.REPO_MAP:
+            repo_map = artifacts["repo_map"]
+            if not repo_map:  # no Python definitions
+                return artifacts["project"]
+            return repo_map.context(self.path_weights, self.context_tokens)
+        return artifacts[self.inputs[0]]
+
+    async def run(self, artifacts: Mapping[str, Any], client: OllamaClient) -> str:
+        """Generate documentation from resolved input artifacts.
+
+        The default implementation documents the context assembled by
+        :meth:`build_context`, in one completion or, in outline mode, section
+        by section.
+
+        Args:
+            artifacts: Resolved values for every name in :meth:`required_inputs`.
+            client: Ollama client for text generation.
+
+        Returns:
+            Generated documentation as a string.
+        """
+        context = await self.build_context(artifacts)
+        if self.outline:
+            return await self.expand(context, artifacts["files"], client)
+        return await self.generate(context, client)
+
+    async def expand(self, context: str, files: Any, client: OllamaClient) -> str:
+        """Generate a document as an outline of concurrently written sections.
+
+        Output tokens are generated serially, so one long completion takes as
+        long as the whole document. Here the model first returns a short JSON
+        outline naming each section and the files it needs; every section is
+        then generated at once from only those files and the results are
+        stitched together in order. Falls back to :meth:`generate` when no
+        usable outline is returned.
+
+        In multi-revision runs the outline of the previous revision is reused
+        while the set of files is unchanged. Sections whose files did not
+        change then send the same prompt again, which the run journal
+        answers without a model call.
+
+        Args:
+            context: Project context used to plan the outline.
+            files: File index (:class:`~repodoc.parser.PackIndex`) the
+                section context is read from.
+            client: Ollama client for text generation.
+
+        Returns:
+            Generated documentation as a string.
+        """
+        paths = list(files.files.paths())
+        memo = self.outlines if self.outlines is not None else {}
+        known_paths, sections = memo.get(self.title, ((), []))
+        if sections and known_paths == tuple(paths):
+            logger.info(f"Reusing the outline of {self.title} from the last revision")
+        else:
+            response = await client.generate(
+                prompt_segments(
+                    lambda ctx: build_outline_prompt(
+                        self.title, self.query, ctx, paths
+                    ),
+                    context,
+                ),
+                format=OUTLINE_SCHEMA,
+                task="extract",
+            )
+            sections = parse_outline(response)
+            if sections:
+                memo[self.title] = (tuple(paths), sections)
+        if not sections:
+            logger.warning(f"No usable outline for {self.title}; generating it whole")
+            return await self.generate(context, client)
+
+        async def write(section: OutlineSection) -> str:
+            known = [path for path in section.files if path in files]
+            section_context = (
+                files.segments(_within_budget(files, known, self.context_tokens))
+                if known
+                else context
+            )
+            return await client.generate(
+                prompt_segments(
+                    lambda ctx: build_section_prompt(self.title, section, ctx),
+                    section_context,
+                )
+            )
+
+        bodies = await asyncio.gather(*(write(section) for section in sections))
+        parts = [_as_section(s.title, body) for s, body in zip(sections, bodies)]
+        return "\n\n".join([f"## {self.title}", *parts]) + "\n"
+
+    async def review(self, doc: str, client: OllamaClient) -> str:
+        """Validate a generated document and repair what fails.
+
+        The checks are local (headers, code fences, Mermaid syntax and
+        truncated text); only failing sections are sent back to the model,
+        routed as :attr:`~repodoc.ollama.Task.REPAIR` requests.
+
+        Args:
+            doc: Output of :meth:`run`.
+            client: Ollama client for text generation.
+
+        Returns:
+            The document, repaired if enabled and needed.
+        """
+        if not self.repair:
+            return doc
+        from repodoc.validate import repair
+
+        return await repair(doc, client, title=self.title, diagrams=self.diagrams)
+
     @abstractmethod
     async def generate(self, project: str, client: OllamaClient) -> str:
         """Generate documentation for a project.
@@ -28,9 +293,236 @@ class DocGenerator(ABC):
         pass
 
 
+class ArtifactBuilder(ABC):
+    """Abstract base class for shared intermediate artifacts.
+
+    Artifacts (for example per-module summaries) are computed once per run
+    and shared by every generator that declares them as an input.
+
+    Attributes:
+        inputs: Names of the artifacts this builder consumes.
+    """
+
+    inputs: Tuple[str, ...] = ("project",)
+
+    @abstractmethod
+    async def build(self, artifacts: Mapping[str, Any], client: OllamaClient) -> Any:
+        """Compute the artifact.
+
+        Args:
+            artifacts: Resolved values for every name in :attr:`inputs`.
+            client: Ollama client for text generation.
+
+        Returns:
+            The artifact value.
+        """
+        pass
+
+
+def render_files(files: Iterable[Tuple[str, str]]) -> str:
+    """Render files as prompt context in the repomix XML layout.
+
+    Args:
+        files: ``(path, content)`` pairs.
+
+    Returns:
+        Concatenated ``<file path="...">`` blocks.
+    """
+    return "\n\n".join(
+        f'<file path="{path}">\n{content}\n</file>' for path, content in files
+    )
+
+
+# Stands in for the context while a prompt template is rendered
+_CONTEXT_MARKER = "\x00repodoc-context\x00"
+
+
+def prompt_segments(build: Callable[[str], str], context: Prompt) -> List[Segment]:
+    """Render a prompt around a context without copying the context.
+
+    Prompt builders interpolate the context into an f-string, which copies
+    it once per prompt. Here the builder renders a marker instead and the
+    context is spliced in as segments, which the client streams as is.
+
+    Args:
+        build: Prompt builder taking the context as its only argument.
+        context: Context string or segments.
+
+    Returns:
+        Prompt segments for :meth:`~repodoc.ollama.OllamaClient.generate`.
+    """
+    before, _, after = build(_CONTEXT_MARKER).partition(_CONTEXT_MARKER)
+    parts = [context] if isinstance(context, str) else list(context)
+    return [before, *parts, after]
+
+
+@dataclass
+class OutlineSection:
+    """One section of a document outline.
+
+    Attributes:
+        title: Section title.
+        files: Paths of the files the section needs.
+        notes: What the section should cover.
+    """
+
+    title: str
+    files: List[str] = field(default_factory=list)
+    notes: str = ""
+
+
+# Document title -> file paths an outline was planned from and its sections
+OutlineMemo = Dict[str, Tuple[Tuple[str, ...], List[OutlineSection]]]
+
+
+def build_outline_prompt(title: str, focus: str, context: str, paths: List[str]) -> str:
+    """Build a prompt asking for a document outline.
+
+    Args:
+        title: Title of the document.
+        focus: What the document should cover.
+        context: Project content to plan from.
+        paths: Paths of every file a section may reference.
+
+    Returns:
+        Prompt string requesting a JSON outline.
+    """
+    listing = "\n".join(paths)
+    return f"""Plan the '{title}' documentation for the following project.
+{focus}
+
+Code to analyze:
+{context}
+
+Files available to each section:
+{listing}
+
+Respond with a JSON object {{"sections": [...]}} listing at most {MAX_SECTIONS}
+sections in reading order. Each section has a "title", the "files" (paths from
+the list above) needed to write it, and short "notes" on what it covers."""
+
+
+def build_section_prompt(title: str, section: OutlineSection, context: str) -> str:
+    """Build a prompt writing one section of an outlined document.
+
+    Args:
+        title: Title of the document.
+        section: The section to write.
+        context: Content of the files the section needs.
+
+    Returns:
+        Prompt string for the section body.
+    """
+    notes = f"\nIt should cover: {section.notes}\n" if section.notes else ""
+    return f"""Write the '{section.title}' section of the '{title}' documentation
+for the following code, in markdown format.
+{notes}
+Code to analyze:
+{context}
+
+Start with the level 3 header '### {section.title}' and use level 4 headers
+for subsections. Write only this section."""
+
+
+def parse_outline(response: str) -> List[OutlineSection]:
+    """Parse the model's JSON outline.
+
+    Args:
+        response: Raw model response.
+
+    Returns:
+        Up to :data:`MAX_SECTIONS` sections; empty if the response is unusable.
+    """
+    try:
+        entries = json.loads(response)["sections"]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return []
+    if not isinstance(entries, list):
+        return []
+    sections = []
+    for entry in entries:
+        if len(sections) == MAX_SECTIONS:
+            break
+        if not isinstance(entry, dict) or not str(entry.get("title", "")).strip():
+            continue
+        files = entry.get("files") or []
+        sections.append(
+            OutlineSection(
+                title=str(entry["title"]).strip(),
+                files=[str(path) for path in files] if isinstance(files, list) else [],
+                notes=str(entry.get("notes", "")).strip(),
+            )
+        )
+    return sections
+
+
+def _within_budget(files: Any, paths: List[str], max_tokens: int) -> List[str]:
+    """Select the files a section needs, up to a token budget.
+
+    Args:
+        files: File index of the pack.
+        paths: Paths in priority order.
+        max_tokens: Token budget.
+
+    Returns:
+        Paths that fit, in priority order.
+    """
+    selected = []
+    used = 0
+    for path in paths:
+        tokens = files.get(path).tokens
+        if used + tokens > max_tokens:
+            continue
+        selected.append(path)
+        used += tokens
+    return selected
+
+
+def _as_section(title: str, body: str) -> str:
+    """Ensure a generated section starts with its level 3 header.
+
+    Args:
+        title: Section title.
+        body: Generated section.
+
+    Returns:
+        The section with a single ``###`` header.
+    """
+    body = body.strip()
+    if body.startswith("#"):
+        return body
+    return f"### {title}\n\n{body}"
+
+
 # Registry for concrete generator implementations
 _registry: Dict[str, Type[DocGenerator]] = {}
 
+# Built-in generators and the modules that register them. They are imported
+# only when first requested, keeping CLI startup independent of their cost.
+_builtin: Dict[str, str] = {
+    "api": "repodoc.generators.api",
+    "manual": "repodoc.generators.manual",
+    "architecture": "repodoc.generators.architecture",
+}
+
+# Registry for shared artifact builders, loaded lazily like generators
+_artifact_registry: Dict[str, Type[ArtifactBuilder]] = {}
+
+_builtin_artifacts: Dict[str, str] = {
+    "embeddings_dir": "repodoc.generators.retrieval",
+    "files": "repodoc.generators.files",
+    "import_graph": "repodoc.generators.files",
+    "project": "repodoc.generators.files",
+    "skeleton": "repodoc.generators.files",
+    "retriever": "repodoc.generators.retrieval",
+    "skeletons": "repodoc.generators.files",
+    "planner": "repodoc.generators.files",
+    "repo_map": "repodoc.generators.files",
+    "module_summaries": "repodoc.generators.summaries",
+    "pack": "repodoc.generators.files",
+    "pack_stream": "repodoc.generators.files",
+}
+
 
 def register(name: str) -> Type[DocGenerator]:
     """Register a concrete generator implementation.
@@ -64,6 +556,82 @@ def get_generator(name: str) -> Type[DocGenerator]:
     Raises:
         KeyError: If no generator is registered with the given name.
     """
+    if name not in _registry:
+        _load(name)
     if name not in _registry:
         raise KeyError(f"No generator registered with name '{name}'")
-    return _registry[name] 
\ No newline at end of file
+    return _registry[name]
+
+
+def register_artifact(name: str) -> Type[ArtifactBuilder]:
+    """Register an artifact builder.
+
+    Args:
+        name: Unique identifier for the artifact.
+
+    Returns:
+        Decorator function that registers the builder class.
+
+    Raises:
+        ValueError: If an artifact with the given name is already registered.
+    """
+    def decorator(cls: Type[ArtifactBuilder]) -> Type[ArtifactBuilder]:
+        if name in _artifact_registry:
+            raise ValueError(f"Artifact '{name}' is already registered")
+        _artifact_registry[name] = cls
+        return cls
+    return decorator
+
+
+def get_artifact_builder(name: str) -> Type[ArtifactBuilder]:
+    """Get a registered artifact builder by name.
+
+    Args:
+        name: Name of the artifact to retrieve.
+
+    Returns:
+        The registered builder class.
+
+    Raises:
+        KeyError: If no artifact is registered with the given name.
+    """
+    if name not in _artifact_registry and name in _builtin_artifacts:
+        import_module(_builtin_artifacts[name])
+    if name not in _artifact_registry:
+        raise KeyError(f"No artifact registered with name '{name}'")
+    return _artifact_registry[name]
+
+
+def available_generators() -> List[str]:
+    """List the names of all known generators without importing them.
+
+    Returns:
+        Sorted generator names: registered, built-in and entry point provided.
+    """
+    from importlib.metadata import entry_points
+
+    names = set(_registry) | set(_builtin)
+    names.update(ep.name for ep in entry_points(group=ENTRY_POINT_GROUP))
+    return sorted(names)
+
+
+def _load(name: str) -> None:
+    """Import the module providing generator *name*, if one is known.
+
+    Built-in generators register themselves when their module is imported.
+    Entry point generators are registered here unless their module already
+    used the :func:`register` decorator.
+
+    Args:
+        name: Name of the generator to load.
+    """
+    if name in _builtin:
+        import_module(_builtin[name])
+        return
+
+    from importlib.metadata import entry_points
+
+    for ep in entry_points(group=ENTRY_POINT_GROUP, name=name):
+        cls = ep.load()
+        _registry.setdefault(name, cls)
+        return 
\ No newline at end of file
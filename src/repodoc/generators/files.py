@@ -0,0 +1,319 @@
+"""Per-file artifacts of the packed project."""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Tuple
+
+from repodoc.filters import filter_files, load_ignore
+from repodoc.generators.base import ArtifactBuilder, register_artifact, render_files
+from repodoc.graph import ImportGraph, import_graph
+from repodoc.ollama import OllamaClient
+from repodoc.parser import PackIndex, PackStream, open_pack_index
+from repodoc.planner import (
+    ContextPlanner,
+    Signals,
+    entry_point_paths,
+    git_churn,
+    import_fan_in,
+)
+from repodoc.repomap import RepoMap, build_repo_map
+from repodoc.skeleton import skeletonize_many
+
+logger = logging.getLogger("repodoc")
+
+
+@register_artifact("pack")
+class Pack(ArtifactBuilder):
+    """Builder for the raw text of the repomix pack."""
+
+    inputs = ("project_file",)
+
+    async def build(self, artifacts: Mapping[str, Any], client: OllamaClient) -> str:
+        """Read the pack once it has been written.
+
+        Args:
+            artifacts: Resolved inputs; ``project_file`` is the pack path.
+            client: Ollama client (unused).
+
+        Returns:
+            Pack content.
+        """
+        return await asyncio.to_thread(Path(artifacts["project_file"]).read_text)
+
+
+@register_artifact("pack_stream")
+class PackFiles(ArtifactBuilder):
+    """Builder for the files of a finished pack as a :class:`PackStream`.
+
+    Used when no packer seeds ``pack_stream`` with files as they are packed.
+    The stream carries every file of the pack; consumers filter it as it
+    arrives.
+    """
+
+    inputs = ("project_file",)
+
+    async def build(
+        self, artifacts: Mapping[str, Any], client: OllamaClient
+    ) -> PackStream:
+        """Stream the files of the pack.
+
+        Args:
+            artifacts: Resolved inputs; ``project_file`` is the pack path.
+            client: Ollama client (unused).
+
+        Returns:
+            Closed stream over every file of the pack.
+        """
+        index = await asyncio.to_thread(open_pack_index, artifacts["project_file"])
+        files = await asyncio.to_thread(list, index.contents())
+        return PackStream.from_files(files)
+
+
+@register_artifact("files")
+class FileIndex(ArtifactBuilder):
+    """Builder for the file offset index of a repomix XML pack.
+
+    Gives downstream artifacts per-file random access to the pack instead of
+    its raw text. Ignored, lock, vendored, generated and duplicate files are
+    filtered out first (see :mod:`repodoc.filters`). Packs in other formats
+    yield an empty index.
+    """
+
+    inputs = ("project_file", "repo_path")
+
+    async def build(
+        self, artifacts: Mapping[str, Any], client: OllamaClient
+    ) -> PackIndex:
+        """Index the files of the packed project worth documenting.
+
+        Args:
+            artifacts: Resolved inputs; ``project_file`` is the pack path and
+                ``repo_path`` the repository holding ``.repodocignore``.
+            client: Ollama client (unused).
+
+        Returns:
+            Index of the files kept from the pack.
+        """
+        return await asyncio.to_thread(
+            _filtered_index, artifacts["project_file"], artifacts["repo_path"]
+        )
+
+
+def _filtered_index(project_file: Path, repo_path: Path) -> PackIndex:
+    """Open a pack's index and drop files with no documentation value.
+
+    Args:
+        project_file: Path to the pack.
+        repo_path: Path to the repository.
+
+    Returns:
+        Index restricted to the kept files.
+    """
+    index = open_pack_index(project_file)
+    if not len(index):
+        return index
+    rows, report = filter_files(
+        index.files, index.contents(), ignore=load_ignore(Path(repo_path))
+    )
+    if report.removed:
+        logger.info("Filtered files before prompting:")
+        for line in report.lines():
+            logger.info(f"  {line}")
+    if len(rows) == len(index):
+        return index
+    return PackIndex(index.pack_path, index.files.take(rows))
+
+
+@register_artifact("project")
+class Project(ArtifactBuilder):
+    """Builder for the project content sent to the model.
+
+    Renders only the files kept by the ``files`` index; falls back to the raw
+    pack when it could not be indexed.
+    """
+
+    inputs = ("files", "pack")
+
+    async def build(self, artifacts: Mapping[str, Any], client: OllamaClient) -> str:
+        """Render the kept files of the packed project.
+
+        Args:
+            artifacts: Resolved inputs; file index and raw pack content.
+            client: Ollama client (unused).
+
+        Returns:
+            Project content without filtered files.
+        """
+        index: PackIndex = artifacts["files"]
+        if not len(index):
+            return artifacts["pack"]
+        return render_files(index.contents())
+
+
+@register_artifact("skeletons")
+class Skeletons(ArtifactBuilder):
+    """Builder for the AST skeleton of every Python file in the pack.
+
+    Skeletons keep imports, signatures, decorators and docstrings and drop
+    implementation bodies.
+    """
+
+    inputs = ("files",)
+
+    async def build(
+        self, artifacts: Mapping[str, Any], client: OllamaClient
+    ) -> Dict[str, str]:
+        """Skeletonize the Python files of the packed project.
+
+        Args:
+            artifacts: Resolved inputs; the file index.
+            client: Ollama client (unused).
+
+        Returns:
+            Path -> skeleton source for each Python file.
+        """
+        return await asyncio.to_thread(_skeletons, artifacts["files"])
+
+
+def _skeletons(index: PackIndex) -> Dict[str, str]:
+    """Skeletonize every Python file of a pack in a process pool.
+
+    Args:
+        index: File index of the pack.
+
+    Returns:
+        Path -> skeleton source.
+    """
+    rows = index.files.select(index.files.mask_language("python"))
+    paths = [index.files.path(row) for row in rows]
+    skeletons = skeletonize_many([index.read(path) for path in paths])
+    return dict(zip(paths, skeletons))
+
+
+@register_artifact("skeleton")
+class Skeleton(ArtifactBuilder):
+    """Builder for a compressed view of the project.
+
+    Python modules are replaced by their skeleton; other files are kept
+    verbatim. Generators that only need interfaces, such as API docs, select
+    it as their input. Falls back to the raw project when the pack has no
+    file index.
+    """
+
+    inputs = ("files", "skeletons", "project")
+
+    async def build(self, artifacts: Mapping[str, Any], client: OllamaClient) -> str:
+        """Render the pack with every Python file skeletonized.
+
+        Args:
+            artifacts: Resolved inputs; file index, skeletons and raw project.
+            client: Ollama client (unused).
+
+        Returns:
+            Project content with Python bodies dropped.
+        """
+        index: PackIndex = artifacts["files"]
+        if not len(index):
+            return artifacts["project"]
+        skeletons: Dict[str, str] = artifacts["skeletons"]
+        return render_files(
+            (path, skeletons.get(path, content)) for path, content in index.contents()
+        )
+
+
+@register_artifact("planner")
+class Planner(ArtifactBuilder):
+    """Builder for the token-budget context planner.
+
+    Gathers repository-wide relevance signals once: console-script entry
+    points from ``pyproject.toml``, import fan-in and Git churn.
+    """
+
+    inputs = ("files", "skeletons", "repo_path")
+
+    async def build(
+        self, artifacts: Mapping[str, Any], client: OllamaClient
+    ) -> ContextPlanner:
+        """Collect relevance signals for the packed project.
+
+        Args:
+            artifacts: Resolved inputs; file index, skeletons and repository.
+            client: Ollama client (unused).
+
+        Returns:
+            Planner shared by every generator in planned mode.
+        """
+        index: PackIndex = artifacts["files"]
+        files = list(index.contents())
+        signals = await asyncio.to_thread(_signals, files, artifacts["repo_path"])
+        return ContextPlanner(files, signals, artifacts["skeletons"])
+
+
+def _signals(files: List[Tuple[str, str]], repo_path: Path) -> Signals:
+    """Collect the relevance signals of a project.
+
+    Args:
+        files: ``(path, content)`` pairs of the packed project.
+        repo_path: Path to the Git repository.
+
+    Returns:
+        Entry points, import fan-in and churn of every file.
+    """
+    paths = [path for path, _ in files]
+    pyproject = dict(files).get("pyproject.toml", "")
+    return Signals(
+        entry_points=entry_point_paths(pyproject, paths),
+        fan_in=import_fan_in(files, paths),
+        churn=git_churn(repo_path),
+    )
+
+
+@register_artifact("import_graph")
+class ImportGraphArtifact(ArtifactBuilder):
+    """Builder for the static package import graph of the project.
+
+    Computed from Python imports alone, so it costs no model time.
+    """
+
+    inputs = ("files",)
+
+    async def build(
+        self, artifacts: Mapping[str, Any], client: OllamaClient
+    ) -> ImportGraph:
+        """Analyze the imports of the packed project.
+
+        Args:
+            artifacts: Resolved inputs; the file index.
+            client: Ollama client (unused).
+
+        Returns:
+            Import graph; empty for packs without Python files.
+        """
+        index: PackIndex = artifacts["files"]
+        return await asyncio.to_thread(import_graph, list(index.contents()))
+
+
+@register_artifact("repo_map")
+class RepoMapArtifact(ArtifactBuilder):
+    """Builder for the ranked map of the project's definitions.
+
+    Generators rank it with their own path weights, so one map serves all.
+    """
+
+    inputs = ("files",)
+
+    async def build(
+        self, artifacts: Mapping[str, Any], client: OllamaClient
+    ) -> RepoMap:
+        """Collect the definitions and references of the packed project.
+
+        Args:
+            artifacts: Resolved inputs; the file index.
+            client: Ollama client (unused).
+
+        Returns:
+            Repository map; empty for packs without Python definitions.
+        """
+        index: PackIndex = artifacts["files"]
+        return await asyncio.to_thread(build_repo_map, list(index.contents()))
@@ -1,6 +1,6 @@
 """User manual documentation generator."""
 
-from repodoc.generators.base import DocGenerator, register
+from repodoc.generators.base import DocGenerator, prompt_segments, register
 from repodoc.ollama import OllamaClient
 
 
@@ -36,6 +36,23 @@ class ManualGenerator(DocGenerator):
     getting started guides, and common workflows.
     """
 
+    title = "User Manual"
+    query = (
+        "README and usage documentation, installation steps, command-line entry "
+        "points, configuration options and examples."
+    )
+    path_weights = (
+        ("README*", 5.0),
+        ("*/README*", 3.0),
+        ("docs/*", 3.0),
+        ("examples/*", 2.5),
+        ("*cli*", 2.5),
+        ("*config*", 2.0),
+        ("pyproject.toml", 2.0),
+        ("*tests/*", 0.2),
+        ("*.lock", 0.0),
+    )
+
     async def generate(self, project: str, client: OllamaClient) -> str:
         """Generate user manual documentation.
 
@@ -46,5 +63,5 @@ class ManualGenerator(DocGenerator):
         Returns:
             Generated user manual in markdown format.
         """
-        prompt = build_prompt(project)
+        prompt = prompt_segments(build_prompt, project)
         return await client.generate(prompt) 
\ No newline at end of file
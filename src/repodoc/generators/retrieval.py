@@ -0,0 +1,63 @@
+"""Embedding retrieval artifact of the packed project."""
+
+from pathlib import Path
+from typing import Any, Mapping
+
+from repodoc.generators.base import ArtifactBuilder, register_artifact
+from repodoc.ollama import OllamaClient
+from repodoc.parser import PackIndex
+from repodoc.retrieval import Retriever, build_index
+
+
+@register_artifact("embeddings_dir")
+class EmbeddingsDir(ArtifactBuilder):
+    """Builder for the directory holding the embedding index.
+
+    Defaults to ``<pack>.embeddings`` next to the pack. Multi-revision runs
+    seed one directory for every revision, so each revision only embeds the
+    chunks that changed since the previous one.
+    """
+
+    inputs = ("project_file",)
+
+    async def build(self, artifacts: Mapping[str, Any], client: OllamaClient) -> Path:
+        """Place the embedding index next to the pack.
+
+        Args:
+            artifacts: Resolved inputs; the pack path.
+            client: Ollama client (unused).
+
+        Returns:
+            Directory of the embedding index.
+        """
+        project_file: Path = artifacts["project_file"]
+        return project_file.with_name(project_file.name + ".embeddings")
+
+
+@register_artifact("retriever")
+class RetrieverArtifact(ArtifactBuilder):
+    """Builder for the embedding retriever shared by all generators.
+
+    The embedding index is kept on disk (see :class:`EmbeddingsDir`) so later
+    runs only embed chunks that changed.
+    """
+
+    inputs = ("files", "embeddings_dir")
+
+    async def build(
+        self, artifacts: Mapping[str, Any], client: OllamaClient
+    ) -> Retriever:
+        """Create or update the embedding index of the pack.
+
+        Args:
+            artifacts: Resolved inputs; the file index and the directory of
+                the embedding index.
+            client: Ollama client providing embeddings.
+
+        Returns:
+            Retriever over the pack's chunks.
+        """
+        files: PackIndex = artifacts["files"]
+        directory = Path(artifacts["embeddings_dir"])
+        index = await build_index(directory, files.contents(), client)
+        return Retriever(index, files, client)
@@ -0,0 +1,107 @@
+"""Shared module summaries artifact."""
+
+import asyncio
+from pathlib import Path
+from typing import Any, List, Mapping, Tuple
+
+from repodoc.chunker import iter_line_chunks
+from repodoc.filters import FileFilter, load_ignore
+from repodoc.generators.base import ArtifactBuilder, register_artifact, render_files
+from repodoc.index import blob_hash, estimate_tokens
+from repodoc.ollama import DEFAULT_CHUNK_TOKENS, OllamaClient, Task
+from repodoc.parser import PackStream
+
+# Token budget of the files summarized by one request, unless the client has
+# a tuned size for the summarizing model
+CHUNK_TOKENS = DEFAULT_CHUNK_TOKENS
+
+
+def build_prompt(chunk: str) -> str:
+    """Build a prompt summarizing the modules contained in one chunk.
+
+    Args:
+        chunk: Slice of the packed project content.
+
+    Returns:
+        Prompt string asking for a compact per-module summary.
+    """
+    return f"""Summarize each source file in the following code excerpt.
+For every file give its path followed by a few bullet points covering:
+- Its responsibility within the project
+- Public classes and functions it defines
+- Other project modules it depends on
+
+Code excerpt:
+{chunk}
+
+Be concise and use markdown lists. Do not add an introduction or conclusion."""
+
+
+@register_artifact("module_summaries")
+class ModuleSummaries(ArtifactBuilder):
+    """Builder for per-module summaries of the packed project.
+
+    Files are consumed from the pack stream while repomix is still packing:
+    each is filtered as it arrives (see :class:`repodoc.filters.FileFilter`),
+    and a summary request is started as soon as enough files for one chunk
+    have arrived. Summaries are concatenated in pack order.
+    """
+
+    inputs = ("pack_stream", "repo_path")
+
+    async def build(self, artifacts: Mapping[str, Any], client: OllamaClient) -> str:
+        """Summarize the packed project chunk by chunk.
+
+        Args:
+            artifacts: Resolved inputs; ``pack_stream`` yields the packed
+                files and ``repo_path`` is the repository holding
+                ``.repodocignore``.
+            client: Ollama client for text generation.
+
+        Returns:
+            Concatenated module summaries in markdown.
+        """
+        stream: PackStream = artifacts["pack_stream"]
+        chunk_tokens = client.chunk_tokens_for(Task.SUMMARIZE)
+        file_filter = FileFilter(load_ignore(Path(artifacts["repo_path"])))
+        requests: List["asyncio.Future[str]"] = []
+        batch: List[Tuple[str, str]] = []
+        batch_tokens = 0
+
+        def summarize(chunk: str) -> None:
+            requests.append(
+                asyncio.ensure_future(
+                    client.generate(build_prompt(chunk), task=Task.SUMMARIZE)
+                )
+            )
+
+        try:
+            async for path, content in stream:
+                data = content.encode("utf-8")
+                tokens = estimate_tokens(len(data))
+                if not file_filter.accept(
+                    path,
+                    content,
+                    tokens=tokens,
+                    size=len(data),
+                    digest=blob_hash(data).hex(),
+                ):
+                    continue
+                if batch and batch_tokens + tokens > chunk_tokens:
+                    summarize(render_files(batch))
+                    batch, batch_tokens = [], 0
+                if tokens > chunk_tokens:
+                    parts = iter_line_chunks(content, max_tokens=chunk_tokens)
+                    for _, _, part in parts:
+                        summarize(render_files([(path, part)]))
+                    continue
+                batch.append((path, content))
+                batch_tokens += tokens
+            if batch:
+                summarize(render_files(batch))
+            summaries = await asyncio.gather(*requests)
+        except BaseException:
+            for request in requests:
+                request.cancel()
+            raise
+        return "\n\n".join(summaries)
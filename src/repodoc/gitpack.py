@@ -0,0 +1,439 @@
+"""Packing of Git revisions straight from the object database.
+
+:func:`pack_revision` lists a commit's tree with ``git ls-tree`` and reads
+every blob through a single long-lived ``git cat-file --batch`` process, so
+any revision of any repository, including bare mirrors, can be packed
+without a checkout or a subprocess per file. The pack has the layout of a
+parsable repomix XML pack, so indexing, filtering and the generators treat
+both alike. :func:`pack_files` packs any subset of a tree the same way, e.g.
+one package of a monorepo.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from repodoc.errors import InputFileError
+from repodoc.parser import PackStream, open_pack_index
+
+# Where revision packs are kept inside the output directory
+PACKS_DIR = Path(".repodoc") / "packs"
+
+# Blobs larger than this are left out, like repomix's default size limit
+MAX_FILE_BYTES = 50 << 20
+
+# Leading bytes searched for NUL to detect binary files, as Git does
+BINARY_PROBE_BYTES = 8000
+
+# Git modes of entries that are not regular files (symlinks and submodules)
+_SKIPPED_MODES = (b"120000", b"160000")
+
+_ENTITIES = {'"': "&quot;"}
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    """One file of a Git tree.
+
+    Attributes:
+        path: File path inside the repository.
+        object_id: Hex id of the blob.
+        size: Blob size in bytes.
+    """
+
+    path: str
+    object_id: str
+    size: int
+
+
+async def _git(repo_path: Path, *args: str) -> bytes:
+    """Run a Git command in a repository and return its output.
+
+    Args:
+        repo_path: Path to the repository; may be bare.
+        *args: Git subcommand and arguments.
+
+    Returns:
+        Standard output.
+
+    Raises:
+        InputFileError: If Git is missing or the command fails.
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            "-C",
+            str(repo_path),
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        raise InputFileError("git binary not found. Please install it first.")
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        message = stderr.decode("utf-8", errors="replace").strip()
+        raise InputFileError(f"git {args[0]} failed: {message}")
+    return stdout
+
+
+async def resolve_revision(repo_path: Path, rev: str) -> str:
+    """Resolve a branch, tag or commit expression to a commit id.
+
+    Args:
+        repo_path: Path to the repository; may be bare.
+        rev: Revision expression, e.g. ``v1.2.0`` or ``HEAD~3``.
+
+    Returns:
+        Hex commit id.
+
+    Raises:
+        InputFileError: If the revision does not name a commit.
+    """
+    if rev.startswith("-"):
+        raise InputFileError(f"Invalid revision: {rev}")
+    try:
+        output = await _git(repo_path, "rev-parse", "--verify", f"{rev}^{{commit}}")
+    except InputFileError as e:
+        raise InputFileError(f"Unknown revision {rev}: {e}") from e
+    return output.decode("ascii").strip()
+
+
+async def list_tree(repo_path: Path, commit: str) -> List[TreeEntry]:
+    """List the regular files of a commit.
+
+    Args:
+        repo_path: Path to the repository; may be bare.
+        commit: Commit id or other revision.
+
+    Returns:
+        Files in tree order; symlinks and submodules are omitted.
+
+    Raises:
+        InputFileError: If the tree cannot be listed.
+    """
+    output = await _git(repo_path, "ls-tree", "-r", "-z", "--long", commit)
+    entries = []
+    for record in output.split(b"\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition(b"\t")
+        mode, kind, object_id, size = meta.split()
+        if kind != b"blob" or mode in _SKIPPED_MODES:
+            continue
+        entries.append(
+            TreeEntry(
+                path.decode("utf-8", errors="surrogateescape"),
+                object_id.decode("ascii"),
+                int(size),
+            )
+        )
+    return entries
+
+
+async def revision_range(repo_path: Path, spec: str) -> List[str]:
+    """Expand a revision specification into the revisions to document.
+
+    ``A..B`` selects *A*, every tag on the commits after *A* up to *B* in
+    topological order, and *B*; ``A,B,C`` lists revisions explicitly; any
+    other value is a single revision.
+
+    Args:
+        repo_path: Path to the repository; may be bare.
+        spec: Revision specification.
+
+    Returns:
+        Revision names, oldest first, without duplicates.
+
+    Raises:
+        InputFileError: If a revision does not name a commit.
+    """
+    if ".." not in spec:
+        names = [name.strip() for name in spec.split(",") if name.strip()]
+        for name in names:
+            await resolve_revision(repo_path, name)
+        return list(dict.fromkeys(names))
+
+    start, end = (name.strip() for name in spec.split("..", 1))
+    first = await resolve_revision(repo_path, start)
+    last = await resolve_revision(repo_path, end)
+    listing = await _git(
+        repo_path,
+        "for-each-ref",
+        "--format=%(*objectname) %(objectname) %(refname:short)",
+        "refs/tags",
+    )
+    tags: Dict[str, str] = {}
+    for line in listing.decode("utf-8").splitlines():
+        peeled, object_id, name = line.split(" ", 2)
+        tags.setdefault(peeled or object_id, name)  # annotated tags are peeled
+    commits = await _git(
+        repo_path, "rev-list", "--reverse", "--topo-order", f"{first}..{last}"
+    )
+    between = [
+        tags[commit]
+        for commit in commits.decode("ascii").split()
+        if commit in tags and commit != last
+    ]
+    return list(dict.fromkeys([start, *between, end]))
+
+
+@dataclass(frozen=True)
+class RevisionDelta:
+    """Files changed between two revisions.
+
+    Attributes:
+        added: Paths only in the newer revision.
+        modified: Paths whose blob changed.
+        deleted: Paths only in the older revision.
+        unchanged: Number of files with the same blob in both.
+    """
+
+    added: List[str]
+    modified: List[str]
+    deleted: List[str]
+    unchanged: int
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.modified)} modified, "
+            f"{len(self.deleted)} deleted, {self.unchanged} unchanged"
+        )
+
+
+def tree_delta(old: Sequence[TreeEntry], new: Sequence[TreeEntry]) -> RevisionDelta:
+    """Compare the files of two revisions by blob id.
+
+    Args:
+        old: Files of the older revision.
+        new: Files of the newer revision.
+
+    Returns:
+        The per-file delta.
+    """
+    before = {entry.path: entry.object_id for entry in old}
+    added, modified = [], []
+    unchanged = 0
+    for entry in new:
+        previous = before.pop(entry.path, None)
+        if previous is None:
+            added.append(entry.path)
+        elif previous != entry.object_id:
+            modified.append(entry.path)
+        else:
+            unchanged += 1
+    return RevisionDelta(added, modified, sorted(before), unchanged)
+
+
+def _directory_structure(paths: Sequence[str]) -> str:
+    """Render paths as an indented tree like repomix's directory structure.
+
+    Args:
+        paths: File paths in tree order.
+
+    Returns:
+        One line per directory and file.
+    """
+    lines = []
+    previous: Tuple[str, ...] = ()
+    for path in paths:
+        *directories, name = path.split("/")
+        common = 0
+        while (
+            common < min(len(previous), len(directories))
+            and previous[common] == directories[common]
+        ):
+            common += 1
+        for depth in range(common, len(directories)):
+            lines.append(f"{'  ' * depth}{directories[depth]}/")
+        lines.append(f"{'  ' * len(directories)}{name}")
+        previous = tuple(directories)
+    return "\n".join(lines)
+
+
+def _decode_text(content: bytes) -> Optional[str]:
+    """Decode a blob that looks like text.
+
+    Args:
+        content: Blob content.
+
+    Returns:
+        The text, or None for binary and non-UTF-8 blobs.
+    """
+    if b"\0" in content[:BINARY_PROBE_BYTES]:
+        return None
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+async def pack_revision(
+    repo_path: Path,
+    rev: str,
+    packs_dir: Path,
+    stream: Optional[PackStream] = None,
+) -> Path:
+    """Pack a revision as a parsable XML pack without checking it out.
+
+    Packs are named after the commit, which never changes, so a revision
+    packed before is reused as is.
+
+    Args:
+        repo_path: Path to the repository; may be bare.
+        rev: Revision to pack.
+        packs_dir: Directory holding revision packs; created if missing.
+        stream: Receives every packed file and is closed at the end, also on
+            failure; None to only write the pack.
+
+    Returns:
+        Path to the pack, ``<packs_dir>/<commit>.xml``.
+
+    Raises:
+        InputFileError: If the revision or a blob cannot be read.
+    """
+    try:
+        commit = await resolve_revision(repo_path, rev)
+        output_path = packs_dir / f"{commit}.xml"
+        entries = [] if output_path.exists() else await list_tree(repo_path, commit)
+    except BaseException:
+        if stream:
+            await stream.close()
+        raise
+    return await pack_files(
+        repo_path, entries, output_path, stream, label=f"revision {commit}"
+    )
+
+
+async def pack_files(
+    repo_path: Path,
+    entries: Sequence[TreeEntry],
+    output_path: Path,
+    stream: Optional[PackStream] = None,
+    *,
+    label: str,
+) -> Path:
+    """Pack files of the object database as a parsable XML pack.
+
+    Object ids are written to ``git cat-file --batch`` while its output is
+    read, so Git streams blobs back to back. Binary, non-UTF-8 and oversized
+    files are left out. The pack is written to a temporary file and renamed
+    when complete; an existing pack at *output_path* is reused as is, so
+    name packs after what determines their content.
+
+    Args:
+        repo_path: Path to the repository; may be bare.
+        entries: Files to pack, under the paths they get in the pack.
+        output_path: Pack file; its directory is created if missing.
+        stream: Receives every packed file and is closed at the end, also on
+            failure; None to only write the pack.
+        label: What the pack holds, named in its header.
+
+    Returns:
+        *output_path*.
+
+    Raises:
+        InputFileError: If a blob cannot be read or the pack written.
+    """
+    try:
+        if output_path.exists():
+            if stream:
+                index = await asyncio.to_thread(open_pack_index, output_path)
+                for path, content in index.contents():
+                    await stream.put(path, content)
+            return output_path
+
+        entries = [entry for entry in entries if entry.size <= MAX_FILE_BYTES]
+        partial = output_path.with_name(output_path.name + ".part")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with partial.open("wb") as out:
+            await _write_blobs(repo_path, label, entries, out, stream)
+        partial.replace(output_path)
+    except OSError as e:
+        raise InputFileError(f"Failed to write pack: {e}") from e
+    finally:
+        if stream:
+            await stream.close()
+    return output_path
+
+
+async def _write_blobs(
+    repo_path: Path,
+    label: str,
+    entries: Sequence[TreeEntry],
+    out: BinaryIO,
+    stream: Optional[PackStream],
+) -> None:
+    """Write the files of a tree through one ``git cat-file --batch`` process.
+
+    Args:
+        repo_path: Path to the repository.
+        label: What the pack holds, named in its header.
+        entries: Files to pack.
+        out: Pack file opened for writing.
+        stream: Receives every packed file; None to only write the pack.
+
+    Raises:
+        InputFileError: If Git is missing or a blob cannot be read.
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            "-C",
+            str(repo_path),
+            "cat-file",
+            "--batch",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        raise InputFileError("git binary not found. Please install it first.")
+
+    async def request() -> None:
+        # Written concurrently with reading, or both pipes could fill up
+        process.stdin.write(
+            b"".join(f"{entry.object_id}\n".encode("ascii") for entry in entries)
+        )
+        await process.stdin.drain()
+        process.stdin.close()
+
+    requests = asyncio.ensure_future(request())
+    try:
+        tree = _directory_structure([entry.path for entry in entries])
+        out.write(
+            f"This file is a merged representation of {label}.\n"
+            f"<directory_structure>\n{escape(tree)}\n</directory_structure>\n"
+            "\n<files>\n".encode("utf-8", "surrogateescape")
+        )
+        for entry in entries:
+            header = await process.stdout.readline()
+            if not header or header.endswith(b" missing\n"):
+                raise InputFileError(f"Missing Git object for {entry.path}")
+            size = int(header.split()[2])
+            content = (await process.stdout.readexactly(size + 1))[:-1]
+            text = _decode_text(content)
+            if text is None:
+                continue
+            path = escape(entry.path, _ENTITIES)
+            out.write(
+                f'<file path="{path}">\n{escape(text)}\n</file>\n\n'.encode(
+                    "utf-8", "surrogateescape"
+                )
+            )
+            if stream:
+                await stream.put(entry.path, text)
+        out.write(b"</files>\n")
+        await requests
+        await process.wait()
+    except asyncio.IncompleteReadError as e:
+        raise InputFileError("git cat-file ended early") from e
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        requests.cancel()
@@ -0,0 +1,288 @@
+"""Package-level import graph with layering, cycles and Mermaid rendering.
+
+The graph is computed statically from Python imports, so architecture
+diagrams are deterministic and cost milliseconds rather than model time.
+"""
+
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Mapping, Set, Tuple
+
+from repodoc.imports import module_names, module_table, resolve_imports
+
+# Top-level directories left out of architecture diagrams
+EXCLUDED_PACKAGES = frozenset({"tests", "test", "docs", "examples", "benchmarks"})
+
+# Below this many packages the module-level graph is more informative
+MIN_PACKAGES = 3
+
+
+def strongly_connected(edges: Mapping[str, Iterable[str]]) -> List[List[str]]:
+    """Find strongly connected components with Tarjan's algorithm.
+
+    The traversal is iterative, so deep import chains cannot exhaust the
+    recursion limit.
+
+    Args:
+        edges: Node -> successor nodes. Every node must be a key.
+
+    Returns:
+        Sorted member lists in reverse topological order: a component comes
+        after every component it has edges to.
+    """
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components: List[List[str]] = []
+    work: List[Tuple[str, Iterator[str]]] = []
+
+    def visit(node: str) -> None:
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        work.append((node, iter(sorted(edges[node]))))
+
+    for root in sorted(edges):
+        if root in index:
+            continue
+        visit(root)
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    visit(successor)
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def _docstring(source: str) -> str:
+    """Return the first line of a module docstring.
+
+    Args:
+        source: Python source code.
+
+    Returns:
+        Docstring summary, or an empty string.
+    """
+    try:
+        docstring = ast.get_docstring(ast.parse(source))
+    except (SyntaxError, ValueError):
+        return ""
+    return docstring.strip().splitlines()[0] if docstring else ""
+
+
+@dataclass
+class ImportGraph:
+    """Directed dependency graph between packages or modules.
+
+    Attributes:
+        modules: Node -> dotted names of the modules it groups.
+        edges: Node -> imported node -> number of module-level imports.
+        docs: Module name -> first line of its docstring.
+    """
+
+    modules: Dict[str, List[str]] = field(default_factory=dict)
+    edges: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    docs: Dict[str, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.modules)
+
+    def cycles(self) -> List[List[str]]:
+        """List the groups of nodes that import each other.
+
+        Returns:
+            Components with more than one node, sorted.
+        """
+        return sorted(
+            component
+            for component in strongly_connected(self.edges)
+            if len(component) > 1
+        )
+
+    def layers(self) -> Dict[str, int]:
+        """Assign every node to a dependency layer.
+
+        Layer 0 holds nodes importing nothing else in the graph; every other
+        node sits one layer above its highest dependency. Nodes in a cycle
+        share a layer.
+
+        Returns:
+            Node -> layer.
+        """
+        layer: Dict[str, int] = {}
+        for component in strongly_connected(self.edges):
+            members = set(component)
+            depends = [
+                layer[target]
+                for node in component
+                for target in self.edges[node]
+                if target not in members
+            ]
+            for node in component:
+                layer[node] = max(depends) + 1 if depends else 0
+        return layer
+
+    def mermaid(self) -> str:
+        """Render the graph as a Mermaid flowchart.
+
+        Nodes are grouped into one subgraph per layer, highest layer first;
+        edges are labelled with their import count when above one and nodes
+        in cycles are highlighted. Output depends only on the graph.
+
+        Returns:
+            Mermaid source, without code fences.
+        """
+        layers = self.layers()
+        ids = {node: f"n{i}" for i, node in enumerate(sorted(self.modules))}
+        lines = ["flowchart TD"]
+        for level in sorted(set(layers.values()), reverse=True):
+            lines.append(f'    subgraph layer{level}["Layer {level}"]')
+            lines.extend(
+                f'        {ids[node]}["{node}"]'
+                for node in sorted(self.modules)
+                if layers[node] == level
+            )
+            lines.append("    end")
+        for node in sorted(self.edges):
+            for target, count in sorted(self.edges[node].items()):
+                label = f"|{count}|" if count > 1 else ""
+                lines.append(f"    {ids[node]} -->{label} {ids[target]}")
+        cyclic = sorted(ids[node] for cycle in self.cycles() for node in cycle)
+        if cyclic:
+            lines.append("    classDef cycle stroke:#d33,stroke-width:2px")
+            lines.append(f"    class {','.join(cyclic)} cycle")
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        """Describe the graph compactly for the model.
+
+        Returns:
+            One entry per node, highest layer first, listing its modules with
+            their docstring summaries and its dependencies, followed by any
+            cycles.
+        """
+        layers = self.layers()
+        lines = []
+        for node in sorted(self.modules, key=lambda n: (-layers[n], n)):
+            header = f"- {node} (layer {layers[node]})"
+            if self.modules[node] == [node]:
+                doc = self.docs.get(node)
+                lines.append(f"{header}: {doc}" if doc else header)
+            else:
+                lines.append(header)
+                for module in self.modules[node]:
+                    doc = self.docs.get(module)
+                    lines.append(f"  - {module}: {doc}" if doc else f"  - {module}")
+            if self.edges[node]:
+                lines.append(f"  - imports: {', '.join(sorted(self.edges[node]))}")
+        for cycle in self.cycles():
+            lines.append(f"Cycle: {' <-> '.join(cycle)}")
+        return "\n".join(lines)
+
+
+def _drop_parents(modules: Set[str]) -> Set[str]:
+    """Drop packages whose submodules are also imported.
+
+    ``from package import module`` resolves to both the package and the
+    submodule; only the submodule is a real dependency.
+
+    Args:
+        modules: Imported module names.
+
+    Returns:
+        Modules without such parent packages.
+    """
+    return {
+        module
+        for module in modules
+        if not any(other.startswith(module + ".") for other in modules)
+    }
+
+
+def _collapse(
+    edges: Mapping[str, Set[str]], group: Mapping[str, str]
+) -> Dict[str, Dict[str, int]]:
+    """Merge module edges into edges between groups of modules.
+
+    Args:
+        edges: Module -> imported modules.
+        group: Module -> group node.
+
+    Returns:
+        Group -> imported group -> number of module imports.
+    """
+    collapsed: Dict[str, Dict[str, int]] = {node: {} for node in set(group.values())}
+    for module, targets in edges.items():
+        source = group[module]
+        for target in targets:
+            if group[target] != source:
+                counts = collapsed[source]
+                counts[group[target]] = counts.get(group[target], 0) + 1
+    return collapsed
+
+
+def import_graph(files: Iterable[Tuple[str, str]]) -> ImportGraph:
+    """Build the import graph of a repository's Python files.
+
+    Modules are collapsed to their package. When that leaves fewer than
+    :data:`MIN_PACKAGES` nodes, as in single-package projects, the module
+    graph is returned instead. Test, docs and example trees are skipped.
+
+    Args:
+        files: ``(path, source)`` pairs.
+
+    Returns:
+        Package (or module) dependency graph; empty without Python files.
+    """
+    sources: Dict[str, str] = {}
+    name: Dict[str, str] = {}
+    for path, source in files:
+        names = module_names(path)
+        if names and names[-1].split(".")[0] not in EXCLUDED_PACKAGES:
+            sources[path] = source
+            name[path] = names[-1]
+    file_edges = resolve_imports(sources.items(), module_table(sources))
+    edges = {
+        name[path]: _drop_parents({name[target] for target in targets})
+        for path, targets in file_edges.items()
+    }
+    docs = {name[path]: _docstring(source) for path, source in sources.items()}
+
+    package = {}
+    for path, module in name.items():
+        is_package = path.endswith("/__init__.py")
+        package[module] = module if is_package else module.rpartition(".")[0] or module
+
+    group = (
+        package
+        if len(set(package.values())) >= MIN_PACKAGES
+        else {module: module for module in name.values()}
+    )
+    modules: Dict[str, List[str]] = {}
+    for module in sorted(group):
+        modules.setdefault(group[module], []).append(module)
+    return ImportGraph(
+        modules=modules,
+        edges=_collapse(edges, group),
+        docs={module: doc for module, doc in docs.items() if doc},
+    )
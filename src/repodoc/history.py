@@ -0,0 +1,126 @@
+"""Throughput history carried over between runs.
+
+Model rates measured during a run are saved next to the run journal, so the
+next run starts with realistic timeouts and ``repodoc plan`` can turn token
+estimates into an ETA.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from repodoc.metrics import Metrics
+from repodoc.timeouts import ModelRates, RateTracker
+
+logger = logging.getLogger("repodoc")
+
+# History location inside the output directory
+HISTORY_PATH = Path(".repodoc") / "throughput.json"
+
+
+@dataclass
+class ThroughputHistory:
+    """Measured throughput of previous runs.
+
+    Attributes:
+        rates: Model -> measured rates.
+        response_tokens: Task -> average response tokens.
+        responses: Task -> responses averaged into :attr:`response_tokens`.
+    """
+
+    rates: Dict[str, ModelRates] = field(default_factory=dict)
+    response_tokens: Dict[str, float] = field(default_factory=dict)
+    responses: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> ThroughputHistory:
+        """Read a saved history.
+
+        Args:
+            path: History file.
+
+        Returns:
+            The saved history; empty when missing or unreadable.
+        """
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return cls(
+                rates={
+                    model: ModelRates(**rates)
+                    for model, rates in data.get("rates", {}).items()
+                },
+                response_tokens=dict(data.get("response_tokens", {})),
+                responses=dict(data.get("responses", {})),
+            )
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable throughput history {path}: {e}")
+            return cls()
+
+    def save(self, path: Path) -> None:
+        """Write the history, logging instead of failing the run on errors.
+
+        Args:
+            path: History file; parent directories are created.
+        """
+        data = {
+            "rates": {model: asdict(rates) for model, rates in self.rates.items()},
+            "response_tokens": self.response_tokens,
+            "responses": self.responses,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not save throughput history: {e}")
+
+    def update(self, tracker: RateTracker, metrics: Metrics) -> None:
+        """Fold the measurements of a finished run into the history.
+
+        Args:
+            tracker: Rates measured by the run's client.
+            metrics: Requests made by the run.
+        """
+        self.rates.update(tracker.measured())
+        for record in metrics.records:
+            count = self.responses.get(record.task, 0)
+            total = self.response_tokens.get(record.task, 0.0) * count
+            tokens = record.response_chars / 4  # same heuristic as the chunker
+            self.response_tokens[record.task] = (total + tokens) / (count + 1)
+            self.responses[record.task] = count + 1
+
+    def seed(self, tracker: RateTracker) -> None:
+        """Start a client's rate tracker from the history.
+
+        Args:
+            tracker: Tracker of a new client.
+        """
+        for model, rates in self.rates.items():
+            tracker.seed(model, ModelRates(**asdict(rates)))
+
+    def request_seconds(
+        self, model: str, task: str, prompt_tokens: int
+    ) -> Optional[float]:
+        """Estimate how long a request takes.
+
+        Args:
+            model: Model the request is routed to.
+            task: Task type of the request.
+            prompt_tokens: Estimated prompt tokens.
+
+        Returns:
+            Seconds until the response is complete, or None without
+            measurements of the model.
+        """
+        rates = self.rates.get(model)
+        if rates is None or not rates.prompt_samples:
+            return None
+        seconds = prompt_tokens / rates.prompt_rate
+        if rates.token_samples:
+            seconds += self.response_tokens.get(task, 0.0) / rates.token_rate
+        return seconds
@@ -0,0 +1,120 @@
+"""Static analysis of Python imports between repository modules."""
+
+from __future__ import annotations
+
+import ast
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def module_names(path: str) -> List[str]:
+    """Return the dotted module names a Python file may be imported as.
+
+    ``src/`` layouts are supported by also offering the name without the
+    leading ``src`` package.
+
+    Args:
+        path: File path inside the repository.
+
+    Returns:
+        Candidate module names, most specific first; empty for non-Python files.
+    """
+    if not path.endswith(".py"):
+        return []
+    parts = path[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts:
+        return []
+    names = [".".join(parts)]
+    if parts[0] == "src" and len(parts) > 1:
+        names.append(".".join(parts[1:]))
+    return names
+
+
+def module_table(paths: Iterable[str]) -> Dict[str, str]:
+    """Map importable module names to the files defining them.
+
+    Args:
+        paths: File paths inside the repository.
+
+    Returns:
+        Dotted module name -> file path.
+    """
+    table: Dict[str, str] = {}
+    for path in paths:
+        for name in module_names(path):
+            table.setdefault(name, path)
+    return table
+
+
+def _package_of(path: str) -> List[str]:
+    """Return the package parts a file's relative imports resolve against.
+
+    Args:
+        path: File path inside the repository.
+
+    Returns:
+        Package name parts.
+    """
+    parts = path[:-3].split("/")
+    return parts[:-1]
+
+
+def imported_modules(path: str, source: str) -> Set[str]:
+    """List the absolute module names imported by a Python file.
+
+    ``from package import name`` yields both ``package`` and
+    ``package.name``, since *name* may itself be a submodule.
+
+    Args:
+        path: File path inside the repository, used for relative imports.
+        source: Python source code.
+
+    Returns:
+        Imported module names; empty if the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+
+    found: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base: Optional[str] = node.module
+            if node.level:
+                package = _package_of(path)
+                if node.level > 1:
+                    package = package[: -(node.level - 1)]
+                # Path-based names always exist in the module table
+                base = ".".join(p for p in (*package, node.module or "") if p)
+            if not base:
+                continue
+            found.add(base)
+            found.update(f"{base}.{alias.name}" for alias in node.names)
+    return found
+
+
+def resolve_imports(
+    files: Iterable[Tuple[str, str]], table: Dict[str, str]
+) -> Dict[str, Set[str]]:
+    """Resolve the in-repository files each Python file imports.
+
+    Args:
+        files: ``(path, source)`` pairs.
+        table: Module table from :func:`module_table`.
+
+    Returns:
+        Importing file path -> imported file paths (excluding itself).
+    """
+    edges: Dict[str, Set[str]] = {}
+    for path, source in files:
+        if not path.endswith(".py"):
+            continue
+        names = imported_modules(path, source)
+        targets = {table[name] for name in names if name in table}
+        targets.discard(path)
+        edges[path] = targets
+    return edges
@@ -0,0 +1,211 @@
+"""Run journal recording model output so interrupted runs can resume.
+
+Every generation request is identified by a hash of its model, options and
+prompt, so a request is only reused while its inputs are unchanged. Output
+is appended to a JSON Lines file as it streams in: partial text survives a
+crash and is continued on resume, and completed responses are returned
+without contacting the server.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, TextIO, Tuple
+
+from repodoc.errors import OutputDirectoryError
+from repodoc.payload import Prompt, iter_text
+
+logger = logging.getLogger("repodoc")
+
+# Journal location inside the output directory
+JOURNAL_PATH = Path(".repodoc") / "journal.jsonl"
+
+# Streamed text is written out at least this often
+FLUSH_SECONDS = 1.0
+FLUSH_CHARS = 4096
+
+
+def request_key(fields: Mapping[str, Any], prompt: Prompt) -> str:
+    """Hash the inputs that determine a response.
+
+    Args:
+        fields: Request options such as model, temperature and format.
+        prompt: Prompt string or segments.
+
+    Returns:
+        Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    for text in iter_text(prompt):
+        digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def read_journal(path: Path) -> Dict[str, Tuple[List[str], bool]]:
+    """Replay the records of a journal.
+
+    Args:
+        path: Journal file.
+
+    Returns:
+        Request key -> recorded text pieces and whether the response is
+        complete; empty when there is no journal.
+
+    Raises:
+        OutputDirectoryError: If the journal cannot be read.
+    """
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return {}
+    except OSError as e:
+        raise OutputDirectoryError(f"Failed to read run journal: {e}")
+    entries: Dict[str, Tuple[List[str], bool]] = {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # torn write
+        parts, done = entries.setdefault(record["key"], ([], False))
+        if "text" in record:
+            parts.append(record["text"])
+        elif record.get("reset"):
+            parts.clear()
+        elif record.get("done"):
+            entries[record["key"]] = (parts, True)
+    return entries
+
+
+class Journal:
+    """Append-only record of generated text, keyed by request.
+
+    Records are ``{"key", "text"}`` for streamed text, ``{"key", "reset"}``
+    when output was discarded and ``{"key", "done"}`` when a response is
+    complete. A torn last line, as left by a crash, is ignored.
+
+    Attributes:
+        path: Journal file.
+        resumed: Completed responses served from the journal.
+    """
+
+    def __init__(self, path: Path, *, resume: bool = False) -> None:
+        """Open a journal, replaying it when resuming.
+
+        Args:
+            path: Journal file; parent directories are created.
+            resume: Keep and replay existing records instead of starting
+                a new journal.
+
+        Raises:
+            OutputDirectoryError: If the journal cannot be opened.
+        """
+        self.path = path
+        self.resumed = 0
+        self._entries: Dict[str, Tuple[List[str], bool]] = {}
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._flushed = time.monotonic()
+        if resume:
+            self._replay()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file: Optional[TextIO] = path.open(
+                "a" if resume else "w", encoding="utf-8"
+            )
+        except OSError as e:
+            raise OutputDirectoryError(f"Failed to open run journal: {e}")
+
+    def _replay(self) -> None:
+        """Load the records of a previous run."""
+        self._entries = read_journal(self.path)
+        complete = sum(done for _, done in self._entries.values())
+        logger.info(
+            f"Resuming from {self.path}: {complete} completed and "
+            f"{len(self._entries) - complete} partial responses"
+        )
+
+    def get(self, key: str) -> Tuple[str, bool]:
+        """Return the text recorded for a request.
+
+        Args:
+            key: Request key from :func:`request_key`.
+
+        Returns:
+            Recorded text and whether the response is complete; an empty
+            string for unknown requests.
+        """
+        parts, done = self._entries.get(key, ([], False))
+        if done:
+            self.resumed += 1
+        return "".join(parts), done
+
+    def append(self, key: str, text: str) -> None:
+        """Record streamed text of a request.
+
+        Args:
+            key: Request key.
+            text: Next piece of the response.
+        """
+        self._entries.setdefault(key, ([], False))[0].append(text)
+        self._write({"key": key, "text": text})
+
+    def reset(self, key: str) -> None:
+        """Discard the text recorded for a request, e.g. before a restart.
+
+        Args:
+            key: Request key.
+        """
+        self._entries[key] = ([], False)
+        self._write({"key": key, "reset": True})
+
+    def complete(self, key: str) -> None:
+        """Mark a response complete and write it out.
+
+        Args:
+            key: Request key.
+        """
+        parts, _ = self._entries.setdefault(key, ([], False))
+        self._entries[key] = (parts, True)
+        self._write({"key": key, "done": True})
+        self.flush()
+
+    def _write(self, record: Mapping[str, Any]) -> None:
+        """Buffer a record, flushing periodically.
+
+        Args:
+            record: Record to append.
+        """
+        line = json.dumps(record)
+        self._pending.append(line)
+        self._pending_chars += len(line)
+        if (
+            self._pending_chars >= FLUSH_CHARS
+            or time.monotonic() - self._flushed >= FLUSH_SECONDS
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records to disk."""
+        if self._file and self._pending:
+            self._file.write("".join(f"{line}\n" for line in self._pending))
+            self._file.flush()
+        self._pending.clear()
+        self._pending_chars = 0
+        self._flushed = time.monotonic()
+
+    def close(self) -> None:
+        """Flush and close the journal."""
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """Close and delete the journal once a run has completed."""
+        self.close()
+        self.path.unlink(missing_ok=True)
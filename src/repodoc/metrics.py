@@ -0,0 +1,89 @@
+"""Per-request metrics of model calls."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    """One completed model request.
+
+    Attributes:
+        task: Task type the request was routed by.
+        model: Model that served the request.
+        prompt_chars: Length of the prompt.
+        response_chars: Length of the response.
+        seconds: Wall-clock duration, excluding time queued for a slot.
+    """
+
+    task: str
+    model: str
+    prompt_chars: int
+    response_chars: int
+    seconds: float
+
+
+class Metrics:
+    """Collector of model request metrics.
+
+    Attributes:
+        records: Completed requests in completion order.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty collector."""
+        self.records: List[RequestRecord] = []
+
+    def record(
+        self,
+        task: str,
+        model: str,
+        *,
+        prompt_chars: int,
+        response_chars: int,
+        seconds: float,
+    ) -> None:
+        """Record a completed request.
+
+        Args:
+            task: Task type the request was routed by.
+            model: Model that served the request.
+            prompt_chars: Length of the prompt.
+            response_chars: Length of the response.
+            seconds: Wall-clock duration of the request.
+        """
+        self.records.append(
+            RequestRecord(task, model, prompt_chars, response_chars, seconds)
+        )
+
+    def routes(self) -> Dict[Tuple[str, str], int]:
+        """Count requests per routing decision.
+
+        Returns:
+            ``(task, model)`` -> number of requests.
+        """
+        counts: Dict[Tuple[str, str], int] = {}
+        for record in self.records:
+            key = (record.task, record.model)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def summary(self) -> List[str]:
+        """Format per-route totals for logging.
+
+        Returns:
+            One line per ``(task, model)`` route, in first-use order.
+        """
+        totals: Dict[Tuple[str, str], List[float]] = {}
+        for record in self.records:
+            total = totals.setdefault((record.task, record.model), [0, 0, 0.0])
+            total[0] += 1
+            total[1] += record.response_chars
+            total[2] += record.seconds
+        return [
+            f"{task} -> {model}: {int(count)} requests, "
+            f"{int(chars):,} chars out, {seconds:.1f}s"
+            for (task, model), (count, chars, seconds) in totals.items()
+        ]
@@ -0,0 +1,186 @@
+"""Package roots of monorepos, documented one package at a time.
+
+A directory holding a package manifest (``pyproject.toml``,
+``package.json``, ``go.mod`` or ``Cargo.toml``) is a package root and owns
+the files below it, except those of packages nested inside it. Each package
+is packed and documented on its own, so no prompt has to hold the whole
+repository. A package is identified by a digest of its files' paths and
+blob ids; the digests of the last documented versions are kept in the
+output directory, so only packages whose files changed are documented again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from repodoc.errors import OutputDirectoryError
+from repodoc.gitpack import TreeEntry
+from repodoc.writer import KIND_TO_FILENAME
+
+logger = logging.getLogger("repodoc")
+
+# Manifest file name -> language of the package it declares
+MARKERS: Dict[str, str] = {
+    "pyproject.toml": "Python",
+    "package.json": "JavaScript",
+    "go.mod": "Go",
+    "Cargo.toml": "Rust",
+}
+
+# Package digests of the last run, inside the output directory
+MANIFEST_PATH = Path(".repodoc") / "packages.json"
+
+
+@dataclass(frozen=True)
+class Package:
+    """Files of one package root.
+
+    Attributes:
+        root: Directory of the package manifest; ``""`` for the repository
+            root.
+        languages: Languages of the manifests found in :attr:`root`.
+        entries: Files of the package, with paths relative to :attr:`root`.
+    """
+
+    root: str
+    languages: Tuple[str, ...]
+    entries: Tuple[TreeEntry, ...]
+
+    @property
+    def name(self) -> str:
+        """Display name: the root directory, or ``.`` for the repository."""
+        return self.root or "."
+
+    @property
+    def slug(self) -> str:
+        """Subdirectory of the output directory holding the package's docs."""
+        return self.root.replace("/", "-")
+
+    @property
+    def digest(self) -> str:
+        """Hex digest of the package's file paths and blob ids."""
+        digest = hashlib.sha256()
+        for entry in sorted(self.entries, key=lambda entry: entry.path):
+            digest.update(f"{entry.path}\0{entry.object_id}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+
+def find_packages(entries: Sequence[TreeEntry]) -> List[Package]:
+    """Split the files of a tree into packages.
+
+    A manifest at the repository root is treated as a workspace manifest
+    when there are packages below it, so the root is a package only on its
+    own. Files outside every package root, such as top-level CI settings,
+    are not documented then.
+
+    Args:
+        entries: Files of the tree, e.g. from
+            :func:`~repodoc.gitpack.list_tree`.
+
+    Returns:
+        Packages sorted by root; the whole tree as a single root package if
+        no manifest is found.
+    """
+    roots: Dict[str, List[str]] = {}
+    for entry in entries:
+        directory, _, name = entry.path.rpartition("/")
+        if name in MARKERS:
+            roots.setdefault(directory, []).append(MARKERS[name])
+    if len(roots) > 1:
+        roots.pop("", None)
+    if not roots:
+        roots[""] = []
+
+    # Deepest roots first, so nested packages claim their own files
+    ordered = sorted(roots, key=lambda root: (-root.count("/"), root))
+    files: Dict[str, List[TreeEntry]] = {root: [] for root in roots}
+    for entry in entries:
+        for root in ordered:
+            if not root:
+                files[root].append(entry)
+                break
+            if entry.path.startswith(f"{root}/"):
+                path = entry.path[len(root) + 1 :]
+                files[root].append(TreeEntry(path, entry.object_id, entry.size))
+                break
+    return [
+        Package(root, tuple(dict.fromkeys(sorted(roots[root]))), tuple(files[root]))
+        for root in sorted(roots)
+    ]
+
+
+def load_manifest(path: Path) -> Dict[str, str]:
+    """Read the package digests of the last run.
+
+    Args:
+        path: Manifest file.
+
+    Returns:
+        Package root -> digest of its last documented version; empty when
+        missing or unreadable.
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable package manifest {path}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {str(root): str(digest) for root, digest in data.items()}
+
+
+def save_manifest(path: Path, manifest: Mapping[str, str]) -> None:
+    """Write the package digests of this run.
+
+    Args:
+        path: Manifest file; parent directories are created.
+        manifest: Package root -> digest of its documented version.
+
+    Raises:
+        OutputDirectoryError: If the manifest cannot be written.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(dict(sorted(manifest.items())), indent=2) + "\n",
+            encoding="utf-8",
+        )
+    except OSError as e:
+        raise OutputDirectoryError(f"Failed to write package manifest: {e}")
+
+
+def render_index(
+    title: str, packages: Iterable[Package], documents: Mapping[str, str]
+) -> str:
+    """Render the index document linking every package's documentation.
+
+    Args:
+        title: Repository name.
+        packages: Documented packages.
+        documents: Documentation kind -> description, e.g. ``"API
+            documentation"``.
+
+    Returns:
+        Markdown with one table row per package.
+    """
+    packages = list(packages)
+    rows = ["| Package | Language | Documentation |", "| --- | --- | --- |"]
+    for package in packages:
+        prefix = f"{package.slug}/" if package.slug else ""
+        links = ", ".join(
+            f"[{description}]({prefix}{KIND_TO_FILENAME[kind]})"
+            for kind, description in documents.items()
+        )
+        languages = ", ".join(package.languages) or "-"
+        rows.append(f"| `{package.name}` | {languages} | {links} |")
+    count = f"{len(packages)} package{'s' if len(packages) != 1 else ''}"
+    return "\n\n".join(
+        [f"# {title}", f"{count}, each documented on its own.", "\n".join(rows)]
+    )
@@ -2,11 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
+import itertools
 import json
+import logging
+import time
+from enum import Enum
 import httpx
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+from typing import Union
 
 from repodoc.errors import OllamaError
+from repodoc.index import estimate_tokens
+from repodoc.journal import Journal, request_key
+from repodoc.metrics import Metrics
+from repodoc.payload import JsonBody, Prompt, Segment, prompt_size
+from repodoc.timeouts import RateTracker
+
+logger = logging.getLogger("repodoc")
+
+# Seconds allowed to connect, send the prompt and for a free connection
+CONNECT_TIMEOUT = 30.0
+
+# Prompt tokens per map-stage chunk unless tuned per model
+DEFAULT_CHUNK_TOKENS = 16_000
+
+
+class Task(str, Enum):
+    """Kind of work a generation request does, used to route it to a model."""
+
+    SUMMARIZE = "summarize"  # per-chunk summaries in map stages
+    EXTRACT = "extract"  # short structured output such as JSON outlines
+    SYNTHESIZE = "synthesize"  # final documentation prose
+    REPAIR = "repair"  # targeted fixes of generated documents
 
 
 class OllamaClient:
@@ -15,21 +43,137 @@ class OllamaClient:
     Attributes:
         url: Base URL for Ollama API.
         model: Name of the model to use.
+        embedding_model: Name of the model used for embeddings.
+        routes: Task -> model overrides; other tasks use :attr:`model`.
+        keep_alive: How long the server keeps a model loaded after a request.
+        retries: Attempts after a failed generation.
+        backoff: Seconds before the first retry, doubling after each.
+        journal: Run journal generated text is recorded in, if any.
+        chunk_tokens: Model -> prompt tokens per map-stage chunk.
+        default_chunk_tokens: Chunk size of models without their own.
         client: HTTP client for making requests.
     """
 
     def __init__(
-        self, url: str = "http://localhost:11434", model: str = "devstral"
+        self,
+        url: str = "http://localhost:11434",
+        model: str = "devstral",
+        *,
+        concurrency: int = 4,
+        embedding_model: str = "nomic-embed-text",
+        routes: Optional[Mapping[Union[Task, str], str]] = None,
+        keep_alive: Optional[str] = "10m",
+        retries: int = 2,
+        backoff: float = 1.0,
+        journal: Optional[Journal] = None,
+        chunk_tokens: Optional[Mapping[str, int]] = None,
+        default_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
     ) -> None:
         """Initialize the client.
 
         Args:
             url: Base URL for Ollama API (e.g., "http://localhost:11434").
             model: Name of the model to use (e.g., "devstral").
+            concurrency: Maximum number of generation requests in flight;
+                further requests wait here instead of queueing on the server.
+            embedding_model: Name of the model used by :meth:`embed`.
+            routes: Model per task type, e.g. a small model for
+                ``summarize``; unlisted tasks use *model*.
+            keep_alive: Duration (e.g. ``"10m"``) the server keeps a model
+                loaded between requests, so routing between several models
+                does not reload them; None uses the server default.
+            retries: Attempts after a failed generation; partial output is
+                kept and the model asked to continue it.
+            backoff: Seconds before the first retry, doubling after each.
+            journal: Records generated text as it streams in; completed
+                responses found there are returned without a request and
+                partial ones are continued.
+            chunk_tokens: Prompt tokens per map-stage chunk for individual
+                models, e.g. as measured by ``repodoc tune``.
+            default_chunk_tokens: Chunk size of all other models.
         """
         self.base_url = url.rstrip("/")
         self.model = model
+        self.embedding_model = embedding_model
+        self.routes = {Task(task): name for task, name in (routes or {}).items()}
+        self.keep_alive = keep_alive
+        self.retries = retries
+        self.backoff = backoff
+        self.journal = journal
+        self.chunk_tokens = dict(chunk_tokens or {})
+        self.default_chunk_tokens = default_chunk_tokens
+        self._metrics = Metrics()
+        self._rates = RateTracker()
         self._client = httpx.AsyncClient(timeout=2.0)  # 2 second timeout
+        self._slots = asyncio.Semaphore(concurrency)
+
+    @property
+    def metrics(self) -> Metrics:
+        """Metrics of the requests made by this client."""
+        return self._metrics
+
+    @property
+    def rates(self) -> RateTracker:
+        """Measured model throughput, from which timeouts are derived."""
+        return self._rates
+
+    def model_for(self, task: Union[Task, str]) -> str:
+        """Return the model a task is routed to.
+
+        Args:
+            task: Task type of a request.
+
+        Returns:
+            The routed model, or the default :attr:`model`.
+        """
+        return self.routes.get(Task(task), self.model)
+
+    def chunk_tokens_for(self, task: Union[Task, str]) -> int:
+        """Return the prompt size for map-stage chunks of a task.
+
+        Args:
+            task: Task type of the chunked requests.
+
+        Returns:
+            Tokens per chunk for the model the task is routed to.
+        """
+        return self.chunk_tokens.get(self.model_for(task), self.default_chunk_tokens)
+
+    async def warm_up(
+        self, tasks: Iterable[Union[Task, str]] = tuple(Task)
+    ) -> List[str]:
+        """Load the models serving the given tasks ahead of their first request.
+
+        An empty generate request makes the server load a model and keep it
+        for :attr:`keep_alive`. Models are loaded concurrently; failures are
+        logged and otherwise ignored, since the first real request loads the
+        model anyway.
+
+        Args:
+            tasks: Task types whose models should be loaded.
+
+        Returns:
+            The models that were loaded.
+        """
+        models = sorted({self.model_for(task) for task in tasks})
+
+        async def load(model: str) -> bool:
+            payload: Dict[str, Any] = {"model": model}
+            if self.keep_alive is not None:
+                payload["keep_alive"] = self.keep_alive
+            try:
+                response = await self._client.post(
+                    f"{self.base_url}/api/generate", json=payload, timeout=120.0
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.warning(f"Could not warm up model {model}: {e}")
+                return False
+            logger.debug(f"Model {model} loaded")
+            return True
+
+        loaded = await asyncio.gather(*(load(model) for model in models))
+        return [model for model, ok in zip(models, loaded) if ok]
 
     async def healthcheck(self) -> bool:
         """Check if Ollama server is healthy.
@@ -49,12 +193,37 @@ class OllamaClient:
         except httpx.RequestError as e:
             raise OllamaError(f"Failed to connect to Ollama: {str(e)}")
 
-    async def generate(self, prompt: str, *, temperature: float = 0.2) -> str:
+    async def generate(
+        self,
+        prompt: Prompt,
+        *,
+        temperature: float = 0.2,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        task: Union[Task, str] = Task.SYNTHESIZE,
+    ) -> str:
         """Generate text using the Ollama model.
 
+        The request body is streamed: the prompt is JSON-escaped piece by
+        piece while it is sent, so a request holds only a small buffer on
+        top of the prompt segments themselves.
+
+        There is no fixed timeout. The first token may take as long as the
+        prompt size and the model's measured rates suggest, and the response
+        is considered stalled only when tokens stop arriving (see
+        :mod:`repodoc.timeouts`). Failed requests are retried with
+        exponential backoff; text generated before the failure is kept and
+        the model asked to continue it, unless *format* requires a complete
+        JSON document. With a :attr:`journal`, the same applies to output
+        recorded by an earlier, interrupted run.
+
         Args:
-            prompt: The prompt to generate text from.
+            prompt: The prompt to generate text from, as a string or as
+                segments (see :mod:`repodoc.payload`), e.g. pack slices read
+                through ``mmap``.
             temperature: Sampling temperature (0.0 to 1.0). Defaults to 0.2.
+            format: Constrain the response to JSON: ``"json"`` or a JSON
+                schema the response must follow.
+            task: Task type, selecting the model through :attr:`routes`.
 
         Returns:
             Generated text.
@@ -62,41 +231,270 @@ class OllamaClient:
         Raises:
             OllamaError: If generation fails.
         """
-        try:
-            json_data = {
-                "model": self.model,
-                "prompt": prompt,
-                "temperature": temperature,
-            }
-            headers = {
-                "Content-Type": "application/json",
-            }
+        task = Task(task)
+        model = self.model_for(task)
+        fields = self._fields(model, temperature, format)
+        prompt_tokens = estimate_tokens(prompt_size(prompt))
 
-            response = await self._client.post(
-                f"{self.base_url}/api/generate",
-                headers=headers,
-                json=json_data,
-                timeout=30.0,  # 30 second timeout for generation
+        output: List[str] = []
+        emit = output.append
+        journal, key = self.journal, ""
+        if journal:
+            key = await asyncio.to_thread(self._request_key, fields, prompt)
+            recorded, done = journal.get(key)
+            if done:
+                return recorded
+            if recorded:
+                output.append(recorded)
+
+            def emit(text: str) -> None:
+                output.append(text)
+                journal.append(key, text)
+
+        seconds = 0.0
+        prompt_chars = 0
+        for attempt in itertools.count():
+            if output and format is None:
+                body = JsonBody(fields, build_continuation(prompt, "".join(output)))
+            else:
+                if output and journal:
+                    journal.reset(key)
+                output.clear()  # structured output cannot be resumed
+                body = JsonBody(fields, prompt)
+            started = time.perf_counter()
+            try:
+                async with self._slots:
+                    await self._stream(body, model, prompt_tokens, emit)
+                break
+            except (TimeoutError, httpx.TimeoutException):
+                failure = "timed out"
+            except httpx.TransportError as e:
+                failure = str(e)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code < 500:
+                    raise OllamaError(f"Failed to generate text: {str(e)}")
+                failure = str(e)
+            finally:
+                seconds += time.perf_counter() - started
+                prompt_chars += body.chars
+
+            if attempt >= self.retries:
+                if failure == "timed out":
+                    raise OllamaError("Generation timed out")
+                raise OllamaError(f"Failed to generate text: {failure}")
+            delay = self.backoff * 2**attempt
+            kept = sum(len(text) for text in output) if format is None else 0
+            logger.warning(
+                f"Generation with {model} failed ({failure}); retrying in "
+                f"{delay:.1f}s, keeping {kept} chars of partial output"
             )
-            response.raise_for_status()
-            
-            # Ollama returns a stream of JSON objects, one per line
-            full_response = ""
-            async for line in response.aiter_lines():
-                if line.strip():
+            await asyncio.sleep(delay)
+
+        full_response = "".join(output)
+        if journal:
+            journal.complete(key)
+        self._metrics.record(
+            task.value,
+            model,
+            prompt_chars=prompt_chars,
+            response_chars=len(full_response),
+            seconds=seconds,
+        )
+        return full_response
+
+    def _fields(
+        self,
+        model: str,
+        temperature: float,
+        format: Optional[Union[str, Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Build the members of a generate request other than the prompt.
+
+        Args:
+            model: Model the request is routed to.
+            temperature: Sampling temperature.
+            format: Response format constraint, if any.
+
+        Returns:
+            Request fields.
+        """
+        fields: Dict[str, Any] = {
+            "model": model,
+            "temperature": temperature,
+        }
+        if format is not None:
+            fields["format"] = format
+        if self.keep_alive is not None:
+            fields["keep_alive"] = self.keep_alive
+        return fields
+
+    @staticmethod
+    def _request_key(fields: Mapping[str, Any], prompt: Prompt) -> str:
+        """Identify a request by the inputs that determine its response.
+
+        Args:
+            fields: Request fields from :meth:`_fields`.
+            prompt: Prompt string or segments.
+
+        Returns:
+            Journal key of the request.
+        """
+        return request_key({**fields, "keep_alive": None}, prompt)
+
+    async def _stream(
+        self,
+        body: JsonBody,
+        model: str,
+        prompt_tokens: int,
+        emit: Callable[[str], None],
+    ) -> None:
+        """Send one generation request and collect its streamed response.
+
+        The first token must arrive within a timeout derived from the prompt
+        size; every further line must follow within the idle timeout. Text is
+        handed to *emit* as it arrives, so it survives a failure.
+
+        Args:
+            body: Request body.
+            model: Model the request is routed to.
+            prompt_tokens: Estimated prompt tokens.
+            emit: Receives the response text piece by piece.
+
+        Raises:
+            TimeoutError: If the first token or a later one is overdue.
+            httpx.HTTPError: If the request fails.
+            OllamaError: If the response cannot be parsed.
+        """
+        request = self._client.build_request(
+            "POST",
+            f"{self.base_url}/api/generate",
+            headers={"Content-Type": "application/json"},
+            content=body,
+            # Waiting for tokens is bounded by the adaptive timeouts below
+            timeout=httpx.Timeout(CONNECT_TIMEOUT, read=None),
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first_token = self._rates.first_token_timeout(model, prompt_tokens)
+        async with asyncio.timeout(first_token) as deadline:
+            response = await self._client.send(request, stream=True)
+            try:
+                response.raise_for_status()
+
+                # Ollama returns a stream of JSON objects, one per line
+                async for line in response.aiter_lines():
+                    if started is not None:
+                        elapsed = loop.time() - started
+                        self._rates.observe_first_token(model, prompt_tokens, elapsed)
+                        started = None
+                    deadline.reschedule(loop.time() + self._rates.idle_timeout(model))
+                    if not line.strip():
+                        continue
                     try:
                         chunk = json.loads(line)
-                        if "response" in chunk:
-                            full_response += chunk["response"]
                     except json.JSONDecodeError as e:
                         raise OllamaError(f"Failed to parse Ollama response: {e}")
-            
-            return full_response
+                    if chunk.get("response"):
+                        emit(chunk["response"])
+                    if chunk.get("done"):
+                        self._rates.observe_stats(model, chunk)
+            finally:
+                await response.aclose()
+
+    async def probe(
+        self, model: str, prompt: str, *, num_predict: int
+    ) -> Dict[str, Any]:
+        """Send one unjournaled request and return its timing statistics.
+
+        Used to benchmark the server; the response text is not kept.
+
+        Args:
+            model: Model to query.
+            prompt: Prompt text.
+            num_predict: Maximum tokens to generate.
+
+        Returns:
+            Final response object with ``prompt_eval_count``,
+            ``prompt_eval_duration``, ``eval_count`` and ``eval_duration``
+            (nanoseconds).
+
+        Raises:
+            OllamaError: If the request fails.
+        """
+        payload: Dict[str, Any] = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"num_predict": num_predict, "temperature": 0.0},
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        try:
+            response = await self._client.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=httpx.Timeout(CONNECT_TIMEOUT, read=None),
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise OllamaError(f"Benchmark request failed: {str(e)}")
+        except ValueError as e:
+            raise OllamaError(f"Failed to parse Ollama response: {e}")
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed a batch of texts with the embedding model.
+
+        Args:
+            texts: Texts to embed in one request.
+
+        Returns:
+            One embedding vector per text, in input order.
+
+        Raises:
+            OllamaError: If the request fails or the response is malformed.
+        """
+        try:
+            async with self._slots:
+                response = await self._client.post(
+                    f"{self.base_url}/api/embed",
+                    json={"model": self.embedding_model, "input": list(texts)},
+                    timeout=30.0,
+                )
+                response.raise_for_status()
+            embeddings = response.json()["embeddings"]
         except httpx.TimeoutException:
-            raise OllamaError("Generation timed out")
-        except httpx.RequestError as e:
-            raise OllamaError(f"Failed to generate text: {str(e)}")
+            raise OllamaError("Embedding timed out")
+        except httpx.HTTPError as e:
+            raise OllamaError(f"Failed to embed text: {str(e)}")
+        except (KeyError, ValueError) as e:
+            raise OllamaError(f"Failed to parse Ollama response: {e}")
+
+        if len(embeddings) != len(texts):
+            raise OllamaError(
+                f"Expected {len(texts)} embeddings, got {len(embeddings)}"
+            )
+        return embeddings
 
     async def close(self) -> None:
         """Close the HTTP client."""
         await self._client.aclose()
+
+
+def build_continuation(prompt: Prompt, partial: str) -> List[Segment]:
+    """Extend a prompt so that the model resumes an interrupted answer.
+
+    Args:
+        prompt: Original prompt string or segments.
+        partial: Text generated before the interruption.
+
+    Returns:
+        Prompt segments asking for the rest of the answer only.
+    """
+    segments: List[Segment] = [prompt] if isinstance(prompt, str) else list(prompt)
+    return [
+        *segments,
+        "\n\nYour previous answer was interrupted. This is what you wrote so far:\n\n",
+        partial,
+        "\n\nContinue exactly where it stops, without repeating any of it.",
+    ]
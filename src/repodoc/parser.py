@@ -1,11 +1,27 @@
 """Parser for repomix output."""
 
+import asyncio
+import codecs
+import mmap
 import subprocess
+from collections import deque
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import (
+    AsyncIterator,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from xml.sax.saxutils import unescape
 
 from repodoc.errors import InputFileError
+from repodoc.index import RepoIndex, RepoIndexBuilder, blob_hash, detect_language
 
 
 class OutputFormat(Enum):
@@ -20,6 +36,7 @@ def run_repomix(
     repo_path: Path,
     format: OutputFormat = OutputFormat.MARKDOWN,
     compress: bool = False,
+    parsable: bool = False,
 ) -> Path:
     """Run repomix binary on a repository.
 
@@ -27,6 +44,8 @@ def run_repomix(
         repo_path: Path to the Git repository.
         format: Output format for repomix (markdown, xml, or text).
         compress: Whether to compress the output.
+        parsable: Whether to escape file contents so that the output is
+            well-formed; required by :func:`index_xml`.
 
     Returns:
         Path to the generated output file.
@@ -34,6 +53,46 @@ def run_repomix(
     Raises:
         InputFileError: If repomix fails or repository is invalid.
     """
+    output_path = _output_path(repo_path, format)
+    cmd = _repomix_command(
+        repo_path,
+        format,
+        ["-o", str(output_path)],
+        compress=compress,
+        parsable=parsable,
+    )
+
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise InputFileError(f"repomix failed: {e.stderr}") from e
+    except FileNotFoundError:
+        raise InputFileError("repomix binary not found. Please install it first.")
+
+    if not output_path.exists():
+        raise InputFileError("repomix did not generate output file")
+
+    return output_path
+
+
+def _output_path(repo_path: Path, format: OutputFormat) -> Path:
+    """Return where the pack of a repository is written.
+
+    Args:
+        repo_path: Path to the Git repository.
+        format: Output format for repomix.
+
+    Returns:
+        Path of the pack inside the repository.
+
+    Raises:
+        InputFileError: If the repository is invalid.
+    """
     if not repo_path.exists():
         raise InputFileError(f"Repository not found: {repo_path}")
 
@@ -45,34 +104,595 @@ def run_repomix(
         OutputFormat.XML: ".xml",
         OutputFormat.TEXT: ".txt",
     }[format]
-    output_path = repo_path / f"repomix-output{extension}"
-
-    cmd = [
-        "npx",
-        "--yes",
-        "repomix",
-        str(repo_path),
-        "-o",
-        str(output_path),
-        "--style",
-        format.value,
-    ]
+    return repo_path / f"repomix-output{extension}"
+
+
+def _repomix_command(
+    repo_path: Path,
+    format: OutputFormat,
+    output: List[str],
+    *,
+    compress: bool,
+    parsable: bool,
+) -> List[str]:
+    """Build the repomix command line.
+
+    Args:
+        repo_path: Path to the Git repository.
+        format: Output format for repomix.
+        output: Output arguments, ``-o <path>`` or ``--stdout``.
+        compress: Whether to compress the output.
+        parsable: Whether to escape file contents.
+
+    Returns:
+        Command and arguments.
+    """
+    cmd = ["npx", "--yes", "repomix", str(repo_path), *output, "--style", format.value]
     if compress:
         cmd.append("--compress")
+    if parsable:
+        cmd.append("--parsable-style")
+    return cmd
+
+
+class PackStream:
+    """Files of a pack, handed to a consumer while the pack is produced.
+
+    Backed by a bounded queue: when the consumer falls behind, the producer
+    waits, stops reading repomix output and so pauses repomix itself. Meant
+    for a single consumer, which iterates until the producer closes it.
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        """Initialize the stream.
+
+        Args:
+            maxsize: Files buffered before the producer waits; 0 for no bound.
+        """
+        self._queue: asyncio.Queue[Optional[Tuple[str, str]]] = asyncio.Queue(maxsize)
+
+    @classmethod
+    def from_files(cls, files: Iterable[Tuple[str, str]]) -> "PackStream":
+        """Create a closed stream over files that are already available.
+
+        Args:
+            files: ``(path, content)`` pairs.
 
+        Returns:
+            Stream yielding *files* in order.
+        """
+        stream = cls(maxsize=0)
+        for entry in files:
+            stream._queue.put_nowait(entry)
+        stream._queue.put_nowait(None)
+        return stream
+
+    async def put(self, path: str, content: str) -> None:
+        """Hand over the next file, waiting while the buffer is full.
+
+        Args:
+            path: File path inside the repository.
+            content: File content.
+        """
+        await self._queue.put((path, content))
+
+    async def close(self) -> None:
+        """Signal that no more files follow."""
+        await self._queue.put(None)
+
+    async def __aiter__(self) -> AsyncIterator[Tuple[str, str]]:
+        """Yield files until the stream is closed.
+
+        Yields:
+            ``(path, content)`` pairs in pack order.
+        """
+        while (entry := await self._queue.get()) is not None:
+            yield entry
+
+
+# Bytes read from the repomix process per step
+_READ_SIZE = 1 << 16
+
+
+async def stream_repomix(
+    repo_path: Path,
+    stream: Optional[PackStream] = None,
+    *,
+    format: OutputFormat = OutputFormat.XML,
+    compress: bool = False,
+    parsable: bool = True,
+) -> Path:
+    """Run repomix as an async subprocess, streaming files as they are packed.
+
+    The pack is read from repomix's standard output and written to the same
+    path :func:`run_repomix` uses. For XML packs each ``<file>`` element is
+    handed to *stream* as soon as it is complete, so consumers can start
+    before packing finishes; the event loop is never blocked.
+
+    Args:
+        repo_path: Path to the Git repository.
+        stream: Receives every packed file and is closed at the end, also on
+            failure; None to only write the pack.
+        format: Output format for repomix. Files are only streamed for XML.
+        compress: Whether to compress the output.
+        parsable: Whether to escape file contents so that the output is
+            well-formed.
+
+    Returns:
+        Path to the generated output file.
+
+    Raises:
+        InputFileError: If repomix fails or repository is invalid.
+    """
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True,
+        output_path = _output_path(repo_path, format)
+        cmd = _repomix_command(
+            repo_path, format, ["--stdout"], compress=compress, parsable=parsable
         )
-    except subprocess.CalledProcessError as e:
-        raise InputFileError(f"repomix failed: {e.stderr}") from e
-    except FileNotFoundError:
-        raise InputFileError("repomix binary not found. Please install it first.")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise InputFileError("repomix binary not found. Please install it first.")
 
-    if not output_path.exists():
-        raise InputFileError("repomix did not generate output file")
+        errors = asyncio.ensure_future(process.stderr.read())
+        files = _XmlFileParser() if stream and format is OutputFormat.XML else None
+        try:
+            with output_path.open("wb") as out:
+                while chunk := await process.stdout.read(_READ_SIZE):
+                    out.write(chunk)
+                    if files:
+                        for path, content in files.feed(chunk):
+                            await stream.put(path, content)
+                if files:
+                    for path, content in files.feed(b"", final=True):
+                        await stream.put(path, content)
+            returncode = await process.wait()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            errors.cancel()
+            raise
+        stderr = (await errors).decode("utf-8", errors="replace")
+    finally:
+        if stream:
+            await stream.close()
+
+    if returncode != 0:
+        raise InputFileError(f"repomix failed: {stderr}")
+    return output_path
+
+
+class _XmlFileParser:
+    """Incremental parser yielding the ``<file>`` elements of an XML pack."""
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        from lxml import etree
+
+        self._parser = etree.XMLPullParser(
+            events=("end",), recover=True, huge_tree=True
+        )
+        self._head: Optional[bytes] = b""
+
+    def feed(self, data: bytes, *, final: bool = False) -> List[Tuple[str, str]]:
+        """Parse the next bytes of the pack.
+
+        Args:
+            data: Next bytes of the pack.
+            final: Whether this is the end of the pack.
+
+        Returns:
+            ``(path, content)`` of the files completed by *data*.
+        """
+        if self._head is not None:
+            # Repomix output has no single root element, so wrap it (after
+            # the XML declaration, if any) once the first line is complete.
+            self._head += data
+            if b"\n" not in self._head and not final:
+                return []
+            head, self._head = self._head, None
+            if head.startswith(b"<?xml") and b"?>" in head:
+                end = head.index(b"?>") + 2
+                self._parser.feed(head[:end])
+                head = head[end:]
+            self._parser.feed(b"<repodoc-pack>")
+            data = head
+        if data:
+            self._parser.feed(data)
 
-    return output_path
\ No newline at end of file
+        completed = []
+        for _, element in self._parser.read_events():
+            if element.tag == "file":
+                completed.append(
+                    (element.get("path", ""), _strip_framing(element.text or ""))
+                )
+                # Release parsed content to keep memory constant
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+        return completed
+
+
+@dataclass(frozen=True)
+class PackSlice:
+    """Prompt segment referring to one file inside a parsable XML pack.
+
+    The content is read through ``mmap`` and unescaped chunk by chunk only
+    when a request body is streamed (see :mod:`repodoc.payload`), so prompts
+    can include files without holding them in memory.
+
+    Attributes:
+        pack_path: Path to the pack.
+        offset: Byte offset of the escaped content.
+        length: Byte length of the escaped content.
+    """
+
+    pack_path: Path
+    offset: int
+    length: int
+
+    def __len__(self) -> int:
+        return self.length
+
+    def chunks(self, chunk_size: int = 1 << 16) -> Iterator[str]:
+        """Read the unescaped content in pieces.
+
+        Args:
+            chunk_size: Bytes of the pack read per piece.
+
+        Yields:
+            Pieces of the content, without the framing newlines; together
+            they equal :meth:`PackIndex.read`.
+        """
+        if not self.length:
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pending = ""
+        with (
+            self.pack_path.open("rb") as fh,
+            mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as view,
+        ):
+            start, end = self.offset, self.offset + self.length
+            if view[start] == 0x0A:
+                start += 1
+            if start < end and view[end - 1] == 0x0A:
+                end -= 1
+            for position in range(start, end, chunk_size):
+                text = pending + decoder.decode(
+                    view[position : min(position + chunk_size, end)]
+                )
+                # Keep an entity split across pieces for the next one
+                cut = text.rfind("&")
+                if cut >= 0 and ";" not in text[cut:]:
+                    text, pending = text[:cut], text[cut:]
+                else:
+                    pending = ""
+                if text:
+                    yield unescape(text, _ENTITIES)
+        text = pending + decoder.decode(b"", final=True)
+        if text:
+            yield unescape(text, _ENTITIES)
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """Location of one file inside a repomix XML pack.
+
+    Attributes:
+        path: File path inside the repository.
+        offset: Byte offset of the (escaped) file content in the pack.
+        length: Byte length of the escaped content in the pack.
+        language: Language identifier derived from the extension.
+        size: Size of the unescaped content in bytes.
+        tokens: Estimated token count of the content.
+        blob_hash: Hex Git blob id of the unescaped content.
+    """
+
+    path: str
+    offset: int
+    length: int
+    language: str
+    size: int
+    tokens: int = 0
+    blob_hash: str = ""
+
+
+class PackIndex:
+    """Index of the files contained in a repomix XML pack.
+
+    Provides random access to individual files without loading the pack.
+    Metadata lives in a columnar :class:`~repodoc.index.RepoIndex`; entries
+    are materialized only when iterated or looked up.
+
+    Attributes:
+        pack_path: Path to the indexed pack.
+        files: Columnar file metadata in pack order.
+    """
+
+    def __init__(self, pack_path: Path, files: RepoIndex) -> None:
+        """Initialize the index.
+
+        Args:
+            pack_path: Path to the indexed pack.
+            files: Columnar file metadata in pack order.
+        """
+        self.pack_path = pack_path
+        self.files = files
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        return (self.entry(row) for row in range(len(self.files)))
+
+    def __contains__(self, path: object) -> bool:
+        try:
+            self.files.find(path)  # type: ignore[arg-type]
+        except KeyError:
+            return False
+        return True
+
+    def entry(self, row: int) -> FileEntry:
+        """Materialize the entry of one row.
+
+        Args:
+            row: Row number in the columnar index.
+
+        Returns:
+            The file entry.
+        """
+        files = self.files
+        return FileEntry(
+            path=files.path(row),
+            offset=files.offsets[row],
+            length=files.lengths[row],
+            language=files.language(row),
+            size=files.sizes[row],
+            tokens=files.tokens[row],
+            blob_hash=files.blob_hash(row),
+        )
+
+    def get(self, path: str) -> FileEntry:
+        """Look up a file entry by path.
+
+        Args:
+            path: File path inside the repository.
+
+        Returns:
+            The matching entry.
+
+        Raises:
+            KeyError: If the file is not part of the pack.
+        """
+        return self.entry(self.files.find(path))
+
+    def read(self, path: str) -> str:
+        """Read the content of a single file from the pack.
+
+        Args:
+            path: File path inside the repository.
+
+        Returns:
+            The unescaped file content.
+
+        Raises:
+            KeyError: If the file is not part of the pack.
+        """
+        row = self.files.find(path)
+        with self.pack_path.open("rb") as fh:
+            fh.seek(self.files.offsets[row])
+            raw = fh.read(self.files.lengths[row])
+        return _strip_framing(unescape(raw.decode("utf-8"), _ENTITIES))
+
+    def slice(self, path: str) -> PackSlice:
+        """Refer to the content of a single file without reading it.
+
+        Args:
+            path: File path inside the repository.
+
+        Returns:
+            Prompt segment streaming the unescaped file content.
+
+        Raises:
+            KeyError: If the file is not part of the pack.
+        """
+        row = self.files.find(path)
+        return PackSlice(
+            self.pack_path, self.files.offsets[row], self.files.lengths[row]
+        )
+
+    def segments(self, paths: Iterable[str]) -> List[Union[str, PackSlice]]:
+        """Render files as prompt segments in the layout of ``render_files``.
+
+        Args:
+            paths: File paths inside the repository.
+
+        Returns:
+            ``<file path="...">`` framing strings around :class:`PackSlice`
+            segments; joined, the text of
+            :func:`~repodoc.generators.base.render_files`.
+
+        Raises:
+            KeyError: If a file is not part of the pack.
+        """
+        segments: List[Union[str, PackSlice]] = []
+        for path in paths:
+            opening = f'<file path="{path}">\n'
+            segments.extend(
+                (
+                    "\n\n" + opening if segments else opening,
+                    self.slice(path),
+                    "\n</file>",
+                )
+            )
+        return segments
+
+    def contents(self) -> Iterator[Tuple[str, str]]:
+        """Read every file sequentially through a single file handle.
+
+        Yields:
+            ``(path, content)`` pairs in pack order.
+        """
+        files = self.files
+        with self.pack_path.open("rb") as fh:
+            for row in range(len(files)):
+                fh.seek(files.offsets[row])
+                raw = fh.read(files.lengths[row])
+                content = unescape(raw.decode("utf-8"), _ENTITIES)
+                yield files.path(row), _strip_framing(content)
+
+
+# Entities escaped by repomix beyond the three handled by ``unescape``
+_ENTITIES = {"&quot;": '"', "&apos;": "'"}
+
+_FILE_OPEN = b"<file "
+_FILE_CLOSE = b"</file>"
+
+
+def _strip_framing(content: str) -> str:
+    """Remove the newlines repomix places around each file's content.
+
+    Args:
+        content: Raw content between the ``<file>`` tags.
+
+    Returns:
+        Content without the surrounding framing newlines.
+    """
+    if content.startswith("\n"):
+        content = content[1:]
+    if content.endswith("\n"):
+        content = content[:-1]
+    return content
+
+
+def index_xml(pack_path: Path) -> PackIndex:
+    """Build a file index from a repomix XML pack by incremental parsing.
+
+    The pack is fed line by line to an lxml pull parser, so memory use is
+    bounded by the largest single file rather than the pack. Byte offsets are
+    recovered from the lines containing ``<file>`` tags, which are the only
+    lines retained between parser events.
+
+    Args:
+        pack_path: Path to an XML pack produced with ``parsable=True``.
+
+    Returns:
+        Index of every ``<file>`` element in the pack.
+
+    Raises:
+        InputFileError: If the pack cannot be read.
+    """
+    from lxml import etree
+
+    parser = etree.XMLPullParser(events=("start", "end"), recover=True, huge_tree=True)
+    # Lines containing file tags, with the byte offset of each line
+    tag_lines: Deque[Tuple[int, bytes]] = deque()
+    cursor = 0  # absolute offset up to which tags have been matched
+    content_start = 0
+    builder = RepoIndexBuilder()
+
+    def locate(tag: bytes) -> int:
+        nonlocal cursor
+        while tag_lines:
+            line_offset, line = tag_lines[0]
+            pos = line.find(tag, max(cursor - line_offset, 0))
+            if pos >= 0:
+                cursor = line_offset + pos + len(tag)
+                return line_offset + pos
+            tag_lines.popleft()
+        raise InputFileError(f"Malformed repomix pack: {pack_path}")
+
+    try:
+        with pack_path.open("rb") as fh:
+            first = True
+            offset = 0
+            for line in fh:
+                if first:
+                    # Repomix output has no single root element, so wrap it
+                    # (after the XML declaration, if any).
+                    first = False
+                    if line.startswith(b"<?xml"):
+                        parser.feed(line)
+                        parser.feed(b"<repodoc-pack>")
+                        offset += len(line)
+                        continue
+                    parser.feed(b"<repodoc-pack>")
+                if _FILE_OPEN in line or _FILE_CLOSE in line:
+                    tag_lines.append((offset, line))
+                parser.feed(line)
+                offset += len(line)
+
+                for event, element in parser.read_events():
+                    if element.tag != "file":
+                        continue
+                    if event == "start":
+                        start = locate(_FILE_OPEN)
+                        line_offset, tag_line = tag_lines[0]
+                        tag_end = tag_line.index(b">", start - line_offset)
+                        content_start = line_offset + tag_end + 1
+                        cursor = content_start
+                        continue
+                    end = locate(_FILE_CLOSE)
+                    path = element.get("path", "")
+                    content = _strip_framing(element.text or "").encode("utf-8")
+                    builder.add(
+                        path,
+                        offset=content_start,
+                        length=end - content_start,
+                        size=len(content),
+                        language=detect_language(path),
+                        digest=blob_hash(content),
+                    )
+                    # Release parsed content to keep memory constant
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+        stat = pack_path.stat()
+    except OSError as e:
+        raise InputFileError(f"Failed to read repomix pack: {e}") from e
+
+    files = builder.build(source_size=stat.st_size, source_mtime_ns=stat.st_mtime_ns)
+    return PackIndex(pack_path, files)
+
+
+def open_pack_index(pack_path: Path) -> PackIndex:
+    """Return the index of a pack, reusing a saved index when still valid.
+
+    The index is saved next to the pack (``<pack>.idx``) and memory-mapped on
+    later runs as long as the pack's size and modification time match.
+
+    Args:
+        pack_path: Path to an XML pack produced with ``parsable=True``.
+
+    Returns:
+        Index of every ``<file>`` element in the pack.
+
+    Raises:
+        InputFileError: If the pack cannot be read.
+    """
+    index_path = pack_path.with_name(pack_path.name + ".idx")
+    try:
+        stat = pack_path.stat()
+    except OSError as e:
+        raise InputFileError(f"Failed to read repomix pack: {e}") from e
+
+    if index_path.exists():
+        try:
+            files = RepoIndex.load(index_path)
+        except InputFileError:
+            pass
+        else:
+            if (files.source_size, files.source_mtime_ns) == (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                return PackIndex(pack_path, files)
+
+    index = index_xml(pack_path)
+    try:
+        index.files.save(index_path)
+    except OSError:
+        pass  # caching is best effort; the index itself is valid
+    return index
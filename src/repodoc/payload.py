@@ -0,0 +1,148 @@
+"""Streaming JSON request bodies built from prompt segments.
+
+A prompt is either a string or a sequence of segments: strings, UTF-8
+buffers such as ``bytes`` or ``memoryview`` slices, and objects with a
+``chunks()`` method such as :class:`~repodoc.parser.PackSlice`, which reads
+one file of a pack through ``mmap``. :class:`JsonBody` escapes the segments
+chunk by chunk while the request is being sent, so neither the full prompt
+nor its JSON encoding is ever held in memory.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from json.encoder import encode_basestring_ascii
+from typing import Any, AsyncIterator, Iterator, Mapping, Protocol, Sequence, Union
+
+# Characters (or bytes, for buffers) escaped per step
+CHUNK_SIZE = 1 << 16
+
+
+class Chunked(Protocol):
+    """Prompt segment producing its text incrementally."""
+
+    def __len__(self) -> int:
+        """Return the approximate length of the text."""
+        ...
+
+    def chunks(self) -> Iterator[str]:
+        """Yield the text of the segment in pieces."""
+        ...
+
+
+Segment = Union[str, bytes, bytearray, memoryview, Chunked]
+Prompt = Union[str, Sequence[Segment]]
+
+
+def iter_text(prompt: Prompt, *, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the text of a prompt in bounded pieces.
+
+    Args:
+        prompt: Prompt string or segments.
+        chunk_size: Maximum characters (bytes for buffers) per piece.
+
+    Yields:
+        Non-empty pieces of text in order.
+    """
+    for segment in [prompt] if isinstance(prompt, str) else prompt:
+        if isinstance(segment, str):
+            for start in range(0, len(segment), chunk_size):
+                yield segment[start : start + chunk_size]
+        elif isinstance(segment, (bytes, bytearray, memoryview)):
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            with memoryview(segment) as view:
+                for start in range(0, len(view), chunk_size):
+                    text = decoder.decode(view[start : start + chunk_size])
+                    if text:
+                        yield text
+            text = decoder.decode(b"", final=True)
+            if text:
+                yield text
+        else:
+            yield from (text for text in segment.chunks() if text)
+
+
+def prompt_size(prompt: Prompt) -> int:
+    """Estimate the length of a prompt without reading its segments.
+
+    Args:
+        prompt: Prompt string or segments.
+
+    Returns:
+        Characters of strings plus bytes of buffers and other segments.
+    """
+    if isinstance(prompt, str):
+        return len(prompt)
+    return sum(
+        segment.nbytes if isinstance(segment, memoryview) else len(segment)
+        for segment in prompt
+    )
+
+
+def prompt_text(prompt: Prompt) -> str:
+    """Join a prompt into a single string.
+
+    Only meant for logging and tests; requests stream the segments instead.
+
+    Args:
+        prompt: Prompt string or segments.
+
+    Returns:
+        The full prompt.
+    """
+    return prompt if isinstance(prompt, str) else "".join(iter_text(prompt))
+
+
+class JsonBody:
+    """JSON object request body whose prompt is streamed.
+
+    Iterating asynchronously yields the encoded object: the fixed fields
+    first, then the prompt as the last member, escaped piece by piece. The
+    body can be iterated again, e.g. to retry a request.
+
+    Attributes:
+        fields: Members other than the prompt.
+        prompt: Prompt string or segments.
+        key: Member name of the prompt.
+        chars: Prompt characters sent by the last iteration.
+    """
+
+    def __init__(
+        self, fields: Mapping[str, Any], prompt: Prompt, *, key: str = "prompt"
+    ) -> None:
+        """Initialize the body.
+
+        Args:
+            fields: Members other than the prompt; must be JSON serializable.
+            prompt: Prompt string or segments.
+            key: Member name of the prompt.
+        """
+        self.fields = dict(fields)
+        self.prompt = prompt
+        self.key = key
+        self.chars = 0
+
+    def chunks(self) -> Iterator[bytes]:
+        """Encode the body incrementally.
+
+        Yields:
+            Consecutive pieces of the JSON document.
+        """
+        self.chars = 0
+        head = json.dumps(self.fields)[:-1]
+        separator = ", " if self.fields else ""
+        yield f"{head}{separator}{json.dumps(self.key)}: \"".encode("ascii")
+        for text in iter_text(self.prompt):
+            self.chars += len(text)
+            yield encode_basestring_ascii(text)[1:-1].encode("ascii")
+        yield b'"}'
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Stream the body to an HTTP client.
+
+        Yields:
+            Consecutive pieces of the JSON document.
+        """
+        for chunk in self.chunks():
+            yield chunk
@@ -0,0 +1,295 @@
+"""Dry-run estimation of the cost and duration of a documentation run.
+
+The real scheduler and generators run against a :class:`PlanningClient`
+that records each request instead of sending it. Estimates therefore follow
+the generators exactly: the same artifacts, context selection and prompts.
+Only requests made after a model response (such as outline sections) are
+missing, because planning returns empty responses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from repodoc.generators.base import ContextMode
+from repodoc.history import ThroughputHistory
+from repodoc.index import estimate_tokens
+from repodoc.ollama import OllamaClient, Task
+from repodoc.parser import PackIndex, open_pack_index
+from repodoc.payload import Prompt, prompt_size
+from repodoc.scheduler import Scheduler
+
+logger = logging.getLogger("repodoc")
+
+# Rows shown in the directory heatmap and the largest-files list
+TOP_ROWS = 10
+
+# Width of the heatmap bars in characters
+BAR_WIDTH = 24
+
+
+@dataclass(frozen=True)
+class PlannedRequest:
+    """A model request a run would make.
+
+    Attributes:
+        task: Task type the request is routed by.
+        model: Model the request is routed to.
+        prompt_tokens: Estimated prompt tokens.
+        key: Journal key of the request.
+    """
+
+    task: str
+    model: str
+    prompt_tokens: int
+    key: str
+
+
+class PlanningClient(OllamaClient):
+    """Client recording the requests of a run instead of sending them.
+
+    Every generation returns an empty response. Embeddings are refused, since
+    made-up vectors would end up in the embedding index of the pack.
+
+    Attributes:
+        requests: Requests recorded so far.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the client; arguments are those of :class:`OllamaClient`."""
+        super().__init__(*args, **kwargs)
+        self.requests: List[PlannedRequest] = []
+
+    async def generate(
+        self,
+        prompt: Prompt,
+        *,
+        temperature: float = 0.2,
+        format: Optional[Any] = None,
+        task: Any = Task.SYNTHESIZE,
+    ) -> str:
+        """Record a generation request.
+
+        Args:
+            prompt: Prompt string or segments.
+            temperature: Sampling temperature.
+            format: Response format constraint, if any.
+            task: Task type, selecting the model through :attr:`routes`.
+
+        Returns:
+            An empty response.
+        """
+        task = Task(task)
+        model = self.model_for(task)
+        fields = self._fields(model, temperature, format)
+        key = await asyncio.to_thread(self._request_key, fields, prompt)
+        tokens = estimate_tokens(prompt_size(prompt))
+        self.requests.append(PlannedRequest(task.value, model, tokens, key))
+        return ""
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Refuse to embed.
+
+        Args:
+            texts: Texts to embed.
+
+        Raises:
+            NotImplementedError: Always.
+        """
+        raise NotImplementedError("Planning does not compute embeddings")
+
+    async def warm_up(self, tasks: Iterable[Any] = ()) -> List[str]:
+        """Load no models.
+
+        Args:
+            tasks: Ignored.
+
+        Returns:
+            An empty list.
+        """
+        return []
+
+
+def directory_tokens(index: PackIndex, depth: int = 2) -> List[Tuple[str, int]]:
+    """Sum the estimated tokens of the files below each directory.
+
+    Args:
+        index: File index of the pack.
+        depth: Directory levels kept; deeper files count towards their
+            ancestor at this depth.
+
+    Returns:
+        ``(directory, tokens)`` pairs, largest first; files at the
+        repository root are grouped under ``.``.
+    """
+    totals: Dict[str, int] = {}
+    files = index.files
+    for row, path in enumerate(files.paths()):
+        parts = path.split("/")[:-1][:depth]
+        directory = "/".join(parts) or "."
+        totals[directory] = totals.get(directory, 0) + files.tokens[row]
+    return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _duration(seconds: float) -> str:
+    """Format a duration compactly.
+
+    Args:
+        seconds: Duration in seconds.
+
+    Returns:
+        E.g. ``"45s"``, ``"12m 5s"`` or ``"3h 20m"``.
+    """
+    seconds = round(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+
+
+@dataclass
+class RunPlan:
+    """Estimates for a documentation run.
+
+    Attributes:
+        packed_files: Files in the pack.
+        files: Files kept after filtering, ``(path, tokens)`` in pack order.
+        directories: Tokens per directory, largest first.
+        requests: Generator -> requests it would make.
+        cached: Keys of requests completed in the run journal.
+        history: Throughput measured by previous runs.
+        failures: Generator -> error that prevented its estimate.
+    """
+
+    packed_files: int
+    files: List[Tuple[str, int]]
+    directories: List[Tuple[str, int]]
+    requests: Dict[str, List[PlannedRequest]] = field(default_factory=dict)
+    cached: Set[str] = field(default_factory=set)
+    history: ThroughputHistory = field(default_factory=ThroughputHistory)
+    failures: Dict[str, str] = field(default_factory=dict)
+
+    def _summary(self, requests: Iterable[PlannedRequest]) -> str:
+        """Describe a group of requests on one line.
+
+        Args:
+            requests: Requests of one generator or of the whole run.
+
+        Returns:
+            Request count, prompt tokens, cache hits and ETA.
+        """
+        unique = list({request.key: request for request in requests}.values())
+        pending = [request for request in unique if request.key not in self.cached]
+        estimates = [
+            self.history.request_seconds(r.model, r.task, r.prompt_tokens)
+            for r in pending
+        ]
+        known = [seconds for seconds in estimates if seconds is not None]
+        if not pending:
+            eta = "nothing to generate"
+        elif not known:
+            eta = "ETA unknown (no throughput history)"
+        else:
+            eta = f"ETA {_duration(sum(known))}"
+            if len(known) < len(pending):
+                eta += f" + {len(pending) - len(known)} unmeasured"
+        tokens = sum(request.prompt_tokens for request in unique)
+        cached = len(unique) - len(pending)
+        return (
+            f"{len(unique)} requests, ~{tokens:,} prompt tokens, "
+            f"{cached} cached, {eta}"
+        )
+
+    def lines(self) -> List[str]:
+        """Format the plan for the terminal.
+
+        Returns:
+            Report lines.
+        """
+        total = sum(tokens for _, tokens in self.files)
+        lines = [
+            f"Files: {len(self.files)} of {self.packed_files} kept, "
+            f"~{total:,} tokens",
+            "",
+            "Tokens by directory:",
+        ]
+        width = max((len(name) for name, _ in self.directories[:TOP_ROWS]), default=0)
+        largest = self.directories[0][1] if self.directories else 0
+        for name, tokens in self.directories[:TOP_ROWS]:
+            bar = "#" * max(1, round(BAR_WIDTH * tokens / largest)) if tokens else ""
+            share = 100 * tokens / total if total else 0.0
+            lines.append(f"  {name:<{width}}  {tokens:>10,}  {share:5.1f}%  {bar}")
+
+        lines += ["", "Largest files:"]
+        top = sorted(self.files, key=lambda item: (-item[1], item[0]))[:TOP_ROWS]
+        width = max((len(path) for path, _ in top), default=0)
+        lines.extend(f"  {path:<{width}}  {tokens:>10,}" for path, tokens in top)
+
+        lines += ["", "Requests:"]
+        width = max((len(name) for name in [*self.requests, "total"]), default=0)
+        for name, requests in self.requests.items():
+            lines.append(f"  {name:<{width}}  {self._summary(requests)}")
+        for name, error in self.failures.items():
+            lines.append(f"  {name:<{width}}  could not be estimated: {error}")
+        everything = [r for requests in self.requests.values() for r in requests]
+        lines.append(f"  {'total':<{width}}  {self._summary(everything)}")
+        return lines
+
+
+async def build_plan(
+    client: PlanningClient,
+    seeds: Mapping[str, Any],
+    generators: Iterable[str],
+    *,
+    context: ContextMode = ContextMode.INPUTS,
+    outline: bool = False,
+    cached: Optional[Set[str]] = None,
+    history: Optional[ThroughputHistory] = None,
+) -> RunPlan:
+    """Estimate a run without calling the model.
+
+    Each generator is run on its own scheduler so that its requests can be
+    attributed to it; requests shared through artifacts are counted once in
+    the total.
+
+    Args:
+        client: Planning client, configured with the run's model routes.
+        seeds: Scheduler seeds; ``project_file`` must be a finished pack.
+        generators: Generator names of the run.
+        context: Context mode of the run. Retrieval is estimated like the
+            token-budget planner, since it would need embeddings.
+        outline: Whether generators expand an outline; only the outline
+            requests are counted, since sections depend on the response.
+        cached: Keys of requests completed in the run journal.
+        history: Throughput measured by previous runs.
+
+    Returns:
+        The plan.
+    """
+    if ContextMode(context) is ContextMode.RETRIEVAL:
+        logger.info("Estimating retrieval context with the token-budget planner")
+        context = ContextMode.PLANNED
+
+    files = await Scheduler(client, seeds).resolve("files")
+    packed = await asyncio.to_thread(open_pack_index, seeds["project_file"])
+    plan = RunPlan(
+        packed_files=len(packed),
+        files=list(zip(files.files.paths(), files.files.tokens)),
+        directories=directory_tokens(files),
+        cached=cached or set(),
+        history=history or ThroughputHistory(),
+    )
+    options = {"context": context, "outline": outline}
+    for name in generators:
+        client.requests = []
+        scheduler = Scheduler(client, seeds, generator_options=options)
+        async for _, result in scheduler.run([name]):
+            if isinstance(result, BaseException):
+                plan.failures[name] = str(result)
+        if name not in plan.failures:
+            plan.requests[name] = client.requests
+    return plan
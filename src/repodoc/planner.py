@@ -0,0 +1,307 @@
+"""Token-budget planning of generator context.
+
+Every file gets a relevance score per documentation kind from cheap signals:
+path heuristics declared by the generator, console-script entry points in
+``pyproject.toml``, import fan-in and Git churn. The planner then fills the
+context budget with the highest-value files, preferring full content and
+falling back to AST skeletons, by solving a multiple-choice knapsack with the
+greedy convex-hull method.
+"""
+
+from __future__ import annotations
+
+import math
+import subprocess
+from collections import Counter
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import tomli
+
+from repodoc.imports import module_table, resolve_imports
+from repodoc.index import estimate_tokens
+
+# Relevance multipliers for files that define console-script entry points
+ENTRY_POINT_BOOST = 3.0
+
+# Fraction of a file's value retained when only its skeleton is included
+SKELETON_VALUE = 0.6
+
+
+@dataclass(frozen=True)
+class Signals:
+    """Repository-wide relevance signals.
+
+    Attributes:
+        entry_points: Paths of modules referenced by ``[project.scripts]``.
+        fan_in: Number of repository files importing each path.
+        churn: Number of recent commits touching each path.
+    """
+
+    entry_points: Set[str] = field(default_factory=set)
+    fan_in: Mapping[str, int] = field(default_factory=dict)
+    churn: Mapping[str, int] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """A file that may be included in a context.
+
+    Attributes:
+        path: File path inside the repository.
+        value: Relevance-weighted value of the full file.
+        tokens: Token estimate of the full file.
+        skeleton_tokens: Token estimate of the skeleton, if one exists.
+    """
+
+    path: str
+    value: float
+    tokens: int
+    skeleton_tokens: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Selection:
+    """A file chosen for a context.
+
+    Attributes:
+        path: File path inside the repository.
+        mode: ``"full"`` or ``"skeleton"``.
+        tokens: Tokens the file contributes.
+    """
+
+    path: str
+    mode: str
+    tokens: int
+
+
+def entry_point_paths(pyproject: str, paths: Iterable[str]) -> Set[str]:
+    """Find the files defining the console scripts of a project.
+
+    Args:
+        pyproject: Content of ``pyproject.toml``.
+        paths: File paths inside the repository.
+
+    Returns:
+        Paths of the modules named by ``[project.scripts]``.
+    """
+    try:
+        scripts = tomli.loads(pyproject).get("project", {}).get("scripts", {})
+    except tomli.TOMLDecodeError:
+        return set()
+    table = module_table(paths)
+    modules = {target.split(":")[0].strip() for target in scripts.values()}
+    return {table[module] for module in modules if module in table}
+
+
+def import_fan_in(
+    files: Iterable[Tuple[str, str]], paths: Iterable[str]
+) -> Dict[str, int]:
+    """Count how many repository files import each Python file.
+
+    Args:
+        files: ``(path, source)`` pairs.
+        paths: All file paths inside the repository.
+
+    Returns:
+        Path -> number of importing files.
+    """
+    edges = resolve_imports(files, module_table(paths))
+    return dict(Counter(target for targets in edges.values() for target in targets))
+
+
+def git_churn(repo_path: Path, *, max_commits: int = 500) -> Dict[str, int]:
+    """Count recent commits touching each file.
+
+    Args:
+        repo_path: Path to the Git repository.
+        max_commits: Number of most recent commits inspected.
+
+    Returns:
+        Path -> number of commits; empty if Git history is unavailable.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "-C",
+                str(repo_path),
+                "log",
+                "--format=",
+                "--name-only",
+                "-n",
+                str(max_commits),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    return dict(Counter(line for line in result.stdout.splitlines() if line))
+
+
+def path_weight(path: str, weights: Sequence[Tuple[str, float]]) -> float:
+    """Return the weight of the first pattern matching *path*.
+
+    Args:
+        path: File path inside the repository.
+        weights: ``(glob pattern, weight)`` pairs in priority order.
+
+    Returns:
+        The matching weight, or 1.0 when no pattern matches.
+    """
+    for pattern, weight in weights:
+        if fnmatch(path, pattern):
+            return weight
+    return 1.0
+
+
+def relevance(
+    path: str, weights: Sequence[Tuple[str, float]], signals: Signals
+) -> float:
+    """Combine path heuristics and repository signals into one score.
+
+    Args:
+        path: File path inside the repository.
+        weights: Path weights of the documentation kind.
+        signals: Repository-wide signals.
+
+    Returns:
+        Relevance multiplier, 0 for excluded files.
+    """
+    score = path_weight(path, weights)
+    if path in signals.entry_points:
+        score *= ENTRY_POINT_BOOST
+    score *= 1 + math.log1p(signals.fan_in.get(path, 0))
+    score *= 1 + 0.5 * math.log1p(signals.churn.get(path, 0))
+    return score
+
+
+def select(candidates: Iterable[Candidate], budget: int) -> List[Selection]:
+    """Choose files and their representation within a token budget.
+
+    Each candidate offers up to two options (skeleton, full). Options are
+    reduced to incremental upgrades along each file's convex hull and taken
+    greedily by value per token, which solves the LP relaxation of the
+    multiple-choice knapsack and is near optimal for many small items.
+
+    Args:
+        candidates: Files that may be included.
+        budget: Maximum number of tokens.
+
+    Returns:
+        Chosen files, in descending order of value density.
+    """
+    increments: List[Tuple[float, int, str, str, int]] = []
+    for order, candidate in enumerate(candidates):
+        if candidate.value <= 0 or candidate.tokens <= 0:
+            continue
+        full = (candidate.tokens, candidate.value)
+        skeleton = None
+        if 0 < (candidate.skeleton_tokens or 0) < candidate.tokens:
+            skeleton = (candidate.skeleton_tokens, candidate.value * SKELETON_VALUE)
+        density_full = full[1] / full[0]
+        if skeleton is None or skeleton[1] / skeleton[0] <= density_full:
+            # Skeleton is dominated: offer the full file only
+            increments.append((density_full, order, candidate.path, "full", full[0]))
+            continue
+        upgrade_density = (full[1] - skeleton[1]) / (full[0] - skeleton[0])
+        density_skeleton = skeleton[1] / skeleton[0]
+        increments.append(
+            (density_skeleton, order, candidate.path, "skeleton", skeleton[0])
+        )
+        increments.append((upgrade_density, order, candidate.path, "full", full[0]))
+
+    chosen: Dict[str, Selection] = {}
+    used = 0
+    increments.sort(key=lambda item: (-item[0], item[1]))
+    for _, _, path, mode, tokens in increments:
+        previous = chosen.get(path)
+        extra = tokens - (previous.tokens if previous else 0)
+        if used + extra > budget:
+            continue
+        used += extra
+        chosen[path] = Selection(path, mode, tokens)
+    return list(chosen.values())
+
+
+class ContextPlanner:
+    """Plans and renders the context of each documentation kind.
+
+    Attributes:
+        signals: Repository-wide relevance signals.
+    """
+
+    def __init__(
+        self,
+        files: Sequence[Tuple[str, str]],
+        signals: Signals,
+        skeletons: Mapping[str, str],
+    ) -> None:
+        """Initialize the planner.
+
+        Args:
+            files: ``(path, content)`` pairs of the packed project.
+            signals: Repository-wide relevance signals.
+            skeletons: Skeleton source of each Python file.
+        """
+        self._files = dict(files)
+        self.signals = signals
+        self._skeletons = dict(skeletons)
+
+    def candidates(self, weights: Sequence[Tuple[str, float]]) -> List[Candidate]:
+        """Score every file for a documentation kind.
+
+        Args:
+            weights: Path weights of the documentation kind.
+
+        Returns:
+            Candidates in pack order.
+        """
+        candidates = []
+        for path, content in self._files.items():
+            tokens = estimate_tokens(len(content.encode("utf-8")))
+            skeleton = self._skeletons.get(path)
+            skeleton_tokens = (
+                estimate_tokens(len(skeleton.encode("utf-8"))) if skeleton else None
+            )
+            candidates.append(
+                Candidate(
+                    path=path,
+                    value=relevance(path, weights, self.signals) * math.sqrt(tokens),
+                    tokens=tokens,
+                    skeleton_tokens=skeleton_tokens,
+                )
+            )
+        return candidates
+
+    def plan(
+        self, weights: Sequence[Tuple[str, float]], budget: int
+    ) -> List[Selection]:
+        """Choose the files of a documentation kind within a budget.
+
+        Args:
+            weights: Path weights of the documentation kind.
+            budget: Maximum number of context tokens.
+
+        Returns:
+            Chosen files in pack order.
+        """
+        selections = select(self.candidates(weights), budget)
+        chosen = {selection.path: selection for selection in selections}
+        return [chosen[path] for path in self._files if path in chosen]
+
+    def render(self, selections: Iterable[Selection]) -> List[Tuple[str, str]]:
+        """Return the content of each selected file in its chosen mode.
+
+        Args:
+            selections: Planned files.
+
+        Returns:
+            ``(path, content)`` pairs.
+        """
+        sources = {"full": self._files, "skeleton": self._skeletons}
+        return [(s.path, sources[s.mode][s.path]) for s in selections]
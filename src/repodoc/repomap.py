@@ -0,0 +1,399 @@
+"""Ranked map of a repository's definitions for compact prompt context.
+
+Every class, function and method defined in the Python files of a project is
+collected together with the names each file references. Files are ranked with
+PageRank over the resulting reference graph, the rank flowing along each
+reference is credited to the referenced definitions, and the most central
+definitions are rendered as a token-bounded outline of signatures, optionally
+followed by the full source of the top-ranked ones.
+
+The reference graph is kept in compressed sparse row form using the standard
+library's :mod:`array`, so ranking stays linear in the number of edges.
+"""
+
+from __future__ import annotations
+
+import ast
+import math
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from repodoc.index import estimate_tokens
+from repodoc.planner import path_weight
+
+DAMPING = 0.85
+
+# Share of a context budget spent on the outline; the rest holds full sources
+OUTLINE_SHARE = 0.4
+
+# Names too generic to link definitions across files
+_IGNORED_NAMES = frozenset({"self", "cls", "main", "run", "get", "set", "type"})
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """A class, function or method definition.
+
+    Attributes:
+        path: File path inside the repository.
+        name: Simple name, as used by references.
+        qualname: Name qualified with the enclosing class, if any.
+        signature: Definition line without body, e.g. ``def f(x: int) -> str``.
+        start: First line (1-based), including decorators.
+        end: Last line (1-based).
+    """
+
+    path: str
+    name: str
+    qualname: str
+    signature: str
+    start: int
+    end: int
+
+    @property
+    def parent(self) -> Optional[str]:
+        """Qualified name of the enclosing class, if any."""
+        return self.qualname.rpartition(".")[0] or None
+
+
+def _signature(node: ast.AST) -> str:
+    """Render the definition line of a class or function.
+
+    Args:
+        node: Class or (async) function definition.
+
+    Returns:
+        Signature without trailing colon.
+    """
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(base) for base in (*node.bases, *node.keywords)]
+        return (
+            f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+        )
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def extract(path: str, source: str) -> Tuple[List[Symbol], Counter]:
+    """Collect the definitions and referenced names of a Python file.
+
+    Only module-level classes and functions and the methods of module-level
+    classes are collected.
+
+    Args:
+        path: File path inside the repository.
+        source: Python source code.
+
+    Returns:
+        Definitions in source order and referenced name -> occurrence count;
+        both empty if the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return [], Counter()
+
+    definitions = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+    symbols: List[Symbol] = []
+
+    def add(node: ast.AST, qualname: str) -> None:
+        start = min([node.lineno, *(d.lineno for d in node.decorator_list)])
+        symbols.append(
+            Symbol(path, node.name, qualname, _signature(node), start, node.end_lineno)
+        )
+
+    for node in tree.body:
+        if isinstance(node, definitions):
+            add(node, node.name)
+            if isinstance(node, ast.ClassDef):
+                for child in node.body:
+                    if isinstance(child, definitions):
+                        add(child, f"{node.name}.{child.name}")
+
+    references: Counter = Counter()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            references[node.id] += 1
+        elif isinstance(node, ast.Attribute):
+            references[node.attr] += 1
+    return symbols, references
+
+
+def pagerank(
+    indptr: array,
+    indices: array,
+    weights: array,
+    personalization: Sequence[float],
+    *,
+    damping: float = DAMPING,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+) -> List[float]:
+    """Compute personalized PageRank over a weighted sparse graph.
+
+    The graph is given in compressed sparse row form: the out-edges of node
+    ``i`` are ``indices[indptr[i]:indptr[i + 1]]`` with matching weights.
+    Rank of nodes without out-edges is redistributed by the personalization.
+
+    Args:
+        indptr: Row offsets, one more than the number of nodes.
+        indices: Edge targets.
+        weights: Positive edge weights.
+        personalization: Non-negative teleport weight per node; uniform when
+            all zero.
+        damping: Probability of following an edge.
+        tol: Convergence threshold on the L1 change of the rank vector.
+        max_iter: Maximum number of power iterations.
+
+    Returns:
+        Rank per node, summing to one.
+    """
+    n = len(indptr) - 1
+    if not n:
+        return []
+    total = sum(personalization)
+    teleport = [p / total for p in personalization] if total else [1.0 / n] * n
+    out = [sum(weights[indptr[i] : indptr[i + 1]]) for i in range(n)]
+
+    rank = list(teleport)
+    for _ in range(max_iter):
+        spread = [0.0] * n
+        dangling = 0.0
+        for i in range(n):
+            if not out[i]:
+                dangling += rank[i]
+                continue
+            share = damping * rank[i] / out[i]
+            for k in range(indptr[i], indptr[i + 1]):
+                spread[indices[k]] += share * weights[k]
+        base = 1.0 - damping + damping * dangling
+        updated = [value + base * t for value, t in zip(spread, teleport)]
+        change = sum(abs(a - b) for a, b in zip(updated, rank))
+        rank = updated
+        if change < tol:
+            break
+    return rank
+
+
+class RepoMap:
+    """Reference graph between the definitions of a repository.
+
+    Attributes:
+        symbols: Every collected definition.
+        files: Paths of the files defining or referencing symbols.
+    """
+
+    def __init__(
+        self,
+        symbols: List[Symbol],
+        references: Dict[str, Counter],
+        sources: Dict[str, str],
+    ) -> None:
+        """Link references to definitions and build the sparse file graph.
+
+        A file referencing a name *n* times gains an edge of weight
+        ``sqrt(n)`` to the files defining it, scaled down for names that many
+        files reference and split evenly between definitions in different
+        files. References within a file are ignored.
+
+        Args:
+            symbols: Definitions of every file.
+            references: Path -> referenced name counts.
+            sources: Path -> source code, used to render full definitions.
+        """
+        self.symbols = symbols
+        self._lines = {path: source.splitlines() for path, source in sources.items()}
+        self.files = sorted({s.path for s in symbols} | set(references))
+        row = {path: i for i, path in enumerate(self.files)}
+
+        defined: Dict[str, List[Symbol]] = {}
+        for symbol in symbols:
+            if symbol.name not in _IGNORED_NAMES and not symbol.name.startswith("__"):
+                defined.setdefault(symbol.name, []).append(symbol)
+
+        # Names referenced from most files (``path``, ``name``) carry little
+        # information about which definition is meant
+        spread = Counter(name for counts in references.values() for name in counts)
+
+        # (source row, symbol, weight) for every reference crossing files
+        self._links: List[Tuple[int, Symbol, float]] = []
+        edges: List[Dict[int, float]] = [{} for _ in self.files]
+        for path, counts in references.items():
+            for name, count in counts.items():
+                targets = [s for s in defined.get(name, ()) if s.path != path]
+                if not targets:
+                    continue
+                idf = math.log(1 + len(references) / spread[name])
+                weight = math.sqrt(count) * idf / len(targets)
+                for symbol in targets:
+                    self._links.append((row[path], symbol, weight))
+                    target = row[symbol.path]
+                    edges[row[path]][target] = (
+                        edges[row[path]].get(target, 0.0) + weight
+                    )
+
+        self._indptr = array("I", [0])
+        self._indices = array("I")
+        self._weights = array("d")
+        for targets in edges:
+            for target, weight in sorted(targets.items()):
+                self._indices.append(target)
+                self._weights.append(weight)
+            self._indptr.append(len(self._indices))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def ranked(
+        self, weights: Sequence[Tuple[str, float]] = ()
+    ) -> List[Tuple[Symbol, float]]:
+        """Rank every definition by centrality.
+
+        PageRank is personalized with the path weights, so a generator's
+        notion of relevant files steers the ranking. Each definition receives
+        the rank its referencing files pass along; unreferenced definitions
+        are ordered by the rank of their own file.
+
+        Args:
+            weights: ``(glob pattern, weight)`` pairs scoring file relevance.
+
+        Returns:
+            ``(symbol, score)`` pairs, most central first, excluding files
+            weighted zero.
+        """
+        relevance = [path_weight(path, weights) for path in self.files]
+        rank = pagerank(self._indptr, self._indices, self._weights, relevance)
+        out = [
+            sum(self._weights[self._indptr[i] : self._indptr[i + 1]])
+            for i in range(len(self.files))
+        ]
+        row = {path: i for i, path in enumerate(self.files)}
+
+        score: Dict[Symbol, float] = {
+            symbol: rank[row[symbol.path]] * 1e-3 for symbol in self.symbols
+        }
+        for source, symbol, weight in self._links:
+            score[symbol] += rank[source] * weight / out[source]
+        ordered = sorted(
+            (
+                (symbol, value * relevance[row[symbol.path]])
+                for symbol, value in score.items()
+                if relevance[row[symbol.path]] > 0
+            ),
+            key=lambda item: (-item[1], item[0].path, item[0].start),
+        )
+        return ordered
+
+    def outline(
+        self, ranked: Iterable[Tuple[Symbol, float]], max_tokens: int
+    ) -> Tuple[str, List[Symbol]]:
+        """Render the signatures of the top-ranked definitions.
+
+        Definitions are taken in rank order while they fit the budget, then
+        grouped by file (most central file first) and listed in source order.
+        A method pulls in its class's signature line.
+
+        Args:
+            ranked: ``(symbol, score)`` pairs from :meth:`ranked`.
+            max_tokens: Token budget of the outline.
+
+        Returns:
+            The outline and the definitions it lists.
+        """
+        by_qualname = {(s.path, s.qualname): s for s in self.symbols}
+        chosen: Dict[str, Set[Symbol]] = {}
+        used = 0
+        for symbol, _ in ranked:
+            listed = chosen.get(symbol.path, set())
+            if symbol in listed:
+                continue
+            missing = [symbol]
+            parent = by_qualname.get((symbol.path, symbol.parent or ""))
+            if parent and parent not in listed:
+                missing.append(parent)
+            cost = sum(estimate_tokens(len(s.signature) + 4) for s in missing)
+            if symbol.path not in chosen:
+                cost += estimate_tokens(len(symbol.path) + 2)
+            if used + cost > max_tokens:
+                continue
+            chosen.setdefault(symbol.path, set()).update(missing)
+            used += cost
+
+        lines: List[str] = []
+        for path, symbols in chosen.items():
+            lines.append(f"{path}:")
+            for symbol in sorted(symbols, key=lambda s: s.start):
+                indent = "    " if symbol.parent else "  "
+                lines.append(f"{indent}{symbol.signature}")
+        listed = [s for symbols in chosen.values() for s in symbols]
+        return "\n".join(lines), listed
+
+    def source(self, symbol: Symbol) -> str:
+        """Return the full source of a definition.
+
+        Args:
+            symbol: A collected definition.
+
+        Returns:
+            Source lines of the definition, including decorators.
+        """
+        return "\n".join(self._lines[symbol.path][symbol.start - 1 : symbol.end])
+
+    def context(self, weights: Sequence[Tuple[str, float]], max_tokens: int) -> str:
+        """Render prompt context: an outline plus top-ranked sources.
+
+        The outline takes up to :data:`OUTLINE_SHARE` of the budget; the
+        remainder is filled with the full source of the highest-ranked
+        functions and methods that fit.
+
+        Args:
+            weights: ``(glob pattern, weight)`` pairs scoring file relevance.
+            max_tokens: Token budget of the context.
+
+        Returns:
+            Outline followed by ``<file path="..." lines="a-b">`` blocks.
+        """
+        ranked = self.ranked(weights)
+        outline, _ = self.outline(ranked, int(max_tokens * OUTLINE_SHARE))
+        used = estimate_tokens(len(outline))
+        blocks = [f"Repository map (most central definitions):\n{outline}"]
+        for symbol, _ in ranked:
+            if symbol.signature.startswith("class "):
+                continue
+            body = self.source(symbol)
+            cost = estimate_tokens(len(body) + len(symbol.path) + 40)
+            if used + cost > max_tokens:
+                continue
+            blocks.append(
+                f'<file path="{symbol.path}" lines="{symbol.start}-{symbol.end}">\n'
+                f"{body}\n</file>"
+            )
+            used += cost
+        return "\n\n".join(blocks)
+
+
+def build_repo_map(files: Iterable[Tuple[str, str]]) -> RepoMap:
+    """Build the repository map of a project's Python files.
+
+    Args:
+        files: ``(path, source)`` pairs; non-Python files are skipped.
+
+    Returns:
+        Map of every definition and cross-file reference.
+    """
+    symbols: List[Symbol] = []
+    references: Dict[str, Counter] = {}
+    sources: Dict[str, str] = {}
+    for path, source in files:
+        if not path.endswith(".py"):
+            continue
+        defined, referenced = extract(path, source)
+        if defined:
+            sources[path] = source
+        symbols.extend(defined)
+        if referenced:
+            references[path] = referenced
+    return RepoMap(symbols, references, sources)
@@ -0,0 +1,305 @@
+"""Embedding-based retrieval of relevant project chunks.
+
+Files are split into line-aligned chunks, embedded in batches through Ollama
+and stored as a normalized float32 matrix that is memory-mapped on later
+runs. Only chunks whose content changed are re-embedded. Queries are answered
+with a cosine top-k over the matrix.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import operator
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from repodoc.chunker import iter_line_chunks
+from repodoc.errors import InputFileError
+
+if TYPE_CHECKING:
+    from repodoc.ollama import OllamaClient
+    from repodoc.parser import PackIndex
+
+VECTORS_FILE = "vectors.f32"
+CHUNKS_FILE = "chunks.json"
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A line range of one file.
+
+    Attributes:
+        path: File path inside the repository.
+        start: First line (1-based, inclusive).
+        end: Last line (1-based, inclusive).
+        digest: Hash of the embedding model and chunk text.
+    """
+
+    path: str
+    start: int
+    end: int
+    digest: str
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    """Scale a vector to unit length.
+
+    Args:
+        vector: Embedding vector.
+
+    Returns:
+        The unit vector (the zero vector is returned unchanged).
+    """
+    norm = math.sqrt(sum(map(operator.mul, vector, vector)))
+    return [value / norm for value in vector] if norm else list(vector)
+
+
+class EmbeddingIndex:
+    """Memory-mapped matrix of normalized chunk embeddings.
+
+    Attributes:
+        directory: Directory holding the matrix and chunk metadata.
+        model: Embedding model the vectors were produced with.
+        dim: Vector dimension.
+        chunks: Metadata of each matrix row.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        model: str,
+        dim: int,
+        chunks: List[Chunk],
+        vectors: Any,
+        buffer: Optional[mmap.mmap] = None,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            directory: Directory holding the matrix and chunk metadata.
+            model: Embedding model the vectors were produced with.
+            dim: Vector dimension.
+            chunks: Metadata of each matrix row.
+            vectors: Flat float32 buffer with ``len(chunks) * dim`` values.
+            buffer: Memory map backing *vectors*, kept alive with the index.
+        """
+        self.directory = directory
+        self.model = model
+        self.dim = dim
+        self.chunks = chunks
+        self._vectors = vectors
+        self._buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def row(self, i: int) -> Any:
+        """Return the vector of one row.
+
+        Args:
+            i: Row number.
+
+        Returns:
+            A float32 view of the row.
+        """
+        return self._vectors[i * self.dim : (i + 1) * self.dim]
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional[EmbeddingIndex]:
+        """Memory-map a saved index.
+
+        Args:
+            directory: Directory written by :meth:`save`.
+
+        Returns:
+            The index, or None if nothing usable is saved there.
+        """
+        try:
+            meta = json.loads((directory / CHUNKS_FILE).read_text())
+            chunks = [Chunk(**chunk) for chunk in meta["chunks"]]
+            dim = meta["dim"]
+            if not chunks:
+                return cls(directory, meta["model"], dim, [], array("f"))
+            with (directory / VECTORS_FILE).open("rb") as fh:
+                buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        vectors = memoryview(buffer).cast("f")
+        if len(vectors) != len(chunks) * dim:
+            return None
+        return cls(directory, meta["model"], dim, chunks, vectors, buffer)
+
+    def save(self) -> None:
+        """Write the matrix and chunk metadata atomically.
+
+        Raises:
+            InputFileError: If the index cannot be written.
+        """
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_vectors = self.directory / (VECTORS_FILE + ".tmp")
+            tmp_vectors.write_bytes(memoryview(self._vectors).cast("B"))
+            tmp_meta = self.directory / (CHUNKS_FILE + ".tmp")
+            tmp_meta.write_text(
+                json.dumps(
+                    {
+                        "model": self.model,
+                        "dim": self.dim,
+                        "chunks": [asdict(chunk) for chunk in self.chunks],
+                    }
+                )
+            )
+            tmp_vectors.replace(self.directory / VECTORS_FILE)
+            tmp_meta.replace(self.directory / CHUNKS_FILE)
+        except OSError as e:
+            raise InputFileError(f"Failed to write embedding index: {e}") from e
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[float, Chunk]]:
+        """Return the *k* chunks most similar to *query*.
+
+        Args:
+            query: Query embedding (normalized here).
+            k: Number of results.
+
+        Returns:
+            ``(cosine similarity, chunk)`` pairs, best first.
+        """
+        unit = _normalize(query)
+        scores = (
+            (sum(map(operator.mul, unit, self.row(i))), i) for i in range(len(self))
+        )
+        return [(score, self.chunks[i]) for score, i in heapq.nlargest(k, scores)]
+
+
+async def build_index(
+    directory: Path,
+    files: Iterable[Tuple[str, str]],
+    client: OllamaClient,
+    *,
+    max_tokens: int = 512,
+    batch_size: int = 32,
+) -> EmbeddingIndex:
+    """Create or incrementally update the embedding index of *files*.
+
+    Chunks whose hash is already present in the saved index reuse their
+    vector; only new or changed chunks are sent to the embedding endpoint,
+    in concurrent batches.
+
+    Args:
+        directory: Directory holding the index.
+        files: ``(path, content)`` pairs.
+        client: Ollama client providing embeddings.
+        max_tokens: Approximate size of each chunk.
+        batch_size: Number of chunks per embedding request.
+
+    Returns:
+        The up-to-date index, saved to *directory*.
+    """
+    model = client.embedding_model
+    previous = EmbeddingIndex.load(directory)
+    if previous is not None and previous.model != model:
+        previous = None
+    known: Dict[str, int] = (
+        {chunk.digest: i for i, chunk in enumerate(previous.chunks)} if previous else {}
+    )
+
+    chunks: List[Chunk] = []
+    missing: Dict[str, str] = {}  # digest -> text still to embed
+    for path, content in files:
+        for start, end, text in iter_line_chunks(content, max_tokens=max_tokens):
+            digest = hashlib.sha1(f"{model}\0{path}\0{text}".encode()).hexdigest()
+            chunks.append(Chunk(path, start, end, digest))
+            if digest not in known:
+                missing[digest] = f"{path}\n{text}"
+
+    digests = list(missing)
+    batches = [digests[i : i + batch_size] for i in range(0, len(digests), batch_size)]
+    results = await asyncio.gather(
+        *(client.embed([missing[digest] for digest in batch]) for batch in batches)
+    )
+    fresh: Dict[str, List[float]] = {}
+    for batch, vectors in zip(batches, results):
+        fresh.update(
+            (digest, _normalize(vector)) for digest, vector in zip(batch, vectors)
+        )
+
+    dim = (
+        len(next(iter(fresh.values()))) if fresh else (previous.dim if previous else 0)
+    )
+    vectors = array("f")
+    for chunk in chunks:
+        if chunk.digest in fresh:
+            vectors.extend(fresh[chunk.digest])
+        else:
+            vectors.extend(previous.row(known[chunk.digest]))  # type: ignore[union-attr]
+
+    index = EmbeddingIndex(directory, model, dim, chunks, vectors)
+    index.save()
+    return index
+
+
+class Retriever:
+    """Answers generator queries with the most relevant chunks of the pack.
+
+    Attributes:
+        index: Embedding index of the pack's chunks.
+        files: File index used to read chunk text back from the pack.
+        client: Ollama client used to embed queries.
+    """
+
+    def __init__(
+        self, index: EmbeddingIndex, files: PackIndex, client: OllamaClient
+    ) -> None:
+        """Initialize the retriever.
+
+        Args:
+            index: Embedding index of the pack's chunks.
+            files: File index used to read chunk text back from the pack.
+            client: Ollama client used to embed queries.
+        """
+        self.index = index
+        self.files = files
+        self.client = client
+
+    async def search(self, query: str, *, top_k: int) -> List[Chunk]:
+        """Find the chunks most relevant to *query*.
+
+        Args:
+            query: Natural-language description of the needed context.
+            top_k: Number of chunks to return.
+
+        Returns:
+            Matching chunks ordered by path and line.
+        """
+        [vector] = await self.client.embed([query])
+        hits = self.index.search(vector, top_k)
+        return sorted((chunk for _, chunk in hits), key=lambda c: (c.path, c.start))
+
+    async def context(self, query: str, *, top_k: int) -> str:
+        """Render the chunks most relevant to *query* as prompt context.
+
+        Args:
+            query: Natural-language description of the needed context.
+            top_k: Number of chunks to include.
+
+        Returns:
+            ``<file>`` blocks holding the selected line ranges.
+        """
+        blocks = []
+        for chunk in await self.search(query, top_k=top_k):
+            lines = self.files.read(chunk.path).splitlines()[
+                chunk.start - 1 : chunk.end
+            ]
+            text = "\n".join(lines)
+            blocks.append(
+                f'<file path="{chunk.path}" lines="{chunk.start}-{chunk.end}">\n'
+                f"{text}\n</file>"
+            )
+        return "\n\n".join(blocks)
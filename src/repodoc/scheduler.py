@@ -0,0 +1,204 @@
+"""Dependency-aware scheduling of generators and shared artifacts."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, List, Mapping
+from typing import Optional, Tuple, Union
+
+from repodoc.generators.base import DocGenerator, get_artifact_builder, get_generator
+
+if TYPE_CHECKING:
+    from repodoc.ollama import OllamaClient
+
+
+class Scheduler:
+    """Run generators as a DAG over their declared inputs.
+
+    Every node (a seed value, a shared artifact or a generated document) is
+    computed at most once per scheduler and as soon as all of its inputs are
+    available, so independent generators and artifacts run concurrently.
+
+    Attributes:
+        client: Ollama client passed to builders and generators.
+    """
+
+    def __init__(
+        self,
+        client: OllamaClient,
+        seeds: Mapping[str, Any],
+        *,
+        generator_options: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            client: Ollama client for text generation.
+            seeds: Precomputed artifacts, e.g. ``pack`` and ``project_file``.
+                A future seed, such as a pack still being produced, is
+                awaited by the nodes that depend on it.
+            generator_options: Keyword arguments used to instantiate every
+                generator, e.g. ``{"retrieval": True}``.
+        """
+        self.client = client
+        self._seeds = dict(seeds)
+        self._generator_options = dict(generator_options or {})
+        self._generators: Dict[str, DocGenerator] = {}
+        self._futures: Dict[str, asyncio.Future[Any]] = {}
+
+    def generator(self, name: str) -> DocGenerator:
+        """Return the generator instance used for *name*.
+
+        Args:
+            name: Generator name.
+
+        Returns:
+            The generator, instantiated once with the generator options.
+
+        Raises:
+            KeyError: If no generator is registered with the given name.
+        """
+        if name not in self._generators:
+            self._generators[name] = get_generator(name)(**self._generator_options)
+        return self._generators[name]
+
+    def inputs_of(self, name: str) -> Tuple[str, ...]:
+        """Return the declared inputs of a node.
+
+        Args:
+            name: Seed, artifact or generator name.
+
+        Returns:
+            Names of the nodes *name* depends on.
+
+        Raises:
+            KeyError: If *name* is neither a seed, an artifact nor a generator.
+        """
+        if name in self._seeds:
+            return ()
+        try:
+            return tuple(get_artifact_builder(name).inputs)
+        except KeyError:
+            return tuple(self.generator(name).required_inputs())
+
+    def plan(self, targets: Iterable[str]) -> List[str]:
+        """Order every node required by *targets* topologically.
+
+        Args:
+            targets: Generator names to produce.
+
+        Returns:
+            Node names such that each appears after all of its inputs.
+
+        Raises:
+            KeyError: If a node is unknown.
+            ValueError: If the dependency graph contains a cycle.
+        """
+        order: List[str] = []
+        state: Dict[str, bool] = {}  # False while visiting, True when done
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if state.get(name):
+                return
+            if name in state:
+                cycle = " -> ".join((*path[path.index(name) :], name))
+                raise ValueError(f"Dependency cycle: {cycle}")
+            state[name] = False
+            for dep in self.inputs_of(name):
+                visit(dep, (*path, name))
+            state[name] = True
+            order.append(name)
+
+        for target in targets:
+            visit(target, ())
+        return order
+
+    async def resolve(self, name: str) -> Any:
+        """Compute a node once, awaiting its inputs concurrently.
+
+        Args:
+            name: Seed, artifact or generator name.
+
+        Returns:
+            The node value; generated documentation for generator names.
+        """
+        if name in self._seeds:
+            seed = self._seeds[name]
+            if isinstance(seed, asyncio.Future):
+                return await asyncio.shield(seed)
+            return seed
+        if name not in self._futures:
+            self._futures[name] = asyncio.ensure_future(self._compute(name))
+        return await asyncio.shield(self._futures[name])
+
+    def artifacts(self) -> Dict[str, Any]:
+        """Return the shared artifacts computed so far.
+
+        Passing them as seeds of another scheduler reuses them instead of
+        building them again, e.g. when only generator options change.
+
+        Returns:
+            Artifact name -> value, for every artifact that was built
+            successfully; generated documents are not included.
+        """
+        return {
+            name: future.result()
+            for name, future in self._futures.items()
+            if name not in self._generators
+            and future.done()
+            and not future.cancelled()
+            and future.exception() is None
+        }
+
+    async def _compute(self, name: str) -> Any:
+        """Build an artifact or generate a document from resolved inputs.
+
+        Args:
+            name: Artifact or generator name.
+
+        Returns:
+            The computed value.
+        """
+        inputs = self.inputs_of(name)
+        values = await asyncio.gather(*(self.resolve(dep) for dep in inputs))
+        artifacts = dict(zip(inputs, values))
+        try:
+            builder = get_artifact_builder(name)
+        except KeyError:
+            generator = self.generator(name)
+            doc = await generator.run(artifacts, self.client)
+            return await generator.review(doc, self.client)
+        return await builder().build(artifacts, self.client)
+
+    async def run(
+        self, targets: Iterable[str]
+    ) -> AsyncIterator[Tuple[str, Union[str, BaseException]]]:
+        """Generate documents, yielding each one as soon as it completes.
+
+        Args:
+            targets: Generator names to produce.
+
+        Yields:
+            ``(name, result)`` pairs in completion order, where *result* is
+            the generated documentation or the exception that prevented it.
+
+        Raises:
+            KeyError: If a node is unknown.
+            ValueError: If the dependency graph contains a cycle.
+        """
+        targets = list(targets)
+        self.plan(targets)
+
+        async def settle(name: str) -> Tuple[str, Union[str, BaseException]]:
+            try:
+                return name, await self.resolve(name)
+            except Exception as e:
+                return name, e
+
+        pending = [asyncio.ensure_future(settle(name)) for name in targets]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for future in (*pending, *self._futures.values()):
+                future.cancel()
@@ -0,0 +1,139 @@
+"""AST-based skeleton compression of Python sources.
+
+A skeleton keeps what documentation needs from a module - imports, class and
+function signatures with type hints and decorators, docstrings and simple
+module constants - and drops implementation bodies. Prompts built from
+skeletons are several times smaller than prompts built from full sources.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+# Files are skeletonized inline below this count; a process pool only pays off
+# once there is enough work to amortize worker start-up.
+POOL_THRESHOLD = 64
+
+# Assigned values longer than this are elided from the skeleton
+MAX_VALUE_CHARS = 80
+
+
+def _docstring(body: List[ast.stmt]) -> List[ast.stmt]:
+    """Return the docstring statement of a body, if any.
+
+    Args:
+        body: Statements of a module, class or function.
+
+    Returns:
+        A list holding the docstring expression, or an empty list.
+    """
+    if (
+        body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+        and isinstance(body[0].value.value, str)
+    ):
+        return [body[0]]
+    return []
+
+
+def _ellipsis() -> ast.stmt:
+    """Build a ``...`` statement standing in for a dropped body.
+
+    Returns:
+        Expression statement holding an ellipsis.
+    """
+    return ast.Expr(value=ast.Constant(value=Ellipsis))
+
+
+def _short(value: Optional[ast.expr]) -> Optional[ast.expr]:
+    """Keep short assigned values and elide long ones.
+
+    Args:
+        value: Assigned expression.
+
+    Returns:
+        The expression, or an ellipsis if it is too long to be useful.
+    """
+    if value is None or len(ast.unparse(value)) <= MAX_VALUE_CHARS:
+        return value
+    return ast.Constant(value=Ellipsis)
+
+
+def _strip(body: List[ast.stmt], *, in_class: bool) -> List[ast.stmt]:
+    """Reduce a module or class body to its skeleton.
+
+    Args:
+        body: Statements to reduce.
+        in_class: Whether *body* belongs to a class.
+
+    Returns:
+        Skeleton statements.
+    """
+    kept: List[ast.stmt] = _docstring(body)
+    for node in body[len(kept) :]:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            kept.append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            node.body = _docstring(node.body) or [_ellipsis()]
+            kept.append(node)
+        elif isinstance(node, ast.ClassDef):
+            node.body = _strip(node.body, in_class=True) or [_ellipsis()]
+            kept.append(node)
+        elif isinstance(node, ast.AnnAssign):
+            node.value = _short(node.value)
+            kept.append(node)
+        elif isinstance(node, ast.Assign) and all(
+            isinstance(target, ast.Name) for target in node.targets
+        ):
+            node.value = _short(node.value)  # type: ignore[assignment]
+            kept.append(node)
+        elif (
+            not in_class
+            and isinstance(node, ast.If)
+            and ast.unparse(node.test) in ("TYPE_CHECKING", "typing.TYPE_CHECKING")
+        ):
+            node.body = _strip(node.body, in_class=False) or [_ellipsis()]
+            node.orelse = []
+            kept.append(node)
+    return kept
+
+
+def skeletonize(source: str) -> str:
+    """Reduce a Python module to its skeleton.
+
+    Args:
+        source: Python source code.
+
+    Returns:
+        The skeleton source, or *source* unchanged if it does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return source
+    tree.body = _strip(tree.body, in_class=False)
+    return ast.unparse(tree) + "\n"
+
+
+def skeletonize_many(
+    sources: Sequence[str], *, max_workers: Optional[int] = None
+) -> List[str]:
+    """Skeletonize many modules, in a process pool when worthwhile.
+
+    Args:
+        sources: Python sources.
+        max_workers: Pool size; defaults to the number of CPUs.
+
+    Returns:
+        Skeletons in the order of *sources*.
+    """
+    if len(sources) < POOL_THRESHOLD or max_workers == 1:
+        return [skeletonize(source) for source in sources]
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(sources) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(skeletonize, sources, chunksize=chunksize))
@@ -0,0 +1,162 @@
+"""Adaptive timeouts for generation requests.
+
+A fixed timeout either kills long but healthy generations after most of the
+GPU work is done, or waits far too long on a stalled server. Here the wait
+for the first token is derived from the prompt size and the rate at which
+previous prompts of the same model were answered, and a stream is only
+considered stalled when no token arrives for several times the measured
+inter-token interval.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping
+
+# Assumed until a model has answered once; deliberately pessimistic
+DEFAULT_PROMPT_RATE = 100.0  # prompt tokens per second until the first token
+DEFAULT_TOKEN_RATE = 5.0  # tokens generated per second
+
+# Allowance for loading a model before its first answer has been measured
+LOAD_SECONDS = 60.0
+
+# Expected durations are multiplied by this to become timeouts
+SAFETY_FACTOR = 4.0
+
+MIN_FIRST_TOKEN_SECONDS = 30.0
+MIN_IDLE_SECONDS = 15.0
+
+# Weight of the newest measurement in the moving averages
+SMOOTHING = 0.3
+
+
+@dataclass
+class ModelRates:
+    """Measured throughput of one model.
+
+    Attributes:
+        prompt_rate: Prompt tokens per second of wall time until the first
+            token arrives, including queueing, loading and prompt evaluation.
+        token_rate: Tokens generated per second.
+        prompt_samples: Requests measured for :attr:`prompt_rate`.
+        token_samples: Responses measured for :attr:`token_rate`.
+    """
+
+    prompt_rate: float = DEFAULT_PROMPT_RATE
+    token_rate: float = DEFAULT_TOKEN_RATE
+    prompt_samples: int = 0
+    token_samples: int = 0
+
+
+def _average(current: float, sample: float, samples: int) -> float:
+    """Fold a measurement into an exponential moving average.
+
+    Args:
+        current: Current average.
+        sample: New measurement.
+        samples: Measurements already averaged; the first one replaces the
+            default.
+
+    Returns:
+        Updated average.
+    """
+    if not samples:
+        return sample
+    return (1 - SMOOTHING) * current + SMOOTHING * sample
+
+
+class RateTracker:
+    """Per-model throughput measurements and the timeouts derived from them."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker without measurements."""
+        self._rates: Dict[str, ModelRates] = {}
+
+    def rates(self, model: str) -> ModelRates:
+        """Return the measured rates of a model.
+
+        Args:
+            model: Model name.
+
+        Returns:
+            Measured rates, or the pessimistic defaults.
+        """
+        return self._rates.get(model, ModelRates())
+
+    def measured(self) -> Dict[str, ModelRates]:
+        """Return the rates of every model measured so far.
+
+        Returns:
+            Model -> rates.
+        """
+        return dict(self._rates)
+
+    def seed(self, model: str, rates: ModelRates) -> None:
+        """Start from rates measured in an earlier run.
+
+        Args:
+            model: Model name.
+            rates: Previously measured rates.
+        """
+        self._rates[model] = rates
+
+    def observe_first_token(
+        self, model: str, prompt_tokens: int, seconds: float
+    ) -> None:
+        """Record how long a prompt took to produce its first token.
+
+        Args:
+            model: Model that answered.
+            prompt_tokens: Estimated prompt tokens.
+            seconds: Wall time from sending the request to the first token.
+        """
+        rates = self._rates.setdefault(model, ModelRates())
+        if prompt_tokens <= 0 or seconds <= 0:
+            return
+        sample = prompt_tokens / seconds
+        rates.prompt_rate = _average(rates.prompt_rate, sample, rates.prompt_samples)
+        rates.prompt_samples += 1
+
+    def observe_stats(self, model: str, stats: Mapping[str, Any]) -> None:
+        """Record the generation rate reported in a final response chunk.
+
+        Args:
+            model: Model that answered.
+            stats: Final chunk of an Ollama response, with ``eval_count`` and
+                ``eval_duration`` in nanoseconds.
+        """
+        count = stats.get("eval_count") or 0
+        duration = (stats.get("eval_duration") or 0) / 1e9
+        if count <= 0 or duration <= 0:
+            return
+        rates = self._rates.setdefault(model, ModelRates())
+        sample = count / duration
+        rates.token_rate = _average(rates.token_rate, sample, rates.token_samples)
+        rates.token_samples += 1
+
+    def first_token_timeout(self, model: str, prompt_tokens: int) -> float:
+        """Return how long to wait for the first token of a request.
+
+        Args:
+            model: Model the request is routed to.
+            prompt_tokens: Estimated prompt tokens.
+
+        Returns:
+            Timeout in seconds, growing with the prompt.
+        """
+        rates = self.rates(model)
+        seconds = SAFETY_FACTOR * prompt_tokens / rates.prompt_rate
+        if not rates.prompt_samples:
+            seconds += LOAD_SECONDS
+        return max(MIN_FIRST_TOKEN_SECONDS, seconds)
+
+    def idle_timeout(self, model: str) -> float:
+        """Return how long a stream may go without a token before it stalls.
+
+        Args:
+            model: Model the request is routed to.
+
+        Returns:
+            Timeout in seconds.
+        """
+        return max(MIN_IDLE_SECONDS, SAFETY_FACTOR / self.rates(model).token_rate)
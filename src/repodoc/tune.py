@@ -0,0 +1,271 @@
+"""Benchmarks of the Ollama host behind ``repodoc tune``.
+
+Three properties decide how fast a run is: how many requests the server
+processes in parallel before throughput stops growing, how fast each model
+evaluates prompts and generates tokens, and how large a map-stage chunk can
+be before prompt evaluation slows down or the server truncates the prompt to
+its context window. Each is measured with short synthetic requests and the
+results become the ``[performance]`` section of config.toml.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from repodoc.config import ModelProfile, Performance
+from repodoc.ollama import OllamaClient
+
+logger = logging.getLogger("repodoc")
+
+# Prompt sizes in tokens tried as map-stage chunk sizes
+CHUNK_SIZES = (2_000, 4_000, 8_000, 16_000, 32_000)
+
+# Requests in flight tried when measuring parallel throughput
+CONCURRENCY_LEVELS = (1, 2, 4, 8)
+
+# Tokens generated per request of the throughput and generation benchmarks
+GENERATED_TOKENS = 64
+
+# A concurrency level is only worth it if it raises throughput this much
+MIN_SPEEDUP = 1.15
+
+# A chunk size must keep this share of the best measured prompt rate
+MIN_RATE_SHARE = 0.75
+
+# Share of a prompt the server must evaluate; less means it was truncated
+MIN_EVALUATED = 0.9
+
+# Filler resembling source code, so token counts match real prompts
+_FILLER = (
+    "def handle_request(self, request: Request) -> Response:\n"
+    '    """Dispatch a request to the matching route."""\n'
+    "    route = self.routes.get(request.path)\n"
+    "    if route is None:\n"
+    "        return Response(status=404)\n"
+    "    return route(request)\n\n"
+)
+
+
+def _prompt(tokens: int) -> str:
+    """Build a synthetic prompt of roughly *tokens* tokens.
+
+    A random prefix keeps the server from reusing a cached prompt prefix,
+    which would make prompt evaluation look faster than it is.
+
+    Args:
+        tokens: Target size in tokens (4 characters each).
+
+    Returns:
+        Prompt text.
+    """
+    head = f"# {uuid.uuid4().hex}\n"
+    body = _FILLER * (tokens * 4 // len(_FILLER) + 1)
+    return head + body[: max(0, tokens * 4 - len(head))]
+
+
+def _rate(count: Any, duration_ns: Any) -> Optional[float]:
+    """Turn a count and a duration in nanoseconds into a rate.
+
+    Args:
+        count: Tokens processed.
+        duration_ns: Duration in nanoseconds.
+
+    Returns:
+        Tokens per second, or None without usable statistics.
+    """
+    if not count or not duration_ns:
+        return None
+    return count / (duration_ns / 1e9)
+
+
+@dataclass(frozen=True)
+class ChunkSample:
+    """Prompt evaluation measured for one prompt size.
+
+    Attributes:
+        tokens: Prompt size sent, in estimated tokens.
+        evaluated: Prompt tokens the server evaluated.
+        prompt_rate: Prompt tokens evaluated per second, if reported.
+    """
+
+    tokens: int
+    evaluated: int
+    prompt_rate: Optional[float]
+
+
+async def measure_chunk_sizes(
+    client: OllamaClient, model: str, sizes: Sequence[int] = CHUNK_SIZES
+) -> List[ChunkSample]:
+    """Measure prompt evaluation at increasing prompt sizes.
+
+    Stops after the first size the server truncates, since larger ones
+    would be truncated too.
+
+    Args:
+        client: Client of the host to benchmark.
+        model: Model to benchmark.
+        sizes: Prompt sizes in tokens, ascending.
+
+    Returns:
+        One sample per measured size.
+    """
+    samples = []
+    for tokens in sizes:
+        stats = await client.probe(model, _prompt(tokens), num_predict=1)
+        evaluated = int(stats.get("prompt_eval_count") or 0)
+        rate = _rate(evaluated, stats.get("prompt_eval_duration"))
+        samples.append(ChunkSample(tokens, evaluated, rate))
+        logger.info(
+            f"{model}: {tokens:,}-token prompt, {evaluated:,} evaluated"
+            + (f" at {rate:.0f} tokens/s" if rate else "")
+        )
+        if evaluated < MIN_EVALUATED * tokens:
+            break
+    return samples
+
+
+def best_chunk_size(samples: Sequence[ChunkSample]) -> Optional[int]:
+    """Pick the largest chunk size that is evaluated whole and fast enough.
+
+    Larger chunks mean fewer requests and less repeated instruction text,
+    until the prompt no longer fits the context window or evaluation slows
+    down.
+
+    Args:
+        samples: Measurements from :func:`measure_chunk_sizes`.
+
+    Returns:
+        Chunk size in tokens, or None if no size was evaluated whole.
+    """
+    whole = [s for s in samples if s.evaluated >= MIN_EVALUATED * s.tokens]
+    rates = [s.prompt_rate for s in whole if s.prompt_rate]
+    if not whole:
+        return None
+    best_rate = max(rates, default=0.0)
+    fast = [
+        s.tokens
+        for s in whole
+        if not s.prompt_rate or s.prompt_rate >= MIN_RATE_SHARE * best_rate
+    ]
+    return max(fast, default=whole[0].tokens)
+
+
+async def measure_token_rate(client: OllamaClient, model: str) -> Optional[float]:
+    """Measure how fast a model generates tokens.
+
+    Args:
+        client: Client of the host to benchmark.
+        model: Model to benchmark.
+
+    Returns:
+        Tokens per second, or None if not reported.
+    """
+    stats = await client.probe(
+        model, _prompt(100) + "\nExplain this code.", num_predict=GENERATED_TOKENS
+    )
+    return _rate(stats.get("eval_count"), stats.get("eval_duration"))
+
+
+async def measure_concurrency(
+    client: OllamaClient, model: str, levels: Sequence[int] = CONCURRENCY_LEVELS
+) -> Dict[int, float]:
+    """Measure total generation throughput with parallel requests.
+
+    Args:
+        client: Client of the host to benchmark.
+        model: Model to benchmark.
+        levels: Numbers of simultaneous requests, ascending.
+
+    Returns:
+        Level -> generated tokens per second of wall time across requests.
+    """
+    throughput: Dict[int, float] = {}
+    for level in levels:
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                client.probe(
+                    model,
+                    _prompt(200) + "\nExplain this code.",
+                    num_predict=GENERATED_TOKENS,
+                )
+                for _ in range(level)
+            )
+        )
+        seconds = time.perf_counter() - started
+        tokens = sum(int(stats.get("eval_count") or 0) for stats in results)
+        throughput[level] = tokens / seconds if seconds > 0 else 0.0
+        logger.info(
+            f"{model}: {level} parallel requests, "
+            f"{throughput[level]:.1f} tokens/s in total"
+        )
+    return throughput
+
+
+def best_concurrency(throughput: Mapping[int, float]) -> int:
+    """Pick the level after which parallel requests stop paying off.
+
+    Args:
+        throughput: Level -> total tokens per second, from
+            :func:`measure_concurrency`.
+
+    Returns:
+        The highest level reached while each step raised throughput by at
+        least :data:`MIN_SPEEDUP`; 1 without measurements.
+    """
+    chosen, best = 1, 0.0
+    for level in sorted(throughput):
+        if best and throughput[level] < MIN_SPEEDUP * best:
+            break
+        chosen, best = level, throughput[level]
+    return chosen
+
+
+async def tune(
+    client: OllamaClient,
+    models: Sequence[str],
+    *,
+    base: Optional[Performance] = None,
+    sizes: Sequence[int] = CHUNK_SIZES,
+    levels: Sequence[int] = CONCURRENCY_LEVELS,
+) -> Performance:
+    """Benchmark the host and derive performance settings.
+
+    Concurrency is measured with the first model, since parallel slots are
+    a property of the server; rates and chunk sizes are measured per model.
+
+    Args:
+        client: Client of the host to benchmark.
+        models: Models to profile, the default model first.
+        base: Settings to start from, e.g. the current configuration.
+        sizes: Prompt sizes tried as chunk sizes.
+        levels: Concurrency levels tried.
+
+    Returns:
+        Tuned settings.
+
+    Raises:
+        OllamaError: If a benchmark request fails.
+    """
+    base = base or Performance()
+    performance = Performance(base.concurrency, base.chunk_tokens, dict(base.models))
+    for model in models:
+        samples = await measure_chunk_sizes(client, model, sizes)
+        chunk_tokens = best_chunk_size(samples)
+        rates = [s.prompt_rate for s in samples if s.prompt_rate]
+        performance.models[model] = ModelProfile(
+            prompt_rate=max(rates) if rates else None,
+            token_rate=await measure_token_rate(client, model),
+            chunk_tokens=chunk_tokens,
+        )
+        if model == models[0] and chunk_tokens:
+            performance.chunk_tokens = chunk_tokens
+    if models:
+        throughput = await measure_concurrency(client, models[0], levels)
+        performance.concurrency = best_concurrency(throughput)
+    return performance
@@ -0,0 +1,386 @@
+"""Local checks of generated documents and targeted repairs.
+
+Generated markdown is checked without a model: the top-level header is
+present, code fences are closed, Mermaid diagrams start with a diagram type
+and balance their brackets, enough diagrams are included and no section
+ends mid-sentence. Each failing section is then rewritten on its own by a
+small repair prompt holding only that section, so a broken diagram costs a
+fraction of regenerating the document.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from repodoc.ollama import OllamaClient, Task
+
+logger = logging.getLogger("repodoc")
+
+# Keywords a Mermaid diagram can start with
+DIAGRAM_TYPES = frozenset(
+    {
+        "architecture-beta",
+        "block-beta",
+        "C4Component",
+        "C4Container",
+        "C4Context",
+        "C4Deployment",
+        "C4Dynamic",
+        "classDiagram",
+        "erDiagram",
+        "flowchart",
+        "gantt",
+        "gitGraph",
+        "graph",
+        "journey",
+        "mindmap",
+        "pie",
+        "quadrantChart",
+        "requirementDiagram",
+        "sankey-beta",
+        "sequenceDiagram",
+        "stateDiagram",
+        "stateDiagram-v2",
+        "timeline",
+        "xychart-beta",
+    }
+)
+
+# Lines a section may not end with: words, commas and open brackets
+_TRUNCATED_END = re.compile(r"[\w,;(\[{]$")
+
+# Block elements whose lines need no closing punctuation
+_BLOCK_START = re.compile(r"^(#|\||[-*+] |\d+[.)] |>|<|!\[|\[)")
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_SECTION_HEADER = re.compile(r"^#{2,3} \S")
+_BRACKETS = {")": "(", "]": "[", "}": "{"}
+_QUOTED = re.compile(r'"[^"]*"')
+
+
+@dataclass(frozen=True)
+class Block:
+    """A fenced code block.
+
+    Attributes:
+        info: Info string after the opening fence, e.g. ``mermaid``.
+        body: Lines between the fences.
+        closed: Whether a closing fence was found.
+    """
+
+    info: str
+    body: str
+    closed: bool
+
+
+def code_blocks(text: str) -> List[Block]:
+    """Find the fenced code blocks of a markdown text.
+
+    Args:
+        text: Markdown text.
+
+    Returns:
+        Blocks in order; an unclosed block runs to the end of the text.
+    """
+    blocks = []
+    opening: Optional[Tuple[str, str]] = None
+    body: List[str] = []
+    for line in text.splitlines():
+        match = _FENCE.match(line)
+        if opening is None:
+            if match:
+                opening = (match.group(1), line.strip()[3:].strip())
+                body = []
+        elif match and match.group(1) == opening[0] and not line.strip()[3:].strip():
+            blocks.append(Block(opening[1], "\n".join(body), True))
+            opening = None
+        else:
+            body.append(line)
+    if opening is not None:
+        blocks.append(Block(opening[1], "\n".join(body), False))
+    return blocks
+
+
+def split_sections(doc: str) -> List[str]:
+    """Split a document before every level 2 and 3 header.
+
+    Headers inside code blocks are not section boundaries.
+
+    Args:
+        doc: Markdown document.
+
+    Returns:
+        Sections with their line endings; joined they give back *doc*.
+    """
+    sections: List[str] = []
+    current: List[str] = []
+    fence: Optional[str] = None
+    for line in doc.splitlines(keepends=True):
+        match = _FENCE.match(line)
+        if fence is None and _SECTION_HEADER.match(line) and current:
+            sections.append("".join(current))
+            current = []
+        if match and fence is None:
+            fence = match.group(1)
+        elif match and match.group(1) == fence:
+            fence = None
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def check_mermaid(diagram: str) -> Optional[str]:
+    """Check that a Mermaid diagram looks renderable.
+
+    Only cheap structural checks are made: a known diagram type and
+    brackets balanced on every line outside quoted labels.
+
+    Args:
+        diagram: Diagram source between the fences.
+
+    Returns:
+        A description of the first problem, or None.
+    """
+    lines = [
+        line.strip()
+        for line in diagram.splitlines()
+        if line.strip() and not line.strip().startswith("%%")
+    ]
+    if not lines:
+        return "empty Mermaid diagram"
+    kind = lines[0].split()[0]
+    if kind not in DIAGRAM_TYPES:
+        return f"Mermaid diagram starts with unknown type '{kind}'"
+    for line in lines[1:]:
+        stack: List[str] = []
+        for char in _QUOTED.sub("", line):
+            if char in "([{":
+                stack.append(char)
+            elif char in _BRACKETS and (not stack or stack.pop() != _BRACKETS[char]):
+                return f"unbalanced brackets in Mermaid line '{line}'"
+        if stack:
+            return f"unbalanced brackets in Mermaid line '{line}'"
+    return None
+
+
+def _ends_mid_sentence(text: str) -> bool:
+    """Check whether prose ends without closing punctuation.
+
+    Args:
+        text: Markdown text with code blocks.
+
+    Returns:
+        True if the last line outside code blocks is a paragraph line
+        ending in a word, a comma or an open bracket.
+    """
+    last = ""
+    fence: Optional[str] = None
+    for line in text.splitlines():
+        match = _FENCE.match(line)
+        if match and fence is None:
+            fence, last = match.group(1), ""
+        elif match and match.group(1) == fence:
+            fence, last = None, ""
+        elif fence is None and line.strip():
+            last = line.strip()
+    if not last or _BLOCK_START.match(last):
+        return False
+    return bool(_TRUNCATED_END.search(last))
+
+
+def check_section(section: str) -> List[str]:
+    """Check one section of a document.
+
+    Args:
+        section: Section text, starting with its header.
+
+    Returns:
+        Descriptions of its problems; empty if it looks sound.
+    """
+    problems = []
+    for block in code_blocks(section):
+        if not block.closed:
+            problems.append("code block is never closed")
+        if block.info.split()[:1] == ["mermaid"]:
+            problem = check_mermaid(block.body)
+            if problem:
+                problems.append(problem)
+    if _ends_mid_sentence(section):
+        problems.append("text ends mid-sentence")
+    return problems
+
+
+def count_diagrams(doc: str) -> int:
+    """Count the valid Mermaid diagrams of a document.
+
+    Args:
+        doc: Markdown document.
+
+    Returns:
+        Closed ``mermaid`` blocks passing :func:`check_mermaid`.
+    """
+    return sum(
+        1
+        for block in code_blocks(doc)
+        if block.closed
+        and block.info.split()[:1] == ["mermaid"]
+        and check_mermaid(block.body) is None
+    )
+
+
+def validate(doc: str, *, title: str, diagrams: int = 0) -> List[str]:
+    """Check a generated document.
+
+    Args:
+        doc: Markdown document.
+        title: Document title, expected as its level 2 header.
+        diagrams: Minimum number of Mermaid diagrams.
+
+    Returns:
+        Descriptions of its problems; empty if it looks sound.
+    """
+    problems = []
+    header = f"## {title}"
+    if not any(line.strip() == header for line in doc.splitlines()):
+        problems.append(f"missing the '{header}' header")
+    found = count_diagrams(doc)
+    if found < diagrams:
+        problems.append(f"{found} of at least {diagrams} Mermaid diagrams")
+    for section in split_sections(doc):
+        problems.extend(check_section(section))
+    return problems
+
+
+def build_repair_prompt(title: str, section: str, problems: List[str]) -> str:
+    """Build a prompt fixing one section of a document.
+
+    Args:
+        title: Title of the document.
+        section: Section text.
+        problems: Problems found in the section.
+
+    Returns:
+        Prompt string asking for the corrected section only.
+    """
+    listing = "\n".join(f"- {problem}" for problem in problems)
+    return f"""The following section of the '{title}' documentation has these problems:
+{listing}
+
+Rewrite the section so that the problems are fixed. Keep its header, content
+and wording otherwise unchanged; complete text that was cut off, close every
+code block and use valid Mermaid syntax in diagrams. Respond with the
+corrected section in markdown and nothing else.
+
+Section:
+{section.strip()}"""
+
+
+def build_diagram_prompt(title: str, doc: str) -> str:
+    """Build a prompt for a diagram missing from a document.
+
+    Only the section headers and their first lines are sent.
+
+    Args:
+        title: Title of the document.
+        doc: Markdown document.
+
+    Returns:
+        Prompt string asking for a single Mermaid diagram.
+    """
+    summary = []
+    for section in split_sections(doc):
+        lines = [line.strip() for line in section.splitlines() if line.strip()]
+        summary.extend(lines[:2])
+    outline = "\n".join(summary)
+    return f"""The following is an outline of the '{title}' documentation of a project.
+Draw one Mermaid diagram of the components it describes and how they interact.
+Respond with a single ```mermaid code block and nothing else.
+
+{outline}"""
+
+
+def _diagram_section(response: str) -> Optional[str]:
+    """Turn a diagram response into a document section.
+
+    Args:
+        response: Model response, a fenced or bare Mermaid diagram.
+
+    Returns:
+        A ``### Diagram`` section, or None if no valid diagram was returned.
+    """
+    blocks = [block for block in code_blocks(response) if block.closed]
+    diagram = blocks[0].body if blocks else response.strip()
+    if check_mermaid(diagram) is not None:
+        return None
+    return f"### Diagram\n\n```mermaid\n{diagram.strip()}\n```\n"
+
+
+async def repair(
+    doc: str, client: OllamaClient, *, title: str, diagrams: int = 0
+) -> str:
+    """Fix the problems :func:`validate` finds, one section at a time.
+
+    A missing top-level header is added without the model. Every failing
+    section is sent alone in a repair request, all at once; a rewrite is
+    kept only if it has fewer problems than the original. Missing diagrams
+    are requested in one request from an outline of the document and
+    appended. Each section is repaired at most once.
+
+    Args:
+        doc: Markdown document.
+        client: Ollama client for text generation.
+        title: Document title, expected as its level 2 header.
+        diagrams: Minimum number of Mermaid diagrams.
+
+    Returns:
+        The repaired document; *doc* itself if no problem was found.
+    """
+    if not validate(doc, title=title, diagrams=diagrams):
+        return doc
+    sections = split_sections(doc)
+    header = f"## {title}"
+    if not any(line.strip() == header for line in doc.splitlines()):
+        sections.insert(0, f"{header}\n\n")
+    failing = [
+        (i, problems)
+        for i, section in enumerate(sections)
+        if (problems := check_section(section))
+    ]
+    responses = await asyncio.gather(
+        *(
+            client.generate(
+                build_repair_prompt(title, sections[i], problems), task=Task.REPAIR
+            )
+            for i, problems in failing
+        )
+    )
+    repaired = 0
+    for (i, problems), response in zip(failing, responses):
+        rewrite = response.strip()
+        if rewrite and len(check_section(rewrite)) < len(problems):
+            ending = "\n\n" if i < len(sections) - 1 else "\n"
+            sections[i] = rewrite + ending
+            repaired += 1
+        else:
+            logger.warning(f"Could not repair a section of {title}: {problems[0]}")
+
+    result = "".join(sections)
+    missing = count_diagrams(result) < diagrams
+    if missing:
+        response = await client.generate(
+            build_diagram_prompt(title, result), task=Task.REPAIR
+        )
+        section = _diagram_section(response)
+        if section is None:
+            logger.warning(f"Could not add a missing diagram to {title}")
+        else:
+            result = result.rstrip("\n") + "\n\n" + section
+            repaired += 1
+    if failing or missing:
+        logger.info(f"Repaired {repaired} problem areas of {title} in place")
+    return result
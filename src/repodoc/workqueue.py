@@ -0,0 +1,675 @@
+"""Work queue distributing generation requests across machines.
+
+A queue directory, shared by every participant, holds a SQLite database of
+jobs and a content-addressed cache of results. ``repodoc generate --queue``
+runs the generators as usual, but each model request becomes a job keyed
+like the run journal (see :func:`~repodoc.journal.request_key`) instead of
+being sent to Ollama. ``repodoc worker`` processes, one or more per machine
+and each talking to its own Ollama host, lease jobs, keep their leases alive
+with heartbeats while generating, and store the response in the cache. A job
+whose lease expires, because its worker died or lost the shared directory,
+is handed to the next worker until it has been attempted
+:data:`MAX_ATTEMPTS` times.
+
+Throughput grows with the number of workers, without a broker: SQLite's
+file locks serialize claims. The directory must be on a filesystem with
+working POSIX locks, as local disks and most NFS setups provide.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from repodoc.errors import OllamaError, OutputDirectoryError
+from repodoc.ollama import OllamaClient, Task
+from repodoc.payload import Prompt, iter_text
+
+logger = logging.getLogger("repodoc")
+
+# Seconds a claimed job stays leased without a heartbeat
+LEASE_SECONDS = 60.0
+
+# Leases are renewed this many times per lease period
+HEARTBEATS_PER_LEASE = 3
+
+# Claims of a job before it is given up
+MAX_ATTEMPTS = 3
+
+# Seconds between checks for new jobs and finished results
+POLL_SECONDS = 0.5
+
+# Keys checked per query, below SQLite's limit on bound parameters
+_KEYS_PER_QUERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    submitted REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, submitted);
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    """A claimed generation request.
+
+    Attributes:
+        key: Request key, also the key of its result in the cache.
+        payload: Model, task, options and prompt of the request.
+        attempts: Claims so far, including this one.
+    """
+
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class WorkQueue:
+    """Jobs with leases in a SQLite database.
+
+    A job is ``pending`` until a worker claims it, ``leased`` while the
+    worker holds an unexpired lease, and ``done`` or ``failed`` at the end.
+
+    Attributes:
+        path: Database file.
+        max_attempts: Claims of a job before it is given up.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_attempts: int = MAX_ATTEMPTS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Open a queue, creating the database if needed.
+
+        Args:
+            path: Database file; parent directories are created.
+            max_attempts: Claims of a job before it is given up.
+            clock: Wall-clock time in seconds, shared by all machines.
+
+        Raises:
+            OutputDirectoryError: If the database cannot be created.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._clock = clock
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            raise OutputDirectoryError(f"Failed to create queue directory: {e}")
+        with self._transaction() as db:
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    db.execute(statement)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction on a fresh connection.
+
+        A connection per transaction keeps the queue usable from worker
+        threads and never holds a lock between operations.
+
+        Yields:
+            The connection, inside ``BEGIN IMMEDIATE``.
+
+        Raises:
+            OutputDirectoryError: If the database cannot be used.
+        """
+        try:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        except sqlite3.Error as e:
+            raise OutputDirectoryError(f"Failed to open work queue: {e}")
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            yield db
+            db.execute("COMMIT")
+        except sqlite3.Error as e:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise OutputDirectoryError(f"Work queue error: {e}")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def submit(self, key: str, payload: Dict[str, Any]) -> None:
+        """Add a job, or retry it if it failed before.
+
+        A job submitted again while pending, leased or done is left alone,
+        so runs asking for the same request share its work.
+
+        Args:
+            key: Request key.
+            payload: Model, task, options and prompt of the request.
+        """
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO jobs (key, payload, state, submitted) "
+                "VALUES (?, ?, 'pending', ?) "
+                "ON CONFLICT (key) DO UPDATE SET state = 'pending', owner = NULL, "
+                "attempts = 0, error = NULL, payload = excluded.payload "
+                "WHERE state = 'failed'",
+                (key, json.dumps(payload), self._clock()),
+            )
+
+    def claim(self, owner: str, lease_seconds: float = LEASE_SECONDS) -> Optional[Job]:
+        """Lease the oldest pending job or one whose lease expired.
+
+        Jobs whose lease expired after their last attempt are failed.
+
+        Args:
+            owner: Identity of the claiming worker.
+            lease_seconds: Lease duration.
+
+        Returns:
+            The claimed job, or None if there is nothing to do.
+        """
+        now = self._clock()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET state = 'failed', owner = NULL, "
+                "error = 'lease expired after ' || attempts || ' attempts' "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = db.execute(
+                "SELECT key, payload, attempts FROM jobs WHERE state = 'pending' "
+                "OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY submitted LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            key, payload, attempts = row
+            db.execute(
+                "UPDATE jobs SET state = 'leased', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE key = ?",
+                (owner, now + lease_seconds, key),
+            )
+        return Job(key, json.loads(payload), attempts + 1)
+
+    def requeue(self, key: str) -> None:
+        """Make a done job pending again, e.g. after its result was deleted.
+
+        Args:
+            key: Request key.
+        """
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, error = NULL "
+                "WHERE key = ? AND state = 'done'",
+                (key,),
+            )
+
+    def heartbeat(
+        self, key: str, owner: str, lease_seconds: float = LEASE_SECONDS
+    ) -> bool:
+        """Extend the lease of a job.
+
+        Args:
+            key: Request key.
+            owner: Worker holding the lease.
+            lease_seconds: New lease duration from now.
+
+        Returns:
+            Whether *owner* still held the lease.
+        """
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_expires = ? "
+                "WHERE key = ? AND owner = ? AND state = 'leased'",
+                (self._clock() + lease_seconds, key, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, key: str) -> None:
+        """Mark a job done once its result is in the cache.
+
+        The result is valid whoever computed it, so this succeeds even
+        after the lease was lost.
+
+        Args:
+            key: Request key.
+        """
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET state = 'done', owner = NULL, error = NULL "
+                "WHERE key = ?",
+                (key,),
+            )
+
+    def fail(self, key: str, owner: str, error: str) -> None:
+        """Release a job after a failed attempt.
+
+        The job is pending again until it has been attempted
+        :attr:`max_attempts` times, then failed.
+
+        Args:
+            key: Request key.
+            owner: Worker holding the lease.
+            error: Description of the failure.
+        """
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET owner = NULL, error = ?, state = CASE "
+                "WHEN attempts >= ? THEN 'failed' ELSE 'pending' END "
+                "WHERE key = ? AND owner = ? AND state = 'leased'",
+                (error, self.max_attempts, key, owner),
+            )
+
+    def settled(self, keys: Iterable[str]) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Look up which of several jobs are done or failed.
+
+        Args:
+            keys: Request keys.
+
+        Returns:
+            Key -> final state and error, for finished jobs only.
+        """
+        keys = list(keys)
+        settled = {}
+        with self._transaction() as db:
+            for start in range(0, len(keys), _KEYS_PER_QUERY):
+                batch = keys[start : start + _KEYS_PER_QUERY]
+                marks = ", ".join("?" * len(batch))
+                rows = db.execute(
+                    f"SELECT key, state, error FROM jobs WHERE key IN ({marks}) "
+                    "AND state IN ('done', 'failed')",
+                    batch,
+                )
+                settled.update({key: (state, error) for key, state, error in rows})
+        return settled
+
+    def counts(self) -> Dict[str, int]:
+        """Count jobs by state.
+
+        Returns:
+            State -> number of jobs.
+        """
+        with self._transaction() as db:
+            rows = db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state")
+            return dict(rows.fetchall())
+
+
+class ResultCache:
+    """Content-addressed store of generated responses.
+
+    Results are files named after their request key, written atomically,
+    so readers on any machine see either nothing or the whole response.
+
+    Attributes:
+        root: Cache directory.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Cache directory; created on the first write.
+        """
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        """Return the file of a result.
+
+        Args:
+            key: Request key.
+
+        Returns:
+            ``<root>/<first two hex digits>/<key>.txt``.
+        """
+        return self.root / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        """Read a result.
+
+        Args:
+            key: Request key.
+
+        Returns:
+            The response, or None if it is not cached.
+
+        Raises:
+            OutputDirectoryError: If the result cannot be read.
+        """
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise OutputDirectoryError(f"Failed to read cached result: {e}")
+
+    def put(self, key: str, text: str) -> None:
+        """Store a result.
+
+        Args:
+            key: Request key.
+            text: Response.
+
+        Raises:
+            OutputDirectoryError: If the result cannot be written.
+        """
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=path.parent, delete=False
+            ) as tmp:
+                tmp.write(text)
+            os.replace(tmp.name, path)
+        except OSError as e:
+            raise OutputDirectoryError(f"Failed to write cached result: {e}")
+
+
+def open_queue(queue_dir: Path) -> Tuple[WorkQueue, ResultCache]:
+    """Open the queue and result cache of a shared queue directory.
+
+    Args:
+        queue_dir: Directory shared by the coordinator and all workers.
+
+    Returns:
+        The work queue and the result cache.
+
+    Raises:
+        OutputDirectoryError: If the queue cannot be created.
+    """
+    return WorkQueue(queue_dir / "queue.db"), ResultCache(queue_dir / "results")
+
+
+class QueueClient(OllamaClient):
+    """Client handing generation requests to workers through a work queue.
+
+    Responses found in the result cache, from any earlier run or machine,
+    are returned at once. Embeddings are still computed through
+    :attr:`url`, since retrieval needs them locally.
+
+    Attributes:
+        queue: Queue jobs are submitted to.
+        cache: Cache workers store responses in.
+        poll_seconds: Seconds between checks for finished jobs.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        cache: ResultCache,
+        *args: Any,
+        poll_seconds: float = POLL_SECONDS,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the client.
+
+        Args:
+            queue: Queue jobs are submitted to.
+            cache: Cache workers store responses in.
+            *args: Positional arguments of :class:`OllamaClient`.
+            poll_seconds: Seconds between checks for finished jobs.
+            **kwargs: Keyword arguments of :class:`OllamaClient`.
+        """
+        super().__init__(*args, **kwargs)
+        self.queue = queue
+        self.cache = cache
+        self.poll_seconds = poll_seconds
+        self._waiters: Dict[str, asyncio.Future[str]] = {}
+        self._poller: Optional[asyncio.Task[None]] = None
+
+    async def generate(
+        self,
+        prompt: Prompt,
+        *,
+        temperature: float = 0.2,
+        format: Optional[Any] = None,
+        task: Any = Task.SYNTHESIZE,
+    ) -> str:
+        """Generate text on a worker.
+
+        Args:
+            prompt: Prompt string or segments.
+            temperature: Sampling temperature.
+            format: Response format constraint, if any.
+            task: Task type, selecting the model through :attr:`routes`.
+
+        Returns:
+            Generated text.
+
+        Raises:
+            OllamaError: If the job failed on every attempt.
+        """
+        task = Task(task)
+        model = self.model_for(task)
+        fields = self._fields(model, temperature, format)
+        key = await asyncio.to_thread(self._request_key, fields, prompt)
+        if self.journal:
+            recorded, done = self.journal.get(key)
+            if done:
+                return recorded
+
+        started = time.perf_counter()
+        text = await asyncio.to_thread(self.cache.get, key)
+        prompt_text = ""
+        if text is None:
+            prompt_text = "".join(iter_text(prompt))
+            payload = {
+                "model": model,
+                "task": task.value,
+                "temperature": temperature,
+                "format": format,
+                "prompt": prompt_text,
+            }
+            await asyncio.to_thread(self.queue.submit, key, payload)
+            text = await self._wait(key)
+        if self.journal:
+            self.journal.append(key, text)
+            self.journal.complete(key)
+        self.metrics.record(
+            task.value,
+            model,
+            prompt_chars=len(prompt_text),
+            response_chars=len(text),
+            seconds=time.perf_counter() - started,
+        )
+        return text
+
+    async def _wait(self, key: str) -> str:
+        """Wait for a submitted job to finish.
+
+        One background task polls for all waiting jobs at once.
+
+        Args:
+            key: Request key.
+
+        Returns:
+            The response.
+
+        Raises:
+            OllamaError: If the job failed.
+        """
+        future = self._waiters.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[key] = future
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        return await future
+
+    async def _poll(self) -> None:
+        """Resolve the waiting jobs as they finish."""
+        while self._waiters:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                settled = await asyncio.to_thread(
+                    self.queue.settled, list(self._waiters)
+                )
+                for key, (state, error) in settled.items():
+                    if state == "done":
+                        text = await asyncio.to_thread(self.cache.get, key)
+                        if text is None:  # result deleted from the cache
+                            await asyncio.to_thread(self.queue.requeue, key)
+                            continue
+                    future = self._waiters.pop(key)
+                    if future.done():
+                        continue  # the waiting request was cancelled
+                    if state == "done":
+                        future.set_result(text)
+                    else:
+                        future.set_exception(
+                            OllamaError(f"Queued generation failed: {error}")
+                        )
+            except Exception as e:
+                for future in self._waiters.values():
+                    if not future.done():
+                        future.set_exception(e)
+                self._waiters.clear()
+
+    async def warm_up(self, tasks: Iterable[Any] = ()) -> List[str]:
+        """Load no models; workers load their own.
+
+        Args:
+            tasks: Ignored.
+
+        Returns:
+            An empty list.
+        """
+        return []
+
+
+class Worker:
+    """Process pulling jobs from a work queue and running them on Ollama.
+
+    Attributes:
+        queue: Queue jobs are claimed from.
+        cache: Cache responses are stored in.
+        owner: Identity of this worker in job leases.
+        lease_seconds: Lease duration, renewed while a job runs.
+        processed: Jobs completed by this worker.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        cache: ResultCache,
+        client_for: Callable[[str], OllamaClient],
+        *,
+        owner: str,
+        lease_seconds: float = LEASE_SECONDS,
+        poll_seconds: float = POLL_SECONDS,
+    ) -> None:
+        """Initialize the worker.
+
+        Args:
+            queue: Queue jobs are claimed from.
+            cache: Cache responses are stored in.
+            client_for: Returns the client generating with a model; jobs
+                name the model the coordinator routed them to.
+            owner: Identity of this worker in job leases, e.g. host and pid.
+            lease_seconds: Lease duration, renewed while a job runs.
+            poll_seconds: Seconds between checks for new jobs.
+        """
+        self.queue = queue
+        self.cache = cache
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.processed = 0
+        self._client_for = client_for
+        self._poll_seconds = poll_seconds
+
+    async def run(
+        self, concurrency: int = 1, idle_exit: Optional[float] = None
+    ) -> int:
+        """Process jobs until stopped or idle.
+
+        Args:
+            concurrency: Jobs processed at once.
+            idle_exit: Stop after this many seconds without a job; None to
+                run until cancelled.
+
+        Returns:
+            Jobs completed.
+        """
+        await asyncio.gather(*(self._loop(idle_exit) for _ in range(concurrency)))
+        return self.processed
+
+    async def _loop(self, idle_exit: Optional[float]) -> None:
+        """Claim and process jobs one at a time.
+
+        Args:
+            idle_exit: Stop after this many seconds without a job, if set.
+        """
+        idle_since = time.monotonic()
+        while True:
+            job = await asyncio.to_thread(
+                self.queue.claim, self.owner, self.lease_seconds
+            )
+            if job is None:
+                if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                    return
+                await asyncio.sleep(self._poll_seconds)
+                continue
+            await self.process(job)
+            idle_since = time.monotonic()
+
+    async def process(self, job: Job) -> None:
+        """Generate the response of a claimed job while renewing its lease.
+
+        Args:
+            job: Claimed job.
+        """
+        payload = job.payload
+        logger.info(
+            f"Job {job.key[:12]}: {payload['task']} with {payload['model']} "
+            f"(attempt {job.attempts})"
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(job.key))
+        try:
+            if await asyncio.to_thread(self.cache.get, job.key) is None:
+                text = await self._client_for(payload["model"]).generate(
+                    payload["prompt"],
+                    temperature=payload["temperature"],
+                    format=payload["format"],
+                    task=payload["task"],
+                )
+                await asyncio.to_thread(self.cache.put, job.key, text)
+        except OllamaError as e:
+            logger.warning(f"Job {job.key[:12]} failed: {e}")
+            await asyncio.to_thread(self.queue.fail, job.key, self.owner, str(e))
+            return
+        finally:
+            heartbeat.cancel()
+        await asyncio.to_thread(self.queue.complete, job.key)
+        self.processed += 1
+
+    async def _heartbeat(self, key: str) -> None:
+        """Renew the lease of a running job until cancelled.
+
+        Args:
+            key: Request key.
+        """
+        while True:
+            await asyncio.sleep(self.lease_seconds / HEARTBEATS_PER_LEASE)
+            held = await asyncio.to_thread(
+                self.queue.heartbeat, key, self.owner, self.lease_seconds
+            )
+            if not held:
+                logger.warning(f"Lost the lease of job {key[:12]}")
+                return
@@ -13,6 +13,7 @@ KIND_TO_FILENAME: Dict[str, str] = {
     "api": "api-docs.md",
     "manual": "user-manual.md",
     "architecture": "architecture.md",
+    "index": "index.md",
 }
 
 
@@ -0,0 +1,95 @@
+"""Tests for static API extraction."""
+
+from repodoc.apiref import extract_api, extract_module, is_public_module, render_api
+
+SOURCE = '''"""Storage backends.
+
+Longer description.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class Record:
+    """A stored record."""
+
+    key: str
+    value: int = 0
+
+
+class Store:
+    """Key-value store."""
+
+    def __init__(self, path: str, *, create: bool = False) -> None:
+        self.path = path
+
+    def get(self, key: str) -> Record | None:
+        """Look up a record."""
+
+    @staticmethod
+    def open(path: str) -> "Store":
+        return Store(path)
+
+    def _flush(self) -> None:
+        pass
+
+
+def connect(url: str = "sqlite:///a-very-long-default-value/that/is/elided.db"):
+    pass
+
+
+def _helper():
+    pass
+'''
+
+
+def test_is_public_module() -> None:
+    """Test which files are documented."""
+    assert is_public_module("src/pkg/store.py")
+    assert is_public_module("pkg/__init__.py")
+    assert not is_public_module("pkg/_internal.py")
+    assert not is_public_module("tests/test_store.py")
+    assert not is_public_module("README.md")
+
+
+def test_extract_module() -> None:
+    """Test signatures, docstrings and visibility."""
+    module = extract_module("src/pkg/store.py", SOURCE)
+
+    assert module.name == "pkg.store"
+    assert module.description == "Storage backends."
+    assert [(s.qualname, s.signature, s.description) for s in module.symbols] == [
+        ("Record", "Record(key: str, value: int=0)", "A stored record."),
+        ("Store", "Store(path: str, *, create: bool=False)", "Key-value store."),
+        ("Store.get", "get(key: str) -> Record | None", "Look up a record."),
+        ("Store.open", "open(path: str) -> 'Store'", ""),
+        ("connect", "connect(url: str=...)", ""),
+    ]
+    assert (
+        module.symbols[3].snippet
+        == 'def open(path: str) -> "Store":\n    return Store(path)'
+    )
+
+
+def test_extract_respects_all() -> None:
+    """Test that ``__all__`` limits the exported names."""
+    source = '__all__ = ["b"]\n\ndef a():\n    pass\n\ndef b():\n    pass\n'
+    [module] = extract_api([("pkg/mod.py", source), ("pkg/empty.py", "")])
+    assert [s.qualname for s in module.symbols] == ["b"]
+
+
+def test_render_api() -> None:
+    """Test that tables are grouped by module and class."""
+    rendered = render_api([extract_module("pkg/store.py", SOURCE)])
+
+    assert rendered.startswith("## API\n\n### `pkg.store`\n\nStorage backends.\n")
+    assert (
+        "| Function | Description |\n| --- | --- |\n| `connect(url: str=...)` |  |"
+        in rendered
+    )
+    assert (
+        "#### `class Store(path: str, *, create: bool=False)`\n\nKey-value store."
+        in rendered
+    )
+    assert "| `get(key: str) -> Record \\| None` | Look up a record. |" in rendered
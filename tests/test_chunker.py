@@ -4,7 +4,7 @@ from pathlib import Path
 
 import pytest
 
-from repodoc.chunker import iter_chunks
+from repodoc.chunker import iter_chunks, iter_line_chunks
 
 
 @pytest.fixture
@@ -83,3 +83,12 @@ def test_chunk_empty_file(tmp_path: Path) -> None:
 
     chunks = list(iter_chunks(empty))
     assert chunks == []
+
+
+def test_line_chunks() -> None:
+    """Line chunks keep whole lines and report their line range."""
+    text = "".join(f"line{i:03d}\n" for i in range(1, 11))  # 8 chars per line
+    chunks = list(iter_line_chunks(text, max_tokens=6))  # 24 chars
+
+    assert [(start, end) for start, end, _ in chunks] == [(1, 3), (4, 6), (7, 9), (10, 10)]
+    assert "".join(chunk for _, _, chunk in chunks) == text
@@ -2,6 +2,9 @@
 
 import asyncio
 import logging
+import os
+import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -9,8 +12,9 @@ import pytest
 import typer
 from typer.testing import CliRunner
 
-from repodoc.cli import app, _generate_docs
-from repodoc.errors import OutputDirectoryError
+from repodoc.cli import app, _generate_docs, _parse_duration
+from repodoc.config import Config, Performance
+from repodoc.errors import InputFileError, OutputDirectoryError
 from repodoc.ollama import OllamaClient
 
 
@@ -53,13 +57,13 @@ async def test_generate_docs_success(tmp_path: Path, mock_console: MagicMock) ->
 
     # Mock Ollama client
     mock_client = AsyncMock(spec=OllamaClient)
-    mock_client.generate.return_value = "Test documentation"
+    mock_client.generate.return_value = "Test documentation."
 
-    with patch("repodoc.cli.run_repomix", return_value=project_file), \
-         patch("repodoc.cli.OllamaClient", return_value=mock_client), \
-         patch("repodoc.cli.setup_logging", return_value=mock_console), \
-         patch("repodoc.cli.write") as mock_write, \
-         patch("repodoc.cli.Confirm.ask", return_value=True):
+    with patch("repodoc.parser.stream_repomix", AsyncMock(return_value=project_file)), \
+         patch("repodoc.ollama.OllamaClient", return_value=mock_client), \
+         patch("repodoc.logging.setup_logging", return_value=mock_console), \
+         patch("repodoc.writer.write") as mock_write, \
+         patch("rich.prompt.Confirm.ask", return_value=True):
         
         await _generate_docs(repo_path, tmp_path / "docs", verbose=True)
         
@@ -67,12 +71,16 @@ async def test_generate_docs_success(tmp_path: Path, mock_console: MagicMock) ->
         logger = logging.getLogger("repodoc")
         assert logger.getEffectiveLevel() == logging.WARNING
         
-        # Verify client was called for each generator
-        assert mock_client.generate.call_count == 3
+        # Verify client was called once for each generator, plus once for
+        # the diagram missing from the architecture document
+        assert mock_client.generate.call_count == 4
         
         # Verify files were written
         assert mock_write.call_count == 3
 
+        # The journal is only kept for runs that did not complete
+        assert not (tmp_path / "docs" / ".repodoc" / "journal.jsonl").exists()
+
 
 @pytest.mark.asyncio
 async def test_generate_docs_error(tmp_path: Path, mock_console: MagicMock) -> None:
@@ -95,14 +103,200 @@ async def test_generate_docs_error(tmp_path: Path, mock_console: MagicMock) -> N
     mock_client = AsyncMock(spec=OllamaClient)
     mock_client.generate.side_effect = Exception("Test error")
 
-    with patch("repodoc.cli.run_repomix", return_value=project_file), \
-         patch("repodoc.cli.OllamaClient", return_value=mock_client), \
-         patch("repodoc.cli.setup_logging", return_value=mock_console), \
-         patch("repodoc.cli.Confirm.ask", return_value=False):
+    with patch("repodoc.parser.stream_repomix", AsyncMock(return_value=project_file)), \
+         patch("repodoc.ollama.OllamaClient", return_value=mock_client), \
+         patch("repodoc.logging.setup_logging", return_value=mock_console), \
+         patch("rich.prompt.Confirm.ask", return_value=False):
         
         with pytest.raises(typer.Exit):  # Changed from SystemExit
             await _generate_docs(repo_path, tmp_path / "docs", verbose=True)
 
+    assert (tmp_path / "docs" / ".repodoc" / "journal.jsonl").exists()
+
+
+@pytest.mark.asyncio
+async def test_generate_docs_repomix_failure(
+    tmp_path: Path, mock_console: MagicMock
+) -> None:
+    """Test that a failed pack aborts without prompting per document.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        mock_console: Mock console instance.
+    """
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    (repo_path / ".git").mkdir()
+
+    mock_client = AsyncMock(spec=OllamaClient)
+    failure = AsyncMock(side_effect=InputFileError("repomix failed: boom"))
+
+    with patch("repodoc.parser.stream_repomix", failure), \
+         patch("repodoc.ollama.OllamaClient", return_value=mock_client), \
+         patch("repodoc.logging.setup_logging", return_value=mock_console), \
+         patch("rich.prompt.Confirm.ask") as mock_ask:
+
+        with pytest.raises(typer.Exit) as exc_info:
+            await _generate_docs(repo_path, tmp_path / "docs", verbose=True)
+
+    assert exc_info.value.exit_code == 1
+    mock_ask.assert_not_called()
+    mock_client.generate.assert_not_called()
+    mock_client.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_generate_docs_revision(tmp_path: Path, mock_console: MagicMock) -> None:
+    """Test that a revision is packed from Git instead of running repomix.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        mock_console: Mock console instance.
+    """
+    repo_path = tmp_path / "mirror.git"
+    repo_path.mkdir()
+    project_file = tmp_path / "project.txt"
+    project_file.write_text("Test project content")
+
+    mock_client = AsyncMock(spec=OllamaClient)
+    mock_client.generate.return_value = "Test documentation"
+    pack_revision = AsyncMock(return_value=project_file)
+
+    with patch("repodoc.gitpack.pack_revision", pack_revision), \
+         patch("repodoc.parser.stream_repomix") as mock_repomix, \
+         patch("repodoc.ollama.OllamaClient", return_value=mock_client), \
+         patch("repodoc.logging.setup_logging", return_value=mock_console), \
+         patch("repodoc.writer.write") as mock_write:
+
+        await _generate_docs(repo_path, tmp_path / "docs", verbose=False, rev="v1")
+
+    mock_repomix.assert_not_called()
+    args = pack_revision.call_args[0]
+    assert args[:3] == (repo_path, "v1", tmp_path / "docs" / ".repodoc" / "packs")
+    assert mock_write.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_generate_docs_revisions(tmp_path: Path, mock_console: MagicMock) -> None:
+    """Test that revisions share one journal and write to their own directories.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        mock_console: Mock console instance.
+    """
+    repo_path = tmp_path / "mirror.git"
+    repo_path.mkdir()
+    project_file = tmp_path / "project.txt"
+    project_file.write_text("Test project content")
+    docs = tmp_path / "docs"
+
+    mock_client = AsyncMock(spec=OllamaClient)
+    mock_client.generate.return_value = "Test documentation"
+
+    with patch("repodoc.gitpack.revision_range", AsyncMock(return_value=["v1", "v2"])), \
+         patch("repodoc.gitpack.list_tree", AsyncMock(return_value=[])), \
+         patch("repodoc.gitpack.pack_revision", AsyncMock(return_value=project_file)), \
+         patch("repodoc.ollama.OllamaClient", return_value=mock_client), \
+         patch("repodoc.journal.Journal") as mock_journal, \
+         patch("repodoc.logging.setup_logging", return_value=mock_console), \
+         patch("repodoc.writer.write") as mock_write:
+
+        await _generate_docs(repo_path, docs, verbose=False, revs="v1..v2")
+
+    mock_journal.assert_called_once()
+    assert [call.args[2] for call in mock_write.call_args_list].count(docs / "v2") == 3
+    assert {call.args[2] for call in mock_write.call_args_list} == {
+        docs / "v1",
+        docs / "v2",
+    }
+
+
+@pytest.mark.asyncio
+async def test_generate_docs_deadline(tmp_path: Path, mock_console: MagicMock) -> None:
+    """Test that a deadline run writes a draft of every document.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        mock_console: Mock console instance.
+    """
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    project_file = tmp_path / "project.txt"
+    project_file.write_text("Test project content")
+
+    mock_client = AsyncMock(spec=OllamaClient)
+    mock_client.generate.return_value = "Test documentation."
+
+    with patch("repodoc.parser.stream_repomix", AsyncMock(return_value=project_file)), \
+         patch("repodoc.ollama.OllamaClient", return_value=mock_client), \
+         patch("repodoc.logging.setup_logging", return_value=mock_console), \
+         patch("repodoc.writer.write") as mock_write:
+
+        await _generate_docs(repo_path, tmp_path / "docs", verbose=False, deadline=60)
+
+    # The pack holds no indexed files, so the draft already holds everything
+    assert mock_write.call_count == 3
+    assert not (tmp_path / "docs" / ".repodoc" / "journal.jsonl").exists()
+
+
+def test_parse_duration() -> None:
+    """Test the --deadline values."""
+    assert _parse_duration("300") == 300
+    assert _parse_duration("90s") == 90
+    assert _parse_duration("1.5m") == 90
+    assert _parse_duration("1H") == 3600
+    for value in ("soon", "0", "-5m", ""):
+        with pytest.raises(typer.BadParameter):
+            _parse_duration(value)
+
+
+@pytest.mark.asyncio
+async def test_generate_docs_packages(tmp_path: Path, mock_console: MagicMock) -> None:
+    """Test that packages are documented separately and only when changed.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        mock_console: Mock console instance.
+    """
+    repo_path = tmp_path / "shop"
+    for package in ("api", "web"):
+        (repo_path / package).mkdir(parents=True)
+        (repo_path / package / "go.mod").write_text(f"module {package}\n")
+        (repo_path / package / "main.go").write_text("package main\n")
+
+    def git(*args: str) -> None:
+        subprocess.run(
+            ["git", "-C", str(repo_path), "-c", "user.name=t", "-c",
+             "user.email=t@t", *args],
+            check=True,
+            capture_output=True,
+        )
+
+    git("init", "-q")
+    git("add", ".")
+    git("commit", "-q", "-m", "one")
+    docs = tmp_path / "docs"
+
+    async def run() -> AsyncMock:
+        mock_client = AsyncMock(spec=OllamaClient)
+        mock_client.generate.return_value = "Test documentation."
+        with patch("repodoc.ollama.OllamaClient", return_value=mock_client), \
+             patch("repodoc.logging.setup_logging", return_value=mock_console):
+            await _generate_docs(repo_path, docs, verbose=False, packages=True)
+        return mock_client
+
+    first = await run()
+    assert (docs / "api" / "api-docs.md").exists()
+    assert (docs / "web" / "architecture.md").exists()
+    index = (docs / "index.md").read_text()
+    assert "[API documentation](web/api-docs.md)" in index
+
+    assert (await run()).generate.call_count == 0
+
+    (repo_path / "web" / "main.go").write_text("package main\n\nfunc main() {}\n")
+    git("commit", "-q", "-am", "two")
+    assert (await run()).generate.call_count == first.generate.call_count / 2
+
 
 def test_cli_help(runner: CliRunner) -> None:
     """Test CLI help output.
@@ -134,8 +328,119 @@ def test_cli_verbose(runner: CliRunner, tmp_path: Path) -> None:
 
     with patch("repodoc.cli._generate_docs") as mock_generate:
         # Use absolute path to avoid any path resolution issues
-        result = runner.invoke(app, [str(repo_path.absolute()), "-v"])
+        result = runner.invoke(app, ["generate", str(repo_path.absolute()), "-v"])
         print(result.output)
         assert result.exit_code == 0
         mock_generate.assert_called_once()
-        assert mock_generate.call_args[0][2] is True  # verbose=True 
\ No newline at end of file
+        assert mock_generate.call_args[0][2] is True  # verbose=True 
+
+def test_cli_plan(runner: CliRunner, tmp_path: Path) -> None:
+    """Test that the plan command reports estimates without a model.
+
+    Args:
+        runner: CLI runner fixture.
+        tmp_path: Temporary directory provided by pytest.
+    """
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    (repo_path / ".git").mkdir()
+    pack = tmp_path / "repomix-output.xml"
+    pack.write_text(
+        '<files>\n<file path="app.py">\nprint("hi")\n</file>\n</files>\n'
+    )
+
+    with patch("repodoc.parser.stream_repomix", AsyncMock(return_value=pack)):
+        result = runner.invoke(
+            app, ["plan", str(repo_path), "-o", str(tmp_path / "docs")]
+        )
+
+    assert result.exit_code == 0, result.output
+    assert "Files: 1 of 1 kept" in result.output
+    assert "app.py" in result.output
+    assert "3 requests" in result.output
+    assert not (tmp_path / "docs").exists()
+
+
+def test_cli_tune(runner: CliRunner) -> None:
+    """Test that tune benchmarks every routed model and saves the profile.
+
+    Args:
+        runner: CLI runner fixture.
+    """
+    performance = Performance(concurrency=2, chunk_tokens=8000)
+    config = Config(model="big", routes={"summarize": "small"})
+    tune_host = AsyncMock(return_value=performance)
+
+    with patch("repodoc.config.load", return_value=config), \
+         patch("repodoc.tune.tune", tune_host), \
+         patch("repodoc.config.save_performance") as mock_save:
+        result = runner.invoke(app, ["tune", "--max-concurrency", "4"])
+
+    assert result.exit_code == 0, result.output
+    assert tune_host.call_args.args[1] == ["big", "small"]
+    assert tune_host.call_args.kwargs["levels"] == [1, 2, 4]
+    mock_save.assert_called_once_with(performance)
+    assert "concurrency = 2" in result.output
+
+
+def test_cli_worker_serves_queued_jobs(runner: CliRunner, tmp_path: Path) -> None:
+    """Test that a worker generates queued jobs with the job's model and exits idle.
+
+    Args:
+        runner: CLI runner fixture.
+        tmp_path: Temporary directory provided by pytest.
+    """
+    from repodoc.workqueue import open_queue
+
+    queue, cache = open_queue(tmp_path / "queue")
+    queue.submit(
+        "ab" * 32,
+        {"model": "small", "task": "summarize", "temperature": 0.2,
+         "format": None, "prompt": "Summarize"},
+    )
+    mock_client = AsyncMock(spec=OllamaClient)
+    mock_client.generate.return_value = "Summary."
+
+    with patch("repodoc.config.load", return_value=Config(model="big")), \
+         patch("repodoc.ollama.OllamaClient", return_value=mock_client) as factory:
+        result = runner.invoke(
+            app, ["worker", str(tmp_path / "queue"), "--idle-exit", "0"]
+        )
+
+    assert result.exit_code == 0, result.output
+    assert factory.call_args.args[1] == "small"
+    assert cache.get("ab" * 32) == "Summary."
+    assert queue.counts() == {"done": 1}
+
+
+def test_import_is_lazy() -> None:
+    """Importing the CLI must not pull in httpx, rich widgets or generators."""
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent / "src"))
+    code = (
+        "import sys, repodoc.cli; "
+        "print(sorted(m for m in ('httpx', 'rich.progress', 'rich.prompt', "
+        "'repodoc.ollama', 'repodoc.generators.api') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_help_imports_no_heavy_dependencies() -> None:
+    """``repodoc --help`` must not import httpx, rich widgets or generators."""
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent / "src"))
+    code = (
+        "import sys\n"
+        "from repodoc.cli import app\n"
+        "try:\n"
+        "    app(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted(m for m in ('httpx', 'rich.progress', 'rich.prompt', "
+        "'repodoc.ollama', 'repodoc.generators.api') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
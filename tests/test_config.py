@@ -7,7 +7,13 @@ from typing import Optional
 import pytest
 import tomli
 
-from repodoc.config import Config, load
+from repodoc.config import (
+    Config,
+    ModelProfile,
+    Performance,
+    load,
+    save_performance,
+)
 from repodoc.errors import ConfigurationError
 from conftest import as_cwd
 
@@ -108,4 +114,114 @@ def test_invalid_config_file(tmp_path: Path) -> None:
     config.write_text("invalid toml content")
     with as_cwd(config.parent):
         with pytest.raises(ConfigurationError, match="Invalid config.toml"):
-            load() 
\ No newline at end of file
+            load() 
+
+def test_model_routes(tmp_path: Path) -> None:
+    """Test task routes from the config file and environment.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory.
+    """
+    config = tmp_path / "config.toml"
+    config.write_text(
+        """[ollama]
+model = "devstral"
+keep_alive = "30m"
+
+[ollama.routes]
+summarize = "qwen2.5-coder:1.5b"
+extract = "qwen2.5-coder:1.5b"
+"""
+    )
+    with as_cwd(tmp_path):
+        os.environ["REPODOC_MODEL_EXTRACT"] = "llama3.2:3b"
+        try:
+            config = load()
+        finally:
+            del os.environ["REPODOC_MODEL_EXTRACT"]
+    assert config.keep_alive == "30m"
+    assert config.routes == {
+        "summarize": "qwen2.5-coder:1.5b",
+        "extract": "llama3.2:3b",
+    }
+
+
+def test_unknown_route(tmp_path: Path) -> None:
+    """Test that routes for unknown tasks are rejected.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory.
+    """
+    (tmp_path / "config.toml").write_text('[ollama.routes]\ntranslate = "x"\n')
+    with as_cwd(tmp_path):
+        with pytest.raises(ConfigurationError, match="Unknown task"):
+            load()
+
+
+def test_performance_precedence(tmp_path: Path) -> None:
+    """Test that performance settings follow file, env, CLI precedence.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory.
+    """
+    (tmp_path / "config.toml").write_text(
+        """[performance]
+concurrency = 2
+chunk_tokens = 8000
+
+[performance.models."qwen2.5-coder:7b"]
+prompt_rate = 850.5
+chunk_tokens = 4000
+"""
+    )
+    with as_cwd(tmp_path):
+        config = load()
+        assert config.performance.concurrency == 2
+        assert config.performance.models["qwen2.5-coder:7b"] == ModelProfile(
+            prompt_rate=850.5, chunk_tokens=4000
+        )
+        os.environ["REPODOC_CONCURRENCY"] = "3"
+        os.environ["REPODOC_CHUNK_TOKENS"] = "6000"
+        try:
+            config = load({"concurrency": 6})
+            assert config.performance.concurrency == 6
+            assert config.performance.chunk_tokens == 6000
+            os.environ["REPODOC_CONCURRENCY"] = "many"
+            with pytest.raises(ConfigurationError, match="REPODOC_CONCURRENCY"):
+                load()
+        finally:
+            del os.environ["REPODOC_CONCURRENCY"]
+            del os.environ["REPODOC_CHUNK_TOKENS"]
+
+
+def test_save_performance_keeps_other_settings(tmp_path: Path) -> None:
+    """Test that tuning results replace only the performance tables.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory.
+    """
+    path = tmp_path / "config.toml"
+    path.write_text(
+        """[ollama]
+model = "devstral"
+
+[performance]
+concurrency = 9
+
+[performance.models."old"]
+chunk_tokens = 1000
+
+[ollama.routes]
+summarize = "small"
+"""
+    )
+    performance = Performance(
+        concurrency=3, chunk_tokens=8000, models={"devstral": ModelProfile(1.5, 2.0)}
+    )
+    save_performance(performance, path)
+
+    with as_cwd(tmp_path):
+        config = load()
+    assert config.model == "devstral"
+    assert config.routes == {"summarize": "small"}
+    assert config.performance == performance
@@ -0,0 +1,158 @@
+"""Tests for deadline-bounded documentation runs."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Tuple
+from unittest.mock import AsyncMock
+
+import pytest
+
+from repodoc.deadline import first_budget, next_budget, refine
+from repodoc.generators.base import ContextMode, DocGenerator, _registry, register
+from repodoc.history import ThroughputHistory
+from repodoc.ollama import OllamaClient
+from repodoc.timeouts import ModelRates
+
+
+def _history() -> ThroughputHistory:
+    """Build a history of 1,000 prompt and 10 response tokens per second.
+
+    Returns:
+        History where a synthesis request takes 50s plus 1s per 1,000
+        context tokens.
+    """
+    return ThroughputHistory(
+        rates={"m": ModelRates(1000.0, 10.0, prompt_samples=1, token_samples=1)},
+        response_tokens={"synthesize": 500.0},
+    )
+
+
+def test_first_budget_fits_the_draft_share() -> None:
+    """Test that the draft round is planned from measured throughput."""
+    # 16,000 tokens take 66s, within a quarter of 300s; 32,000 take 82s
+    assert first_budget(_history(), "m", 300) == 16_000
+    assert first_budget(_history(), "m", 10) == 2_000
+    assert first_budget(ThroughputHistory(), "m", 3600) == 2_000
+
+
+def test_next_budget_extrapolates_the_last_round() -> None:
+    """Test the choice of the refinement budget."""
+    # Scaled by the request estimates: 32,000 tokens take 82s, 64,000 114s
+    assert next_budget(_history(), "m", 2_000, 52, 90) == 32_000
+    assert next_budget(_history(), "m", 2_000, 52, 90, total=10_000) == 16_000
+    # Without measurements the duration grows with the budget
+    assert next_budget(ThroughputHistory(), "m", 2_000, 10, 45) == 8_000
+    assert next_budget(ThroughputHistory(), "m", 2_000, 10, 15) is None
+    assert next_budget(_history(), "m", 16_000, 1, 1000, total=10_000) is None
+
+
+class FakeRepoMap:
+    """Repository map returning its budget as the context."""
+
+    def __bool__(self) -> bool:
+        """Pretend to hold definitions."""
+        return True
+
+    def context(self, path_weights: Any, budget: int) -> str:
+        """Return a context naming *budget*.
+
+        Args:
+            path_weights: Path weights of the generator (unused).
+            budget: Context budget in tokens.
+
+        Returns:
+            The context.
+        """
+        return f"context of {budget} tokens"
+
+
+@pytest.fixture
+def seeds() -> Iterator[dict]:
+    """Register a generator sending its context as the prompt.
+
+    Yields:
+        Scheduler seeds for a project of 10,000 tokens.
+    """
+
+    @register("test_deadline")
+    class Echo(DocGenerator):
+        async def generate(self, project: str, client: OllamaClient) -> str:
+            return await client.generate(project)
+
+    yield {
+        "repo_map": FakeRepoMap(),
+        "project": "whole project",
+        "files": SimpleNamespace(files=SimpleNamespace(total=lambda column: 10_000)),
+    }
+    _registry.pop("test_deadline")
+
+
+def _client(slow_from: int) -> OllamaClient:
+    """Build a fake client that answers with the prompt.
+
+    Args:
+        slow_from: Context budget from which requests take ten seconds.
+
+    Returns:
+        The client.
+    """
+    client = AsyncMock(spec=OllamaClient)
+    client.model_for.return_value = "m"
+
+    async def generate(prompt: str, **kwargs: Any) -> str:
+        budget = int(prompt.split()[2])
+        await asyncio.sleep(10 if budget >= slow_from else 0.01)
+        return f"## Doc\n\n{prompt}."
+
+    client.generate.side_effect = generate
+    return client
+
+
+@pytest.mark.asyncio
+async def test_refine_drafts_then_refines(seeds: dict) -> None:
+    """Test that a draft is replaced by a version holding the whole project.
+
+    Args:
+        seeds: Scheduler seeds from the fixture.
+    """
+    published: List[Tuple[str, str, int]] = []
+    result = await refine(
+        _client(slow_from=100_000),
+        seeds,
+        ["test_deadline"],
+        until=time.monotonic() + 30,
+        history=ThroughputHistory(),
+        generator_options={"context": ContextMode.INPUTS},
+        publish=lambda *doc: published.append(doc),
+    )
+
+    assert result == {"test_deadline": 16_000}
+    assert published == [
+        ("test_deadline", "## Doc\n\ncontext of 2000 tokens.", 2_000),
+        ("test_deadline", "## Doc\n\ncontext of 16000 tokens.", 16_000),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_refine_keeps_the_draft_at_the_deadline(seeds: dict) -> None:
+    """Test that a refinement cut off by the deadline is discarded.
+
+    Args:
+        seeds: Scheduler seeds from the fixture.
+    """
+    published: List[Tuple[str, str, int]] = []
+    started = time.monotonic()
+    result = await refine(
+        _client(slow_from=4_000),
+        seeds,
+        ["test_deadline"],
+        until=started + 0.5,
+        history=ThroughputHistory(),
+        generator_options={"context": ContextMode.REPO_MAP},
+        publish=lambda *doc: published.append(doc),
+    )
+
+    assert time.monotonic() - started < 2
+    assert result == {"test_deadline": 2_000}
+    assert [budget for _, _, budget in published] == [2_000]
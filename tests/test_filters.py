@@ -0,0 +1,126 @@
+"""Tests for duplicate and generated-file filtering."""
+
+from repodoc.filters import (
+    FilterReport,
+    classify,
+    filter_files,
+    is_ignored,
+    load_ignore,
+    minhash,
+    similarity,
+)
+from repodoc.index import RepoIndexBuilder, blob_hash, detect_language
+
+BODY = "\n".join(
+    f"def handler_{i}(request):\n    return respond(request, {i})" for i in range(40)
+)
+
+
+def build(files):
+    """Build an in-memory index over ``(path, content)`` pairs.
+
+    Args:
+        files: Files in pack order.
+
+    Returns:
+        Columnar index of the files.
+    """
+    builder = RepoIndexBuilder()
+    offset = 0
+    for path, content in files:
+        data = content.encode()
+        builder.add(
+            path,
+            offset=offset,
+            length=len(data),
+            size=len(data),
+            language=detect_language(path),
+            digest=blob_hash(data),
+        )
+        offset += len(data)
+    return builder.build()
+
+
+def test_is_ignored() -> None:
+    """Test gitignore-style pattern matching."""
+    assert is_ignored("docs/_build/index.html", ["_build/"])
+    assert is_ignored("src/app/fixtures.json", ["*.json"])
+    assert is_ignored("tests/data/big.csv", ["tests/data/*"])
+    assert not is_ignored("src/_build.py", ["_build/"])
+    assert not is_ignored("src/app.py", ["tests/*"])
+
+
+def test_load_ignore(tmp_path) -> None:
+    """Test that comments and blank lines are skipped.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    assert load_ignore(tmp_path) == []
+    (tmp_path / ".repodocignore").write_text("# fixtures\n\n*.csv\nbuild/\n")
+    assert load_ignore(tmp_path) == ["*.csv", "build/"]
+
+
+def test_classify() -> None:
+    """Test lock, vendored, generated and minified detection."""
+    assert classify("uv.lock", "", 10) == "lockfile"
+    assert classify("web/node_modules/x/index.js", "", 10) == "vendored"
+    assert classify("proto/api_pb2.py", "", 10) == "generated"
+    assert (
+        classify("gen.go", "// Code generated by protoc. DO NOT EDIT.\n", 10)
+        == "generated"
+    )
+    assert classify("app.min.js", "", 10) == "generated"
+    assert classify("bundle.js", "x" * 1024, 4096) == "minified"
+    assert classify("src/app.py", BODY[:1024], len(BODY)) is None
+
+
+def test_minhash_similarity() -> None:
+    """Test that signatures track textual similarity."""
+    edited = BODY.replace("handler_3(", "handler_three(")
+    assert similarity(minhash(BODY), minhash(BODY)) == 1.0
+    assert similarity(minhash(BODY), minhash(edited)) >= 0.9
+    assert similarity(minhash(BODY), minhash("unrelated words " * 200)) < 0.2
+
+
+def test_filter_files() -> None:
+    """Test that each rule removes its files and reports tokens saved."""
+    files = [
+        ("src/app.py", BODY),
+        ("src/copy.py", BODY),
+        ("src/near.py", BODY.replace("handler_3(", "handler_three(")),
+        ("src/__init__.py", ""),
+        ("pkg/__init__.py", ""),
+        ("poetry.lock", "[[package]]\n" * 100),
+        ("data/fixture.csv", "a,b\n" * 100),
+        ("src/other.py", "class Other:\n    pass\n" * 30),
+    ]
+    index = build(files)
+
+    rows, report = filter_files(index, files, ignore=["*.csv"])
+
+    assert [files[row][0] for row in rows] == [
+        "src/app.py",
+        "src/__init__.py",
+        "pkg/__init__.py",
+        "src/other.py",
+    ]
+    assert report.removed == {
+        "duplicate": ["src/copy.py"],
+        "near-duplicate": ["src/near.py"],
+        "lockfile": ["poetry.lock"],
+        "repodocignore": ["data/fixture.csv"],
+    }
+    assert report.tokens["lockfile"] == index.tokens[5]
+    assert report.kept_tokens == index.total("tokens", rows)
+
+
+def test_report_lines() -> None:
+    """Test the per-rule summary lines."""
+    report = FilterReport()
+    report.add("lockfile", "uv.lock", 300)
+    report.kept_tokens = 100
+    assert report.lines() == [
+        "lockfile: 1 files, 300 tokens",
+        "total: 300 of 400 tokens saved (75%)",
+    ]
@@ -1,13 +1,30 @@
 """Tests for documentation generators."""
 
+import asyncio
+import json
+
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from repodoc.generators.base import DocGenerator, get_generator, register
+from repodoc.generators.base import (
+    MAX_SECTIONS,
+    DocGenerator,
+    OutlineSection,
+    _registry,
+    available_generators,
+    get_artifact_builder,
+    get_generator,
+    parse_outline,
+    register,
+)
 from repodoc.generators.api import ApiGenerator, build_prompt as build_api_prompt
 from repodoc.generators.manual import ManualGenerator, build_prompt as build_manual_prompt
 from repodoc.generators.architecture import ArchitectureGenerator, build_prompt as build_architecture_prompt
+from repodoc.generators.summaries import CHUNK_TOKENS
+from repodoc.graph import ImportGraph
 from repodoc.ollama import OllamaClient
+from repodoc.parser import PackStream
+from repodoc.payload import prompt_text
 
 
 def test_generator_registry() -> None:
@@ -70,7 +87,7 @@ async def test_api_generator() -> None:
     
     # Verify the client was called with the correct prompt
     client.generate.assert_called_once()
-    call_args = client.generate.call_args[0][0]
+    call_args = prompt_text(client.generate.call_args[0][0])
     assert "Please analyze the following code" in call_args
     assert "test project" in call_args
 
@@ -91,7 +108,7 @@ async def test_manual_generator() -> None:
     
     # Verify the client was called with the correct prompt
     client.generate.assert_called_once()
-    call_args = client.generate.call_args[0][0]
+    call_args = prompt_text(client.generate.call_args[0][0])
     assert "Please analyze the following code" in call_args
     assert "test project" in call_args
     assert "Getting started guide" in call_args
@@ -121,7 +138,7 @@ sequenceDiagram
     
     # Verify the client was called with the correct prompt
     client.generate.assert_called_once()
-    call_args = client.generate.call_args[0][0]
+    call_args = prompt_text(client.generate.call_args[0][0])
     assert "Please analyze the following code" in call_args
     assert "test project" in call_args
     assert "Mermaid diagrams" in call_args
@@ -140,4 +157,279 @@ def test_duplicate_registration() -> None:
 def test_get_nonexistent_generator() -> None:
     """Test that getting a nonexistent generator raises an error."""
     with pytest.raises(KeyError, match="No generator registered with name 'nonexistent'"):
-        get_generator("nonexistent") 
\ No newline at end of file
+        get_generator("nonexistent") 
+
+def test_available_generators() -> None:
+    """Test that built-in generators are listed without being imported."""
+    assert {"api", "manual", "architecture"} <= set(available_generators())
+
+
+def test_entry_point_generator() -> None:
+    """Test that generators can be discovered through entry points."""
+
+    class PluginGenerator(DocGenerator):
+        async def generate(self, project: str, client: OllamaClient) -> str:
+            return ""
+
+    entry_point = MagicMock()
+    entry_point.load.return_value = PluginGenerator
+    with patch("importlib.metadata.entry_points", return_value=[entry_point]):
+        try:
+            assert get_generator("plugin") is PluginGenerator
+        finally:
+            _registry.pop("plugin", None)
+
+
+@pytest.mark.asyncio
+async def test_module_summaries(tmp_path) -> None:
+    """Test that module summaries are built from the filtered pack stream.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    client = OllamaClient()
+    client.generate = AsyncMock(return_value="- example.py: defines example()")
+    stream = PackStream.from_files(
+        [("example.py", "def example(): pass\n"), ("package-lock.json", "{}")]
+    )
+
+    builder = get_artifact_builder("module_summaries")()
+    summaries = await builder.build(
+        {"pack_stream": stream, "repo_path": tmp_path}, client
+    )
+
+    assert summaries == "- example.py: defines example()"
+    prompt = prompt_text(client.generate.call_args[0][0])
+    assert '<file path="example.py">\ndef example(): pass' in prompt
+    assert "package-lock.json" not in prompt
+
+
+@pytest.mark.asyncio
+async def test_module_summaries_start_before_pack_completes(tmp_path) -> None:
+    """Test that the first summary request is sent while packing continues.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    started = asyncio.Event()
+
+    async def generate(prompt: str, **kwargs) -> str:
+        started.set()
+        return prompt.split('"')[1]
+
+    client = OllamaClient()
+    client.generate = AsyncMock(side_effect=generate)
+    stream = PackStream(maxsize=1)
+    builder = get_artifact_builder("module_summaries")()
+    summaries = asyncio.ensure_future(
+        builder.build({"pack_stream": stream, "repo_path": tmp_path}, client)
+    )
+
+    # Each file fills a whole chunk, so the second one flushes the first
+    size = (CHUNK_TOKENS - 100) * 4
+    await stream.put("a.py", "a = 1\n" * (size // 6))
+    await stream.put("b.py", "b = 2\n" * (size // 6))
+    await asyncio.wait_for(started.wait(), timeout=1)
+    assert not summaries.done()
+
+    await stream.close()
+    assert await summaries == "a.py\n\nb.py"
+
+
+@pytest.mark.asyncio
+async def test_architecture_renders_import_graph() -> None:
+    """Test that diagrams come from the import graph, not the model."""
+    graph = ImportGraph(
+        modules={"app.cli": ["app.cli"], "app.core": ["app.core"]},
+        edges={"app.cli": {"app.core": 1}, "app.core": {}},
+        docs={"app.core": "Core logic."},
+    )
+    client = OllamaClient()
+    client.generate = AsyncMock(return_value="## Architecture\n\n### Overview\nText")
+
+    result = await ArchitectureGenerator().run(
+        {"project": "raw pack", "import_graph": graph}, client
+    )
+
+    prompt = prompt_text(client.generate.call_args[0][0])
+    assert "app.core (layer 0): Core logic." in prompt
+    assert "raw pack" not in prompt
+    assert result.count("## Architecture") == 1
+    assert "### Overview\nText" in result
+    assert "```mermaid\nflowchart TD\n" in result
+    assert "n0 --> n1" in result
+
+
+@pytest.mark.asyncio
+async def test_architecture_without_import_graph() -> None:
+    """Test the fallback to the raw pack for projects without imports."""
+    client = OllamaClient()
+    client.generate = AsyncMock(return_value="## Architecture")
+
+    await ArchitectureGenerator().run(
+        {"project": "raw pack", "import_graph": ImportGraph()}, client
+    )
+
+    assert "raw pack" in prompt_text(client.generate.call_args[0][0])
+
+
+@pytest.mark.asyncio
+async def test_skeleton_artifact(tmp_path) -> None:
+    """Test that Python files are skeletonized and other files kept.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    pack = tmp_path / "pack.xml"
+    pack.write_text(
+        '<files>\n<file path="app.py">\ndef run() -&gt; None:\n    work()\n</file>\n'
+        '<file path="README.md">\n# Demo\n</file>\n</files>\n'
+    )
+    client = OllamaClient()
+    files = await get_artifact_builder("files")().build(
+        {"project_file": pack, "repo_path": tmp_path}, client
+    )
+    skeletons = await get_artifact_builder("skeletons")().build({"files": files}, client)
+    assert set(skeletons) == {"app.py"}
+    skeleton = await get_artifact_builder("skeleton")().build(
+        {"files": files, "skeletons": skeletons, "project": pack.read_text()}, client
+    )
+    assert '<file path="app.py">\ndef run() -> None:\n    ...\n' in skeleton
+    assert "work()" not in skeleton
+    assert '<file path="README.md">\n# Demo\n</file>' in skeleton
+
+
+def test_api_falls_back_to_skeleton() -> None:
+    """Test that API docs fall back to the skeleton view of the project."""
+    assert ApiGenerator.inputs == ("skeleton", "files")
+
+
+@pytest.mark.asyncio
+async def test_api_hybrid_tables(tmp_path) -> None:
+    """Test that signatures are static and only descriptions are generated.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    pack = tmp_path / "pack.xml"
+    pack.write_text(
+        '<files>\n<file path="pkg/core.py">\n"""Core module."""\n\n'
+        "def documented(x: int) -&gt; int:\n"
+        '    """Double a number."""\n    return 2 * x\n\n'
+        "def bare(name: str = &quot;a&quot;):\n    return name\n"
+        "</file>\n</files>\n"
+    )
+    client = OllamaClient()
+    client.generate = AsyncMock(return_value='{"0": "Return the given name."}')
+    files = await get_artifact_builder("files")().build(
+        {"project_file": pack, "repo_path": tmp_path}, client
+    )
+
+    result = await ApiGenerator().run({"skeleton": "", "files": files}, client)
+
+    client.generate.assert_awaited_once()
+    assert client.generate.call_args.kwargs["format"]["type"] == "object"
+    assert "[0] pkg.core.bare (function)" in prompt_text(client.generate.call_args[0][0])
+    assert result.startswith("## API\n\n### `pkg.core`\n\nCore module.")
+    assert "| `documented(x: int) -> int` | Double a number. |" in result
+    assert "| `bare(name: str='a')` | Return the given name. |" in result
+
+
+@pytest.mark.asyncio
+async def test_outline_expands_sections_concurrently(tmp_path) -> None:
+    """Test that outlined sections get only their files and keep their order.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    pack = tmp_path / "pack.xml"
+    pack.write_text(
+        '<files>\n<file path="README.md">\n# Demo\n</file>\n'
+        '<file path="cli.py">\ndef main(): ...\n</file>\n</files>\n'
+    )
+    client = OllamaClient()
+    files = await get_artifact_builder("files")().build(
+        {"project_file": pack, "repo_path": tmp_path}, client
+    )
+    outline = (
+        '{"sections": [{"title": "Getting Started", "files": ["README.md"]},'
+        ' {"title": "Commands", "files": ["cli.py", "missing.py"], "notes": "CLI"}]}'
+    )
+    started = asyncio.Event()
+
+    async def generate(prompt, **kwargs) -> str:
+        if "format" in kwargs:
+            return outline
+        if "'Getting Started'" in prompt_text(prompt):
+            await started.wait()  # finishes only if both sections run at once
+            return "### Getting Started\n\nInstall it."
+        started.set()
+        return "Run `demo`."
+
+    client.generate = AsyncMock(side_effect=generate)
+    generator = ManualGenerator(outline=True)
+    assert "files" in generator.required_inputs()
+
+    result = await asyncio.wait_for(
+        generator.run({"project": "whole project", "files": files}, client), 1
+    )
+
+    assert result == (
+        "## User Manual\n\n### Getting Started\n\nInstall it.\n\n"
+        "### Commands\n\nRun `demo`.\n"
+    )
+    commands_prompt = prompt_text(client.generate.call_args_list[2][0][0])
+    assert "def main()" in commands_prompt
+    assert "# Demo" not in commands_prompt
+    assert "It should cover: CLI" in commands_prompt
+
+
+@pytest.mark.asyncio
+async def test_outline_fallback() -> None:
+    """Test that an unusable outline falls back to a single completion."""
+    client = OllamaClient()
+    client.generate = AsyncMock(side_effect=["not json", "## User Manual"])
+    files = MagicMock()
+    files.files.paths.return_value = iter(())
+
+    result = await ManualGenerator(outline=True).run(
+        {"project": "whole project", "files": files}, client
+    )
+
+    assert result == "## User Manual"
+    assert "whole project" in prompt_text(client.generate.call_args[0][0])
+
+
+@pytest.mark.asyncio
+async def test_outline_reused_across_revisions() -> None:
+    """Test that a shared outline is reused while the files are unchanged."""
+    client = OllamaClient()
+    client.generate = AsyncMock(return_value="Text.")
+    files = MagicMock()
+    files.files.paths.side_effect = lambda: iter(["README.md"])
+    files.__contains__.return_value = False
+    outlines = {
+        "User Manual": (("README.md",), [OutlineSection("Intro", ["README.md"])])
+    }
+
+    generator = ManualGenerator(outline=True, outlines=outlines)
+    result = await generator.run({"project": "p", "files": files}, client)
+
+    assert result == "## User Manual\n\n### Intro\n\nText.\n"
+    assert client.generate.call_count == 1
+    assert "format" not in client.generate.call_args.kwargs
+
+    # A different set of files asks for a new outline
+    files.files.paths.side_effect = lambda: iter(["README.md", "new.py"])
+    client.generate = AsyncMock(side_effect=["not json", "## User Manual"])
+    await generator.run({"project": "p", "files": files}, client)
+    assert "format" in client.generate.call_args_list[0].kwargs
+
+
+def test_parse_outline() -> None:
+    """Test that malformed entries are skipped and sections are capped."""
+    entries = [{"title": f"S{i}", "files": "x"} for i in range(12)]
+    sections = parse_outline(json.dumps({"sections": [{"files": []}, *entries]}))
+    assert len(sections) == MAX_SECTIONS
+    assert sections[0] == OutlineSection("S0", [], "")
+    assert parse_outline('{"sections": {}}') == []
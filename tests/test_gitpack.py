@@ -0,0 +1,153 @@
+"""Tests for packing Git revisions."""
+
+import subprocess
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from repodoc.errors import InputFileError
+from repodoc.gitpack import (
+    list_tree,
+    pack_revision,
+    resolve_revision,
+    revision_range,
+    tree_delta,
+)
+from repodoc.parser import PackStream, open_pack_index
+
+
+def _git(repo: Path, *args: str) -> str:
+    """Run Git with a fixed identity.
+
+    Args:
+        repo: Repository path.
+        *args: Git arguments.
+
+    Returns:
+        Standard output.
+    """
+    return subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+@pytest.fixture
+def bare_repo(tmp_path: Path) -> Path:
+    """Create a bare repository with two tagged commits and one more.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        Path to the bare repository.
+    """
+    work = tmp_path / "work"
+    (work / "src").mkdir(parents=True)
+    _git(tmp_path, "init", "-q", str(work))
+    (work / "src" / "app.py").write_text('if a < b and c > d:\n    s = "x & y"\n')
+    (work / "logo.png").write_bytes(b"\x89PNG\0\0binary")
+    _git(work, "add", ".")
+    _git(work, "commit", "-q", "-m", "one")
+    _git(work, "tag", "v1")
+    (work / "src" / "app.py").write_text("print('v2')\n")
+    (work / "README.md").write_text("# Demo\n")
+    _git(work, "add", ".")
+    _git(work, "commit", "-q", "-m", "two")
+    _git(work, "tag", "-a", "v2", "-m", "release 2")
+    (work / "docs").mkdir()
+    (work / "docs" / "guide.md").write_text("Guide\n")
+    _git(work, "add", ".")
+    _git(work, "commit", "-q", "-m", "three")
+    bare = tmp_path / "mirror.git"
+    _git(tmp_path, "clone", "-q", "--bare", str(work), str(bare))
+    return bare
+
+
+async def _collect(stream: PackStream) -> List[Tuple[str, str]]:
+    """Drain a pack stream.
+
+    Args:
+        stream: Stream to drain.
+
+    Returns:
+        Streamed ``(path, content)`` pairs.
+    """
+    return [entry async for entry in stream]
+
+
+@pytest.mark.asyncio
+async def test_pack_revision_from_bare_repository(
+    bare_repo: Path, tmp_path: Path
+) -> None:
+    """Test that a tagged revision is packed from a bare repository.
+
+    Args:
+        bare_repo: Bare repository fixture.
+        tmp_path: Temporary directory provided by pytest.
+    """
+    stream = PackStream(maxsize=0)
+    pack = await pack_revision(bare_repo, "v1", tmp_path / "packs", stream)
+
+    commit = await resolve_revision(bare_repo, "v1")
+    assert pack == tmp_path / "packs" / f"{commit}.xml"
+    content = 'if a < b and c > d:\n    s = "x & y"\n'
+    assert await _collect(stream) == [("src/app.py", content)]
+    index = open_pack_index(pack)
+    assert [entry.path for entry in index] == ["src/app.py"]  # binary left out
+    assert index.read("src/app.py") == content
+    assert "src/\n  app.py" in pack.read_text()
+
+    # A commit packed before is reused and replayed to the stream
+    stream = PackStream(maxsize=0)
+    assert await pack_revision(bare_repo, commit, tmp_path / "packs", stream) == pack
+    assert await _collect(stream) == [("src/app.py", content)]
+
+
+@pytest.mark.asyncio
+async def test_pack_revision_head_and_unknown(bare_repo: Path, tmp_path: Path) -> None:
+    """Test packing the latest commit and rejecting unknown revisions.
+
+    Args:
+        bare_repo: Bare repository fixture.
+        tmp_path: Temporary directory provided by pytest.
+    """
+    pack = await pack_revision(bare_repo, "HEAD", tmp_path)
+    index = open_pack_index(pack)
+    assert sorted(entry.path for entry in index) == [
+        "README.md",
+        "docs/guide.md",
+        "src/app.py",
+    ]
+    assert index.read("src/app.py") == "print('v2')\n"
+
+    stream = PackStream(maxsize=0)
+    with pytest.raises(InputFileError, match="Unknown revision"):
+        await pack_revision(bare_repo, "v9", tmp_path, stream)
+    assert await _collect(stream) == []
+    with pytest.raises(InputFileError, match="Invalid revision"):
+        await resolve_revision(bare_repo, "--all")
+
+
+@pytest.mark.asyncio
+async def test_revision_range_and_delta(bare_repo: Path) -> None:
+    """Test that ranges include the tags in between and deltas compare blobs.
+
+    Args:
+        bare_repo: Bare repository fixture.
+    """
+    assert await revision_range(bare_repo, "v1..HEAD") == ["v1", "v2", "HEAD"]
+    assert await revision_range(bare_repo, "v2, v1") == ["v2", "v1"]
+    assert await revision_range(bare_repo, "v1") == ["v1"]
+    with pytest.raises(InputFileError):
+        await revision_range(bare_repo, "v1..nope")
+
+    v1, v2 = await list_tree(bare_repo, "v1"), await list_tree(bare_repo, "v2")
+    delta = tree_delta(v1, v2)
+    assert delta.added == ["README.md"]
+    assert delta.modified == ["src/app.py"]
+    assert delta.deleted == []
+    assert str(tree_delta(v2, v1)) == "0 added, 1 modified, 1 deleted, 1 unchanged"
@@ -0,0 +1,81 @@
+"""Tests for the static import graph."""
+
+from repodoc.graph import ImportGraph, import_graph, strongly_connected
+
+FILES = [
+    ("src/app/__init__.py", '"""App package."""\n'),
+    ("src/app/cli.py", "from app.core import engine\nfrom app import store\n"),
+    ("src/app/core/__init__.py", ""),
+    ("src/app/core/engine.py", "from app.store import db\n"),
+    ("src/app/store/__init__.py", ""),
+    ("src/app/store/db.py", "import os\n"),
+    ("tests/test_cli.py", "from app import cli\n"),
+    ("README.md", "# App\n"),
+]
+
+
+def test_strongly_connected() -> None:
+    """Test that cycles are grouped and dependencies come first."""
+    edges = {"a": {"b"}, "b": {"c"}, "c": {"b", "d"}, "d": set()}
+    assert strongly_connected(edges) == [["d"], ["b", "c"], ["a"]]
+
+
+def test_import_graph_packages() -> None:
+    """Test that modules are collapsed to packages and tests are skipped."""
+    graph = import_graph(FILES)
+
+    assert graph.modules == {
+        "app": ["app", "app.cli"],
+        "app.core": ["app.core", "app.core.engine"],
+        "app.store": ["app.store", "app.store.db"],
+    }
+    assert graph.edges == {
+        "app": {"app.core": 1, "app.store": 1},
+        "app.core": {"app.store": 1},
+        "app.store": {},
+    }
+    assert graph.layers() == {"app.store": 0, "app.core": 1, "app": 2}
+    assert graph.docs == {"app": "App package."}
+
+
+def test_import_graph_small_project() -> None:
+    """Test that single-package projects keep module-level nodes."""
+    graph = import_graph(
+        [("pkg/__init__.py", ""), ("pkg/a.py", "from pkg import b\n"), ("pkg/b.py", "")]
+    )
+    assert sorted(graph.modules) == ["pkg", "pkg.a", "pkg.b"]
+    assert graph.edges["pkg.a"] == {"pkg.b": 1}
+
+
+def test_cycles_and_mermaid() -> None:
+    """Test that rendering is deterministic and highlights cycles."""
+    graph = ImportGraph(
+        modules={"a": ["a"], "b": ["b"], "c": ["c"]},
+        edges={"a": {"b": 2}, "b": {"c": 1}, "c": {"b": 1}},
+    )
+
+    assert graph.cycles() == [["b", "c"]]
+    assert graph.layers() == {"b": 0, "c": 0, "a": 1}
+    assert graph.mermaid() == "\n".join(
+        [
+            "flowchart TD",
+            '    subgraph layer1["Layer 1"]',
+            '        n0["a"]',
+            "    end",
+            '    subgraph layer0["Layer 0"]',
+            '        n1["b"]',
+            '        n2["c"]',
+            "    end",
+            "    n0 -->|2| n1",
+            "    n1 --> n2",
+            "    n2 --> n1",
+            "    classDef cycle stroke:#d33,stroke-width:2px",
+            "    class n1,n2 cycle",
+        ]
+    )
+    assert "Cycle: b <-> c" in graph.summary()
+
+
+def test_empty_graph() -> None:
+    """Test that projects without Python files yield an empty graph."""
+    assert not import_graph([("README.md", "# Demo\n")])
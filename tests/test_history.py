@@ -0,0 +1,49 @@
+"""Tests for the throughput history."""
+
+from pathlib import Path
+
+import pytest
+
+from repodoc.history import ThroughputHistory
+from repodoc.metrics import Metrics
+from repodoc.timeouts import RateTracker
+
+
+def test_history_round_trip_and_seed(tmp_path: Path) -> None:
+    """Test that measured rates survive a save and seed a new tracker.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    tracker = RateTracker()
+    tracker.observe_first_token("m", 1000, 2.0)
+    tracker.observe_stats("m", {"eval_count": 100, "eval_duration": 10_000_000_000})
+    metrics = Metrics()
+    metrics.record("synthesize", "m", prompt_chars=4000, response_chars=400, seconds=1)
+    metrics.record("synthesize", "m", prompt_chars=4000, response_chars=800, seconds=1)
+
+    history = ThroughputHistory()
+    history.update(tracker, metrics)
+    path = tmp_path / ".repodoc" / "throughput.json"
+    history.save(path)
+
+    loaded = ThroughputHistory.load(path)
+    assert loaded.response_tokens == {"synthesize": 150.0}
+    fresh = RateTracker()
+    loaded.seed(fresh)
+    assert fresh.rates("m").prompt_rate == 500.0
+    # 1000 prompt tokens at 500/s plus 150 response tokens at 10/s
+    assert loaded.request_seconds("m", "synthesize", 1000) == pytest.approx(17.0)
+    assert loaded.request_seconds("other", "synthesize", 1000) is None
+
+
+def test_unreadable_history_is_ignored(tmp_path: Path) -> None:
+    """Test that a corrupt history file starts an empty history.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    path = tmp_path / "throughput.json"
+    path.write_text("{not json")
+    assert ThroughputHistory.load(path) == ThroughputHistory()
+    assert ThroughputHistory.load(tmp_path / "missing.json") == ThroughputHistory()
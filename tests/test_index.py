@@ -0,0 +1,106 @@
+"""Tests for the columnar repository index."""
+
+from pathlib import Path
+
+import pytest
+
+from repodoc.errors import InputFileError
+from repodoc.index import RepoIndex, RepoIndexBuilder, blob_hash, detect_language
+
+
+@pytest.fixture
+def index() -> RepoIndex:
+    """Create a small index.
+
+    Returns:
+        Index with three files.
+    """
+    builder = RepoIndexBuilder()
+    for offset, (path, content) in enumerate(
+        [("src/app.py", b"print()\n"), ("src/lib.go", b"package lib\n"), ("README.md", b"# Hi\n")]
+    ):
+        builder.add(
+            path,
+            offset=offset * 100,
+            length=len(content),
+            size=len(content),
+            language=detect_language(path),
+            digest=blob_hash(content),
+        )
+    return builder.build(source_size=300, source_mtime_ns=42)
+
+
+def test_blob_hash_matches_git() -> None:
+    """Test that blob hashes equal Git object ids."""
+    # git hash-object of "hello\n"
+    assert blob_hash(b"hello\n").hex() == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_row_access(index: RepoIndex) -> None:
+    """Test reading individual rows.
+
+    Args:
+        index: Index fixture.
+    """
+    assert len(index) == 3
+    assert list(index.paths()) == ["src/app.py", "src/lib.go", "README.md"]
+    assert index.language(1) == "go"
+    assert index.sizes[2] == 5
+    assert index.tokens[2] == 2
+    assert index.blob_hash(0) == blob_hash(b"print()\n").hex()
+    assert index.find("README.md") == 2
+    with pytest.raises(KeyError):
+        index.find("missing")
+
+
+def test_filter_and_sort(index: RepoIndex) -> None:
+    """Test masks, selections and ordering.
+
+    Args:
+        index: Index fixture.
+    """
+    assert index.mask_language("python", "go") == b"\x01\x01\x00"
+    assert index.mask_prefix("src/") == b"\x01\x01\x00"
+    assert index.mask_at_most("sizes", 8) == b"\x01\x00\x01"
+    rows = index.select(index.mask_prefix("src/"))
+    assert list(rows) == [0, 1]
+    assert list(index.argsort("sizes", rows=rows, reverse=True)) == [1, 0]
+    assert index.total("sizes", rows) == 20
+
+    subset = index.take([2, 0])
+    assert list(subset.paths()) == ["README.md", "src/app.py"]
+    assert subset.blob_hash(1) == index.blob_hash(0)
+
+
+def test_save_and_load(index: RepoIndex, tmp_path: Path) -> None:
+    """Test that a saved index is memory-mapped back unchanged.
+
+    Args:
+        index: Index fixture.
+        tmp_path: Temporary directory provided by pytest.
+    """
+    path = tmp_path / "files.idx"
+    index.save(path)
+    loaded = RepoIndex.load(path)
+
+    assert isinstance(loaded.sizes, memoryview)
+    assert list(loaded.paths()) == list(index.paths())
+    assert list(loaded.offsets) == list(index.offsets)
+    assert list(loaded.tokens) == list(index.tokens)
+    assert [loaded.blob_hash(row) for row in range(3)] == [
+        index.blob_hash(row) for row in range(3)
+    ]
+    assert (loaded.source_size, loaded.source_mtime_ns) == (300, 42)
+    assert loaded.mask_language("markdown") == b"\x00\x00\x01"
+
+
+def test_load_invalid(tmp_path: Path) -> None:
+    """Test that invalid index files are rejected.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    path = tmp_path / "bad.idx"
+    path.write_bytes(b"not an index at all, definitely not")
+    with pytest.raises(InputFileError, match="Invalid index file"):
+        RepoIndex.load(path)
@@ -0,0 +1,57 @@
+"""Tests for the run journal."""
+
+from pathlib import Path
+
+from repodoc.journal import Journal, request_key
+
+
+def test_request_key_covers_options_and_prompt() -> None:
+    """Test that keys change with any input that changes the response."""
+    key = request_key({"model": "a"}, "prompt")
+    assert key == request_key({"model": "a"}, ["pro", b"mpt"])
+    assert key != request_key({"model": "b"}, "prompt")
+    assert key != request_key({"model": "a"}, "prompt!")
+
+
+def test_journal_replays_partial_and_completed_output(tmp_path: Path) -> None:
+    """Test that a resumed journal returns what an earlier run recorded.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    path = tmp_path / ".repodoc" / "journal.jsonl"
+    journal = Journal(path)
+    journal.append("done", "Hello ")
+    journal.append("done", "world")
+    journal.complete("done")
+    journal.append("partial", "discarded")
+    journal.reset("partial")
+    journal.append("partial", "Half")
+    journal.close()
+    with path.open("a") as fh:
+        fh.write('{"key": "partial", "te')  # torn by a crash
+
+    resumed = Journal(path, resume=True)
+    assert resumed.get("done") == ("Hello world", True)
+    assert resumed.get("partial") == ("Half", False)
+    assert resumed.get("unknown") == ("", False)
+    assert resumed.resumed == 1
+    resumed.close()
+
+
+def test_journal_without_resume_starts_over(tmp_path: Path) -> None:
+    """Test that a new run truncates the journal and a finished run deletes it.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(path)
+    journal.append("key", "text")
+    journal.complete("key")
+    journal.close()
+
+    fresh = Journal(path)
+    assert fresh.get("key") == ("", False)
+    fresh.discard()
+    assert not path.exists()
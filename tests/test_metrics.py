@@ -0,0 +1,23 @@
+"""Tests for model request metrics."""
+
+from repodoc.metrics import Metrics
+
+
+def test_summary() -> None:
+    """Test per-route totals."""
+    metrics = Metrics()
+    metrics.record(
+        "summarize", "small", prompt_chars=10, response_chars=1000, seconds=1.0
+    )
+    metrics.record(
+        "summarize", "small", prompt_chars=10, response_chars=500, seconds=0.5
+    )
+    metrics.record(
+        "synthesize", "large", prompt_chars=10, response_chars=20, seconds=3.0
+    )
+
+    assert metrics.routes() == {("summarize", "small"): 2, ("synthesize", "large"): 1}
+    assert metrics.summary() == [
+        "summarize -> small: 2 requests, 1,500 chars out, 1.5s",
+        "synthesize -> large: 1 requests, 20 chars out, 3.0s",
+    ]
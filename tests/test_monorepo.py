@@ -0,0 +1,100 @@
+"""Tests for monorepo package detection."""
+
+from pathlib import Path
+from typing import List
+
+from repodoc.gitpack import TreeEntry
+from repodoc.monorepo import (
+    Package,
+    find_packages,
+    load_manifest,
+    render_index,
+    save_manifest,
+)
+
+
+def _tree(*paths: str) -> List[TreeEntry]:
+    """Build tree entries with a blob id derived from each path.
+
+    Args:
+        *paths: File paths.
+
+    Returns:
+        Tree entries.
+    """
+    return [TreeEntry(path, f"id-{path}", 10) for path in paths]
+
+
+def test_find_packages_assigns_files_to_the_nearest_root() -> None:
+    """Test nested roots, workspace manifests and unowned files."""
+    packages = find_packages(
+        _tree(
+            "package.json",
+            ".github/ci.yml",
+            "services/api/pyproject.toml",
+            "services/api/src/app.py",
+            "services/api/plugins/go.mod",
+            "services/api/plugins/main.go",
+            "web/package.json",
+            "web/Cargo.toml",
+            "web/index.js",
+        )
+    )
+
+    assert [(p.root, p.languages) for p in packages] == [
+        ("services/api", ("Python",)),
+        ("services/api/plugins", ("Go",)),
+        ("web", ("JavaScript", "Rust")),
+    ]
+    assert [e.path for e in packages[0].entries] == ["pyproject.toml", "src/app.py"]
+    assert [e.path for e in packages[1].entries] == ["go.mod", "main.go"]
+    assert packages[1].slug == "services-api-plugins"
+
+
+def test_repository_without_manifests_is_one_package() -> None:
+    """Test that a plain repository is documented as a whole."""
+    (package,) = find_packages(_tree("README.md", "src/app.py"))
+    assert package.root == "" and package.name == "." and package.slug == ""
+    assert len(package.entries) == 2
+
+
+def test_digest_changes_only_with_the_package() -> None:
+    """Test that the digest covers exactly the files of a package."""
+    before = find_packages(_tree("a/go.mod", "a/main.go", "b/go.mod", "b/lib.go"))
+    after = find_packages(
+        [
+            *_tree("a/go.mod", "a/main.go", "b/go.mod"),
+            TreeEntry("b/lib.go", "changed", 10),
+        ]
+    )
+    assert before[0].digest == after[0].digest
+    assert before[1].digest != after[1].digest
+
+
+def test_manifest_round_trip(tmp_path: Path) -> None:
+    """Test that package digests survive a save and bad files are ignored.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    path = tmp_path / ".repodoc" / "packages.json"
+    assert load_manifest(path) == {}
+    save_manifest(path, {"web": "abc"})
+    assert load_manifest(path) == {"web": "abc"}
+    path.write_text("{not json")
+    assert load_manifest(path) == {}
+
+
+def test_render_index_links_every_document() -> None:
+    """Test the index table."""
+    packages = [
+        Package("services/api", ("Python",), ()),
+        Package("", (), ()),
+    ]
+    index = render_index("shop", packages, {"api": "API", "manual": "Manual"})
+    assert index.startswith("# shop\n\n2 packages")
+    assert (
+        "| `services/api` | Python | [API](services-api/api-docs.md), "
+        "[Manual](services-api/user-manual.md) |"
+    ) in index
+    assert "| `.` | - | [API](api-docs.md), [Manual](user-manual.md) |" in index
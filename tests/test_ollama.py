@@ -1,11 +1,17 @@
 """Tests for the Ollama client."""
 
+import asyncio
+import json
+from typing import AsyncIterator, List
+
+import httpx
 import pytest
 import respx
 from httpx import Response
 
 from repodoc.errors import OllamaError
-from repodoc.ollama import OllamaClient
+from repodoc.journal import Journal
+from repodoc.ollama import OllamaClient, Task
 
 
 @pytest.fixture
@@ -39,4 +45,286 @@ async def test_client_close(client: OllamaClient) -> None:
     Args:
         client: Ollama client fixture.
     """
-    await client.close()  # Should not raise any errors 
\ No newline at end of file
+    await client.close()  # Should not raise any errors 
+
+@pytest.mark.asyncio
+async def test_embed(client: OllamaClient, respx_mock: respx.MockRouter) -> None:
+    """Test batched embeddings.
+
+    Args:
+        client: Ollama client fixture.
+        respx_mock: Respx mock router.
+    """
+    route = respx_mock.post("http://localhost:11434/api/embed").mock(
+        return_value=Response(200, json={"embeddings": [[1.0, 0.0], [0.0, 1.0]]})
+    )
+    assert await client.embed(["a", "b"]) == [[1.0, 0.0], [0.0, 1.0]]
+    assert route.calls[0].request.read() == (
+        b'{"model":"nomic-embed-text","input":["a","b"]}'
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_json_format(
+    client: OllamaClient, respx_mock: respx.MockRouter
+) -> None:
+    """Test that a response format is forwarded to the server.
+
+    Args:
+        client: Ollama client fixture.
+        respx_mock: Respx mock router.
+    """
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        return_value=Response(200, text='{"response": "{}", "done": true}\n')
+    )
+    assert await client.generate("describe", format="json") == "{}"
+    assert json.loads(route.calls[0].request.read())["format"] == "json"
+
+
+@pytest.mark.asyncio
+async def test_generate_streams_prompt_segments(
+    client: OllamaClient, respx_mock: respx.MockRouter
+) -> None:
+    """Test that prompt segments are sent as one JSON string.
+
+    Args:
+        client: Ollama client fixture.
+        respx_mock: Respx mock router.
+    """
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        return_value=Response(200, text='{"response": "ok", "done": true}\n')
+    )
+    prompt = ["Document:\n", memoryview('print("\u00e9")'.encode()), "\nEnd"]
+
+    assert await client.generate(prompt) == "ok"
+
+    expected = 'Document:\nprint("\u00e9")\nEnd'
+    request = route.calls[0].request
+    assert "content-length" not in request.headers  # streamed, not buffered
+    assert json.loads(request.read())["prompt"] == expected
+    assert client.metrics.records[0].prompt_chars == len(expected)
+
+
+@pytest.mark.asyncio
+async def test_embed_count_mismatch(
+    client: OllamaClient, respx_mock: respx.MockRouter
+) -> None:
+    """Test that missing embeddings are reported.
+
+    Args:
+        client: Ollama client fixture.
+        respx_mock: Respx mock router.
+    """
+    respx_mock.post("http://localhost:11434/api/embed").mock(
+        return_value=Response(200, json={"embeddings": [[1.0]]})
+    )
+    with pytest.raises(OllamaError, match="Expected 2 embeddings"):
+        await client.embed(["a", "b"])
+
+
+@pytest.mark.asyncio
+async def test_generate_routes_by_task(respx_mock: respx.MockRouter) -> None:
+    """Test that tasks are routed to their model and recorded in metrics.
+
+    Args:
+        respx_mock: Respx mock router.
+    """
+    client = OllamaClient(model="large", routes={"summarize": "small"})
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        return_value=Response(200, text='{"response": "ok", "done": true}\n')
+    )
+
+    await client.generate("summarize this", task=Task.SUMMARIZE)
+    await client.generate("write docs")
+
+    bodies = [json.loads(call.request.read()) for call in route.calls]
+    assert [body["model"] for body in bodies] == ["small", "large"]
+    assert bodies[0]["keep_alive"] == "10m"
+    assert client.metrics.routes() == {("summarize", "small"): 1, ("synthesize", "large"): 1}
+
+
+@pytest.mark.asyncio
+async def test_warm_up(respx_mock: respx.MockRouter) -> None:
+    """Test that each routed model is loaded once and failures are tolerated.
+
+    Args:
+        respx_mock: Respx mock router.
+    """
+    client = OllamaClient(model="large", routes={"summarize": "small", "extract": "small"})
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        side_effect=lambda request: Response(
+            500 if json.loads(request.read())["model"] == "large" else 200
+        )
+    )
+
+    assert await client.warm_up() == ["small"]
+    assert route.call_count == 2
+    assert "prompt" not in json.loads(route.calls[0].request.read())
+
+
+class StalledStream(httpx.AsyncByteStream):
+    """Response body that sends some lines and then stops responding."""
+
+    def __init__(self, lines: List[bytes]) -> None:
+        """Initialize the stream.
+
+        Args:
+            lines: Lines sent before the stall.
+        """
+        self.lines = lines
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield the lines, then wait forever.
+
+        Yields:
+            Response lines.
+        """
+        for line in self.lines:
+            yield line
+        await asyncio.sleep(3600)
+
+
+@pytest.mark.asyncio
+async def test_generate_resumes_stalled_stream(
+    respx_mock: respx.MockRouter, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a stalled response is retried keeping its partial output.
+
+    Args:
+        respx_mock: Respx mock router.
+        monkeypatch: Pytest monkeypatch fixture.
+    """
+    client = OllamaClient(backoff=0)
+    monkeypatch.setattr(client.rates, "idle_timeout", lambda model: 0.05)
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        side_effect=[
+            Response(200, stream=StalledStream([b'{"response": "Hello "}\n'])),
+            Response(200, text='{"response": "world", "done": true}\n'),
+        ]
+    )
+
+    assert await client.generate("greet") == "Hello world"
+
+    retry = json.loads(route.calls[1].request.read())["prompt"]
+    assert retry.startswith("greet")
+    assert "what you wrote so far:\n\nHello \n\nContinue" in retry
+    assert client.metrics.records[0].response_chars == len("Hello world")
+
+
+@pytest.mark.asyncio
+async def test_generate_restarts_structured_output(
+    respx_mock: respx.MockRouter, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that partial JSON output is discarded on retry.
+
+    Args:
+        respx_mock: Respx mock router.
+        monkeypatch: Pytest monkeypatch fixture.
+    """
+    client = OllamaClient(backoff=0)
+    monkeypatch.setattr(client.rates, "idle_timeout", lambda model: 0.05)
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        side_effect=[
+            Response(200, stream=StalledStream([b'{"response": "{\\"a\\""}\n'])),
+            Response(200, text='{"response": "{}", "done": true}\n'),
+        ]
+    )
+
+    assert await client.generate("describe", format="json") == "{}"
+    assert json.loads(route.calls[1].request.read())["prompt"] == "describe"
+
+
+@pytest.mark.asyncio
+async def test_generate_gives_up_after_retries(respx_mock: respx.MockRouter) -> None:
+    """Test that server errors are retried with backoff and then reported.
+
+    Args:
+        respx_mock: Respx mock router.
+    """
+    client = OllamaClient(retries=2, backoff=0)
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        return_value=Response(503)
+    )
+    with pytest.raises(OllamaError, match="Failed to generate text"):
+        await client.generate("prompt")
+    assert route.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_generate_does_not_retry_client_errors(
+    respx_mock: respx.MockRouter,
+) -> None:
+    """Test that requests the server rejects are not retried.
+
+    Args:
+        respx_mock: Respx mock router.
+    """
+    client = OllamaClient(backoff=0)
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        return_value=Response(404)
+    )
+    with pytest.raises(OllamaError):
+        await client.generate("prompt")
+    assert route.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_resumes_from_journal(
+    tmp_path, respx_mock: respx.MockRouter
+) -> None:
+    """Test that journaled output is reused and partial output continued.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        respx_mock: Respx mock router.
+    """
+    path = tmp_path / "journal.jsonl"
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        side_effect=[
+            Response(200, text='{"response": "done", "done": true}\n'),
+            Response(200, stream=StalledStream([b'{"response": "Hal"}\n'])),
+        ]
+    )
+    interrupted = OllamaClient(retries=0, journal=Journal(path))
+    interrupted.rates.idle_timeout = lambda model: 0.05
+    assert await interrupted.generate("first") == "done"
+    with pytest.raises(OllamaError):
+        await interrupted.generate("second")
+    interrupted.journal.close()
+
+    route.side_effect = [Response(200, text='{"response": "f", "done": true}\n')]
+    resumed = OllamaClient(journal=Journal(path, resume=True))
+    assert await resumed.generate("first") == "done"
+    assert await resumed.generate("second") == "Half"
+
+    assert route.call_count == 3  # "first" was not requested again
+    continuation = json.loads(route.calls[2].request.read())["prompt"]
+    assert continuation.startswith("second") and "\n\nHal\n\n" in continuation
+    assert resumed.journal.resumed == 1
+
+
+@pytest.mark.asyncio
+async def test_probe_and_chunk_sizes(respx_mock: respx.MockRouter) -> None:
+    """Test benchmark probes and per-model chunk sizes.
+
+    Args:
+        respx_mock: Respx mock router.
+    """
+    client = OllamaClient(
+        routes={"summarize": "small"},
+        chunk_tokens={"small": 4_000},
+        default_chunk_tokens=12_000,
+    )
+    route = respx_mock.post("http://localhost:11434/api/generate").mock(
+        return_value=Response(200, json={"done": True, "eval_count": 8})
+    )
+
+    stats = await client.probe("small", "hello", num_predict=8)
+
+    assert stats["eval_count"] == 8
+    body = json.loads(route.calls[0].request.content)
+    assert body["stream"] is False
+    assert body["options"]["num_predict"] == 8
+    assert client.chunk_tokens_for(Task.SUMMARIZE) == 4_000
+    assert client.chunk_tokens_for(Task.SYNTHESIZE) == 12_000
+    await client.close()
@@ -1,13 +1,25 @@
 """Tests for the repomix execution."""
 
+import asyncio
 import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
 from repodoc.errors import InputFileError
-from repodoc.parser import OutputFormat, run_repomix
+from repodoc.generators.base import render_files
+from repodoc.parser import (
+    OutputFormat,
+    PackSlice,
+    PackStream,
+    index_xml,
+    open_pack_index,
+    run_repomix,
+    stream_repomix,
+)
+from repodoc.payload import prompt_text
 
 
 @pytest.fixture
@@ -181,3 +193,263 @@ def test_run_repomix_failure(mock_repo: Path) -> None:
     ):
         with pytest.raises(InputFileError, match="repomix failed"):
             run_repomix(mock_repo)
+
+
+def test_run_repomix_parsable(mock_repo: Path) -> None:
+    """Test that parsable output is requested from repomix.
+
+    Args:
+        mock_repo: Path to mock repository.
+    """
+    with patch("subprocess.run") as mock_run:
+        mock_run.return_value = subprocess.CompletedProcess(
+            ["repomix"], 0, stdout="", stderr=""
+        )
+        with patch("pathlib.Path.exists", return_value=True):
+            run_repomix(mock_repo, format=OutputFormat.XML, parsable=True)
+            assert mock_run.call_args[0][0][-1] == "--parsable-style"
+
+
+PACK = """This file is a merged representation of the entire codebase.
+
+<file_summary>
+Purpose &amp; usage
+</file_summary>
+
+<files>
+This section contains the contents of the repository's files.
+
+<file path="src/app.py">
+if a &lt; b and c &amp;&amp; d:
+    print("h\u00e9llo")
+</file>
+
+<file path="README.md">
+# Title
+</file>
+
+</files>
+"""
+
+
+@pytest.fixture
+def xml_pack(tmp_path: Path) -> Path:
+    """Create a repomix XML pack in parsable style.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory.
+
+    Returns:
+        Path to the pack.
+    """
+    pack = tmp_path / "repomix-output.xml"
+    pack.write_text(PACK, encoding="utf-8")
+    return pack
+
+
+def test_index_xml(xml_pack: Path) -> None:
+    """Test that every file is indexed with its byte offset and size.
+
+    Args:
+        xml_pack: Path to the XML pack.
+    """
+    index = index_xml(xml_pack)
+    assert [entry.path for entry in index] == ["src/app.py", "README.md"]
+
+    app = index.get("src/app.py")
+    assert app.language == "python"
+    assert app.size == len('if a < b and c && d:\n    print("h\u00e9llo")'.encode())
+    raw = xml_pack.read_bytes()[app.offset : app.offset + app.length]
+    assert raw == b'\nif a &lt; b and c &amp;&amp; d:\n    print("h\xc3\xa9llo")\n'
+
+
+def test_index_random_access(xml_pack: Path) -> None:
+    """Test reading a single file back from the pack.
+
+    Args:
+        xml_pack: Path to the XML pack.
+    """
+    index = index_xml(xml_pack)
+    assert index.read("src/app.py") == 'if a < b and c && d:\n    print("h\u00e9llo")'
+    assert index.read("README.md") == "# Title"
+    assert "missing.py" not in index
+    with pytest.raises(KeyError):
+        index.read("missing.py")
+
+
+def test_pack_slice_chunks(xml_pack: Path) -> None:
+    """Test that pack slices stream the same content as reading the file.
+
+    Tiny pieces split entities and multi-byte characters across reads.
+
+    Args:
+        xml_pack: Path to the XML pack.
+    """
+    index = index_xml(xml_pack)
+    for entry in index:
+        pack_slice = index.slice(entry.path)
+        assert isinstance(pack_slice, PackSlice)
+        for chunk_size in (1, 2, 3, 5, 1 << 16):
+            text = "".join(pack_slice.chunks(chunk_size))
+            assert text == index.read(entry.path)
+
+
+def test_pack_segments_render_files(xml_pack: Path) -> None:
+    """Test that pack segments join to the rendered files.
+
+    Args:
+        xml_pack: Path to the XML pack.
+    """
+    index = index_xml(xml_pack)
+    paths = ["README.md", "src/app.py"]
+    assert prompt_text(index.segments(paths)) == render_files(
+        (path, index.read(path)) for path in paths
+    )
+
+
+def test_index_xml_declaration(tmp_path: Path) -> None:
+    """Test packs starting with an XML declaration and their own root.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory.
+    """
+    pack = tmp_path / "pack.xml"
+    pack.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<repomix><files><file path="a.go">package a</file></files></repomix>\n'
+    )
+    index = index_xml(pack)
+    assert [(entry.path, entry.language) for entry in index] == [("a.go", "go")]
+    assert index.read("a.go") == "package a"
+
+
+def test_index_non_xml(tmp_path: Path) -> None:
+    """Test that packs in other formats produce an empty index.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory.
+    """
+    pack = tmp_path / "pack.md"
+    pack.write_text("# Project\n\nSome text\n")
+    assert len(index_xml(pack)) == 0
+
+
+def test_open_pack_index_reuses_saved_index(xml_pack: Path) -> None:
+    """Test that the saved index is reused while the pack is unchanged.
+
+    Args:
+        xml_pack: Path to the XML pack.
+    """
+    first = open_pack_index(xml_pack)
+    assert (xml_pack.parent / "repomix-output.xml.idx").exists()
+
+    with patch("repodoc.parser.index_xml") as mock_index:
+        second = open_pack_index(xml_pack)
+        mock_index.assert_not_called()
+    assert second.read("README.md") == "# Title"
+    assert second.get("src/app.py") == first.get("src/app.py")
+
+
+def fake_repomix(output: bytes, returncode: int = 0, stderr: bytes = b""):
+    """Patch the repomix subprocess with a process writing *output*.
+
+    Args:
+        output: Bytes written to standard output.
+        returncode: Exit status of the process.
+        stderr: Bytes written to standard error.
+
+    Returns:
+        Patch whose mock records the repomix command.
+    """
+    create = asyncio.create_subprocess_exec
+    script = (
+        "import sys; "
+        f"sys.stdout.buffer.write({output!r}); "
+        f"sys.stderr.buffer.write({stderr!r}); "
+        f"sys.exit({returncode})"
+    )
+
+    async def run(*cmd, **kwargs):
+        return await create(sys.executable, "-c", script, **kwargs)
+
+    return patch("repodoc.parser.asyncio.create_subprocess_exec", side_effect=run)
+
+
+@pytest.mark.asyncio
+async def test_stream_repomix(mock_repo: Path) -> None:
+    """Test that files are streamed while the pack is written to disk.
+
+    Args:
+        mock_repo: Path to mock repository.
+    """
+    stream = PackStream(maxsize=1)
+    with fake_repomix(PACK.encode()) as mock_exec:
+        path, files = await asyncio.gather(
+            stream_repomix(mock_repo, stream),
+            _collect(stream),
+        )
+
+    assert "--stdout" in mock_exec.call_args[0]
+    assert path == mock_repo / "repomix-output.xml"
+    assert path.read_text(encoding="utf-8") == PACK
+    index = index_xml(path)
+    assert files == [(entry.path, index.read(entry.path)) for entry in index]
+
+
+@pytest.mark.asyncio
+async def test_stream_repomix_xml_declaration(mock_repo: Path) -> None:
+    """Test streaming a pack that starts with an XML declaration.
+
+    Args:
+        mock_repo: Path to mock repository.
+    """
+    pack = (
+        b'<?xml version="1.0" encoding="UTF-8"?>\n'
+        b'<repomix><files><file path="a.go">package a</file></files></repomix>\n'
+    )
+    stream = PackStream()
+    with fake_repomix(pack):
+        await stream_repomix(mock_repo, stream)
+    assert await _collect(stream) == [("a.go", "package a")]
+
+
+@pytest.mark.asyncio
+async def test_stream_repomix_failure(mock_repo: Path) -> None:
+    """Test that a failing repomix raises and still closes the stream.
+
+    Args:
+        mock_repo: Path to mock repository.
+    """
+    stream = PackStream()
+    with fake_repomix(b"", returncode=1, stderr=b"boom"):
+        with pytest.raises(InputFileError, match="boom"):
+            await stream_repomix(mock_repo, stream)
+    assert await _collect(stream) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_repomix_not_found(mock_repo: Path) -> None:
+    """Test handling of a missing repomix binary.
+
+    Args:
+        mock_repo: Path to mock repository.
+    """
+    stream = PackStream()
+    with patch(
+        "repodoc.parser.asyncio.create_subprocess_exec", side_effect=FileNotFoundError
+    ):
+        with pytest.raises(InputFileError, match="binary not found"):
+            await stream_repomix(mock_repo, stream)
+    assert await _collect(stream) == []
+
+
+async def _collect(stream: PackStream) -> list:
+    """Drain a pack stream.
+
+    Args:
+        stream: Stream to drain.
+
+    Returns:
+        Every ``(path, content)`` pair in order.
+    """
+    return [entry async for entry in stream]
@@ -0,0 +1,42 @@
+"""Tests for streamed JSON request bodies."""
+
+import asyncio
+import json
+
+from repodoc.payload import JsonBody, iter_text, prompt_text
+
+
+def test_iter_text_bounds_pieces() -> None:
+    """Test that segments are split into bounded pieces without losing text."""
+    prompt = ["ab" * 5, "héllo".encode("utf-8"), memoryview("été".encode())]
+    pieces = list(iter_text(prompt, chunk_size=3))
+    assert all(0 < len(piece) <= 3 for piece in pieces)
+    assert "".join(pieces) == "ab" * 5 + "hélloété"
+
+
+def test_prompt_text_passes_strings_through() -> None:
+    """Test that a plain string prompt is returned unchanged."""
+    prompt = "already joined"
+    assert prompt_text(prompt) is prompt
+
+
+def test_json_body_matches_json_dumps() -> None:
+    """Test that the streamed body decodes to the equivalent JSON object."""
+    fields = {"model": "devstral", "format": {"type": "object"}}
+    prompt = ['Say "hi"\n\t', b"\\ caf\xc3\xa9 ", "☃ 😀"]
+    body = JsonBody(fields, prompt)
+
+    async def read() -> bytes:
+        return b"".join([chunk async for chunk in body])
+
+    data = asyncio.run(read())
+    assert json.loads(data) == {**fields, "prompt": prompt_text(prompt)}
+    assert body.chars == len(prompt_text(prompt))
+    # Bodies can be sent again, e.g. when a request is retried
+    assert asyncio.run(read()) == data
+
+
+def test_json_body_without_fields() -> None:
+    """Test a body holding only the prompt."""
+    body = JsonBody({}, "x", key="input")
+    assert json.loads(b"".join(body.chunks())) == {"input": "x"}
@@ -0,0 +1,107 @@
+"""Tests for dry-run planning."""
+
+from pathlib import Path
+
+import pytest
+
+from repodoc.generators.base import ContextMode
+from repodoc.history import ThroughputHistory
+from repodoc.parser import open_pack_index
+from repodoc.plan import PlanningClient, _duration, build_plan, directory_tokens
+from repodoc.timeouts import ModelRates
+
+
+@pytest.fixture
+def pack(tmp_path: Path) -> Path:
+    """Write a small repomix XML pack.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        Path to the pack.
+    """
+    path = tmp_path / "repomix-output.xml"
+    path.write_text(
+        "<files>\n"
+        '<file path="src/app/main.py">\n' + "def main():\n    run()\n" * 50
+        + "</file>\n"
+        '<file path="src/util.py">\ndef helper():\n    pass\n</file>\n'
+        '<file path="README.md">\n# Demo\n</file>\n'
+        '<file path="package-lock.json">\n{}\n</file>\n'
+        "</files>\n"
+    )
+    return path
+
+
+@pytest.mark.asyncio
+async def test_build_plan_records_requests(pack: Path, tmp_path: Path) -> None:
+    """Test that planning runs the generators without calling the model.
+
+    Args:
+        pack: Pack fixture.
+        tmp_path: Temporary directory provided by pytest.
+    """
+    client = PlanningClient(routes={"synthesize": "big"})
+    seeds = {"project_file": pack, "repo_path": tmp_path}
+    plan = await build_plan(client, seeds, ["api", "manual"])
+    await client.close()
+
+    assert plan.packed_files == 4
+    assert "package-lock.json" not in dict(plan.files)
+    assert plan.directories[0][0] == "src/app"
+    assert set(plan.requests) == {"api", "manual"}
+    request = plan.requests["manual"][0]
+    assert request.model == "big"
+    assert request.prompt_tokens > 0
+
+    # A request completed in the journal counts as cached
+    plan.cached = {request.key}
+    lines = plan.lines()
+    manual = next(line for line in lines if line.strip().startswith("manual"))
+    assert "1 cached" in manual
+    assert "ETA unknown" in lines[-1]
+
+
+@pytest.mark.asyncio
+async def test_build_plan_eta_and_retrieval(pack: Path, tmp_path: Path) -> None:
+    """Test that history turns tokens into an ETA and retrieval needs no embeddings.
+
+    Args:
+        pack: Pack fixture.
+        tmp_path: Temporary directory provided by pytest.
+    """
+    client = PlanningClient(model="m")
+    history = ThroughputHistory(
+        rates={"m": ModelRates(prompt_rate=1.0, prompt_samples=1)}
+    )
+    plan = await build_plan(
+        client,
+        {"project_file": pack, "repo_path": tmp_path},
+        ["manual"],
+        context=ContextMode.RETRIEVAL,
+        history=history,
+    )
+    await client.close()
+
+    assert not plan.failures
+    tokens = plan.requests["manual"][0].prompt_tokens
+    assert f"ETA {_duration(tokens)}" in plan.lines()[-1]
+    assert not list(tmp_path.glob("*.embeddings*"))
+
+
+def test_directory_tokens_and_duration(pack: Path) -> None:
+    """Test directory grouping by depth and duration formatting.
+
+    Args:
+        pack: Pack fixture.
+    """
+    index = open_pack_index(pack)
+    shallow = dict(directory_tokens(index, depth=1))
+    assert set(shallow) == {"src", "."}
+    assert shallow["src"] == index.get("src/app/main.py").tokens + index.get(
+        "src/util.py"
+    ).tokens
+    assert _duration(45) == "45s"
+    assert _duration(725) == "12m 5s"
+    assert _duration(12_000) == "3h 20m"
@@ -0,0 +1,97 @@
+"""Tests for the token-budget context planner."""
+
+import subprocess
+from pathlib import Path
+
+from repodoc.planner import (
+    Candidate,
+    ContextPlanner,
+    Signals,
+    entry_point_paths,
+    git_churn,
+    import_fan_in,
+    relevance,
+    select,
+)
+
+PYPROJECT = """[project]
+name = "demo"
+
+[project.scripts]
+demo = "demo.cli:app"
+"""
+
+FILES = [
+    ("pyproject.toml", PYPROJECT),
+    ("src/demo/__init__.py", ""),
+    ("src/demo/cli.py", "from demo import core\nfrom . import util\n"),
+    ("src/demo/core.py", "from demo.util import helper\n"),
+    ("src/demo/util.py", "def helper():\n    return 1\n"),
+    ("tests/test_core.py", "from demo import core\n"),
+]
+PATHS = [path for path, _ in FILES]
+
+
+def test_entry_point_paths() -> None:
+    """Test that console scripts resolve to their modules in src layouts."""
+    assert entry_point_paths(PYPROJECT, PATHS) == {"src/demo/cli.py"}
+    assert entry_point_paths("not toml [", PATHS) == set()
+
+
+def test_import_fan_in() -> None:
+    """Test that importers are counted per module, including relative imports."""
+    fan_in = import_fan_in(FILES, PATHS)
+    assert fan_in["src/demo/core.py"] == 2
+    assert fan_in["src/demo/util.py"] == 2
+
+
+def test_git_churn(tmp_path: Path) -> None:
+    """Test that churn counts commits touching each file.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*git, "init", "-q"], check=True)
+    for i in range(2):
+        (tmp_path / "a.py").write_text(str(i))
+        subprocess.run([*git, "add", "a.py"], check=True)
+        subprocess.run([*git, "commit", "-qm", f"c{i}"], check=True)
+    assert git_churn(tmp_path) == {"a.py": 2}
+    assert git_churn(tmp_path / "missing") == {}
+
+
+def test_relevance_signals() -> None:
+    """Test that path weights and signals combine multiplicatively."""
+    signals = Signals(entry_points={"cli.py"}, fan_in={"core.py": 3})
+    weights = (("*tests/*", 0.2),)
+    assert relevance("tests/a.py", weights, signals) == 0.2
+    assert relevance("cli.py", weights, signals) == 3.0
+    assert relevance("core.py", weights, signals) > relevance("other.py", weights, signals)
+
+
+def test_select_prefers_full_then_skeleton() -> None:
+    """Test the knapsack: full files where they fit, skeletons as fallback."""
+    candidates = [
+        Candidate("big.py", value=10.0, tokens=100, skeleton_tokens=20),
+        Candidate("small.py", value=4.0, tokens=30, skeleton_tokens=10),
+        Candidate("useless.lock", value=0.0, tokens=5),
+    ]
+    chosen = {s.path: (s.mode, s.tokens) for s in select(candidates, budget=60)}
+    assert chosen == {"big.py": ("skeleton", 20), "small.py": ("full", 30)}
+
+    chosen = {s.path: s.mode for s in select(candidates, budget=200)}
+    assert chosen == {"big.py": "full", "small.py": "full"}
+
+
+def test_planner_respects_budget() -> None:
+    """Test that planned contexts stay within budget and keep pack order."""
+    skeletons = {"src/demo/util.py": "def helper():\n    ...\n"}
+    planner = ContextPlanner(FILES, Signals(), skeletons)
+    selections = planner.plan((("*tests/*", 0.0),), budget=20)
+
+    assert sum(s.tokens for s in selections) <= 20
+    assert "tests/test_core.py" not in {s.path for s in selections}
+    paths = [s.path for s in selections]
+    assert paths == [path for path in PATHS if path in paths]
+    assert dict(planner.render(selections))["src/demo/core.py"] == FILES[3][1]
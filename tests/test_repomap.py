@@ -0,0 +1,93 @@
+"""Tests for the ranked repository map."""
+
+from array import array
+
+import pytest
+
+from repodoc.repomap import build_repo_map, extract, pagerank
+
+CORE = '''class Engine:
+    """Core engine."""
+
+    def start(self, speed: int = 1) -> bool:
+        return True
+
+
+@decorated
+def helper(x):
+    return x
+'''
+
+CLI = '''from core import Engine, helper
+
+
+def main() -> None:
+    engine = Engine()
+    engine.start()
+    helper(1)
+'''
+
+PLUGIN = '''from core import Engine
+
+
+def load() -> Engine:
+    return Engine()
+'''
+
+
+def test_extract() -> None:
+    """Test that definitions carry signatures and line spans."""
+    symbols, references = extract("core.py", CORE)
+
+    assert [s.qualname for s in symbols] == ["Engine", "Engine.start", "helper"]
+    assert symbols[1].signature == "def start(self, speed: int=1) -> bool"
+    assert (symbols[2].start, symbols[2].end) == (8, 10)
+    assert references["decorated"] == 1
+
+
+def test_pagerank() -> None:
+    """Test ranking on a small sparse graph."""
+    # 0 -> 2, 1 -> 2, 2 has no out-edges
+    rank = pagerank(
+        array("I", [0, 1, 2, 2]), array("I", [2, 2]), array("d", [1.0, 1.0]), [1, 1, 1]
+    )
+    assert sum(rank) == pytest.approx(1.0)
+    assert rank[2] > rank[0] == pytest.approx(rank[1])
+
+
+def test_ranked_symbols() -> None:
+    """Test that referenced definitions outrank unreferenced ones."""
+    repo_map = build_repo_map(
+        [("core.py", CORE), ("cli.py", CLI), ("plugin.py", PLUGIN), ("README.md", "")]
+    )
+
+    ranked = [symbol.qualname for symbol, _ in repo_map.ranked()]
+    assert ranked[0] == "Engine"
+    assert ranked.index("helper") < ranked.index("load")
+
+    excluded = repo_map.ranked((("core.py", 0.0),))
+    assert all(symbol.path != "core.py" for symbol, _ in excluded)
+
+
+def test_outline_budget() -> None:
+    """Test that the outline respects its budget and includes class lines."""
+    repo_map = build_repo_map([("core.py", CORE), ("cli.py", CLI), ("plugin.py", PLUGIN)])
+    ranked = repo_map.ranked()
+
+    outline, listed = repo_map.outline(ranked, 1000)
+    assert outline.startswith("core.py:\n  class Engine\n    def start(")
+    assert len(listed) == len(repo_map)
+
+    small, listed = repo_map.outline(ranked, 8)
+    assert small == "core.py:\n  class Engine"
+    assert len(listed) == 1
+
+
+def test_context_includes_sources() -> None:
+    """Test that top-ranked function bodies follow the outline."""
+    repo_map = build_repo_map([("core.py", CORE), ("cli.py", CLI)])
+
+    context = repo_map.context((), 500)
+
+    assert context.startswith("Repository map (most central definitions):\ncore.py:")
+    assert '<file path="core.py" lines="8-10">\n@decorated\ndef helper(x):' in context
@@ -0,0 +1,116 @@
+"""Tests for embedding-based retrieval."""
+
+from pathlib import Path
+from typing import List, Sequence
+from unittest.mock import AsyncMock
+
+import pytest
+
+from repodoc.ollama import OllamaClient
+from repodoc.parser import index_xml
+from repodoc.retrieval import EmbeddingIndex, Retriever, build_index
+
+VOCABULARY = ("config", "cli", "network", "storage")
+
+
+def fake_embed(texts: Sequence[str]) -> List[List[float]]:
+    """Embed texts as keyword counts over a tiny vocabulary.
+
+    Args:
+        texts: Texts to embed.
+
+    Returns:
+        One vector per text.
+    """
+    return [[text.lower().count(word) + 0.01 for word in VOCABULARY] for text in texts]
+
+
+@pytest.fixture
+def client() -> OllamaClient:
+    """Create a client whose embeddings are computed locally.
+
+    Returns:
+        Ollama client with a mocked embedding endpoint.
+    """
+    client = OllamaClient()
+    client.embed = AsyncMock(side_effect=fake_embed)
+    return client
+
+
+FILES = [
+    ("config.py", "config config config\n"),
+    ("cli.py", "cli entry cli\n"),
+    ("net.py", "network socket network\n"),
+]
+
+
+@pytest.mark.asyncio
+async def test_build_and_search(tmp_path: Path, client: OllamaClient) -> None:
+    """Test that the most similar chunk ranks first.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        client: Client fixture.
+    """
+    index = await build_index(tmp_path / "emb", FILES, client)
+    assert len(index) == 3
+    [(score, chunk)] = index.search([0.0, 1.0, 0.0, 0.0], 1)
+    assert chunk.path == "cli.py"
+    assert score == pytest.approx(1.0, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_incremental_update(tmp_path: Path, client: OllamaClient) -> None:
+    """Test that unchanged chunks are not embedded again.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        client: Client fixture.
+    """
+    await build_index(tmp_path / "emb", FILES, client)
+    client.embed.reset_mock()
+
+    changed = [*FILES[:2], ("net.py", "storage storage\n")]
+    index = await build_index(tmp_path / "emb", changed, client)
+
+    client.embed.assert_called_once()
+    assert client.embed.call_args[0][0] == ["net.py\nstorage storage\n"]
+    assert index.search([0.0, 0.0, 0.0, 1.0], 1)[0][1].path == "net.py"
+
+
+@pytest.mark.asyncio
+async def test_load_memory_mapped(tmp_path: Path, client: OllamaClient) -> None:
+    """Test that a saved index is memory-mapped with identical vectors.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        client: Client fixture.
+    """
+    built = await build_index(tmp_path / "emb", FILES, client, batch_size=2)
+    assert client.embed.call_count == 2
+
+    loaded = EmbeddingIndex.load(tmp_path / "emb")
+    assert loaded is not None
+    assert loaded.chunks == built.chunks
+    assert list(loaded.row(1)) == list(built.row(1))
+
+
+@pytest.mark.asyncio
+async def test_retriever_context(tmp_path: Path, client: OllamaClient) -> None:
+    """Test that retrieved chunks are rendered from the pack.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        client: Client fixture.
+    """
+    pack = tmp_path / "pack.xml"
+    pack.write_text(
+        "<files>\n"
+        + "".join(f'<file path="{path}">\n{content}</file>\n' for path, content in FILES)
+        + "</files>\n"
+    )
+    files = index_xml(pack)
+    index = await build_index(tmp_path / "emb", files.contents(), client)
+
+    context = await Retriever(index, files, client).context("network", top_k=1)
+    assert context == '<file path="net.py" lines="1-1">\nnetwork socket network\n</file>'
@@ -0,0 +1,240 @@
+"""Tests for the generator DAG scheduler."""
+
+import asyncio
+from typing import Any, Iterator, Mapping
+from unittest.mock import AsyncMock
+
+import pytest
+
+from repodoc.generators.base import (
+    ArtifactBuilder,
+    DocGenerator,
+    _artifact_registry,
+    _registry,
+    register,
+    register_artifact,
+)
+from repodoc.ollama import OllamaClient
+from repodoc.scheduler import Scheduler
+
+
+@pytest.fixture
+def registered() -> Iterator[dict]:
+    """Register a shared artifact and two generators consuming it.
+
+    Yields:
+        Dict counting how often the shared artifact was built.
+    """
+    calls = {"shared": 0}
+
+    @register_artifact("test_shared")
+    class Shared(ArtifactBuilder):
+        async def build(self, artifacts: Mapping[str, Any], client: OllamaClient) -> str:
+            calls["shared"] += 1
+            await asyncio.sleep(0)
+            return artifacts["project"].upper()
+
+    for name in ("test_one", "test_two"):
+
+        @register(name)
+        class Consumer(DocGenerator):
+            inputs = ("test_shared",)
+
+            async def generate(self, project: str, client: OllamaClient) -> str:
+                return f"## Doc\n{project}"
+
+    yield calls
+
+    _artifact_registry.pop("test_shared")
+    _registry.pop("test_one")
+    _registry.pop("test_two")
+
+
+@pytest.mark.asyncio
+async def test_shared_artifact_built_once(registered: dict) -> None:
+    """Test that an artifact shared by two generators is computed once.
+
+    Args:
+        registered: Build counter from the registration fixture.
+    """
+    scheduler = Scheduler(AsyncMock(spec=OllamaClient), {"project": "src"})
+    results = dict([item async for item in scheduler.run(["test_one", "test_two"])])
+    assert results == {"test_one": "## Doc\nSRC", "test_two": "## Doc\nSRC"}
+    assert registered["shared"] == 1
+
+
+@pytest.mark.asyncio
+async def test_artifacts_seed_another_scheduler(registered: dict) -> None:
+    """Test that built artifacts are reused by a scheduler seeded with them.
+
+    Args:
+        registered: Build counter from the registration fixture.
+    """
+    first = Scheduler(AsyncMock(spec=OllamaClient), {"project": "src"})
+    [item async for item in first.run(["test_one"])]
+    assert first.artifacts() == {"test_shared": "SRC"}
+
+    second = Scheduler(
+        AsyncMock(spec=OllamaClient), {"project": "src", **first.artifacts()}
+    )
+    assert dict([item async for item in second.run(["test_two"])]) == {
+        "test_two": "## Doc\nSRC"
+    }
+    assert registered["shared"] == 1
+
+
+def test_plan_orders_dependencies(registered: dict) -> None:
+    """Test that inputs are planned before the nodes consuming them.
+
+    Args:
+        registered: Build counter from the registration fixture.
+    """
+    scheduler = Scheduler(AsyncMock(spec=OllamaClient), {"project": "src"})
+    assert scheduler.plan(["test_one", "test_two"]) == [
+        "project",
+        "test_shared",
+        "test_one",
+        "test_two",
+    ]
+
+
+def test_plan_detects_cycles() -> None:
+    """Test that dependency cycles are reported."""
+
+    @register("test_cycle_a")
+    class A(DocGenerator):
+        inputs = ("test_cycle_b",)
+
+        async def generate(self, project: str, client: OllamaClient) -> str:
+            return ""
+
+    @register("test_cycle_b")
+    class B(DocGenerator):
+        inputs = ("test_cycle_a",)
+
+        async def generate(self, project: str, client: OllamaClient) -> str:
+            return ""
+
+    try:
+        scheduler = Scheduler(AsyncMock(spec=OllamaClient), {})
+        with pytest.raises(ValueError, match="Dependency cycle"):
+            scheduler.plan(["test_cycle_a"])
+    finally:
+        _registry.pop("test_cycle_a")
+        _registry.pop("test_cycle_b")
+
+
+@pytest.mark.asyncio
+async def test_independent_generators_run_concurrently() -> None:
+    """Test that generators without mutual dependencies overlap in time."""
+    both_started = asyncio.Event()
+    running = []
+
+    for name in ("test_par_a", "test_par_b"):
+
+        @register(name)
+        class Waiter(DocGenerator):
+            async def generate(self, project: str, client: OllamaClient) -> str:
+                running.append(project)
+                if len(running) == 2:
+                    both_started.set()
+                await asyncio.wait_for(both_started.wait(), timeout=1)
+                return "done"
+
+    try:
+        scheduler = Scheduler(AsyncMock(spec=OllamaClient), {"project": "src"})
+        results = [doc async for _, doc in scheduler.run(["test_par_a", "test_par_b"])]
+        assert results == ["done", "done"]
+    finally:
+        _registry.pop("test_par_a")
+        _registry.pop("test_par_b")
+
+
+@pytest.mark.asyncio
+async def test_failure_is_reported_per_document() -> None:
+    """Test that a failing generator yields its exception instead of raising."""
+
+    @register("test_failing")
+    class Failing(DocGenerator):
+        async def generate(self, project: str, client: OllamaClient) -> str:
+            raise RuntimeError("boom")
+
+    try:
+        scheduler = Scheduler(AsyncMock(spec=OllamaClient), {"project": "src"})
+        [(name, result)] = [item async for item in scheduler.run(["test_failing"])]
+        assert name == "test_failing"
+        assert isinstance(result, RuntimeError)
+    finally:
+        _registry.pop("test_failing")
+
+
+def test_retrieval_replaces_declared_inputs() -> None:
+    """Test that retrieval-enabled generators only depend on the retriever."""
+    scheduler = Scheduler(
+        AsyncMock(spec=OllamaClient),
+        {"project": "src", "project_file": "pack.xml", "repo_path": "."},
+        generator_options={"context": "retrieval"},
+    )
+    assert scheduler.inputs_of("manual") == ("retriever",)
+    assert scheduler.plan(["api"]) == [
+        "project_file",
+        "repo_path",
+        "files",
+        "embeddings_dir",
+        "retriever",
+        "api",
+    ]
+
+
+def test_planned_context_inputs() -> None:
+    """Test that planned generators depend on the planner and raw project."""
+    scheduler = Scheduler(
+        AsyncMock(spec=OllamaClient),
+        {"project": "src", "project_file": "pack.xml", "repo_path": "."},
+        generator_options={"context": "planned"},
+    )
+    assert scheduler.inputs_of("manual") == ("planner", "project")
+    assert "skeletons" in scheduler.plan(["manual"])
+
+
+def test_repo_map_context_inputs() -> None:
+    """Test that repo-map generators depend on the repository map."""
+    scheduler = Scheduler(
+        AsyncMock(spec=OllamaClient),
+        {"pack": "src", "project_file": "pack.xml", "repo_path": "."},
+        generator_options={"context": "repo-map"},
+    )
+    assert scheduler.inputs_of("manual") == ("repo_map", "project")
+    assert {"files", "repo_map", "project"} <= set(scheduler.plan(["manual"]))
+
+
+@pytest.mark.asyncio
+async def test_future_seed_is_awaited(registered: dict) -> None:
+    """Test that nodes wait for a seed that is still being computed.
+
+    Args:
+        registered: Build counter from the registration fixture.
+    """
+    project = asyncio.get_running_loop().create_future()
+    scheduler = Scheduler(AsyncMock(spec=OllamaClient), {"project": project})
+    results = asyncio.ensure_future(
+        _collect(scheduler.run(["test_one", "test_two"]))
+    )
+    await asyncio.sleep(0)
+    assert registered["shared"] == 0
+
+    project.set_result("src")
+    assert await results == {"test_one": "## Doc\nSRC", "test_two": "## Doc\nSRC"}
+    assert registered["shared"] == 1
+
+
+async def _collect(results: Any) -> dict:
+    """Gather scheduler results into a dict.
+
+    Args:
+        results: Async iterator of ``(name, result)`` pairs.
+
+    Returns:
+        Name -> result.
+    """
+    return dict([item async for item in results])
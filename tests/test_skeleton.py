@@ -0,0 +1,74 @@
+"""Tests for AST skeleton compression."""
+
+from unittest.mock import patch
+
+from repodoc.skeleton import skeletonize, skeletonize_many
+
+SOURCE = '''"""Module docstring."""
+
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+VERSION = "1.0"
+TABLE = {"alpha": 1, "beta": 2, "gamma": 3, "delta": 4, "epsilon": 5, "zeta": 6, "eta": 7}
+
+
+@dataclass
+class Point:
+    """A point."""
+
+    x: int = 0
+
+    def norm(self, scale: float = 1.0) -> float:
+        """Return the norm."""
+        total = self.x * self.x
+        return total ** 0.5 * scale
+
+
+async def fetch(url: str) -> bytes:
+    response = await get(url)
+    return response.body
+
+
+print("side effect")
+'''
+
+
+def test_skeletonize_keeps_interfaces() -> None:
+    """Test that signatures, decorators and docstrings survive."""
+    skeleton = skeletonize(SOURCE)
+    assert '"""Module docstring."""' in skeleton
+    assert "import os" in skeleton
+    assert "from pathlib import Path" in skeleton
+    assert "VERSION = '1.0'" in skeleton
+    assert "TABLE = ..." in skeleton
+    assert "@dataclass\nclass Point:" in skeleton
+    assert "x: int = 0" in skeleton
+    assert "def norm(self, scale: float=1.0) -> float:" in skeleton
+    assert '"""Return the norm."""' in skeleton
+    assert "async def fetch(url: str) -> bytes:\n    ..." in skeleton
+
+
+def test_skeletonize_drops_bodies() -> None:
+    """Test that implementation details are removed."""
+    skeleton = skeletonize(SOURCE)
+    assert "total" not in skeleton
+    assert "response" not in skeleton
+    assert "side effect" not in skeleton
+    assert len(skeleton) < len(SOURCE)
+
+
+def test_skeletonize_invalid_source() -> None:
+    """Test that unparsable sources are returned unchanged."""
+    assert skeletonize("def broken(:\n") == "def broken(:\n"
+
+
+def test_skeletonize_many_process_pool() -> None:
+    """Test that the process pool preserves input order."""
+    sources = [f"def f{i}(a: int) -> int:\n    return a + {i}\n" for i in range(8)]
+    with patch("repodoc.skeleton.POOL_THRESHOLD", 2):
+        skeletons = skeletonize_many(sources, max_workers=2)
+    assert skeletons == [f"def f{i}(a: int) -> int:\n    ...\n" for i in range(8)]
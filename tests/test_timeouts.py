@@ -0,0 +1,53 @@
+"""Tests for adaptive request timeouts."""
+
+import pytest
+
+from repodoc.timeouts import (
+    LOAD_SECONDS,
+    MIN_FIRST_TOKEN_SECONDS,
+    MIN_IDLE_SECONDS,
+    SAFETY_FACTOR,
+    RateTracker,
+)
+
+
+def test_first_token_timeout_grows_with_prompt() -> None:
+    """Test that large prompts get proportionally longer first-token timeouts."""
+    tracker = RateTracker()
+    small = tracker.first_token_timeout("m", 10)
+    large = tracker.first_token_timeout("m", 100_000)
+    assert small == pytest.approx(LOAD_SECONDS, abs=1)
+    assert small >= MIN_FIRST_TOKEN_SECONDS
+    assert large > small
+
+
+def test_measured_rates_replace_defaults() -> None:
+    """Test that timeouts follow the measured rates of each model."""
+    tracker = RateTracker()
+    tracker.observe_first_token("m", 20_000, 10.0)  # 2000 tokens per second
+    tracker.observe_stats("m", {"eval_count": 100, "eval_duration": 2_000_000_000})
+
+    rates = tracker.rates("m")
+    assert rates.prompt_rate == 2000
+    assert rates.token_rate == 50
+    # The load allowance is dropped once the model has answered
+    assert tracker.first_token_timeout("m", 40_000) == pytest.approx(
+        SAFETY_FACTOR * 20
+    )
+    assert tracker.idle_timeout("m") == MIN_IDLE_SECONDS
+    assert tracker.rates("other").prompt_samples == 0
+
+
+def test_rates_are_smoothed() -> None:
+    """Test that later measurements move the average gradually."""
+    tracker = RateTracker()
+    tracker.observe_first_token("m", 1000, 1.0)
+    tracker.observe_first_token("m", 100, 1.0)
+    assert 100 < tracker.rates("m").prompt_rate < 1000
+
+
+def test_slow_generation_extends_idle_timeout() -> None:
+    """Test that slow models may pause longer between tokens."""
+    tracker = RateTracker()
+    tracker.observe_stats("m", {"eval_count": 1, "eval_duration": 10_000_000_000})
+    assert tracker.idle_timeout("m") == SAFETY_FACTOR * 10
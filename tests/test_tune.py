@@ -0,0 +1,78 @@
+"""Tests for host benchmarking."""
+
+from typing import Any, Dict
+
+import pytest
+
+from repodoc.config import ModelProfile, Performance
+from repodoc.tune import ChunkSample, best_chunk_size, best_concurrency, tune
+
+
+class FakeHost:
+    """Stand-in for a client whose server evaluates at most 8k prompt tokens.
+
+    Attributes:
+        requests: Number of probes sent.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the host."""
+        self.requests = 0
+
+    async def probe(
+        self, model: str, prompt: str, *, num_predict: int
+    ) -> Dict[str, Any]:
+        """Answer a probe with statistics like Ollama's.
+
+        Args:
+            model: Model queried.
+            prompt: Prompt text.
+            num_predict: Tokens to generate.
+
+        Returns:
+            Timing statistics.
+        """
+        self.requests += 1
+        tokens = min(len(prompt) // 4, 8_000)
+        return {
+            "prompt_eval_count": tokens,
+            "prompt_eval_duration": tokens * 1_000_000,  # 1000 tokens/s
+            "eval_count": num_predict,
+            "eval_duration": num_predict * 50_000_000,  # 20 tokens/s
+        }
+
+
+def test_best_chunk_size() -> None:
+    """Test that truncated and slow prompt sizes are not chosen."""
+    samples = [
+        ChunkSample(2_000, 2_000, 900.0),
+        ChunkSample(4_000, 4_000, 1000.0),
+        ChunkSample(8_000, 8_000, 600.0),  # too slow
+        ChunkSample(16_000, 4_096, 1000.0),  # truncated
+    ]
+    assert best_chunk_size(samples) == 4_000
+    assert best_chunk_size([ChunkSample(2_000, 512, 100.0)]) is None
+
+
+def test_best_concurrency() -> None:
+    """Test that concurrency stops growing once throughput levels off."""
+    assert best_concurrency({1: 20.0, 2: 38.0, 4: 70.0, 8: 72.0}) == 4
+    assert best_concurrency({1: 20.0, 2: 21.0, 4: 80.0}) == 1
+    assert best_concurrency({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_tune_profiles_each_model() -> None:
+    """Test that tuning measures rates and chunk sizes per model."""
+    host = FakeHost()
+    base = Performance(models={"other": ModelProfile(chunk_tokens=1_000)})
+
+    performance = await tune(host, ["big", "small"], base=base, levels=(1, 2))
+
+    assert performance.chunk_tokens == 8_000
+    assert performance.models["big"].chunk_tokens == 8_000
+    assert performance.models["big"].prompt_rate == pytest.approx(1000.0)
+    assert performance.models["small"].token_rate == pytest.approx(20.0)
+    assert performance.models["other"].chunk_tokens == 1_000
+    assert performance.concurrency in (1, 2)
+    assert base.models.keys() == {"other"}
@@ -0,0 +1,124 @@
+"""Tests for document validation and targeted repairs."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from repodoc.ollama import OllamaClient, Task
+from repodoc.validate import (
+    check_mermaid,
+    check_section,
+    count_diagrams,
+    repair,
+    split_sections,
+    validate,
+)
+
+GOOD = """## Architecture
+
+The parser reads packs.
+
+### Flow
+
+```mermaid
+graph TD
+    A[Parser] --> B{Index}
+```
+
+Data flows one way.
+"""
+
+
+def test_sound_document_passes() -> None:
+    """Test that a complete document has no problems."""
+    assert validate(GOOD, title="Architecture", diagrams=1) == []
+    assert count_diagrams(GOOD) == 1
+
+
+def test_split_sections_round_trips() -> None:
+    """Test that sections split at headers outside code and join back."""
+    doc = "## A\n\ntext.\n\n```python\n## not a header\n```\n\n### B\n\nmore.\n"
+    sections = split_sections(doc)
+    assert [section.splitlines()[0] for section in sections] == ["## A", "### B"]
+    assert "".join(sections) == doc
+
+
+def test_check_mermaid() -> None:
+    """Test the Mermaid sanity checks."""
+    assert check_mermaid("sequenceDiagram\n    A->>B: Hello") is None
+    assert check_mermaid('graph LR\n    A["label (x"] --> B') is None
+    assert "unknown type" in check_mermaid("diagram\n    A --> B")
+    assert "unbalanced" in check_mermaid("graph TD\n    A[Parser --> B")
+    assert check_mermaid("%% comment only") == "empty Mermaid diagram"
+
+
+def test_check_section_problems() -> None:
+    """Test that unclosed fences and truncated text are reported."""
+    assert check_section("### Usage\n\n```bash\nrepodoc generate .\n") == [
+        "code block is never closed"
+    ]
+    assert check_section("### Usage\n\nRun the command and then") == [
+        "text ends mid-sentence"
+    ]
+    # Lists, tables and code blocks need no closing punctuation
+    assert check_section("### Usage\n\n- generate\n- plan") == []
+    assert check_section("### Options\n\n| a | b |") == []
+
+
+def test_validate_reports_header_and_diagrams() -> None:
+    """Test document-level problems."""
+    problems = validate("Some text.\n", title="Architecture", diagrams=1)
+    assert problems == [
+        "missing the '## Architecture' header",
+        "0 of at least 1 Mermaid diagrams",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_repair_sends_only_failing_sections() -> None:
+    """Test that only the broken section is sent back to the model."""
+    doc = GOOD + "\n### Usage\n\nRun"
+    client = AsyncMock(spec=OllamaClient)
+    client.generate.return_value = "### Usage\n\nRun it."
+
+    repaired = await repair(doc, client, title="Architecture", diagrams=1)
+
+    assert repaired == GOOD + "\n### Usage\n\nRun it.\n"
+    client.generate.assert_called_once()
+    prompt = client.generate.call_args.args[0]
+    assert "text ends mid-sentence" in prompt
+    assert "The parser reads packs." not in prompt
+    assert client.generate.call_args.kwargs["task"] is Task.REPAIR
+
+
+@pytest.mark.asyncio
+async def test_repair_adds_header_and_diagram() -> None:
+    """Test local header fixes and a requested missing diagram."""
+    client = AsyncMock(spec=OllamaClient)
+    client.generate.return_value = "```mermaid\nflowchart LR\n    A --> B\n```"
+
+    repaired = await repair(
+        "The parser reads packs.\n", client, title="Architecture", diagrams=1
+    )
+
+    assert repaired.startswith("## Architecture\n\nThe parser reads packs.\n")
+    assert validate(repaired, title="Architecture", diagrams=1) == []
+    client.generate.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_repair_keeps_original_when_rewrite_is_worse() -> None:
+    """Test that a rewrite that does not fix the section is discarded."""
+    doc = "## API\n\nRun the command and then"
+    client = AsyncMock(spec=OllamaClient)
+    client.generate.return_value = "## API\n\nStill cut off and"
+
+    assert await repair(doc, client, title="API") == doc
+
+
+@pytest.mark.asyncio
+async def test_repair_leaves_sound_documents_alone() -> None:
+    """Test that no request is made for a document without problems."""
+    client = AsyncMock(spec=OllamaClient)
+    assert await repair(GOOD, client, title="Architecture", diagrams=1) is GOOD
+    client.generate.assert_not_called()
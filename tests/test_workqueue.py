@@ -0,0 +1,183 @@
+"""Tests for the shared work queue and its workers."""
+
+import asyncio
+from pathlib import Path
+from typing import Dict, List
+from unittest.mock import AsyncMock
+
+import pytest
+
+from repodoc.errors import OllamaError
+from repodoc.ollama import OllamaClient
+from repodoc.workqueue import QueueClient, ResultCache, WorkQueue, Worker, open_queue
+
+
+class Clock:
+    """Manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        """Start at time 1000."""
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def test_claim_lease_and_expiry(tmp_path: Path) -> None:
+    """Test that expired leases are reclaimed until attempts run out.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    clock = Clock()
+    queue = WorkQueue(tmp_path / "queue.db", max_attempts=2, clock=clock)
+    queue.submit("k", {"prompt": "p"})
+    queue.submit("k", {"prompt": "p"})  # shared while pending
+
+    job = queue.claim("a", lease_seconds=10)
+    assert job is not None and job.payload == {"prompt": "p"} and job.attempts == 1
+    assert queue.claim("b", lease_seconds=10) is None
+
+    clock.now += 5
+    assert queue.heartbeat("k", "a", lease_seconds=10)
+    clock.now += 8
+    assert queue.claim("b", lease_seconds=10) is None  # renewed lease
+
+    clock.now += 20
+    job = queue.claim("b", lease_seconds=10)
+    assert job is not None and job.attempts == 2
+    assert not queue.heartbeat("k", "a", lease_seconds=10)  # lease moved on
+
+    clock.now += 20
+    assert queue.claim("c", lease_seconds=10) is None
+    assert queue.settled(["k", "other"]) == {
+        "k": ("failed", "lease expired after 2 attempts")
+    }
+
+
+def test_fail_retries_then_gives_up(tmp_path: Path) -> None:
+    """Test that failed attempts are retried up to the attempt limit.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    queue = WorkQueue(tmp_path / "queue.db", max_attempts=2)
+    queue.submit("k", {})
+    queue.fail("k", "a", "unleased jobs are not failed")
+    assert queue.counts() == {"pending": 1}
+
+    queue.claim("a")
+    queue.fail("k", "a", "boom")
+    assert queue.counts() == {"pending": 1}
+    queue.claim("a")
+    queue.fail("k", "a", "boom")
+    assert queue.settled(["k"]) == {"k": ("failed", "boom")}
+
+    queue.submit("k", {})  # a new run tries again
+    assert queue.claim("a").attempts == 1
+    queue.complete("k")
+    queue.submit("k", {})
+    assert queue.counts() == {"done": 1}
+    queue.requeue("k")  # e.g. the result was deleted
+    assert queue.counts() == {"pending": 1}
+
+
+def test_result_cache_round_trip(tmp_path: Path) -> None:
+    """Test that results are stored by key.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    cache = ResultCache(tmp_path / "results")
+    assert cache.get("ab12") is None
+    cache.put("ab12", "text")
+    assert cache.get("ab12") == "text"
+    assert (tmp_path / "results" / "ab" / "ab12.txt").exists()
+
+
+def _worker_client(calls: List[str]) -> OllamaClient:
+    """Build a fake Ollama client recording the prompts it generates from.
+
+    Args:
+        calls: Receives each prompt.
+
+    Returns:
+        The client.
+    """
+    client = AsyncMock(spec=OllamaClient)
+
+    async def generate(prompt: str, **kwargs) -> str:
+        calls.append(prompt)
+        await asyncio.sleep(0.01)
+        return f"answer to {prompt}"
+
+    client.generate.side_effect = generate
+    return client
+
+
+@pytest.mark.asyncio
+async def test_several_workers_share_a_queue(tmp_path: Path) -> None:
+    """Test a coordinator and three workers on one machine.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    queue, cache = open_queue(tmp_path / "shared")
+    coordinator = QueueClient(queue, cache, model="big", poll_seconds=0.01)
+    calls: Dict[str, List[str]] = {}
+    workers = []
+    for name in ("w1", "w2", "w3"):
+        calls[name] = []
+        client = _worker_client(calls[name])
+        workers.append(
+            Worker(
+                *open_queue(tmp_path / "shared"),
+                lambda model, client=client: client,
+                owner=name,
+                poll_seconds=0.01,
+            )
+        )
+
+    prompts = [f"prompt {i}" for i in range(12)]
+    running = [asyncio.create_task(w.run(concurrency=2)) for w in workers]
+    answers = await asyncio.gather(
+        *(coordinator.generate(p) for p in prompts), coordinator.generate(prompts[0])
+    )
+    for task in running:
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+    await coordinator.close()
+
+    assert answers == [f"answer to {p}" for p in [*prompts, prompts[0]]]
+    assert sum(w.processed for w in workers) == len(prompts)
+    assert sorted(c for done in calls.values() for c in done) == sorted(prompts)
+    assert queue.counts() == {"done": len(prompts)}
+
+    # Cached results are answered without a new job
+    second = QueueClient(queue, cache, model="big")
+    assert await second.generate(prompts[3]) == "answer to prompt 3"
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_job_raises_on_the_coordinator(tmp_path: Path) -> None:
+    """Test that a job failing on every attempt fails the request.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+    """
+    queue, cache = open_queue(tmp_path)
+    coordinator = QueueClient(queue, cache, model="big", poll_seconds=0.01)
+    client = AsyncMock(spec=OllamaClient)
+    client.generate.side_effect = OllamaError("model not found")
+    worker = Worker(queue, cache, lambda model: client, owner="w", poll_seconds=0.01)
+
+    running = asyncio.create_task(worker.run())
+    with pytest.raises(OllamaError, match="model not found"):
+        await coordinator.generate("prompt")
+    running.cancel()
+    await asyncio.gather(running, return_exceptions=True)
+    assert worker.processed == 0
+    assert client.generate.call_count == 3
+    await coordinator.close()